@@ -3,8 +3,11 @@ import logging
 import os
 import re
 import shutil
+import threading
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime
-from typing import NamedTuple, Optional
+from typing import List, NamedTuple, Optional
 
 from auth.authorization import Authorizer
 from config.exceptions import InvalidConfigException
@@ -25,6 +28,31 @@ WORKING_DIR_FIELD = 'working_directory'
 
 LOGGER = logging.getLogger('config_service')
 
+DEFAULT_VALUES_PROVIDER_WORKERS = 8
+
+DEFAULT_PREWARM_WORKERS = 8
+
+# configs, which take longer to parse during prewarm, are reported as slow
+SLOW_CONFIG_PARSE_SECONDS = 1
+
+# config files, modified within this period, are not cached, because mtime precision can be too low to notice changes
+_RACY_MTIME_NANOSECONDS = 2 * 1_000_000_000
+
+
+class _ShortConfigEntry(NamedTuple):
+    path: str
+    signature: tuple
+    short_config: Optional[ShortConfig]
+    corrupt: bool
+    failed: bool = False
+
+
+class ConfigParseTiming(NamedTuple):
+    path: str
+    seconds: float
+    failed: bool
+
+
 class ConfigSearchResult(NamedTuple):
     short_config: ShortConfig
     path: str
@@ -48,6 +76,24 @@ def _preprocess_incoming_config(config):
     config['name'] = name.strip()
 
 
+def _log_prewarm_timings(timings, total_seconds):
+    failed_count = sum(1 for timing in timings if timing.failed)
+    LOGGER.info('Parsed %d script configs in %.3fs (%d failed)', len(timings), total_seconds, failed_count)
+
+    for timing in sorted(timings, key=lambda t: t.seconds, reverse=True):
+        if timing.seconds < SLOW_CONFIG_PARSE_SECONDS:
+            break
+        LOGGER.warning('Slow script config %s: parsed in %.3fs', timing.path, timing.seconds)
+
+    for timing in timings:
+        LOGGER.debug('Parsed %s in %.3fs%s', timing.path, timing.seconds, ' (failed)' if timing.failed else '')
+
+
+def _read_file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
 def _create_archive_filename(filename):
     current_datetime = datetime.now()
     formatted_datetime = current_datetime.strftime('%Y%m%d%H%M%S')
@@ -60,7 +106,9 @@ class ConfigService:
             authorizer,
             conf_folder,
             group_scripts_by_folder: bool,
-            process_invoker: ProcessInvoker) -> None:
+            process_invoker: ProcessInvoker,
+            values_provider_workers=DEFAULT_VALUES_PROVIDER_WORKERS,
+            project_service=None) -> None:
 
         self._authorizer = authorizer  # type: Authorizer
         self._script_configs_folder = os.path.join(conf_folder, 'runners')
@@ -68,6 +116,19 @@ class ConfigService:
         self._scripts_deleted_folder = os.path.join(conf_folder, 'deleted')
         self._process_invoker = process_invoker
         self._group_scripts_by_folder = group_scripts_by_folder
+        self._project_service = project_service
+
+        # values scripts of all parameters are evaluated in parallel, so a model doesn't wait for each of them
+        self._values_executor = ThreadPoolExecutor(
+            max_workers=values_provider_workers,
+            thread_name_prefix='values-provider')
+
+        self._short_configs_lock = threading.Lock()
+        self._short_config_entries = {}
+        self._short_configs_version = 0
+
+        # script name -> path of its config file, so loading a known script doesn't walk the whole runners folder
+        self._config_paths_by_name = {}
 
         file_utils.prepare_folder(self._script_configs_folder)
         file_utils.prepare_folder(self._scripts_deleted_folder)
@@ -225,34 +286,136 @@ class ConfigService:
         if edit_mode:
             self._check_admin_access(user)
 
-        conf_service = self
-
         has_admin_rights = self._authorizer.is_admin(user.user_id)
 
-        def load_script(path, content) -> Optional[ShortConfig]:
-            try:
-                config_object = self.load_config_file(path, content)
-                short_config = self.read_short_config(config_object, path)
+        result = []
+        for entry in self._read_short_configs():
+            if entry.corrupt:
+                result.append(create_failed_short_config(entry.path, has_admin_rights))
+                continue
 
-                if short_config is None:
-                    return None
+            short_config = entry.short_config
+            if short_config is None:
+                continue
 
-                if edit_mode and (not conf_service._can_edit_script(user, short_config)):
-                    return None
+            if edit_mode and (not self._can_edit_script(user, short_config)):
+                continue
 
-                if (not edit_mode) and (not conf_service._can_access_script(user, short_config)):
-                    return None
+            if (not edit_mode) and (not self._can_access_script(user, short_config)):
+                continue
 
-                return short_config
-            except json.decoder.JSONDecodeError:
-                LOGGER.exception(CorruptConfigFileException.VERBOSE_ERROR + ': ' + path)
-                return create_failed_short_config(path, has_admin_rights)
-            except Exception:
-                LOGGER.exception('Could not load script: ' + path)
+            result.append(short_config)
 
-        return self._visit_script_configs(load_script)
+        return result
 
-    def load_config_model(self, name, user, parameter_values=None, skip_invalid_parameters=False):
+    def get_configs_version(self):
+        """Returns a number, which is changed, when any of the short configs, returned by list_configs, changes"""
+        return self._short_configs_version
+
+    def _read_short_configs(self):
+        """Reads short configs of all the script configs. Only new and modified files are parsed"""
+        with self._short_configs_lock:
+            previous_entries = self._short_config_entries
+            entries = {}
+            changed = False
+
+            for path in self._list_config_paths():
+                try:
+                    signature = _read_file_signature(path)
+                except OSError as e:
+                    LOGGER.exception("Couldn't read the file %s: %s", path, e)
+                    continue
+
+                entry = previous_entries.get(path)
+                if (entry is None) or (entry.signature != signature):
+                    entry = self._parse_short_config_entry(path, signature)
+                    changed = True
+
+                entries[path] = entry
+
+            if changed or (entries.keys() != previous_entries.keys()):
+                self._short_configs_version += 1
+
+            # files, modified in the last moments, can be modified again without mtime change, so they are re-read
+            now = time.time_ns()
+            self._short_config_entries = {
+                path: entry for path, entry in entries.items()
+                if (now - entry.signature[0]) >= _RACY_MTIME_NANOSECONDS}
+
+        return list(entries.values())
+
+    def _parse_short_config_entry(self, path, signature):
+        try:
+            content = file_utils.read_file(path)
+            config_object = self.load_config_file(path, content)
+            short_config = self.read_short_config(config_object, path)
+            return _ShortConfigEntry(path, signature, short_config, False)
+        except json.decoder.JSONDecodeError:
+            LOGGER.exception(CorruptConfigFileException.VERBOSE_ERROR + ': ' + path)
+            return _ShortConfigEntry(path, signature, None, True)
+        except Exception:
+            LOGGER.exception('Could not load script: ' + path)
+            return _ShortConfigEntry(path, signature, None, False, failed=True)
+
+    def prewarm(self, workers=None) -> List[ConfigParseTiming]:
+        """
+        Parses all script configs (and project metadata) in parallel, so that the first list_configs call
+        doesn't need to parse them. Returns parsing time of each config file
+        """
+        start_time = time.perf_counter()
+
+        def parse(path):
+            parse_start_time = time.perf_counter()
+            try:
+                entry = self._parse_short_config_entry(path, _read_file_signature(path))
+            except OSError as e:
+                LOGGER.exception("Couldn't read the file %s: %s", path, e)
+                entry = None
+
+            return entry, ConfigParseTiming(
+                path,
+                time.perf_counter() - parse_start_time,
+                (entry is None) or entry.corrupt or entry.failed)
+
+        with ThreadPoolExecutor(max_workers=workers or DEFAULT_PREWARM_WORKERS,
+                                thread_name_prefix='config-prewarm') as executor:
+            if self._project_service is not None:
+                projects_future = executor.submit(self._prewarm_projects)
+            else:
+                projects_future = None
+
+            parse_results = list(executor.map(parse, self._list_config_paths()))
+
+            if projects_future is not None:
+                projects_future.result()
+
+        now = time.time_ns()
+        with self._short_configs_lock:
+            for entry, _ in parse_results:
+                if (entry is not None) and ((now - entry.signature[0]) >= _RACY_MTIME_NANOSECONDS):
+                    self._short_config_entries[entry.path] = entry
+            self._short_configs_version += 1
+
+        timings = [timing for _, timing in parse_results]
+        _log_prewarm_timings(timings, time.perf_counter() - start_time)
+        return timings
+
+    def _prewarm_projects(self):
+        start_time = time.perf_counter()
+        try:
+            projects = self._project_service.list_projects()
+            LOGGER.info('Loaded metadata of %d projects in %.3fs', len(projects), time.perf_counter() - start_time)
+        except Exception:
+            LOGGER.exception('Failed to load projects metadata')
+
+    def load_config_model(self, name, user, parameter_values=None, skip_invalid_parameters=False,
+                          run_values_scripts=True):
+        """
+        Loads the config model of the script
+
+        run_values_scripts=False is intended for non-interactive executions (e.g. scheduled ones): values scripts
+        of list parameters are not started, so the values of such parameters are not checked against them
+        """
         search_result = self._find_config(name, user)
 
         if search_result is None:
@@ -271,9 +434,12 @@ class ConfigService:
             skip_invalid_parameters,
             self._process_invoker,
             self._group_scripts_by_folder,
-            self._script_configs_folder)
+            self._script_configs_folder,
+            self._values_executor,
+            self._project_service,
+            run_values_scripts)
 
-    def _visit_script_configs(self, visitor):
+    def _list_config_paths(self):
         configs_dir = self._script_configs_folder
 
         # Directories to exclude from script scanning (venv contains 500+ JSON discovery cache files)
@@ -290,9 +456,12 @@ class ConfigService:
         configs = [file for file in files if file.lower().endswith(".json") or file.lower().endswith(".yaml")]
         configs.sort()
 
+        return configs
+
+    def _visit_script_configs(self, visitor):
         result = []
 
-        for config_path in configs:
+        for config_path in self._list_config_paths():
             try:
                 content = file_utils.read_file(config_path)
 
@@ -310,6 +479,12 @@ class ConfigService:
         return result
 
     def _find_config(self, name, user) -> Optional[ConfigSearchResult]:
+        name = name.strip()
+
+        cached_result = self._find_config_by_known_path(name)
+        if cached_result is not None:
+            return cached_result
+
         has_admin_rights = self._authorizer.is_admin(user.user_id)
 
         def find_and_load(path: str, content):
@@ -327,22 +502,44 @@ class ConfigService:
                 LOGGER.exception('Could not load script config: ' + path)
                 return None
 
-            if short_config.name != name.strip():
+            if short_config.name != name:
                 return None
 
             raise StopIteration(ConfigSearchResult(short_config, path, config_object))
 
         configs = self._visit_script_configs(find_and_load)
         if not configs:
+            self._config_paths_by_name.pop(name, None)
             return None
 
         found_config = configs[0]
 
         if found_config.short_config.parsing_failed:
+            self._config_paths_by_name.pop(name, None)
             raise CorruptConfigFileException()
 
+        self._config_paths_by_name[name] = found_config.path
         return found_config
 
+    def _find_config_by_known_path(self, name) -> Optional[ConfigSearchResult]:
+        """Re-reads the file, where the script was found last time. Returns None, if it doesn't match anymore"""
+        path = self._config_paths_by_name.get(name)
+        if path is None:
+            return None
+
+        try:
+            content = file_utils.read_file(path)
+            config_object = self.load_config_file(path, content)
+            short_config = self.read_short_config(config_object, path)
+        except Exception:
+            # the file was removed or broken, full search reports it properly
+            return None
+
+        if (short_config is None) or (short_config.name != name):
+            return None
+
+        return ConfigSearchResult(short_config, path, config_object)
+
     @staticmethod
     def _load_script_config(
             path,
@@ -352,7 +549,10 @@ class ConfigService:
             skip_invalid_parameters,
             process_invoker,
             group_scripts_by_folder,
-            script_configs_folder):
+            script_configs_folder,
+            values_executor=None,
+            project_service=None,
+            run_values_scripts=True):
 
         if isinstance(content_or_json_dict, str):
             json_object = custom_json.loads(content_or_json_dict)
@@ -366,7 +566,10 @@ class ConfigService:
             group_scripts_by_folder,
             script_configs_folder,
             process_invoker,
-            pty_enabled_default=os_utils.is_pty_supported())
+            pty_enabled_default=os_utils.is_pty_supported(),
+            values_executor=values_executor,
+            project_service=project_service,
+            run_values_scripts=run_values_scripts)
 
         if parameter_values is not None:
             config.set_all_param_values(parameter_values, skip_invalid_parameters)
@@ -1,6 +1,8 @@
 import abc
 import logging
 import re
+import threading
+from concurrent.futures import Executor
 
 from model.model_helper import is_empty, fill_parameter_values, InvalidFileException, list_files
 from utils.file_utils import FileMatcher
@@ -14,6 +16,18 @@ class ValuesProvider(metaclass=abc.ABCMeta):
     def get_required_parameters(self):
         return []
 
+    def is_loaded(self):
+        return True
+
+    def wait_loaded(self):
+        pass
+
+    def add_loaded_listener(self, listener):
+        listener()
+
+    def cancel(self):
+        pass
+
     @abc.abstractmethod
     def get_values(self, parameter_values):
         pass
@@ -41,13 +55,55 @@ class ConstValuesProvider(ValuesProvider):
 
 
 class ScriptValuesProvider(ValuesProvider):
+    """
+    Reads values from the script output
+
+    If executor is specified, the script is started in background and get_values returns an empty list,
+    until the script finishes. Otherwise, the script is executed immediately
+    """
 
-    def __init__(self, script, shell, process_invoker: ProcessInvoker) -> None:
-        script_output = process_invoker.invoke(script, shell=shell)
+    def __init__(self, script, shell, process_invoker: ProcessInvoker, executor: Executor = None) -> None:
+        self._script = script
+        self._shell = shell
+        self._process_invoker = process_invoker
+
+        if executor is None:
+            self._future = None
+            self._values = self._read_values()
+        else:
+            self._values = []
+            self._future = executor.submit(self._read_values_safely)
+
+    def _read_values(self):
+        script_output = self._process_invoker.invoke(self._script, shell=self._shell)
         script_output = script_output.rstrip('\n')
-        self._values = [line for line in script_output.split('\n') if not is_empty(line)]
+        return [line for line in script_output.split('\n') if not is_empty(line)]
+
+    def _read_values_safely(self):
+        try:
+            return self._read_values()
+        except Exception as e:
+            LOGGER.warning('Failed to execute script. ' + str(e))
+            return []
+
+    def is_loaded(self):
+        return (self._future is None) or self._future.done()
+
+    def wait_loaded(self):
+        if self._future is not None:
+            self._future.result()
+
+    def add_loaded_listener(self, listener):
+        if self._future is None:
+            listener()
+            return
+
+        self._future.add_done_callback(lambda _: listener())
 
     def get_values(self, parameter_values):
+        if (self._future is not None) and self._future.done():
+            return self._future.result()
+
         return self._values
 
 
@@ -80,9 +136,32 @@ class DependantScriptValuesProvider(ValuesProvider):
         self._shell = shell
         self._process_invoker = process_invoker
 
+        self._process_lock = threading.Lock()
+        self._running_process = None
+        self._cancelled = False
+
     def get_required_parameters(self):
         return self._required_parameters
 
+    def cancel(self):
+        """Kills the values script, which is currently running (if any)"""
+        with self._process_lock:
+            process = self._running_process
+            if process is None:
+                return
+            self._cancelled = True
+
+        LOGGER.info('Cancelling outdated values script: ' + self._script_template)
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+    def _on_process_started(self, process):
+        with self._process_lock:
+            self._running_process = process
+            self._cancelled = False
+
     def get_values(self, parameter_values):
         for param_name in self._required_parameters:
             value_wrapper = parameter_values.get(param_name)
@@ -93,14 +172,30 @@ class DependantScriptValuesProvider(ValuesProvider):
         script = fill_parameter_values(parameters, self._script_template, parameter_values)
 
         try:
-            script_output = self._process_invoker.invoke(script, shell=self._shell)
+            script_output = self._process_invoker.invoke(script,
+                                                         shell=self._shell,
+                                                         on_started=self._on_process_started)
         except Exception as e:
+            if self._finish_process():
+                raise ValuesLoadingCancelledException() from e
+
             LOGGER.warning('Failed to execute script. ' + str(e))
             return []
 
+        if self._finish_process():
+            raise ValuesLoadingCancelledException()
+
         script_output = script_output.rstrip('\n')
         return [line for line in script_output.split('\n') if not is_empty(line)]
 
+    def _finish_process(self):
+        with self._process_lock:
+            cancelled = self._cancelled
+            self._running_process = None
+            self._cancelled = False
+
+        return cancelled
+
 
 class FilesProvider(ValuesProvider):
 
@@ -122,3 +217,8 @@ class FilesProvider(ValuesProvider):
 
     def get_values(self, parameter_values):
         return self._values
+
+
+class ValuesLoadingCancelledException(Exception):
+    def __init__(self) -> None:
+        super().__init__('Values loading was cancelled')
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+from typing import Optional
+
+# manual executions are preferred, because a user is waiting for them
+PRIORITY_MANUAL = 10
+PRIORITY_SCHEDULED = 0
+
+
+class _QueuedEntry:
+    __slots__ = ('execution_id', 'limits', 'priority', 'removed')
+
+    def __init__(self, execution_id, limits, priority) -> None:
+        self.execution_id = execution_id
+        self.limits = limits
+        self.priority = priority
+        self.removed = False
+
+
+class ExecutionQueue:
+    """
+    Concurrency limits of executions
+
+    There is a global limit and limits per key (e.g. per script). Executions, which exceed any of the limits,
+    wait in the queue: higher priority first, FIFO for the same priority.
+
+    This class is not thread-safe, callers should synchronize access
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None) -> None:
+        self.max_concurrent = max_concurrent
+
+        self._running = {}  # execution_id -> limit keys
+        self._running_by_key = {}  # key -> count
+
+        self._queue = []  # heap of (-priority, sequence, entry)
+        self._entries = {}  # execution_id -> entry
+        self._sequence = itertools.count()
+
+    def try_start(self, execution_id, limits: dict = None, priority=PRIORITY_MANUAL) -> bool:
+        """
+        Mark execution as running, if the limits allow it. Otherwise, it's queued
+
+        Args:
+            execution_id: id of the execution
+            limits: key -> max running executions with this key (None values are ignored)
+            priority: executions with higher priority leave the queue first
+
+        Returns:
+            True, if the execution can be started now
+        """
+        limits = {key: limit for key, limit in (limits or {}).items() if limit is not None}
+
+        # queued executions are always blocked by some limit (the queue is drained on every finish),
+        # so starting a new execution with free capacity doesn't overtake any of them
+        if self._has_capacity(limits):
+            self._mark_running(execution_id, limits)
+            return True
+
+        entry = _QueuedEntry(execution_id, limits, priority)
+        self._entries[execution_id] = entry
+        heapq.heappush(self._queue, (-priority, next(self._sequence), entry))
+        return False
+
+    def finish(self, execution_id) -> list:
+        """Release the slot of a finished execution. Returns queued executions, which should be started now"""
+        keys = self._running.pop(execution_id, ())
+        for key in keys:
+            count = self._running_by_key[key] - 1
+            if count:
+                self._running_by_key[key] = count
+            else:
+                del self._running_by_key[key]
+
+        return self._pop_startable()
+
+    def remove(self, execution_id) -> bool:
+        """Remove execution from the queue (if it's still queued)"""
+        entry = self._entries.pop(execution_id, None)
+        if entry is None:
+            return False
+
+        entry.removed = True
+        if len(self._entries) * 2 < len(self._queue):
+            self._queue = [queue_entry for queue_entry in self._queue if not queue_entry[2].removed]
+            heapq.heapify(self._queue)
+
+        return True
+
+    def is_queued(self, execution_id) -> bool:
+        return execution_id in self._entries
+
+    def get_queued_ids(self) -> list:
+        return [queue_entry[2].execution_id for queue_entry in sorted(self._queue) if not queue_entry[2].removed]
+
+    def get_stats(self) -> dict:
+        return {
+            'running': len(self._running),
+            'queued': len(self._entries),
+            'max_concurrent': self.max_concurrent,
+            'running_by_key': dict(self._running_by_key)
+        }
+
+    def _pop_startable(self) -> list:
+        started = []
+        # entries, which are blocked by their own limits, shouldn't block the rest of the queue
+        blocked = []
+
+        while self._queue and self._has_capacity({}):
+            queue_entry = heapq.heappop(self._queue)
+            entry = queue_entry[2]
+            if entry.removed:
+                continue
+
+            if not self._has_capacity(entry.limits):
+                blocked.append(queue_entry)
+                continue
+
+            del self._entries[entry.execution_id]
+            self._mark_running(entry.execution_id, entry.limits)
+            started.append(entry.execution_id)
+
+        for queue_entry in blocked:
+            heapq.heappush(self._queue, queue_entry)
+
+        return started
+
+    def _has_capacity(self, limits: dict) -> bool:
+        if (self.max_concurrent is not None) and (len(self._running) >= self.max_concurrent):
+            return False
+
+        for key, limit in limits.items():
+            if self._running_by_key.get(key, 0) >= limit:
+                return False
+
+        return True
+
+    def _mark_running(self, execution_id, limits: dict):
+        self._running[execution_id] = tuple(limits.keys())
+        for key in limits.keys():
+            self._running_by_key[key] = self._running_by_key.get(key, 0) + 1
@@ -1,10 +1,12 @@
 import logging
+import threading
 from collections import namedtuple
 from typing import Optional, Dict, Callable, Any
 
 from auth.authorization import Authorizer, is_same_user
 from auth.user import User
 from config.constants import SHARED_ACCESS_TYPE_ALL
+from execution.execution_queue import ExecutionQueue, PRIORITY_MANUAL
 from execution.executor import ScriptExecutor
 from model import script_config
 from model.model_helper import is_empty, AccessProhibitedException
@@ -19,8 +21,19 @@ _ExecutionInfo = namedtuple('_ExecutionInfo',
                             defaults=[None, None])
 
 
+class _QueuedExecution:
+    def __init__(self, connection_ids) -> None:
+        self.connection_ids = connection_ids
+        # listeners of this execution, which are added, while it's waiting in the queue
+        self.start_listeners = []
+        self.finish_listeners = []
+        # stop/kill, requested after the execution got a slot, but before it's started
+        self.stop_requested = False
+        self.kill_requested = False
+
+
 class ExecutionService:
-    def __init__(self, authorizer, id_generator, env_vars: EnvVariables):
+    def __init__(self, authorizer, id_generator, env_vars: EnvVariables, max_concurrent: Optional[int] = None):
 
         self._id_generator = id_generator
         self._authorizer = authorizer  # type: Authorizer
@@ -37,6 +50,10 @@ class ExecutionService:
         self._start_listeners = []
         self._env_vars = env_vars
 
+        self._lock = threading.RLock()
+        self._queue = ExecutionQueue(max_concurrent)
+        self._queued_executions = {}  # type: Dict[str, _QueuedExecution]
+
     def get_active_executor(self, execution_id, user):
         self.validate_execution_id(execution_id, user, only_active=False)
         if execution_id not in self._active_executor_ids:
@@ -44,18 +61,23 @@ class ExecutionService:
 
         return self._executors.get(execution_id)
 
-    def start_script(self, config, user: User, schedule_id=None, instance_name=None, connection_ids=None):
+    def start_script(self, config, user: User, schedule_id=None, instance_name=None, connection_ids=None,
+                     priority=PRIORITY_MANUAL, concurrency_group=None):
+        """
+        Start the script or put it to the queue, if concurrency limits are reached
+
+        Args:
+            priority: queued executions with higher priority are started first
+            concurrency_group: executions of the same group don't run in parallel
+        """
         audit_name = user.get_audit_name()
 
         executor = ScriptExecutor(config, self._env_vars)
         execution_id = self._id_generator.next_id()
 
         audit_command = executor.get_secure_command()
-        LOGGER.info('Calling script #%s: %s', execution_id, audit_command)
 
-        executor.start(execution_id, connection_ids=connection_ids)
-        self._executors[execution_id] = executor
-        self._execution_infos[execution_id] = _ExecutionInfo(
+        execution_info = _ExecutionInfo(
             execution_id=execution_id,
             owner_user=user,
             audit_name=audit_name,
@@ -63,7 +85,28 @@ class ExecutionService:
             config=config,
             schedule_id=schedule_id,
             instance_name=instance_name)
-        self._active_executor_ids.add(execution_id)
+
+        limits = {'script:' + config.name: config.max_concurrent_executions}
+        if concurrency_group is not None:
+            limits['group:' + concurrency_group] = 1
+
+        with self._lock:
+            if not self._queue.try_start(execution_id, limits, priority):
+                LOGGER.info('Queued script #%s: %s', execution_id, audit_command)
+
+                self._queued_executions[execution_id] = _QueuedExecution(connection_ids)
+                self._register_execution(executor, execution_info)
+                return execution_id
+
+        LOGGER.info('Calling script #%s: %s', execution_id, audit_command)
+
+        try:
+            executor.start(execution_id, connection_ids=connection_ids)
+        except BaseException:
+            self._release_slot(execution_id)
+            raise
+
+        self._register_execution(executor, execution_info)
 
         self._fire_execution_started(execution_id, user)
 
@@ -71,21 +114,140 @@ class ExecutionService:
 
         return execution_id
 
+    def _register_execution(self, executor, execution_info: _ExecutionInfo):
+        execution_id = execution_info.execution_id
+        self._executors[execution_id] = executor
+        self._execution_infos[execution_id] = execution_info
+        self._active_executor_ids.add(execution_id)
+
+    def _start_queued(self, execution_ids):
+        pending_ids = list(execution_ids)
+
+        while pending_ids:
+            execution_id = pending_ids.pop(0)
+
+            executor = self._executors[execution_id]
+            execution_info = self._execution_infos[execution_id]
+            user = execution_info.owner_user
+
+            with self._lock:
+                queued_execution = self._queued_executions[execution_id]
+                connection_ids = queued_execution.connection_ids
+                stop_requested = queued_execution.stop_requested
+
+            if stop_requested:
+                LOGGER.info('Queued script #%s was stopped before start', execution_id)
+
+                self._remove_queued_execution(execution_id)
+                self._notify_cancelled(execution_id, queued_execution)
+
+                with self._lock:
+                    pending_ids.extend(self._queue.finish(execution_id))
+                continue
+
+            LOGGER.info('Calling queued script #%s: %s', execution_id, execution_info.audit_command)
+
+            try:
+                executor.start(execution_id, connection_ids=connection_ids)
+            except Exception:
+                LOGGER.exception('Failed to start queued script #%s', execution_id)
+
+                queued_execution = self._remove_queued_execution(execution_id)
+                self._notify_cancelled(execution_id, queued_execution)
+
+                with self._lock:
+                    pending_ids.extend(self._queue.finish(execution_id))
+                continue
+
+            with self._lock:
+                queued_execution = self._queued_executions.pop(execution_id)
+
+            self._fire_execution_started(execution_id, user)
+
+            # start listeners go first: finish listeners are called immediately, if the script already finished
+            for callback in queued_execution.start_listeners:
+                _notify_listener(callback, execution_id)
+
+            self._add_post_finish_handling(execution_id, executor, user)
+
+            for callback in queued_execution.finish_listeners:
+                self.add_finish_listener(callback, execution_id)
+
+            # requested, while the script was starting
+            if queued_execution.kill_requested:
+                executor.kill()
+            elif queued_execution.stop_requested:
+                executor.stop()
+
+    def _release_slot(self, execution_id):
+        with self._lock:
+            next_ids = self._queue.finish(execution_id)
+
+        self._start_queued(next_ids)
+
+    def _cancel_queued(self, execution_id, kill=False) -> bool:
+        with self._lock:
+            queued_execution = self._queued_executions.get(execution_id)
+            if queued_execution is None:
+                return False
+
+            if not self._queue.remove(execution_id):
+                # the execution already got a slot, so it's stopped by _start_queued
+                queued_execution.stop_requested = True
+                queued_execution.kill_requested = queued_execution.kill_requested or kill
+                return True
+
+            queued_execution = self._remove_queued_execution(execution_id)
+
+        LOGGER.info('Removed script #%s from the queue', execution_id)
+        self._notify_cancelled(execution_id, queued_execution)
+        return True
+
+    def _remove_queued_execution(self, execution_id) -> _QueuedExecution:
+        with self._lock:
+            queued_execution = self._queued_executions.pop(execution_id)
+            self._executors.pop(execution_id, None)
+            self._execution_infos.pop(execution_id, None)
+            self._active_executor_ids.discard(execution_id)
+
+        return queued_execution
+
+    @staticmethod
+    def _notify_cancelled(execution_id, queued_execution: _QueuedExecution):
+        # the execution will never start, so finish listeners are notified right away
+        for callback in queued_execution.finish_listeners:
+            _notify_listener(callback, execution_id)
+
+    def is_queued(self, execution_id):
+        with self._lock:
+            return execution_id in self._queued_executions
+
+    def get_queue_stats(self) -> dict:
+        with self._lock:
+            return self._queue.get_stats()
+
     def stop_script(self, execution_id, user):
         self.validate_execution_id(execution_id, user)
 
-        if execution_id in self._executors:
-            self._executors[execution_id].stop()
+        if self._cancel_queued(execution_id):
+            return
+
+        executor = self._executors.get(execution_id)
+        if (executor is not None) and executor.is_started():
+            executor.stop()
 
     def kill_script(self, execution_id, user):
         self.validate_execution_id(execution_id, user)
 
-        if execution_id in self._executors:
-            self._executors[execution_id].kill()
+        self.kill_script_by_system(execution_id)
 
     def kill_script_by_system(self, execution_id):
-        if execution_id in self._executors:
-            self._executors[execution_id].kill()
+        if self._cancel_queued(execution_id, kill=True):
+            return
+
+        executor = self._executors.get(execution_id)
+        if (executor is not None) and executor.is_started():
+            executor.kill()
 
     def get_exit_code(self, execution_id):
         return self._get_for_executor(execution_id, lambda e: e.get_return_code())
@@ -97,7 +259,8 @@ class ExecutionService:
 
         self.validate_execution_id(execution_id, user, only_active=False, allow_when_history_access=True)
 
-        return not executor.is_finished()
+        # queued executions are not finished yet
+        return (not executor.is_started()) or (not executor.is_finished())
 
     def get_active_executions(self, user_id):
         result = []
@@ -111,8 +274,8 @@ class ExecutionService:
 
     def get_running_executions(self):
         result = []
-        for id, executor in self._executors.items():
-            if executor.is_finished():
+        for id, executor in list(self._executors.items()):
+            if (not executor.is_started()) or executor.is_finished():
                 continue
             result.append(id)
 
@@ -154,11 +317,13 @@ class ExecutionService:
 
     def get_user_parameter_values(self, execution_id):
         return self._get_for_executor(execution_id,
-                                      lambda e: e.get_user_parameter_values())
+                                      lambda e: e.get_user_parameter_values(),
+                                      only_started=False)
 
     def get_script_parameter_values(self, execution_id):
         return self._get_for_executor(execution_id,
-                                      lambda e: e.get_script_parameter_values())
+                                      lambda e: e.get_script_parameter_values(),
+                                      only_started=False)
 
     def get_owner(self, execution_id):
         return self._get_for_execution_info(execution_id,
@@ -202,11 +367,14 @@ class ExecutionService:
         return self._get_for_executor(execution_id,
                                       lambda e: e.get_process_id())
 
-    def _get_for_executor(self, execution_id, getter: Callable[[ScriptExecutor], Any]):
+    def _get_for_executor(self, execution_id, getter: Callable[[ScriptExecutor], Any], only_started=True):
         executor = self._executors.get(execution_id)
         if executor is None:
             return None
 
+        if only_started and not executor.is_started():
+            return None
+
         return getter(executor)
 
     def _get_for_execution_info(self, execution_id, getter: Callable[[_ExecutionInfo], Any]):
@@ -224,7 +392,7 @@ class ExecutionService:
 
         executor = self._executors.get(execution_id)
 
-        if not executor.is_finished():
+        if (not executor.is_started()) or (not executor.is_finished()):
             raise Exception('Executor ' + execution_id + ' is not yet finished')
 
         executor.cleanup()
@@ -235,6 +403,12 @@ class ExecutionService:
             self._finish_listeners.append(callback)
 
         else:
+            with self._lock:
+                queued_execution = self._queued_executions.get(execution_id)
+                if queued_execution is not None:
+                    queued_execution.finish_listeners.append(callback)
+                    return
+
             executor = self._executors.get(execution_id)
             if not executor:
                 LOGGER.error('Failed to find executor for id ' + execution_id)
@@ -252,6 +426,7 @@ class ExecutionService:
         class FinishListener:
             def finished(self):
                 self_service._fire_execution_finished(execution_id, user)
+                self_service._release_slot(execution_id)
 
         executor.add_finish_listener(FinishListener())
 
@@ -262,8 +437,26 @@ class ExecutionService:
             except Exception as e:
                 LOGGER.exception('Could not notify finish listener (%s), execution: %s: %s', callback, execution_id, e)
 
-    def add_start_listener(self, callback):
-        self._start_listeners.append(callback)
+    def add_start_listener(self, callback, execution_id=None):
+        """
+        Without execution_id, callback(execution_id, user) is called for every started execution.
+        With execution_id, callback() is called, when this execution starts (immediately, if it's already started)
+        """
+        if execution_id is None:
+            self._start_listeners.append(callback)
+            return
+
+        with self._lock:
+            queued_execution = self._queued_executions.get(execution_id)
+            if queued_execution is not None:
+                queued_execution.start_listeners.append(callback)
+                return
+
+        if execution_id not in self._executors:
+            LOGGER.error('Failed to find executor for id ' + execution_id)
+            return
+
+        callback()
 
     def _fire_execution_started(self, execution_id, user):
         for callback in self._start_listeners:
@@ -274,3 +467,10 @@ class ExecutionService:
 
     def _has_full_history_rights(self, user_id):
         return self._authorizer.has_full_history_access(user_id)
+
+
+def _notify_listener(callback, execution_id):
+    try:
+        callback()
+    except Exception as e:
+        LOGGER.exception('Could not notify listener (%s), execution: %s: %s', callback, execution_id, e)
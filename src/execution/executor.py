@@ -210,6 +210,9 @@ class ScriptExecutor:
     def get_return_code(self):
         return self.process_wrapper.get_return_code()
 
+    def is_started(self):
+        return self.process_wrapper is not None
+
     def is_finished(self):
         return self.process_wrapper.is_finished()
 
@@ -217,6 +220,10 @@ class ScriptExecutor:
         self.process_wrapper.add_finish_listener(listener)
 
     def write_to_input(self, text):
+        if self.process_wrapper is None:
+            LOGGER.warning('process is not started yet, ignoring input')
+            return
+
         if self.process_wrapper.is_finished():
             LOGGER.warning('process already finished, ignoring input')
             return
@@ -19,6 +19,8 @@ from features.file_download_feature import FileDownloadFeature
 from features.file_upload_feature import FileUploadFeature
 from files.user_file_storage import UserFileStorage
 from model import server_conf
+from project_manager.project_service import ProjectService
+from venv_manager.project_venvs import ProjectVenvManager
 from scheduling.schedule_service import ScheduleService
 from utils import tool_utils, file_utils
 from utils.process_utils import ProcessInvoker
@@ -108,8 +110,18 @@ def main():
 
     process_invoker = ProcessInvoker(server_config.env_vars)
 
+    # a single instance, so project metadata is cached for config models and admin handlers
+    project_service = ProjectService(project_path, venv_manager=ProjectVenvManager(project_path))
+
     config_service = ConfigService(
-        authorizer, CONFIG_FOLDER, server_config.groups_config.group_by_folders, process_invoker)
+        authorizer,
+        CONFIG_FOLDER,
+        server_config.groups_config.group_by_folders,
+        process_invoker,
+        project_service=project_service)
+
+    if server_config.prewarm_configs:
+        config_service.prewarm(server_config.prewarm_workers)
 
     alerts_service = AlertsService(server_config.alerts_config)
     alerts_service = alerts_service
@@ -123,7 +135,11 @@ def main():
     existing_ids = [entry.id for entry in execution_logging_service.get_history_entries(None, system_call=True)]
     id_generator = IdGenerator(existing_ids)
 
-    execution_service = ExecutionService(authorizer, id_generator, server_config.env_vars)
+    execution_service = ExecutionService(
+        authorizer,
+        id_generator,
+        server_config.env_vars,
+        max_concurrent=server_config.max_concurrent_executions)
 
     execution_logging_controller = ExecutionLoggingController(execution_service, execution_logging_service)
     execution_logging_controller.start()
@@ -145,23 +161,31 @@ def main():
         config_service,
         execution_service,
         CONFIG_FOLDER,
-        onetime_retention_minutes=server_config.onetime_schedule_retention_minutes)
+        onetime_retention_minutes=server_config.onetime_schedule_retention_minutes,
+        dispatch_workers=server_config.schedule_dispatch_workers,
+        default_jitter_seconds=server_config.schedule_jitter_seconds,
+        run_history_size=server_config.schedule_run_history_size)
 
-    server.init(
-        server_config,
-        server_config.authenticator,
-        authorizer,
-        execution_service,
-        schedule_service,
-        execution_logging_service,
-        config_service,
-        alerts_service,
-        file_upload_feature,
-        file_download_feature,
-        secret,
-        server_version,
-        CONFIG_FOLDER,
-        auth_initializer=auth_initializer)
+    try:
+        server.init(
+            server_config,
+            server_config.authenticator,
+            authorizer,
+            execution_service,
+            schedule_service,
+            execution_logging_service,
+            config_service,
+            alerts_service,
+            file_upload_feature,
+            file_download_feature,
+            secret,
+            server_version,
+            CONFIG_FOLDER,
+            auth_initializer=auth_initializer,
+            project_service=project_service)
+    finally:
+        # pending run states of schedules are written on shutdown
+        schedule_service.stop()
 
 
 if __name__ == '__main__':
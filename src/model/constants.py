@@ -16,7 +16,6 @@ MAX_LOG_LINES = 10000
 
 # Scheduling
 SCHEDULE_CLEANUP_INTERVAL_SECONDS = 300
-MAX_SCHEDULE_ITERATIONS = 10000
 
 # File management
 FILE_RETENTION_MS = 1000 * 60 * 60 * 24  # 24 hours in milliseconds
@@ -129,7 +129,9 @@ def _translate_history_entry(entry, running):
     return result
 
 
-def running_flag_to_status(running):
+def running_flag_to_status(running, queued=False):
+    if queued:
+        return 'queued'
     return 'running' if running else 'finished'
 
 
@@ -180,6 +182,12 @@ def parse_external_schedule(external_schedule):
         'repeat_unit': external_schedule.get('repeatUnit'),
         'repeat_period': external_schedule.get('repeatPeriod'),
         'weekdays': external_schedule.get('weekDays'),
+        'timezone': external_schedule.get('timezone'),
+        'cron_expression': external_schedule.get('cronExpression'),
+        'overlap_policy': external_schedule.get('overlapPolicy'),
+        'jitter_seconds': external_schedule.get('jitterSeconds'),
+        'misfire_policy': external_schedule.get('misfirePolicy'),
+        'misfire_limit': external_schedule.get('misfireLimit'),
         'description': external_schedule.get('description'),
         'enabled': external_schedule.get('enabled', True)
     }
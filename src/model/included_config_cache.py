@@ -0,0 +1,163 @@
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils import custom_json, file_utils
+from utils.object_utils import merge_dicts
+
+LOGGER = logging.getLogger('script_server.included_config_cache')
+
+DEFAULT_MAX_ENTRIES = 256
+
+# files, modified within this period, are always re-read, because mtime precision can be too low to notice changes
+_RACY_MTIME_NANOSECONDS = 2 * 1_000_000_000
+
+
+class IncludedConfigCache:
+    """
+    Caches parsed included config files and merged results of include lists
+
+    Parsed files are keyed by content hash, so the same file content is parsed only once (even for different paths).
+    File contents are re-read only, when file modification time, size or inode change
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self._file_hashes = OrderedDict()  # path -> (signature, content hash)
+        self._parsed_files = OrderedDict()  # content hash -> parsed json
+        self._merged_configs = OrderedDict()  # ((path, content hash), ...) -> merged config
+
+    def read_and_merge(self, paths):
+        """
+        Reads included files and merges them into a single config
+
+        Missing and broken files are skipped. Returns a new dictionary, which can be modified by the caller
+        """
+        loaded_files = []
+        for path in paths:
+            if not os.path.exists(path):
+                LOGGER.warning('Failed to load included file, path does not exist: ' + path)
+                continue
+
+            try:
+                content_hash = self._get_content_hash(path)
+                if not isinstance(self._get_parsed(content_hash, path), dict):
+                    raise Exception('Included config should be an object')
+            except Exception as e:
+                LOGGER.exception('Failed to load included file %s: %s', path, e)
+                continue
+
+            loaded_files.append((path, content_hash))
+
+        merge_key = tuple(loaded_files)
+
+        with self._lock:
+            merged_config = _get_lru(self._merged_configs, merge_key)
+
+        if merged_config is None:
+            merged_config = self._merge([self._get_parsed(content_hash, path) for path, content_hash in loaded_files])
+
+            with self._lock:
+                _put_lru(self._merged_configs, merge_key, merged_config, self._max_entries)
+
+        return copy.deepcopy(merged_config)
+
+    def clear(self):
+        with self._lock:
+            self._file_hashes.clear()
+            self._parsed_files.clear()
+            self._merged_configs.clear()
+
+    def _get_content_hash(self, path):
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        with self._lock:
+            cached = _get_lru(self._file_hashes, path)
+            if (cached is not None) and (cached[0] == signature):
+                return cached[1]
+
+        content = file_utils.read_file(path)
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+        with self._lock:
+            if (time.time_ns() - stat.st_mtime_ns) >= _RACY_MTIME_NANOSECONDS:
+                _put_lru(self._file_hashes, path, (signature, content_hash), self._max_entries)
+
+            if content_hash not in self._parsed_files:
+                parsed = custom_json.loads(content)
+                _put_lru(self._parsed_files, content_hash, parsed, self._max_entries)
+
+        return content_hash
+
+    def _get_parsed(self, content_hash, path):
+        with self._lock:
+            parsed = _get_lru(self._parsed_files, content_hash)
+
+        if parsed is None:
+            # evicted in the meantime
+            content = file_utils.read_file(path)
+            parsed = custom_json.loads(content)
+
+            with self._lock:
+                _put_lru(self._parsed_files, content_hash, parsed, self._max_entries)
+
+        return parsed
+
+    @staticmethod
+    def _merge(included_jsons):
+        merged_dict = {}
+        merged_params = []
+        merged_param_names = set()
+
+        for included_json in included_jsons:
+            merged_dict = merge_dicts(merged_dict, included_json, ignored_keys=['parameters'])
+
+            parameters = included_json.get('parameters')
+            if parameters:
+                for param in parameters:
+                    param_name = param.get('name')
+                    if not param_name:
+                        continue
+
+                    if param_name in merged_param_names:
+                        continue
+
+                    merged_params.append(param)
+                    merged_param_names.add(param_name)
+
+        if merged_params:
+            merged_dict['parameters'] = merged_params
+        return merged_dict
+
+
+def _get_lru(ordered_dict, key):
+    value = ordered_dict.get(key)
+    if value is not None:
+        ordered_dict.move_to_end(key)
+    return value
+
+
+def _put_lru(ordered_dict, key, value, max_entries):
+    ordered_dict[key] = value
+    ordered_dict.move_to_end(key)
+
+    while len(ordered_dict) > max_entries:
+        ordered_dict.popitem(last=False)
+
+
+_shared_cache = IncludedConfigCache()
+
+
+def read_and_merge(paths):
+    return _shared_cache.read_and_merge(paths)
+
+
+def clear():
+    _shared_cache.clear()
@@ -6,7 +6,7 @@ from datetime import datetime
 
 import utils.env_utils as env_utils
 from config.constants import FILE_TYPE_DIR, FILE_TYPE_FILE
-from utils import date_utils
+from utils import date_utils, directory_cache
 from utils.file_utils import FileMatcher
 from utils.string_utils import is_blank
 
@@ -239,25 +239,22 @@ def list_files(dir, *, file_type=None, file_extensions=None, excluded_files_matc
     if not is_empty(file_extensions):
         file_type = FILE_TYPE_FILE
 
-    sorted_files = sorted(os.listdir(dir), key=lambda s: s.casefold())
-    for file in sorted_files:
-        file_path = pathlib.Path(dir, file)
-
+    for entry in directory_cache.list_entries(dir):
         if file_type:
-            if file_type == FILE_TYPE_DIR and not file_path.is_dir():
+            if file_type == FILE_TYPE_DIR and not entry.is_dir:
                 continue
-            elif file_type == FILE_TYPE_FILE and not file_path.is_file():
+            elif file_type == FILE_TYPE_FILE and not entry.is_file:
                 continue
 
-        if file_extensions and file_path.is_file():
-            extension = file_path.suffix
+        if file_extensions and entry.is_file:
+            extension = os.path.splitext(entry.name)[1]
             if normalize_extension(extension) not in file_extensions:
                 continue
 
-        if excluded_files_matcher and excluded_files_matcher.has_match(file_path):
+        if excluded_files_matcher and excluded_files_matcher.has_match(pathlib.Path(dir, entry.name)):
             continue
 
-        result.append(file)
+        result.append(entry.name)
 
     return result
 
@@ -2,12 +2,13 @@ import logging
 import os
 import re
 from collections import OrderedDict, namedtuple
+from concurrent.futures import Executor
 from ipaddress import ip_address, IPv4Address, IPv6Address
 
 from config.constants import PARAM_TYPE_SERVER_FILE, FILE_TYPE_FILE, PARAM_TYPE_MULTISELECT, FILE_TYPE_DIR, \
     PARAM_TYPE_EDITABLE_LIST, PASS_AS_ARGUMENT, PASS_AS_ENV_VAR, PASS_AS_STDIN
 from config.script.list_values import ConstValuesProvider, ScriptValuesProvider, EmptyValuesProvider, \
-    DependantScriptValuesProvider, NoneValuesProvider, FilesProvider
+    DependantScriptValuesProvider, NoneValuesProvider, FilesProvider, ValuesLoadingCancelledException
 from model import model_helper
 from model.model_helper import resolve_env_vars, replace_auth_vars, is_empty, SECURE_MASK, \
     normalize_extension, read_bool_from_config, InvalidValueException, read_str_from_config, read_int_from_config
@@ -59,12 +60,16 @@ class ParameterModel(object):
                  other_params_supplier,
                  process_invoker: ProcessInvoker,
                  other_param_values: ObservableDict = None,
-                 working_dir=None):
+                 working_dir=None,
+                 values_executor: Executor = None,
+                 run_values_scripts=True):
         self._username = username
         self._audit_name = audit_name
         self._parameters_supplier = other_params_supplier
         self._working_dir = working_dir
         self._process_invoker = process_invoker
+        self._values_executor = values_executor
+        self._run_values_scripts = run_values_scripts
 
         self.name = parameter_config.get('name')
         self.pass_as: PassAsConfiguration = _read_pass_as(parameter_config, self.name)
@@ -72,13 +77,14 @@ class ParameterModel(object):
 
         self._original_config = parameter_config
         self._parameter_value_wrappers = other_param_values
+        self._allowed_values_cache = None
+        self._values_loading_cancelled = False
 
         self._setup()
 
-        if (other_param_values is not None) \
-                and (self._values_provider is not None) \
-                and self._values_provider.get_required_parameters():
-            other_param_values.subscribe(self._param_values_observer)
+        if (other_param_values is not None) and (self._values_provider is not None):
+            for required_parameter in self._values_provider.get_required_parameters():
+                other_param_values.subscribe_key(required_parameter, self._param_values_observer)
 
     def _setup(self):
         config = self._original_config
@@ -93,6 +99,7 @@ class ParameterModel(object):
         self.max = config.get('max')
         self.max_length = config.get('max_length')
         self.regex = config.get('regex')
+        self._compiled_regex = _compile_regex(self.regex, self.str_name())
         self.secure = read_bool_from_config('secure', config, default=False)
         self.separator = config.get('separator', ',')
         self.multiselect_argument_type = read_str_from_config(
@@ -142,6 +149,7 @@ class ParameterModel(object):
 
         self._validate_config()
 
+        self._values_script_skipped = False
         values_provider = self._create_values_provider(
             config.get('values'),
             self.type,
@@ -196,10 +204,26 @@ class ParameterModel(object):
                     + '" in values.script! ')
 
     def get_ui_values(self):
-        if self.values is None:
-            return None
+        return self._get_allowed_values()[0]
+
+    def _get_allowed_values(self):
+        """Returns (ui values, frozenset of ui values), the latter is None, when values are not hashable"""
+        values = self.values
+        cached = self._allowed_values_cache
+        if (cached is not None) and (cached[0] is values):
+            return cached[1]
+
+        if values is None:
+            allowed_values = (None, None)
+        else:
+            ui_values = [self._ui_value_mapper.map_to_ui_value(v) for v in values]
+            try:
+                allowed_values = (ui_values, frozenset(ui_values))
+            except TypeError:
+                allowed_values = (ui_values, None)
 
-        return [self._ui_value_mapper.map_to_ui_value(v) for v in self.values]
+        self._allowed_values_cache = (values, allowed_values)
+        return allowed_values
 
     def _read_type(self, config):
         type = config.get('type', 'text')
@@ -225,9 +249,38 @@ class ParameterModel(object):
             self.values = None
             return
 
-        values = values_provider.get_values(self._parameter_value_wrappers)
+        loaded = values_provider.is_loaded()
+
+        try:
+            values = values_provider.get_values(self._parameter_value_wrappers)
+        except ValuesLoadingCancelledException:
+            LOGGER.info('Values loading for ' + self.str_name() + ' was cancelled, keeping old values')
+            self._values_loading_cancelled = True
+            return
+
+        self._values_loading_cancelled = False
         self.values = values
 
+        if not loaded:
+            values_provider.add_loaded_listener(self._reload_values)
+
+    def cancel_values_loading(self):
+        if self._values_provider is not None:
+            self._values_provider.cancel()
+
+    def reload_cancelled_values(self):
+        """Load values again, if the last loading was cancelled (old values are outdated in this case)"""
+        if self._values_loading_cancelled:
+            self._reload_values()
+
+    def _wait_for_values(self):
+        values_provider = self._values_provider
+        if (values_provider is None) or values_provider.is_loaded():
+            return
+
+        values_provider.wait_loaded()
+        self._reload_values()
+
     def _create_values_provider(self, values_config, type, constant):
         if constant:
             return NoneValuesProvider()
@@ -249,11 +302,15 @@ class ParameterModel(object):
             original_script = values_config['script']
             has_variables = ('${' in original_script)
 
+            if not self._run_values_scripts:
+                self._values_script_skipped = True
+                return NoneValuesProvider()
+
             script = replace_auth_vars(original_script, self._username, self._audit_name)
             shell = read_bool_from_config('shell', values_config, default=not has_variables)
 
             if '${' not in script:
-                return ScriptValuesProvider(script, shell, self._process_invoker)
+                return ScriptValuesProvider(script, shell, self._process_invoker, self._values_executor)
 
             return DependantScriptValuesProvider(script, self._parameters_supplier, shell, self._process_invoker)
 
@@ -267,6 +324,12 @@ class ParameterModel(object):
 
         return self._values_provider.get_required_parameters()
 
+    def get_dependencies(self):
+        """All parameters, which are referenced by this parameter (in values script or default value)"""
+        result = set(self.get_required_parameters())
+        result.update(self._default_required_parameters)
+        return result
+
     def normalize_user_value(self, value):
         if self.type == PARAM_TYPE_MULTISELECT or self._is_recursive_server_file():
             if isinstance(value, list):
@@ -360,23 +423,18 @@ class ParameterModel(object):
                 return 'is not specified'
             return None
 
-        value_string = self.value_to_repr(user_value)
-
         if self.no_value:
             if isinstance(user_value, bool):
                 return None
             if isinstance(user_value, str) and user_value.lower() in ['true', 'false']:
                 return None
-            return 'should be boolean, but has value ' + value_string
+            return 'should be boolean, but has value ' + self.value_to_repr(user_value)
 
         if self.type == 'text' or self.type == 'multiline_text':
-            if self.regex is not None:
-                regex_pattern = self.regex.get('pattern', None)
-                if not is_empty(regex_pattern):
-                    regex_matched = re.fullmatch(regex_pattern, user_value)
-                    if not regex_matched:
-                        description = self.regex.get('description') or regex_pattern
-                        return 'does not match regex pattern: ' + description
+            if self._compiled_regex is not None:
+                (compiled_pattern, description) = self._compiled_regex
+                if not compiled_pattern.fullmatch(user_value):
+                    return 'does not match regex pattern: ' + description
             if (not is_empty(self.max_length)) and (len(user_value) > int(self.max_length)):
                 return 'is longer than allowed char length (' \
                     + str(len(user_value)) + ' > ' + str(self.max_length) + ')'
@@ -390,17 +448,17 @@ class ParameterModel(object):
         if self.type == 'int':
             if not (isinstance(user_value, int) or (
                     isinstance(user_value, str) and string_utils.is_integer(user_value))):
-                return 'should be integer, but has value ' + value_string
+                return 'should be integer, but has value ' + self.value_to_repr(user_value)
 
             int_value = int(user_value)
 
             if (not is_empty(self.max)) and (int_value > int(self.max)):
                 return 'is greater than allowed value (' \
-                    + value_string + ' > ' + str(self.max) + ')'
+                    + self.value_to_repr(user_value) + ' > ' + str(self.max) + ')'
 
             if (not is_empty(self.min)) and (int_value < int(self.min)):
                 return 'is lower than allowed value (' \
-                    + value_string + ' < ' + str(self.min) + ')'
+                    + self.value_to_repr(user_value) + ' < ' + str(self.min) + ')'
             return None
 
         if self.type in ('ip', 'ip4', 'ip6'):
@@ -408,26 +466,35 @@ class ParameterModel(object):
                 address = ip_address(user_value.strip())
                 if self.type == 'ip4':
                     if not isinstance(address, IPv4Address):
-                        return value_string + ' is not an IPv4 address'
+                        return self.value_to_repr(user_value) + ' is not an IPv4 address'
                 elif self.type == 'ip6':
                     if not isinstance(address, IPv6Address):
-                        return value_string + ' is not an IPv6 address'
+                        return self.value_to_repr(user_value) + ' is not an IPv6 address'
             except ValueError:
-                return 'wrong IP address ' + value_string
+                return 'wrong IP address ' + self.value_to_repr(user_value)
+
+        if self._values_script_skipped:
+            # values are unknown, only the shape of the value can be checked
+            if (self.type == PARAM_TYPE_MULTISELECT) and not isinstance(user_value, list):
+                return 'should be a list, but was: ' + self.value_to_repr(user_value) \
+                    + '(' + str(type(user_value)) + ')'
+            return None
 
-        allowed_values = self.get_ui_values()
+        self._wait_for_values()
+        (allowed_values, allowed_values_set) = self._get_allowed_values()
 
         if (self.type == 'list') or (self._is_plain_server_file()):
-            if user_value not in allowed_values:
-                return 'has value ' + value_string \
+            if not _is_allowed_value(user_value, allowed_values, allowed_values_set):
+                return 'has value ' + self.value_to_repr(user_value) \
                     + ', but should be in ' + repr(allowed_values)
             return None
 
         if self.type == PARAM_TYPE_MULTISELECT:
             if not isinstance(user_value, list):
-                return 'should be a list, but was: ' + value_string + '(' + str(type(user_value)) + ')'
+                return 'should be a list, but was: ' + self.value_to_repr(user_value) \
+                    + '(' + str(type(user_value)) + ')'
             for value_element in user_value:
-                if value_element not in allowed_values:
+                if not _is_allowed_value(value_element, allowed_values, allowed_values_set):
                     element_str = self.value_to_repr(value_element)
                     return 'has value ' + element_str \
                         + ', but should be in ' + repr(allowed_values)
@@ -524,6 +591,8 @@ class ParameterModel(object):
             parameters,
             parameter_value_wrappers,
             process_invoker: ProcessInvoker):
+        self._default_required_parameters = set()
+
         if is_empty(default_config):
             self._default = default_config
             return
@@ -547,6 +616,7 @@ class ParameterModel(object):
             return
 
         template_property = TemplateProperty(resolved_string_value, parameters, parameter_value_wrappers)
+        self._default_required_parameters = set(template_property.required_parameters)
         shell = read_bool_from_config('shell', default_config, default=is_empty(template_property.required_parameters))
 
         def get_script_output(script):
@@ -585,6 +655,34 @@ class PassAsConfiguration:
         return self._configured_option == PASS_AS_STDIN
 
 
+def _compile_regex(regex_config, param_log_name):
+    if not regex_config:
+        return None
+
+    pattern = regex_config.get('pattern', None)
+    if is_empty(pattern):
+        return None
+
+    try:
+        compiled_pattern = re.compile(pattern)
+    except re.error as e:
+        raise Exception('Parameter ' + param_log_name + ' has invalid regex pattern: ' + str(e))
+
+    description = regex_config.get('description') or pattern
+    return compiled_pattern, description
+
+
+def _is_allowed_value(value, allowed_values, allowed_values_set):
+    if allowed_values_set is None:
+        return value in allowed_values
+
+    try:
+        return value in allowed_values_set
+    except TypeError:
+        # unhashable values (e.g. dicts) cannot be equal to any of the hashable allowed values
+        return False
+
+
 def _resolve_file_dir(config, key):
     raw_value = config.get(key)
     if not raw_value:
@@ -0,0 +1,97 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from config.exceptions import InvalidConfigException
+
+
+class ParameterDependencies:
+    """
+    Precomputed graph of ${param} references between parameters
+
+    dependencies should be ordered by priority: when several parameters can be processed at the same time,
+    the one, which comes first, is returned first
+    """
+
+    def __init__(self, dependencies: Dict[str, Iterable[str]]) -> None:
+        self._dependencies = {name: tuple(required) for name, required in dependencies.items()}
+
+        self._dependants = defaultdict(list)
+        for name, required_parameters in self._dependencies.items():
+            for required_parameter in required_parameters:
+                if required_parameter in self._dependencies:
+                    self._dependants[required_parameter].append(name)
+
+        self._order = self._sort_topologically()
+        self._positions = {name: index for index, name in enumerate(self._order)}
+
+    def get_order(self) -> List[str]:
+        return list(self._order)
+
+    def get_dependants(self, name) -> List[str]:
+        """Returns all parameters, which directly or transitively depend on the name, in the topological order"""
+        result = set()
+        to_visit = list(self._dependants.get(name, []))
+
+        while to_visit:
+            dependant = to_visit.pop()
+            if dependant in result:
+                continue
+
+            result.add(dependant)
+            to_visit.extend(self._dependants.get(dependant, []))
+
+        return sorted(result, key=self._positions.get)
+
+    def _sort_topologically(self):
+        priorities = {name: index for index, name in enumerate(self._dependencies.keys())}
+
+        unresolved_counts = {}
+        ready = []
+        for name, required_parameters in self._dependencies.items():
+            count = len({r for r in required_parameters if (r in self._dependencies) and (r != name)})
+            if name in required_parameters:
+                count += 1
+
+            unresolved_counts[name] = count
+            if count == 0:
+                heapq.heappush(ready, (priorities[name], name))
+
+        result = []
+        while ready:
+            (_, name) = heapq.heappop(ready)
+            result.append(name)
+
+            for dependant in set(self._dependants.get(name, [])):
+                unresolved_counts[dependant] -= 1
+                if unresolved_counts[dependant] == 0:
+                    heapq.heappush(ready, (priorities[dependant], dependant))
+
+        if len(result) < len(self._dependencies):
+            remaining = [name for name in self._dependencies.keys() if unresolved_counts[name] > 0]
+            cycle = self._find_cycle(remaining)
+            raise CyclicDependencyException(cycle)
+
+        return result
+
+    def _find_cycle(self, remaining):
+        remaining_set = set(remaining)
+
+        path = [remaining[0]]
+        path_positions = {remaining[0]: 0}
+
+        while True:
+            current = path[-1]
+            next_parameter = next(r for r in self._dependencies[current] if r in remaining_set)
+
+            if next_parameter in path_positions:
+                return path[path_positions[next_parameter]:] + [next_parameter]
+
+            path_positions[next_parameter] = len(path)
+            path.append(next_parameter)
+
+
+class CyclicDependencyException(InvalidConfigException):
+    def __init__(self, cycle) -> None:
+        super().__init__('Cyclic dependency between parameters: ' + ' -> '.join(cycle))
+        self.cycle = cycle
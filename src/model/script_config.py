@@ -1,20 +1,22 @@
 import logging
 import os
 from collections import OrderedDict
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from typing import List, Optional
 
 from auth.authorization import ANY_USER
 from config.exceptions import InvalidConfigException
-from model import parameter_config
+from model import included_config_cache, parameter_config
 from model.model_helper import is_empty, read_bool_from_config, InvalidValueException, \
-    read_str_from_config, replace_auth_vars, read_list
+    read_str_from_config, replace_auth_vars, read_list, read_int_from_config
 from model.parameter_config import ParameterModel
+from model.parameter_dependencies import ParameterDependencies, CyclicDependencyException
 from model.server_conf import LoggingConfig
 from model.template_property import TemplateProperty
 from model.verb_config import VerbsConfiguration
 from react.properties import ObservableList, ObservableDict, observable_fields
-from utils import file_utils, custom_json
+from utils import file_utils
 from utils.object_utils import merge_dicts
 from utils.process_utils import ProcessInvoker
 
@@ -86,7 +88,10 @@ class ConfigModel:
                  group_by_folders: bool,
                  script_configs_folder: str,
                  process_invoker: ProcessInvoker,
-                 pty_enabled_default=True):
+                 pty_enabled_default=True,
+                 values_executor: Executor = None,
+                 project_service=None,
+                 run_values_scripts=True):
         super().__init__()
 
         short_config = read_short(path, config_object, group_by_folders, script_configs_folder)
@@ -94,6 +99,9 @@ class ConfigModel:
         self._pty_enabled_default = pty_enabled_default
         self._config_folder = script_configs_folder
         self._process_invoker = process_invoker
+        self._values_executor = values_executor
+        self._run_values_scripts = run_values_scripts
+        self._project_service = project_service
 
         self._username = username
         self._audit_name = audit_name
@@ -102,6 +110,7 @@ class ConfigModel:
 
         self.parameters = ObservableList()
         self.parameter_values = ObservableDict()
+        self._dependencies = None
 
         self._original_config = config_object
         self._included_config_paths = TemplateProperty(read_list(config_object, 'include'),
@@ -145,28 +154,23 @@ class ConfigModel:
 
     def set_all_param_values(self, param_values, skip_invalid_parameters=False):
         original_values = dict(self.parameter_values)
-        processed = {}
+        processed = set()
 
-        anything_changed = True
-
-        def get_sort_key(parameter):
-            if parameter.name in self._included_config_paths.required_parameters:
-                return len(parameter.get_required_parameters())
-            return 100 + len(parameter.get_required_parameters())
-
-        sorted_parameters = sorted(self.parameters, key=get_sort_key)
-
-        while (len(processed) < len(self.parameters)) and anything_changed:
-            anything_changed = False
+        while True:
+            # included configs can add or remove parameters, in this case the order is rebuilt
+            try:
+                dependencies = self._get_dependencies()
+            except CyclicDependencyException:
+                self.parameter_values.set(original_values)
+                raise
 
-            parameters = sorted_parameters + [p for p in self.parameters if p not in sorted_parameters]
-            for parameter in parameters:
-                if parameter.name in processed:
-                    continue
+            remaining = [name for name in dependencies.get_order() if name not in processed]
+            if not remaining:
+                break
 
-                required_parameters = parameter.get_required_parameters()
-                if required_parameters and any(r not in processed for r in required_parameters):
-                    continue
+            parameters_by_name = {p.name: p for p in self.parameters}
+            for parameter_name in remaining:
+                parameter = parameters_by_name[parameter_name]
 
                 if parameter.constant:
                     value_wrapper = parameter.create_value_wrapper_for_default()
@@ -184,13 +188,10 @@ class ConfigModel:
                         raise InvalidValueException(parameter.name, validation_error)
 
                 self.parameter_values[parameter.name] = value_wrapper
-                processed[parameter.name] = parameter
-                anything_changed = True
+                processed.add(parameter.name)
 
-            if not anything_changed:
-                remaining = [p.name for p in self.parameters if p.name not in processed]
-                self.parameter_values.set(original_values)
-                raise Exception('Could not resolve order for dependencies. Remaining: ' + str(remaining))
+                if self._dependencies is not dependencies:
+                    break
 
         # Handle verb parameter value (if verbs are configured)
         if self.verbs_config and self.verbs_config.enabled:
@@ -214,6 +215,23 @@ class ConfigModel:
                     continue
                 LOGGER.warning('Incoming value for unknown parameter ' + key)
 
+    def cancel_dependant_values_loading(self, param_name):
+        """Stops values scripts, which depend on param_name, because their result is going to be outdated"""
+        for parameter in self.get_dependant_parameters(param_name):
+            if param_name in parameter.get_required_parameters():
+                parameter.cancel_values_loading()
+
+    def reload_cancelled_values(self):
+        """Loads values of parameters, whose loading was cancelled, but their required values didn't change after all"""
+        for parameter in self.parameters:
+            parameter.reload_cancelled_values()
+
+    def get_dependant_parameters(self, param_name) -> List[ParameterModel]:
+        """Parameters, which directly or transitively reference param_name, in the order of their evaluation"""
+        dependant_names = self._get_dependencies().get_dependants(param_name)
+        parameters_by_name = {p.name: p for p in self.parameters}
+        return [parameters_by_name[name] for name in dependant_names if name in parameters_by_name]
+
     def list_files_for_param(self, parameter_name, path):
         parameter = self.find_parameter(parameter_name)
         if not parameter:
@@ -231,16 +249,18 @@ class ConfigModel:
             username: Current username
             audit_name: Audit name for logging
         """
-        import os
-        from project_manager.project_service import ProjectService
+        project_service = self._project_service
+        if project_service is None:
+            from project_manager.project_service import ProjectService
 
-        # ProjectService needs the root directory, not the config folder
-        # config_folder is typically 'conf/runners', we need the parent directory
-        project_root = os.path.dirname(os.path.dirname(self._config_folder))
-        if not project_root:
-            project_root = '.'
+            # ProjectService needs the root directory, not the config folder
+            # config_folder is typically 'conf/runners', we need the parent directory
+            project_root = os.path.dirname(os.path.dirname(self._config_folder))
+            if not project_root:
+                project_root = '.'
+
+            project_service = ProjectService(project_root)
 
-        project_service = ProjectService(project_root)
         project_meta = project_service.get_project(project_id)
 
         if not project_meta:
@@ -257,13 +277,7 @@ class ConfigModel:
         included_names = set(self.instance_config.included_parameters)
         for param_config in project_parameters:
             if param_config['name'] in included_names:
-                parameter = ParameterModel(
-                    param_config, username, audit_name,
-                    lambda: self.parameters,
-                    self._process_invoker,
-                    self.parameter_values,
-                    self.working_directory
-                )
+                parameter = self._create_parameter(param_config)
                 self.parameters.append(parameter)
 
         # Override defaults with instance values
@@ -297,11 +311,7 @@ class ConfigModel:
     def _init_parameters(self, username, audit_name):
         original_parameter_configs = self._original_config.get('parameters', [])
         for parameter_config in original_parameter_configs:
-            parameter = ParameterModel(parameter_config, username, audit_name,
-                                       lambda: self.parameters,
-                                       self._process_invoker,
-                                       self.parameter_values,
-                                       self.working_directory)
+            parameter = self._create_parameter(parameter_config)
             self.parameters.append(parameter)
 
         self._reload_parameters({})
@@ -331,6 +341,11 @@ class ConfigModel:
 
         self.output_files = config.get('output_files', [])
 
+        # None means unlimited (only the server-wide limit applies)
+        self.max_concurrent_executions = read_int_from_config('max_concurrent_executions', config)
+        if (self.max_concurrent_executions is not None) and (self.max_concurrent_executions <= 0):
+            raise InvalidConfigException('max_concurrent_executions should be > 0 for ' + self.name)
+
         scheduling_config = config.get('scheduling')
         if scheduling_config:
             self.schedulable = read_bool_from_config('enabled', scheduling_config, default=False)
@@ -372,11 +387,7 @@ class ConfigModel:
                 parameter_name = parameter_config.get('name')
                 parameter = self.find_parameter(parameter_name)
                 if parameter is None:
-                    parameter = ParameterModel(parameter_config, self._username, self._audit_name,
-                                               lambda: self.parameters,
-                                               self._process_invoker,
-                                               self.parameter_values,
-                                               self.working_directory)
+                    parameter = self._create_parameter(parameter_config)
                     self.parameters.append(parameter)
 
                     if parameter.name not in self.parameter_values:
@@ -387,6 +398,15 @@ class ConfigModel:
                                    + 'This is now allowed! Included parameter is ignored')
                     continue
 
+    def _create_parameter(self, parameter_config) -> ParameterModel:
+        return ParameterModel(parameter_config, self._username, self._audit_name,
+                              lambda: self.parameters,
+                              self._process_invoker,
+                              self.parameter_values,
+                              self.working_directory,
+                              values_executor=self._values_executor,
+                              run_values_scripts=self._run_values_scripts)
+
     def find_parameter(self, param_name) -> Optional[ParameterModel]:
         for parameter in self.parameters:
             if parameter.name == param_name:
@@ -394,13 +414,35 @@ class ConfigModel:
         return None
 
     def on_add(self, parameter, index):
+        self._dependencies = None
+
         if self.schedulable and parameter.secure:
             LOGGER.warning(
                 'Disabling schedulable functionality, because parameter ' + parameter.str_name() + ' is secure')
             self.schedulable = False
 
     def on_remove(self, parameter):
-        pass
+        self._dependencies = None
+
+    def _get_dependencies(self) -> ParameterDependencies:
+        dependencies = self._dependencies
+        if dependencies is None:
+            dependencies = self._build_dependencies()
+            self._dependencies = dependencies
+
+        return dependencies
+
+    def _build_dependencies(self):
+        include_parameters = self._included_config_paths.required_parameters
+
+        def get_sort_key(parameter):
+            dependencies_count = len(parameter.get_dependencies())
+            if parameter.name in include_parameters:
+                return dependencies_count
+            return 100 + dependencies_count
+
+        sorted_parameters = sorted(self.parameters, key=get_sort_key)
+        return ParameterDependencies({p.name: p.get_dependencies() for p in sorted_parameters})
 
     def get_visible_parameters_for_verb(self, verb_name: str) -> List[str]:
         """Get list of visible parameter names for a specific verb.
@@ -427,44 +469,14 @@ class ConfigModel:
         for parameter in self.parameters:
             parameter.validate_parameter_dependencies(self.parameters)
 
+        self._dependencies = self._build_dependencies()
+
     def _read_and_merge_included_paths(self, paths):
         if is_empty(paths):
             return None
 
-        merged_dict = {}
-        merged_params = []
-        merged_param_names = set()
-
-        for path in paths:
-            path = file_utils.normalize_path(path, self._config_folder)
-
-            if os.path.exists(path):
-                try:
-                    included_json = custom_json.loads(file_utils.read_file(path))
-                    merged_dict = merge_dicts(merged_dict, included_json, ignored_keys=['parameters'])
-
-                    parameters = included_json.get('parameters')
-                    if parameters:
-                        for param in parameters:
-                            param_name = param.get('name')
-                            if not param_name:
-                                continue
-
-                            if param_name in merged_param_names:
-                                continue
-
-                            merged_params.append(param)
-                            merged_param_names.add(param_name)
-                except Exception as e:
-                    LOGGER.exception('Failed to load included file %s: %s', path, e)
-                    continue
-            else:
-                LOGGER.warning('Failed to load included file, path does not exist: ' + path)
-                continue
-
-        if merged_params:
-            merged_dict['parameters'] = merged_params
-        return merged_dict
+        normalized_paths = [file_utils.normalize_path(path, self._config_folder) for path in paths]
+        return included_config_cache.read_and_merge(normalized_paths)
 
     def _read_preload_script_conf(self, config):
         if config is None:
@@ -48,6 +48,17 @@ class ServerConfig(object):
         self.env_vars: EnvVariables = None
         # Auto-cleanup settings for one-time schedules (default 60 minutes, -1 to disable)
         self.onetime_schedule_retention_minutes = 60
+        # Number of threads, which start due scheduled jobs
+        self.schedule_dispatch_workers = 8
+        # Scheduled executions are spread over this window (per job, deterministically), 0 = no jitter
+        self.schedule_jitter_seconds = 0
+        # Number of recorded runs per schedule (for run history and its statistics)
+        self.schedule_run_history_size = 100
+        # Max number of simultaneously running scripts (None = unlimited), the rest is queued
+        self.max_concurrent_executions = None
+        # Parse all script configs on startup, so the first requests don't need to
+        self.prewarm_configs = False
+        self.prewarm_workers = None
 
     def get_port(self):
         return self.port
@@ -221,11 +232,30 @@ def from_json(conf_path, temp_folder):
     config.secret_storage_file = json_object.get('secret_storage_file', os.path.join(temp_folder, 'secret.dat'))
     config.xsrf_protection = _parse_xsrf_protection(security)
 
+    startup_config = model_helper.read_dict(json_object, 'startup')
+    config.prewarm_configs = read_bool_from_config('prewarm_configs', startup_config, default=False)
+    config.prewarm_workers = read_int_from_config('prewarm_workers', startup_config)
+
+    execution_config = model_helper.read_dict(json_object, 'execution')
+    config.max_concurrent_executions = read_int_from_config('max_concurrent', execution_config)
+    if (config.max_concurrent_executions is not None) and (config.max_concurrent_executions <= 0):
+        raise InvalidServerConfigException('execution.max_concurrent should be > 0')
+
     # Scheduling configuration
     scheduling_config = model_helper.read_dict(json_object, 'scheduling')
     if scheduling_config:
         config.onetime_schedule_retention_minutes = read_int_from_config(
             'onetime_schedule_retention_minutes', scheduling_config, default=60)
+        config.schedule_dispatch_workers = read_int_from_config(
+            'dispatch_workers', scheduling_config, default=8)
+        config.schedule_jitter_seconds = read_int_from_config(
+            'jitter_seconds', scheduling_config, default=0)
+        if config.schedule_jitter_seconds < 0:
+            raise InvalidServerConfigException('scheduling.jitter_seconds should be >= 0')
+        config.schedule_run_history_size = read_int_from_config(
+            'run_history_size', scheduling_config, default=100)
+        if config.schedule_run_history_size <= 0:
+            raise InvalidServerConfigException('scheduling.run_history_size should be > 0')
 
     return config
 
@@ -49,7 +49,8 @@ class TemplateProperty:
         self._reload()
 
         if self.required_parameters:
-            value_wrappers.subscribe(self._value_changed)
+            for required_parameter in self.required_parameters:
+                value_wrappers.subscribe_key(required_parameter, self._value_changed)
             parameters.subscribe(self)
 
     def _value_changed(self, parameter, old, new):
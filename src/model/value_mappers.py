@@ -18,6 +18,12 @@ class DictBasedValueMapper(ValueMapper):
     def __init__(self, mappings) -> None:
         self._mappings = mappings
 
+        # reverse lookup, the first script value wins (same as iterating over mappings)
+        self._script_values = {}
+        for script_value, mapped_user_value in mappings.items():
+            if isinstance(mapped_user_value, str):
+                self._script_values.setdefault(mapped_user_value, script_value)
+
     def map_to_script_value(self, user_value):
         if user_value is None:
             return None
@@ -25,13 +31,7 @@ class DictBasedValueMapper(ValueMapper):
         if not self._mappings:
             return user_value
 
-        str_user_value = str(user_value)
-
-        for script_value, mapped_user_value in self._mappings.items():
-            if mapped_user_value == str_user_value:
-                return script_value
-
-        return user_value
+        return self._script_values.get(str(user_value), user_value)
 
     def map_to_ui_value(self, script_value):
         if script_value is None:
@@ -0,0 +1,106 @@
+"""
+In-memory store for project metadata (.project-meta.json) files.
+
+Metadata is cached per file and re-read only when the file modification time or size changes.
+Saves go through the store, so the cache is updated without re-reading the file.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+LOGGER = logging.getLogger('script_server.project_metadata_store')
+
+
+class ProjectMetadataStore:
+    """Thread-safe cache of project metadata files."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size), metadata)
+        self._entries = {}
+
+    def load(self, meta_path: Path) -> dict:
+        """
+        Load project metadata, using the cached copy if the file was not modified.
+
+        Args:
+            meta_path: Path to the metadata file
+
+        Returns:
+            A copy of the metadata dictionary (or an empty dictionary if the file doesn't exist)
+        """
+        key = os.path.abspath(meta_path)
+
+        signature = self._get_signature(key)
+        if signature is None:
+            self.invalidate(meta_path)
+            return {}
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if (cached is not None) and (cached[0] == signature):
+                return copy.deepcopy(cached[1])
+
+        with open(key, 'r') as f:
+            meta = json.load(f)
+
+        with self._lock:
+            self._entries[key] = (signature, meta)
+
+        return copy.deepcopy(meta)
+
+    def save(self, meta_path: Path, meta: dict) -> None:
+        """
+        Save project metadata to the file and update the cache.
+
+        Args:
+            meta_path: Path to the metadata file
+            meta: Metadata dictionary
+        """
+        key = os.path.abspath(meta_path)
+        content = json.dumps(meta, indent=2, default=str)
+
+        with self._lock:
+            with open(key, 'w') as f:
+                f.write(content)
+
+            signature = self._get_signature(key)
+            if signature is None:
+                self._entries.pop(key, None)
+            else:
+                # cached value should be the same, as if it was read from the file (e.g. datetimes become strings)
+                self._entries[key] = (signature, json.loads(content))
+
+    def invalidate(self, meta_path: Optional[Path] = None) -> None:
+        """
+        Remove cached metadata.
+
+        Args:
+            meta_path: Path to the metadata file or None to clear the whole cache
+        """
+        with self._lock:
+            if meta_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(meta_path), None)
+
+    @staticmethod
+    def _get_signature(path: str):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+
+_shared_store = ProjectMetadataStore()
+
+
+def get_shared_store() -> ProjectMetadataStore:
+    return _shared_store
@@ -18,6 +18,11 @@ from pathlib import Path
 from typing import Any, Optional
 from urllib.parse import urlparse
 
+from project_manager.project_metadata_store import ProjectMetadataStore, get_shared_store
+from project_manager.source_scanner import SourceScanResult, scan_python_files
+from utils.background_jobs import BackgroundJob, JobCancelledException
+from venv_manager.project_venvs import ProjectVenvManager
+
 try:
     import tomllib
 except ImportError:
@@ -58,14 +63,21 @@ if __name__ == '__main__':
 class ProjectService:
     """Service for managing imported Python projects."""
 
-    def __init__(self, project_root: str):
+    def __init__(self,
+                 project_root: str,
+                 metadata_store: Optional[ProjectMetadataStore] = None,
+                 venv_manager: Optional[ProjectVenvManager] = None):
         """
         Initialize the ProjectService.
 
         Args:
             project_root: Path to script-server root directory
+            metadata_store: Cache for project metadata files (a process-wide store is used by default)
+            venv_manager: Builder of per-project venvs (if not set, all projects use the common venv)
         """
         self.project_root = Path(project_root)
+        self._metadata_store = metadata_store if metadata_store is not None else get_shared_store()
+        self._venv_manager = venv_manager
         # Use /app/projects in Docker, {project_root}/projects locally
         if os.path.exists('/app'):
             self.projects_dir = Path('/app/projects')
@@ -85,17 +97,11 @@ class ProjectService:
 
     def _load_meta(self, project_path: Path) -> dict:
         """Load project metadata from JSON file."""
-        meta_path = self._get_meta_path(project_path)
-        if meta_path.exists():
-            with open(meta_path, 'r') as f:
-                return json.load(f)
-        return {}
+        return self._metadata_store.load(self._get_meta_path(project_path))
 
     def _save_meta(self, project_path: Path, meta: dict) -> None:
         """Save project metadata to JSON file."""
-        meta_path = self._get_meta_path(project_path)
-        with open(meta_path, 'w') as f:
-            json.dump(meta, f, indent=2, default=str)
+        self._metadata_store.save(self._get_meta_path(project_path), meta)
 
     def _sanitize_project_id(self, name: str) -> str:
         """Convert a name to a safe project ID."""
@@ -209,13 +215,14 @@ class ProjectService:
         # if not any(parsed.netloc.endswith(host) for host in allowed_hosts):
         #     raise ValueError(f'Git cloning is restricted to: {", ".join(allowed_hosts)}')
 
-    def import_from_git(self, url: str, branch: Optional[str] = None) -> dict:
+    def import_from_git(self, url: str, branch: Optional[str] = None, job: Optional[BackgroundJob] = None) -> dict:
         """
         Import a project by cloning a Git repository.
 
         Args:
             url: Git repository URL
             branch: Optional branch to clone
+            job: Background job to report progress and stream clone output to
 
         Returns:
             Project metadata dictionary
@@ -241,51 +248,68 @@ class ProjectService:
 
         project_path = self.projects_dir / project_id
 
-        # Build git clone command
-        cmd = ['git', 'clone', '--depth', '1']
-        if branch:
-            cmd.extend(['-b', branch])
-        cmd.extend([url, str(project_path)])
-
-        LOGGER.info(f"Cloning {url} to {project_path}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            raise RuntimeError(f"Git clone failed: {result.stderr}")
-
-        # Detect dependencies and entry points
-        dependencies = self.detect_dependencies(project_path)
-        entry_points = self.detect_entry_points(project_path)
-
-        # Create metadata with unique name
-        # Remove .git suffix before creating display name
-        display_name = re.sub(r'\.git$', '', repo_name, flags=re.IGNORECASE)
-        base_name = display_name.replace('-', ' ').replace('_', ' ').title()
-        unique_name = self._ensure_unique_name(base_name)
-
-        meta = {
-            'id': project_id,
-            'name': unique_name,
-            'import_type': 'git',
-            'source_url': url,
-            'branch': branch,
-            'imported_at': datetime.now().isoformat(),
-            'entry_points': entry_points,
-            'dependencies': dependencies,
-            'wrapper_script': None,
-            'runner_config': None
-        }
-        self._save_meta(project_path, meta)
+        venv_hash = None
+        try:
+            # Build git clone command
+            cmd = ['git', 'clone', '--depth', '1']
+            if branch:
+                cmd.extend(['-b', branch])
+            cmd.extend([url, str(project_path)])
+
+            LOGGER.info(f"Cloning {url} to {project_path}")
+            if job is not None:
+                job.set_stage('cloning', f'Cloning {url}')
+                try:
+                    job.run_process(cmd[:2] + ['--progress'] + cmd[2:])
+                except subprocess.CalledProcessError as e:
+                    raise RuntimeError(f"Git clone failed: {e.stderr}")
+            else:
+                result = subprocess.run(cmd, capture_output=True, text=True)
+
+                if result.returncode != 0:
+                    raise RuntimeError(f"Git clone failed: {result.stderr}")
+
+            # Detect dependencies and entry points
+            dependencies, entry_points, scan_stats, venv_hash = self._analyze_project(project_path, job)
+
+            # Create metadata with unique name
+            # Remove .git suffix before creating display name
+            display_name = re.sub(r'\.git$', '', repo_name, flags=re.IGNORECASE)
+            base_name = display_name.replace('-', ' ').replace('_', ' ').title()
+            unique_name = self._ensure_unique_name(base_name)
+
+            meta = {
+                'id': project_id,
+                'name': unique_name,
+                'import_type': 'git',
+                'source_url': url,
+                'branch': branch,
+                'imported_at': datetime.now().isoformat(),
+                'entry_points': entry_points,
+                'dependencies': dependencies,
+                'scan': scan_stats,
+                'venv': venv_hash,
+                'wrapper_script': None,
+                'runner_config': None
+            }
+            self._save_meta(project_path, meta)
 
-        return meta
+            return meta
+        except BaseException:
+            # a half-imported project (e.g. cancelled during analysis) would keep its id taken forever
+            shutil.rmtree(project_path, ignore_errors=True)
+            raise
+        finally:
+            self._release_venv(venv_hash)
 
-    def import_from_zip(self, file_data: bytes, filename: str) -> dict:
+    def import_from_zip(self, file_data: bytes, filename: str, job: Optional[BackgroundJob] = None) -> dict:
         """
         Import a project from a ZIP file.
 
         Args:
             file_data: ZIP file content as bytes
             filename: Original filename
+            job: Background job to report progress to
 
         Returns:
             Project metadata dictionary
@@ -308,68 +332,81 @@ class ProjectService:
 
         project_path = self.projects_dir / project_id
 
-        # Extract ZIP to temporary directory first
-        with tempfile.TemporaryDirectory() as tmpdir:
-            zip_path = Path(tmpdir) / 'upload.zip'
-            with open(zip_path, 'wb') as f:
-                f.write(file_data)
-
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                # Check for single top-level directory
-                names = zf.namelist()
-                top_dirs = set(n.split('/')[0] for n in names if '/' in n)
-
-                extract_path = Path(tmpdir) / 'extracted'
-                extract_path.mkdir(parents=True, exist_ok=True)
-
-                # Safely extract all files with zip-slip protection
-                for member in zf.namelist():
-                    # Validate path doesn't escape extraction directory
-                    member_path = (extract_path / member).resolve()
-                    if not str(member_path).startswith(str(extract_path.resolve())):
-                        raise ValueError(f'Invalid ZIP entry (path traversal): {member}')
-
-                    # Extract individual file
-                    zf.extract(member, extract_path)
-
-                # If single top-level dir, use its contents
-                if len(top_dirs) == 1:
-                    source_path = extract_path / list(top_dirs)[0]
-                else:
-                    source_path = extract_path
-
-                # Move to final location
-                shutil.move(str(source_path), str(project_path))
-
-        # Detect dependencies and entry points
-        dependencies = self.detect_dependencies(project_path)
-        entry_points = self.detect_entry_points(project_path)
-
-        # Create metadata with unique name
-        display_name = base_name.replace('-', ' ').replace('_', ' ').title()
-        unique_name = self._ensure_unique_name(display_name)
-
-        meta = {
-            'id': project_id,
-            'name': unique_name,
-            'import_type': 'zip',
-            'source_url': None,
-            'imported_at': datetime.now().isoformat(),
-            'entry_points': entry_points,
-            'dependencies': dependencies,
-            'wrapper_script': None,
-            'runner_config': None
-        }
-        self._save_meta(project_path, meta)
+        venv_hash = None
+        try:
+            if job is not None:
+                job.set_stage('extracting', f'Extracting {filename}')
+
+            # Extract ZIP to temporary directory first
+            with tempfile.TemporaryDirectory() as tmpdir:
+                zip_path = Path(tmpdir) / 'upload.zip'
+                with open(zip_path, 'wb') as f:
+                    f.write(file_data)
+
+                with zipfile.ZipFile(zip_path, 'r') as zf:
+                    # Check for single top-level directory
+                    names = zf.namelist()
+                    top_dirs = set(n.split('/')[0] for n in names if '/' in n)
+
+                    extract_path = Path(tmpdir) / 'extracted'
+                    extract_path.mkdir(parents=True, exist_ok=True)
+
+                    # Safely extract all files with zip-slip protection
+                    for member in zf.namelist():
+                        # Validate path doesn't escape extraction directory
+                        member_path = (extract_path / member).resolve()
+                        if not str(member_path).startswith(str(extract_path.resolve())):
+                            raise ValueError(f'Invalid ZIP entry (path traversal): {member}')
+
+                        # Extract individual file
+                        zf.extract(member, extract_path)
+
+                    # If single top-level dir, use its contents
+                    if len(top_dirs) == 1:
+                        source_path = extract_path / list(top_dirs)[0]
+                    else:
+                        source_path = extract_path
+
+                    # Move to final location
+                    shutil.move(str(source_path), str(project_path))
+
+            # Detect dependencies and entry points
+            dependencies, entry_points, scan_stats, venv_hash = self._analyze_project(project_path, job)
+
+            # Create metadata with unique name
+            display_name = base_name.replace('-', ' ').replace('_', ' ').title()
+            unique_name = self._ensure_unique_name(display_name)
+
+            meta = {
+                'id': project_id,
+                'name': unique_name,
+                'import_type': 'zip',
+                'source_url': None,
+                'imported_at': datetime.now().isoformat(),
+                'entry_points': entry_points,
+                'dependencies': dependencies,
+                'scan': scan_stats,
+                'venv': venv_hash,
+                'wrapper_script': None,
+                'runner_config': None
+            }
+            self._save_meta(project_path, meta)
 
-        return meta
+            return meta
+        except BaseException:
+            # a half-imported project (e.g. cancelled during analysis) would keep its id taken forever
+            shutil.rmtree(project_path, ignore_errors=True)
+            raise
+        finally:
+            self._release_venv(venv_hash)
 
-    def import_from_local(self, local_path: str) -> dict:
+    def import_from_local(self, local_path: str, job: Optional[BackgroundJob] = None) -> dict:
         """
         Import a project from a local directory.
 
         Args:
             local_path: Path to the local project directory
+            job: Background job to report progress to
 
         Returns:
             Project metadata dictionary
@@ -400,32 +437,43 @@ class ProjectService:
 
         project_path = self.projects_dir / project_id
 
-        # Copy directory to projects folder
-        LOGGER.info(f"Copying {source_path} to {project_path}")
-        shutil.copytree(str(source_path), str(project_path))
-
-        # Detect dependencies and entry points
-        dependencies = self.detect_dependencies(project_path)
-        entry_points = self.detect_entry_points(project_path)
-
-        # Create metadata with unique name
-        display_name = dir_name.replace('-', ' ').replace('_', ' ').title()
-        unique_name = self._ensure_unique_name(display_name)
-
-        meta = {
-            'id': project_id,
-            'name': unique_name,
-            'import_type': 'local',
-            'source_url': str(source_path),
-            'imported_at': datetime.now().isoformat(),
-            'entry_points': entry_points,
-            'dependencies': dependencies,
-            'wrapper_script': None,
-            'runner_config': None
-        }
-        self._save_meta(project_path, meta)
+        venv_hash = None
+        try:
+            # Copy directory to projects folder
+            LOGGER.info(f"Copying {source_path} to {project_path}")
+            if job is not None:
+                job.set_stage('copying', f'Copying {source_path}')
+            shutil.copytree(str(source_path), str(project_path))
+
+            # Detect dependencies and entry points
+            dependencies, entry_points, scan_stats, venv_hash = self._analyze_project(project_path, job)
+
+            # Create metadata with unique name
+            display_name = dir_name.replace('-', ' ').replace('_', ' ').title()
+            unique_name = self._ensure_unique_name(display_name)
+
+            meta = {
+                'id': project_id,
+                'name': unique_name,
+                'import_type': 'local',
+                'source_url': str(source_path),
+                'imported_at': datetime.now().isoformat(),
+                'entry_points': entry_points,
+                'dependencies': dependencies,
+                'scan': scan_stats,
+                'venv': venv_hash,
+                'wrapper_script': None,
+                'runner_config': None
+            }
+            self._save_meta(project_path, meta)
 
-        return meta
+            return meta
+        except BaseException:
+            # a half-imported project (e.g. cancelled during analysis) would keep its id taken forever
+            shutil.rmtree(project_path, ignore_errors=True)
+            raise
+        finally:
+            self._release_venv(venv_hash)
 
     def delete_project(self, project_id: str) -> bool:
         """
@@ -497,10 +545,82 @@ class ProjectService:
 
         # Delete project directory
         shutil.rmtree(project_path)
+        self._metadata_store.invalidate(self._get_meta_path(project_path))
         LOGGER.info(f"Deleted project {project_id}: {deleted_configs} instance(s) removed")
 
+        if self._venv_manager is not None:
+            used_venvs = {project.get('venv') for project in self.list_projects()}
+            self._venv_manager.remove_unused(used_venvs)
+
         return True
 
+    def _analyze_project(self, project_path: Path, job: Optional[BackgroundJob] = None):
+        """
+        Detect dependencies and entry points of an imported project.
+
+        Returns:
+            Tuple of (dependencies, entry points, source scan statistics, project venv hash or None)
+        """
+        if job is not None:
+            job.set_stage('detecting_dependencies', 'Detecting dependencies')
+        requirements = self.detect_requirements(project_path)
+        dependencies = _get_requirement_names(requirements)
+
+        if job is not None:
+            job.set_stage('scanning_entry_points', 'Scanning source files for entry points')
+        scan_result = scan_python_files(self._get_source_dir(project_path))
+        entry_points = self.detect_entry_points(project_path, scan_result)
+
+        venv_hash = self._prepare_venv(requirements, job)
+
+        if job is not None:
+            stats = scan_result.to_stats()
+            job.set_stage('saving', f"Found {len(entry_points)} entry point(s) "
+                                    f"in {stats['python_files']} python file(s)")
+
+        return dependencies, entry_points, scan_result.to_stats(), venv_hash
+
+    def _prepare_venv(self, requirements: list[str], job: Optional[BackgroundJob] = None) -> Optional[str]:
+        """
+        Build (or reuse) a venv for the project requirements.
+
+        Returns:
+            Hash of the venv or None, if the project should use the common venv
+        """
+        if (self._venv_manager is None) or (not requirements):
+            return None
+
+        try:
+            return self._venv_manager.ensure_env(requirements, job)
+        except JobCancelledException:
+            raise
+        except (OSError, subprocess.CalledProcessError) as e:
+            # the project is still usable with the common venv, if the packages are installed there
+            LOGGER.warning(f"Failed to build project venv, falling back to the common venv: {e}")
+            if job is not None:
+                job.write_output(f'Failed to build project venv: {e}\n')
+            return None
+
+    def _release_venv(self, venv_hash: Optional[str]) -> None:
+        # the venv is protected from removal by the venv manager, until the project meta is saved
+        if venv_hash and (self._venv_manager is not None):
+            self._venv_manager.release_env(venv_hash)
+
+    def _get_python_path(self, meta: dict) -> Path:
+        venv_hash = meta.get('venv')
+        if venv_hash and (self._venv_manager is not None):
+            python_path = self._venv_manager.get_python_path(venv_hash)
+            if python_path is not None:
+                return python_path
+
+        return self.venv_python
+
+    @staticmethod
+    def _get_source_dir(project_path: Path) -> Path:
+        if (project_path / 'src').is_dir():
+            return project_path / 'src'
+        return project_path
+
     def detect_dependencies(self, project_path: Path) -> list[str]:
         """
         Detect project dependencies from pyproject.toml or requirements.txt.
@@ -511,7 +631,19 @@ class ProjectService:
         Returns:
             List of dependency package names
         """
-        dependencies = []
+        return _get_requirement_names(self.detect_requirements(project_path))
+
+    def detect_requirements(self, project_path: Path) -> list[str]:
+        """
+        Detect requirement specifiers (e.g. 'requests>=2.0') from pyproject.toml or requirements.txt.
+
+        Args:
+            project_path: Path to the project directory
+
+        Returns:
+            List of requirement specifiers
+        """
+        requirements = []
         project_path = Path(project_path)
 
         # Try pyproject.toml first
@@ -524,43 +656,40 @@ class ProjectService:
                 # Standard [project.dependencies]
                 deps = data.get('project', {}).get('dependencies', [])
                 for dep in deps:
-                    # Extract package name (before any version specifier)
-                    name = re.split(r'[<>=\[!~]', dep)[0].strip()
-                    if name:
-                        dependencies.append(name)
+                    if dep.strip():
+                        requirements.append(dep.strip())
 
                 # Poetry [tool.poetry.dependencies]
+                # Poetry version constraints are not compatible with pip, so only names are used
                 poetry_deps = data.get('tool', {}).get('poetry', {}).get('dependencies', {})
                 for name in poetry_deps:
                     if name.lower() != 'python':
-                        dependencies.append(name)
+                        requirements.append(name)
 
             except (OSError, KeyError, TypeError) as e:
                 LOGGER.warning(f"Failed to parse pyproject.toml: {e}")
 
         # Try requirements.txt
         requirements_path = project_path / 'requirements.txt'
-        if requirements_path.exists() and not dependencies:
+        if requirements_path.exists() and not requirements:
             try:
                 with open(requirements_path, 'r') as f:
                     for line in f:
                         line = line.strip()
                         if line and not line.startswith('#') and not line.startswith('-'):
-                            # Extract package name
-                            name = re.split(r'[<>=\[!~]', line)[0].strip()
-                            if name:
-                                dependencies.append(name)
+                            requirements.append(line)
             except OSError as e:
                 LOGGER.warning(f"Failed to parse requirements.txt: {e}")
 
-        return list(set(dependencies))
+        return requirements
 
-    def detect_entry_points(self, project_path: Path) -> list[str]:
+    def detect_entry_points(self, project_path: Path, scan_result: Optional[SourceScanResult] = None) -> list[str]:
         """
         Detect CLI entry points in the project.
 
         Args:
             project_path: Path to the project directory
+            scan_result: Already scanned python files of the source directory (scanned, if not provided)
 
         Returns:
             List of entry point strings (e.g., "module.main:app")
@@ -569,11 +698,10 @@ class ProjectService:
         project_path = Path(project_path)
 
         # Find source directory
-        src_dir = None
-        if (project_path / 'src').is_dir():
-            src_dir = project_path / 'src'
-        else:
-            src_dir = project_path
+        src_dir = self._get_source_dir(project_path)
+
+        if scan_result is None:
+            scan_result = scan_python_files(src_dir)
 
         # 1. Check pyproject.toml for declared entry points
         pyproject_path = project_path / 'pyproject.toml'
@@ -596,7 +724,10 @@ class ProjectService:
                 LOGGER.warning(f"Failed to parse pyproject.toml for entry points: {e}")
 
         # 2. Scan for __main__.py files
-        for main_file in src_dir.rglob('__main__.py'):
+        for main_file in scan_result.paths:
+            if main_file.name != '__main__.py':
+                continue
+
             # Get module path relative to src_dir
             rel_path = main_file.parent.relative_to(src_dir)
             module_name = str(rel_path).replace(os.sep, '.')
@@ -604,41 +735,40 @@ class ProjectService:
                 entry_points.append(f"{module_name}.__main__")
 
         # 3. Scan Python files for CLI patterns
-        for py_file in src_dir.glob('**/*.py'):
+        for py_file in scan_result.paths:
             if py_file.name.startswith('_') and py_file.name != '__main__.py':
                 continue
 
-            try:
-                content = py_file.read_text()
-                rel_path = py_file.relative_to(src_dir)
-                module_name = str(rel_path.with_suffix('')).replace(os.sep, '.')
-
-                # Look for typer app
-                if 'typer.Typer()' in content or 'typer.Typer(' in content:
-                    match = re.search(r'(\w+)\s*=\s*typer\.Typer\(', content)
-                    if match:
-                        entry_points.append(f"{module_name}:{match.group(1)}")
-                    else:
-                        entry_points.append(f"{module_name}:app")
-
-                # Look for click app
-                elif '@click.command' in content or '@click.group' in content:
-                    if 'def main(' in content:
-                        entry_points.append(f"{module_name}:main")
-                    elif 'def cli(' in content:
-                        entry_points.append(f"{module_name}:cli")
-
-                # Look for standard Python CLI pattern: if __name__ == "__main__" with main()
-                elif "if __name__" in content and "__main__" in content:
-                    if 'def main(' in content:
-                        entry_points.append(f"{module_name}:main")
-                    # Also check for direct script execution pattern
-                    elif re.search(r'if\s+__name__\s*==\s*["\']__main__["\']\s*:', content):
-                        # This file can be run directly, add as module entry
-                        entry_points.append(f"{module_name}")
-
-            except (OSError, UnicodeDecodeError) as e:
-                LOGGER.warning(f"Failed to scan {py_file} for entry points: {e}")
+            content = scan_result.contents.get(py_file)
+            if content is None:
+                continue
+
+            rel_path = py_file.relative_to(src_dir)
+            module_name = str(rel_path.with_suffix('')).replace(os.sep, '.')
+
+            # Look for typer app
+            if 'typer.Typer()' in content or 'typer.Typer(' in content:
+                match = re.search(r'(\w+)\s*=\s*typer\.Typer\(', content)
+                if match:
+                    entry_points.append(f"{module_name}:{match.group(1)}")
+                else:
+                    entry_points.append(f"{module_name}:app")
+
+            # Look for click app
+            elif '@click.command' in content or '@click.group' in content:
+                if 'def main(' in content:
+                    entry_points.append(f"{module_name}:main")
+                elif 'def cli(' in content:
+                    entry_points.append(f"{module_name}:cli")
+
+            # Look for standard Python CLI pattern: if __name__ == "__main__" with main()
+            elif "if __name__" in content and "__main__" in content:
+                if 'def main(' in content:
+                    entry_points.append(f"{module_name}:main")
+                # Also check for direct script execution pattern
+                elif re.search(r'if\s+__name__\s*==\s*["\']__main__["\']\s*:', content):
+                    # This file can be run directly, add as module entry
+                    entry_points.append(f"{module_name}")
 
         # 4. If no entry points found, list root-level .py files as potential entries
         if not entry_points:
@@ -917,8 +1047,8 @@ if len(sys.argv) >= 2 and sys.argv[1] == '{config_cmd}' and '--config' not in sy
         if not wrapper_path:
             raise RuntimeError("Wrapper script not generated yet")
 
-        # Build script_path using venv python
-        script_path = f"{self.venv_python} {wrapper_path}"
+        # Build script_path using project venv python (or the common one)
+        script_path = f"{self._get_python_path(meta)} {wrapper_path}"
 
         # AUTO-MANAGE: Set working_directory to project root for sandboxing
         # Scripts execute from their project folder and access files via relative paths
@@ -1025,3 +1155,13 @@ if len(sys.argv) >= 2 and sys.argv[1] == '{config_cmd}' and '--config' not in sy
             import_statement=import_statement,
             run_statement=run_statement
         )
+
+
+def _get_requirement_names(requirements: list[str]) -> list[str]:
+    names = set()
+    for requirement in requirements:
+        # Extract package name (before any version specifier)
+        name = re.split(r'[<>=\[!~;@ ]', requirement)[0].strip()
+        if name:
+            names.add(name)
+    return list(names)
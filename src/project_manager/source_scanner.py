@@ -0,0 +1,120 @@
+"""
+Scanner of Python source files in imported projects.
+
+Directories are walked without following symlinks, dependency/VCS folders are skipped,
+and file contents are read in parallel. Large files and huge trees are capped, so a single
+import cannot read the whole disk into memory.
+"""
+
+import logging
+import os
+from concurrent.futures.thread import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+LOGGER = logging.getLogger('script_server.source_scanner')
+
+DEFAULT_MAX_FILE_SIZE = 1024 * 1024
+DEFAULT_MAX_FILES = 10000
+DEFAULT_WORKERS = 8
+
+# hidden directories (.git, .venv, etc.) are skipped as well
+SKIPPED_DIRS = {'venv', 'node_modules', '__pycache__', 'site-packages'}
+
+
+class SourceScanResult(NamedTuple):
+    # all found python files, sorted
+    paths: List[Path]
+    # contents of the files, which are not bigger than the size limit and could be read
+    contents: Dict[Path, str]
+    # number of files, whose content was not read because of the size limit
+    skipped_large_files: int
+    # True, if there were more files than the limit
+    truncated: bool
+
+    def to_stats(self) -> dict:
+        return {
+            'python_files': len(self.paths),
+            'skipped_large_files': self.skipped_large_files,
+            'truncated': self.truncated
+        }
+
+
+def scan_python_files(root: Path,
+                      max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                      max_files: int = DEFAULT_MAX_FILES,
+                      workers: int = DEFAULT_WORKERS) -> SourceScanResult:
+    """
+    Find python files under the root folder and read their contents.
+
+    Args:
+        root: Folder to scan
+        max_file_size: Files bigger than this (in bytes) are listed, but not read
+        max_files: Maximum number of files to find, the rest of the tree is ignored
+        workers: Number of threads for reading files
+
+    Returns:
+        Found files and their contents
+    """
+    root = Path(root)
+
+    paths, readable_paths, skipped_large_files, truncated = _find_python_files(root, max_file_size, max_files)
+    if truncated:
+        LOGGER.warning(f'Too many python files in {root}, only first {max_files} files are scanned')
+
+    contents = {}
+    if readable_paths:
+        with ThreadPoolExecutor(max_workers=min(workers, len(readable_paths)),
+                                thread_name_prefix='source-scanner') as executor:
+            for path, content in zip(readable_paths, executor.map(_read_file, readable_paths)):
+                if content is not None:
+                    contents[path] = content
+
+    return SourceScanResult(
+        paths=sorted(paths),
+        contents=contents,
+        skipped_large_files=skipped_large_files,
+        truncated=truncated)
+
+
+def _find_python_files(root: Path, max_file_size: int, max_files: int):
+    paths = []
+    readable_paths = []
+    skipped_large_files = 0
+
+    for dir_path, dir_names, file_names in os.walk(root):
+        # sorting makes the result deterministic, when the tree is truncated
+        dir_names[:] = sorted(name for name in dir_names
+                              if not name.startswith('.') and name not in SKIPPED_DIRS)
+
+        for file_name in sorted(file_names):
+            if not file_name.endswith('.py'):
+                continue
+
+            if len(paths) >= max_files:
+                return paths, readable_paths, skipped_large_files, True
+
+            path = Path(dir_path) / file_name
+            paths.append(path)
+
+            try:
+                size = os.stat(path).st_size
+            except OSError as e:
+                LOGGER.warning(f'Failed to access {path}: {e}')
+                continue
+
+            if size <= max_file_size:
+                readable_paths.append(path)
+            else:
+                LOGGER.info(f'Skipping {path} ({size} bytes), it is too big to scan')
+                skipped_large_files += 1
+
+    return paths, readable_paths, skipped_large_files, False
+
+
+def _read_file(path: Path):
+    try:
+        return path.read_text()
+    except (OSError, UnicodeDecodeError) as e:
+        LOGGER.warning(f'Failed to scan {path} for entry points: {e}')
+        return None
@@ -116,6 +116,7 @@ class ObservableDict(UserDict):
     def __init__(self, dict: Optional[Mapping[_KT, _VT]] = None, **kwargs: _VT) -> None:
         super().__init__(**kwargs)
         self._observers = []
+        self._key_observers = {}
 
         if dict:
             self.update(dict)
@@ -127,6 +128,15 @@ class ObservableDict(UserDict):
         if observer in self._observers:
             self._observers.remove(observer)
 
+    def subscribe_key(self, key, observer):
+        """Subscribes on changes of a single key only, so unrelated changes don't visit the observer"""
+        self._key_observers.setdefault(key, []).append(observer)
+
+    def unsubscribe_key(self, key, observer):
+        key_observers = self._key_observers.get(key)
+        if key_observers and (observer in key_observers):
+            key_observers.remove(observer)
+
     def set(self, another_dict):
         old_values = dict(self)
 
@@ -137,16 +147,16 @@ class ObservableDict(UserDict):
         for key, value in another_dict.items():
             super().__setitem__(key, value)
 
-        if self._observers:
+        if self._observers or self._key_observers:
             for obsolete_key in obsolete_keys:
                 old_value = old_values[obsolete_key]
-                for observer in self._observers:
+                for observer in self._get_observers(obsolete_key):
                     observer(obsolete_key, old_value, None)
 
             for key, value in self.items():
                 old_value = old_values.get(key)
                 if old_value != value:
-                    for observer in self._observers:
+                    for observer in self._get_observers(key):
                         observer(key, old_value, value)
 
     def __setitem__(self, key: _KT, item: _VT) -> None:
@@ -169,9 +179,16 @@ class ObservableDict(UserDict):
 
         self._notify_observers(key, old_value, None)
 
+    def _get_observers(self, key):
+        key_observers = self._key_observers.get(key)
+        if not key_observers:
+            return list(self._observers)
+
+        return self._observers + key_observers
+
     def _notify_observers(self, key, old_value, new_value):
-        if self._observers:
-            for observer in self._observers:
+        if self._observers or self._key_observers:
+            for observer in self._get_observers(key):
                 try:
                     observer(key, old_value, new_value)
                 except Exception as e:
@@ -0,0 +1,241 @@
+"""
+Cron expressions (minute, hour, day of month, month, day of week).
+
+Expressions are compiled to bitsets (one bit per allowed value), so finding the next fire time
+is a few bit operations per field instead of checking every minute.
+"""
+
+import calendar
+import functools
+from datetime import datetime, timedelta
+
+_MONTH_NAMES = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+_WEEKDAY_NAMES = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+
+_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+# the longest gap between fire times is for 29th of February on a specific weekday
+_MAX_SEARCH_YEARS = 28
+
+
+class InvalidCronExpressionException(Exception):
+    def __init__(self, message) -> None:
+        super().__init__(message)
+
+
+class _Field:
+    def __init__(self, name, min_value, max_value, names=None) -> None:
+        self.name = name
+        self.min_value = min_value
+        self.max_value = max_value
+        self.names = names
+
+    def parse(self, expression: str) -> int:
+        mask = 0
+        for part in expression.split(','):
+            mask |= self._parse_part(part)
+        return mask
+
+    def _parse_part(self, part: str) -> int:
+        range_part, _, step_part = part.partition('/')
+
+        if step_part:
+            step = self._parse_number(step_part)
+            if step <= 0:
+                raise InvalidCronExpressionException(f'Step should be > 0 in {self.name}: {part}')
+        else:
+            step = 1
+
+        if range_part == '*':
+            start, end = self.min_value, self.max_value
+        elif '-' in range_part:
+            start_str, end_str = range_part.split('-', 1)
+            start, end = self._parse_value(start_str), self._parse_value(end_str)
+        else:
+            start = self._parse_value(range_part)
+            # "5/15" means "starting from 5, every 15"
+            end = self.max_value if step_part else start
+
+        if start > end:
+            raise InvalidCronExpressionException(f'Invalid range in {self.name}: {part}')
+
+        mask = 0
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+        return mask
+
+    def _parse_value(self, value_str: str) -> int:
+        if self.names and (value_str.lower() in self.names):
+            return self.names.index(value_str.lower()) + self.min_value
+
+        value = self._parse_number(value_str)
+        if (value < self.min_value) or (value > self.max_value):
+            raise InvalidCronExpressionException(
+                f'{self.name} should be between {self.min_value} and {self.max_value}: {value_str}')
+        return value
+
+    def _parse_number(self, value_str: str) -> int:
+        if not value_str.isdigit():
+            raise InvalidCronExpressionException(f'Invalid value in {self.name}: {value_str}')
+        return int(value_str)
+
+
+_MINUTE_FIELD = _Field('minute', 0, 59)
+_HOUR_FIELD = _Field('hour', 0, 23)
+_DAY_FIELD = _Field('day of month', 1, 31)
+_MONTH_FIELD = _Field('month', 1, 12, _MONTH_NAMES)
+# 7 is an alias for sunday
+_WEEKDAY_FIELD = _Field('day of week', 0, 7, _WEEKDAY_NAMES)
+
+
+class CronExpression:
+    """Compiled cron expression. Times are naive local times (timezone conversion is done by callers)"""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+
+        normalized = _MACROS.get(expression.strip().lower(), expression)
+        fields = normalized.split()
+        if len(fields) != 5:
+            raise InvalidCronExpressionException(
+                'Cron expression should have 5 fields (minute hour day month weekday): ' + expression)
+
+        minutes, hours, days, months, weekdays = fields
+
+        self._minutes = _MINUTE_FIELD.parse(minutes)
+        self._hours = _HOUR_FIELD.parse(hours)
+        self._days = _DAY_FIELD.parse(days)
+        self._months = _MONTH_FIELD.parse(months)
+
+        weekdays_mask = _WEEKDAY_FIELD.parse(weekdays)
+        if weekdays_mask & (1 << 7):
+            weekdays_mask = (weekdays_mask | 1) & ~(1 << 7)
+        self._weekdays = weekdays_mask
+
+        # like in standard cron: if both day fields are restricted (don't start with *), a day matches any of them,
+        # otherwise it should match both (e.g. "*/2" day of month and "1" day of week are odd-dated mondays)
+        self._days_restricted = not days.startswith('*')
+        self._weekdays_restricted = not weekdays.startswith('*')
+
+        self._day_masks = {}
+
+        if not self._has_possible_days():
+            raise InvalidCronExpressionException('Cron expression never matches: ' + expression)
+
+    def get_next_time(self, not_before: datetime) -> datetime:
+        """Get the first matching time (with minute precision), which is not before the specified time"""
+        value = not_before.replace(second=0, microsecond=0)
+        if value < not_before:
+            value += timedelta(minutes=1)
+
+        year, month, day, hour, minute = value.year, value.month, value.day, value.hour, value.minute
+
+        while year <= not_before.year + _MAX_SEARCH_YEARS:
+            month_found = _next_bit(self._months, month)
+            if month_found is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if month_found != month:
+                # moved to a later month, so the rest of the fields start from the beginning
+                month, day, hour, minute = month_found, 1, 0, 0
+
+            day_found = _next_bit(self._get_day_mask(year, month), day)
+            if day_found is None:
+                year, month, day, hour, minute = _next_month(year, month)
+                continue
+            if day_found != day:
+                day, hour, minute = day_found, 0, 0
+
+            hour_found = _next_bit(self._hours, hour)
+            if hour_found is None:
+                year, month, day, hour, minute = _next_day(year, month, day)
+                continue
+            if hour_found != hour:
+                hour, minute = hour_found, 0
+
+            minute_found = _next_bit(self._minutes, minute)
+            if minute_found is None:
+                year, month, day, hour, minute = _next_hour(year, month, day, hour)
+                continue
+
+            return value.replace(year=year, month=month, day=day, hour=hour, minute=minute_found)
+
+        raise InvalidCronExpressionException('Cron expression never matches: ' + self.expression)
+
+    def _get_day_mask(self, year: int, month: int) -> int:
+        key = (year, month)
+        mask = self._day_masks.get(key)
+        if mask is not None:
+            return mask
+
+        mask = self._calculate_day_mask(year, month)
+
+        # the cache is small: only months, which were actually requested
+        if len(self._day_masks) > 64:
+            self._day_masks.clear()
+        self._day_masks[key] = mask
+
+        return mask
+
+    def _calculate_day_mask(self, year: int, month: int) -> int:
+        first_weekday, days_count = calendar.monthrange(year, month)
+        # calendar weekdays start from monday, cron weekdays - from sunday
+        first_weekday = (first_weekday + 1) % 7
+
+        weekdays_mask = 0
+        for day in range(1, days_count + 1):
+            if self._weekdays & (1 << ((first_weekday + day - 1) % 7)):
+                weekdays_mask |= 1 << day
+
+        days_mask = self._days & ((1 << (days_count + 1)) - 2)
+
+        if self._days_restricted and self._weekdays_restricted:
+            return days_mask | weekdays_mask
+        return days_mask & weekdays_mask
+
+    def _has_possible_days(self) -> bool:
+        # weekdays of dates repeat every 28 years (including leap years), if no century years are skipped
+        return any(self._calculate_day_mask(year, month)
+                   for year in range(2024, 2024 + 28)
+                   for month in range(1, 13)
+                   if self._months & (1 << month))
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_cron(expression: str) -> CronExpression:
+    """Compile expression once, so jobs with the same expression share the matcher"""
+    return CronExpression(expression)
+
+
+def _next_bit(mask: int, start: int):
+    """Get the lowest set bit, which is >= start, or None"""
+    remaining = mask >> start
+    if not remaining:
+        return None
+    return start + ((remaining & -remaining).bit_length() - 1)
+
+
+def _next_month(year, month):
+    if month == 12:
+        return year + 1, 1, 1, 0, 0
+    return year, month + 1, 1, 0, 0
+
+
+def _next_day(year, month, day):
+    if day >= calendar.monthrange(year, month)[1]:
+        return _next_month(year, month)
+    return year, month, day + 1, 0, 0
+
+
+def _next_hour(year, month, day, hour):
+    if hour == 23:
+        return _next_day(year, month, day)
+    return year, month, day, hour + 1, 0
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import threading
+from typing import Callable
+
+from utils import file_utils
+
+LOGGER = logging.getLogger('script_server.scheduling.jsonl_journal')
+
+# the journal is rewritten, when it has many more records than the owner retains
+_COMPACTION_MIN_RECORDS = 1000
+
+
+class JsonLinesJournal:
+    """
+    File of JSON records (one compact line per record), which is appended in batches and compacted occasionally
+
+    The owner keeps its state in memory: it provides records for appending (e.g. from a periodic flush)
+    and all retained records for compaction. The journal is not thread-safe, the owner should synchronize the calls
+    """
+
+    def __init__(self, path: str, flush_interval_seconds: float) -> None:
+        self.path = path
+        self.records_count = 0
+
+        self._flush_interval_seconds = flush_interval_seconds
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+
+    def read(self, parse_record: Callable[[dict], object]) -> list:
+        """Read parsed records of the journal. Broken records are skipped"""
+        records = []
+
+        if os.path.exists(self.path):
+            content = file_utils.read_file(self.path, keep_newlines=True)
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+
+                try:
+                    records.append(parse_record(json.loads(line)))
+                except Exception:
+                    # the last line can be partially written, if the server was killed
+                    LOGGER.warning('Skipping broken record in %s: %s', self.path, line)
+
+        self.records_count = len(records)
+        return records
+
+    def start(self, flush: Callable[[], None], thread_name: str) -> None:
+        """Call flush periodically in a background thread"""
+        if self._flush_thread is not None:
+            return
+
+        def flush_loop():
+            while not self._stop_event.wait(self._flush_interval_seconds):
+                try:
+                    flush()
+                except Exception:
+                    LOGGER.exception('Failed to write %s', self.path)
+
+        self._flush_thread = threading.Thread(target=flush_loop, daemon=True, name=thread_name)
+        self._flush_thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def append(self, records: list) -> None:
+        if not records:
+            return
+
+        content = _serialize(records)
+
+        file_utils.prepare_folder(os.path.dirname(self.path))
+        with open(self.path, 'a+b') as file:
+            # a partially written line (if the server was killed) shouldn't be merged with the first new record
+            if not _ends_with_newline(file):
+                content = b'\n' + content
+
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.records_count += len(records)
+
+    def needs_compaction(self, retained_count: int) -> bool:
+        return (self.records_count >= _COMPACTION_MIN_RECORDS) and (self.records_count > 2 * retained_count)
+
+    def compact(self, records: list) -> None:
+        """Rewrite the journal with the specified records only"""
+        file_utils.write_file_atomic(self.path, _serialize(records), byte_content=True)
+        self.records_count = len(records)
+
+        LOGGER.debug('Compacted %s to %d records', self.path, len(records))
+
+
+def _serialize(records: list) -> bytes:
+    return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+
+
+def _ends_with_newline(file) -> bool:
+    size = file.seek(0, os.SEEK_END)
+    if size == 0:
+        return True
+
+    file.seek(size - 1)
+    return file.read(1) == b'\n'
@@ -0,0 +1,280 @@
+import collections
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from scheduling.jsonl_journal import JsonLinesJournal
+from utils import date_utils
+
+LEDGER_FILENAME = 'run_ledger.journal'
+
+DEFAULT_RUNS_PER_SCHEDULE = 100
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5
+
+STATUS_FINISHED = 'finished'
+STATUS_SKIPPED = 'skipped'
+STATUS_FAILED_TO_START = 'failed_to_start'
+STATUS_CANCELLED = 'cancelled'
+
+
+class ScheduleRun:
+    """
+    A single run of a schedule
+
+    Times are: planned (when the scheduler should dispatch it), dispatched (when it was actually dispatched),
+    started (when the script process started, it can be later because of the execution queue) and finished
+    """
+
+    __slots__ = ('schedule_id', 'execution_id', 'status', 'planned_time', 'dispatch_time', 'start_time',
+                 'finish_time', 'exit_code')
+
+    def __init__(self,
+                 schedule_id,
+                 planned_time: Optional[datetime],
+                 dispatch_time: datetime,
+                 status: Optional[str] = None,
+                 execution_id=None,
+                 start_time: Optional[datetime] = None,
+                 finish_time: Optional[datetime] = None,
+                 exit_code: Optional[int] = None) -> None:
+        self.schedule_id = str(schedule_id)
+        self.execution_id = execution_id
+        self.status = status
+        self.planned_time = planned_time
+        self.dispatch_time = dispatch_time
+        self.start_time = start_time
+        self.finish_time = finish_time
+        self.exit_code = exit_code
+
+    @property
+    def dispatch_lag_seconds(self) -> Optional[float]:
+        return _seconds_between(self.planned_time, self.dispatch_time)
+
+    @property
+    def start_lag_seconds(self) -> Optional[float]:
+        return _seconds_between(self.planned_time, self.start_time)
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        return _seconds_between(self.start_time, self.finish_time)
+
+    @property
+    def failed(self) -> bool:
+        if self.status == STATUS_FINISHED:
+            return self.exit_code != 0
+        return self.status == STATUS_FAILED_TO_START
+
+    def as_serializable_dict(self) -> dict:
+        return {
+            'execution_id': self.execution_id,
+            'status': self.status,
+            'planned_time': date_utils.to_iso_string(self.planned_time),
+            'dispatch_time': date_utils.to_iso_string(self.dispatch_time),
+            'start_time': date_utils.to_iso_string(self.start_time),
+            'finish_time': date_utils.to_iso_string(self.finish_time),
+            'exit_code': self.exit_code,
+            'dispatch_lag_seconds': _round_optional(self.dispatch_lag_seconds),
+            'start_lag_seconds': _round_optional(self.start_lag_seconds),
+            'duration_seconds': _round_optional(self.duration_seconds)
+        }
+
+
+class ScheduleRunLedger:
+    """
+    History of schedule runs with timing statistics
+
+    The latest runs of each schedule are kept in memory. New runs are appended to the ledger file in batches
+    (one compact JSON line per run), the file is compacted to the retained runs, when old records dominate it.
+    Removed schedules are marked with a "removed" record, so their runs are dropped on compaction or the next load
+    """
+
+    def __init__(self,
+                 folder: str,
+                 runs_per_schedule: int = DEFAULT_RUNS_PER_SCHEDULE,
+                 flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS) -> None:
+        self._journal = JsonLinesJournal(os.path.join(folder, LEDGER_FILENAME), flush_interval_seconds)
+        self._runs_per_schedule = runs_per_schedule
+
+        self._lock = threading.Lock()
+        self._runs = {}  # schedule_id -> deque of runs, the oldest first
+        self._pending = []  # serialized records
+
+    def load(self, schedule_ids) -> None:
+        """Read the ledger. Runs of other schedules (e.g. removed ones) are dropped"""
+        schedule_ids = set(str(schedule_id) for schedule_id in schedule_ids)
+        runs = {}
+
+        with self._lock:
+            for schedule_id, run in self._journal.read(_parse_record):
+                if run is None:
+                    runs.pop(schedule_id, None)
+                elif schedule_id in schedule_ids:
+                    self._get_or_create_runs(runs, schedule_id).append(run)
+
+            self._runs = runs
+
+            if self._journal.records_count > self._count_retained_runs():
+                self._compact_locked()
+
+    def start(self):
+        self._journal.start(self.flush, 'schedule-run-ledger')
+
+    def stop(self):
+        self._journal.stop()
+        self.flush()
+
+    def add(self, run: ScheduleRun) -> None:
+        with self._lock:
+            self._get_or_create_runs(self._runs, run.schedule_id).append(run)
+            self._pending.append(_serialize_record(run))
+
+    def remove_schedule(self, schedule_id) -> None:
+        """Forget runs of the schedule. The ledger file is not rewritten, the removal is written with the next batch"""
+        schedule_id = str(schedule_id)
+
+        with self._lock:
+            if self._runs.pop(schedule_id, None) is None:
+                return
+
+            self._pending.append(_serialize_removal(schedule_id))
+
+    def get_runs(self, schedule_id, limit: Optional[int] = None) -> list:
+        """Get runs of the schedule, the latest first"""
+        with self._lock:
+            runs = list(reversed(self._runs.get(str(schedule_id), ())))
+
+        if limit is not None:
+            runs = runs[:limit]
+        return runs
+
+    def get_stats(self, schedule_id) -> dict:
+        runs = self.get_runs(schedule_id)
+
+        status_counts = collections.Counter(run.status for run in runs)
+        started_runs = [run for run in runs if run.start_time is not None]
+
+        return {
+            'runs': len(runs),
+            'finished': status_counts[STATUS_FINISHED],
+            'failed': sum(1 for run in runs if run.failed),
+            'skipped': status_counts[STATUS_SKIPPED],
+            'cancelled': status_counts[STATUS_CANCELLED],
+            'dispatch_lag_seconds': _describe([run.dispatch_lag_seconds for run in runs]),
+            'start_lag_seconds': _describe([run.start_lag_seconds for run in started_runs]),
+            'duration_seconds': _describe([run.duration_seconds for run in started_runs])
+        }
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+
+        self._journal.append(self._pending)
+        self._pending = []
+
+        if self._journal.needs_compaction(self._count_retained_runs()):
+            self._compact_locked()
+
+    def _compact_locked(self):
+        # pending runs are written as well and removed schedules are not written at all,
+        # so pending records shouldn't be appended again
+        self._pending = []
+
+        self._journal.compact([_serialize_record(run) for runs in self._runs.values() for run in runs])
+
+    def _count_retained_runs(self):
+        return sum(len(runs) for runs in self._runs.values())
+
+    def _get_or_create_runs(self, runs_dict, schedule_id):
+        runs = runs_dict.get(schedule_id)
+        if runs is None:
+            runs = collections.deque(maxlen=self._runs_per_schedule)
+            runs_dict[schedule_id] = runs
+        return runs
+
+
+def _describe(values) -> dict:
+    values = sorted(value for value in values if value is not None)
+
+    return {
+        'p50': _round_optional(_percentile(values, 50)),
+        'p95': _round_optional(_percentile(values, 95)),
+        'max': _round_optional(values[-1] if values else None)
+    }
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+
+    index = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _seconds_between(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if (start is None) or (end is None):
+        return None
+    return max(0.0, (end - start).total_seconds())
+
+
+def _round_optional(value):
+    if value is None:
+        return None
+    return round(value, 3)
+
+
+def _to_timestamp(value: Optional[datetime]):
+    if value is None:
+        return None
+    return round(value.timestamp(), 3)
+
+
+def _from_timestamp(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def _serialize_record(run: ScheduleRun) -> dict:
+    record = {
+        'id': run.schedule_id,
+        'status': run.status,
+        'planned': _to_timestamp(run.planned_time),
+        'dispatched': _to_timestamp(run.dispatch_time),
+        'started': _to_timestamp(run.start_time),
+        'finished': _to_timestamp(run.finish_time),
+        'execution_id': run.execution_id,
+        'exit_code': run.exit_code
+    }
+
+    # missing values are not written, so the ledger stays compact
+    return {key: value for key, value in record.items() if value is not None}
+
+
+def _serialize_removal(schedule_id: str) -> dict:
+    return {'id': schedule_id, 'removed': True}
+
+
+def _parse_record(record: dict):
+    """Returns (schedule_id, run), run is None for removal records"""
+    schedule_id = str(record['id'])
+
+    if record.get('removed'):
+        return schedule_id, None
+
+    return schedule_id, ScheduleRun(
+        schedule_id,
+        _from_timestamp(record.get('planned')),
+        _from_timestamp(record.get('dispatched')),
+        status=record['status'],
+        execution_id=record.get('execution_id'),
+        start_time=_from_timestamp(record.get('started')),
+        finish_time=_from_timestamp(record.get('finished')),
+        exit_code=record.get('exit_code'))
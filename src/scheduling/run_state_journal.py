@@ -0,0 +1,140 @@
+import os
+import threading
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from scheduling.jsonl_journal import JsonLinesJournal
+from utils import date_utils
+
+JOURNAL_FILENAME = 'run_state.journal'
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5
+
+
+class RunState(NamedTuple):
+    executions_count: int
+    last_execution_time: Optional[datetime]
+
+
+class RunStateJournal:
+    """
+    Append-only journal of schedule run state (executions count and last execution time)
+
+    Run state changes on every execution, so instead of rewriting job files, changes are collected in memory
+    and appended to the journal in batches. Only the latest state per job is written in each batch.
+    Each line is either a state of a job or a "reset" record (no state), which means that the job file
+    is authoritative again (the job was saved or removed)
+
+    The journal is compacted (rewritten with the latest states only), when obsolete records dominate it
+    """
+
+    def __init__(self, folder: str, flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS) -> None:
+        self._journal = JsonLinesJournal(os.path.join(folder, JOURNAL_FILENAME), flush_interval_seconds)
+
+        self._lock = threading.Lock()
+        self._pending = {}  # job_id -> RunState or None (reset)
+        self._states = {}  # job_id -> RunState, as it would be read from the journal
+
+    def load(self) -> dict:
+        """Read the journal. Returns job_id -> RunState"""
+        states = {}
+
+        with self._lock:
+            for job_id, state in self._journal.read(_parse_record):
+                if state is None:
+                    states.pop(job_id, None)
+                else:
+                    states[job_id] = state
+
+            self._states = dict(states)
+
+        return states
+
+    def start(self):
+        self._journal.start(self.flush, 'schedule-run-state')
+
+    def stop(self):
+        self._journal.stop()
+        self.flush()
+
+    def record(self, job_id, executions_count: int, last_execution_time: Optional[datetime]) -> None:
+        """Remember the run state. It's written with the next batch"""
+        with self._lock:
+            self._pending[str(job_id)] = RunState(executions_count, last_execution_time)
+
+    def reset(self, job_id) -> None:
+        """Forget the run state of the job, because its file is up-to-date (or removed)"""
+        job_id = str(job_id)
+
+        with self._lock:
+            self._pending.pop(job_id, None)
+            if job_id not in self._states:
+                return
+
+            # older states in the journal shouldn't override the file, even if the server is killed right after
+            self._pending[job_id] = None
+            self._flush_locked()
+
+    def retain(self, job_ids) -> None:
+        """Drop states of all the jobs, except the specified ones, and compact the journal"""
+        job_ids = set(str(job_id) for job_id in job_ids)
+
+        with self._lock:
+            self._flush_locked()
+
+            stale_ids = [job_id for job_id in self._states.keys() if job_id not in job_ids]
+            for job_id in stale_ids:
+                del self._states[job_id]
+
+            if stale_ids or (self._journal.records_count > len(self._states)):
+                self._compact_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+
+        self._journal.append([_serialize_record(job_id, state) for job_id, state in self._pending.items()])
+
+        # pending states are kept, if writing fails, so they are retried with the next batch
+        pending = self._pending
+        self._pending = {}
+
+        for job_id, state in pending.items():
+            if state is None:
+                self._states.pop(job_id, None)
+            else:
+                self._states[job_id] = state
+
+        if self._journal.needs_compaction(len(self._states)):
+            self._compact_locked()
+
+    def _compact_locked(self):
+        self._journal.compact([_serialize_record(job_id, state) for job_id, state in self._states.items()])
+
+
+def _serialize_record(job_id, state: Optional[RunState]) -> dict:
+    record = {'id': job_id}
+
+    if state is not None:
+        record['executions_count'] = state.executions_count
+        if state.last_execution_time is not None:
+            record['last_execution_time'] = date_utils.to_iso_string(state.last_execution_time)
+
+    return record
+
+
+def _parse_record(record: dict):
+    job_id = str(record['id'])
+
+    if 'executions_count' not in record:
+        return job_id, None
+
+    last_execution_time = record.get('last_execution_time')
+    if last_execution_time is not None:
+        last_execution_time = date_utils.parse_iso_datetime(last_execution_time)
+
+    return job_id, RunState(int(record['executions_count']), last_execution_time)
@@ -1,13 +1,34 @@
+import itertools
 from datetime import timezone, timedelta, datetime
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from model import model_helper
-from model.constants import MAX_SCHEDULE_ITERATIONS
+from scheduling.cron import InvalidCronExpressionException, compile_cron
 from utils import date_utils
 from utils.string_utils import is_blank
 
 ALLOWED_WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
 
+# what to do, when a schedule fires, while its previous execution is still running (or queued)
+OVERLAP_ALLOW = 'allow'
+OVERLAP_SKIP = 'skip'
+OVERLAP_QUEUE = 'queue'
+OVERLAP_KILL = 'kill'
+ALLOWED_OVERLAP_POLICIES = [OVERLAP_ALLOW, OVERLAP_SKIP, OVERLAP_QUEUE, OVERLAP_KILL]
+
+# what to do with executions, which were missed, while the server was down
+MISFIRE_SKIP = 'skip'
+MISFIRE_RUN_ONCE = 'run_once'
+MISFIRE_RUN_ALL = 'run_all'
+ALLOWED_MISFIRE_POLICIES = [MISFIRE_SKIP, MISFIRE_RUN_ONCE, MISFIRE_RUN_ALL]
+DEFAULT_MISFIRE_LIMIT = 10
+
+_MIN_STEP = timedelta(microseconds=1)
+
+# enough to skip a repeated (DST) hour, minute by minute
+_MAX_CRON_DST_ATTEMPTS = 24 * 60
+
 
 def _read_datetime(incoming_schedule_config: dict, key: str) -> datetime:
     datetime_value = model_helper.read_datetime_from_config(key, incoming_schedule_config)
@@ -54,6 +75,71 @@ def _read_end_args(incoming_schedule_config: dict) -> tuple[Optional[str], Any]:
         return end_option,None
 
 
+def _read_timezone(incoming_schedule_config: dict) -> Optional[str]:
+    timezone_name = incoming_schedule_config.get('timezone')
+    if is_blank(timezone_name):
+        return None
+
+    try:
+        ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise InvalidScheduleException('Unknown timezone: ' + timezone_name)
+
+    return timezone_name
+
+
+def _read_cron_expression(incoming_schedule_config: dict) -> Optional[str]:
+    expression = incoming_schedule_config.get('cron_expression')
+    if is_blank(expression):
+        return None
+
+    expression = ' '.join(expression.split())
+    try:
+        compile_cron(expression)
+    except InvalidCronExpressionException as e:
+        raise InvalidScheduleException(str(e))
+
+    return expression
+
+
+def _read_jitter_seconds(incoming_schedule_config: dict) -> Optional[int]:
+    jitter_seconds = model_helper.read_int_from_config('jitter_seconds', incoming_schedule_config)
+    if (jitter_seconds is not None) and (jitter_seconds < 0):
+        raise InvalidScheduleException('jitter_seconds should be >= 0')
+    return jitter_seconds
+
+
+def _read_overlap_policy(incoming_schedule_config: dict) -> str:
+    overlap_policy = incoming_schedule_config.get('overlap_policy')
+    if is_blank(overlap_policy):
+        return OVERLAP_ALLOW
+
+    overlap_policy = overlap_policy.strip().lower()
+    if overlap_policy not in ALLOWED_OVERLAP_POLICIES:
+        raise InvalidScheduleException('overlap_policy should be one of: ' + ', '.join(ALLOWED_OVERLAP_POLICIES))
+
+    return overlap_policy
+
+
+def _read_misfire_policy(incoming_schedule_config: dict) -> str:
+    misfire_policy = incoming_schedule_config.get('misfire_policy')
+    if is_blank(misfire_policy):
+        return MISFIRE_SKIP
+
+    misfire_policy = misfire_policy.strip().lower()
+    if misfire_policy not in ALLOWED_MISFIRE_POLICIES:
+        raise InvalidScheduleException('misfire_policy should be one of: ' + ', '.join(ALLOWED_MISFIRE_POLICIES))
+
+    return misfire_policy
+
+
+def _read_misfire_limit(incoming_schedule_config: dict) -> int:
+    limit = model_helper.read_int_from_config('misfire_limit', incoming_schedule_config, default=DEFAULT_MISFIRE_LIMIT)
+    if limit <= 0:
+        raise InvalidScheduleException('misfire_limit should be > 0')
+    return limit
+
+
 def read_repeatable_flag(incoming_schedule_config: dict) -> bool:
     repeatable = model_helper.read_bool_from_config('repeatable', incoming_schedule_config)
     if repeatable is None:
@@ -84,11 +170,23 @@ def read_schedule_config(incoming_schedule_config: dict) -> 'ScheduleConfig':
 
         prepared_schedule_config.end_option, prepared_schedule_config.end_arg = _read_end_args(incoming_schedule_config)
 
-        prepared_schedule_config.repeat_unit = _read_repeat_unit(incoming_schedule_config)
-        prepared_schedule_config.repeat_period = _read_repeat_period(incoming_schedule_config)
+        prepared_schedule_config.timezone = _read_timezone(incoming_schedule_config)
+
+        prepared_schedule_config.overlap_policy = _read_overlap_policy(incoming_schedule_config)
+
+        prepared_schedule_config.jitter_seconds = _read_jitter_seconds(incoming_schedule_config)
 
-        if prepared_schedule_config.repeat_unit == 'weeks':
-            prepared_schedule_config.weekdays = read_weekdays(incoming_schedule_config)
+        prepared_schedule_config.misfire_policy = _read_misfire_policy(incoming_schedule_config)
+        if prepared_schedule_config.misfire_policy == MISFIRE_RUN_ALL:
+            prepared_schedule_config.misfire_limit = _read_misfire_limit(incoming_schedule_config)
+
+        prepared_schedule_config.cron_expression = _read_cron_expression(incoming_schedule_config)
+        if prepared_schedule_config.cron_expression is None:
+            prepared_schedule_config.repeat_unit = _read_repeat_unit(incoming_schedule_config)
+            prepared_schedule_config.repeat_period = _read_repeat_period(incoming_schedule_config)
+
+            if prepared_schedule_config.repeat_unit == 'weeks':
+                prepared_schedule_config.weekdays = read_weekdays(incoming_schedule_config)
     else:
         # For non-recurring schedules, parse completion_time if present
         prepared_schedule_config.completion_time = model_helper.read_datetime_from_config('completion_time', incoming_schedule_config)
@@ -108,6 +206,16 @@ class ScheduleConfig:
         self.repeat_unit: Optional[str] = None
         self.repeat_period: Optional[int] = None
         self.weekdays: Optional[list[str]] = None
+        # IANA timezone, in which days/weeks/months are counted (UTC of start_datetime, if not set)
+        self.timezone: Optional[str] = None
+        # cron schedules use the expression instead of repeat_unit/repeat_period/weekdays
+        self.cron_expression: Optional[str] = None
+        self.overlap_policy: str = OVERLAP_ALLOW
+        # executions are delayed by up to jitter_seconds (server default, if not set), to spread simultaneous jobs
+        self.jitter_seconds: Optional[int] = None
+        self.misfire_policy: str = MISFIRE_SKIP
+        # max number of missed executions, which are run with MISFIRE_RUN_ALL policy
+        self.misfire_limit: Optional[int] = None
         self.completion_time: Optional[datetime] = None
 
     def as_serializable_dict(self) -> dict:
@@ -137,72 +245,203 @@ class ScheduleConfig:
         if self.weekdays is not None:
             result['weekdays'] = self.weekdays
 
+        if self.timezone is not None:
+            result['timezone'] = self.timezone
+
+        if self.cron_expression is not None:
+            result['cron_expression'] = self.cron_expression
+
+        if self.overlap_policy != OVERLAP_ALLOW:
+            result['overlap_policy'] = self.overlap_policy
+
+        if self.jitter_seconds is not None:
+            result['jitter_seconds'] = self.jitter_seconds
+
+        if self.misfire_policy != MISFIRE_SKIP:
+            result['misfire_policy'] = self.misfire_policy
+
+        if self.misfire_limit is not None:
+            result['misfire_limit'] = self.misfire_limit
+
         if self.completion_time is not None:
             result['completion_time'] = date_utils.to_iso_string(self.completion_time)
 
         return result
 
-    def get_next_time(self) -> datetime:
+    def get_next_time(self, not_before: Optional[datetime] = None) -> datetime:
+        """
+        Get the first execution time, which is not before the specified time (now by default).
+
+        The time is calculated arithmetically (without iterating over previous executions).
+        If timezone is set, days/weeks/months are counted in the local time of the timezone,
+        i.e. executions keep their wall-clock time over DST changes.
+        """
         if not self.repeatable:
             return self.start_datetime
 
-        if self.repeat_unit == 'minutes':
-            next_time_func = lambda start, iteration_index: \
-                start + timedelta(minutes=self.repeat_period * iteration_index)
-            get_initial_multiplier = lambda start: \
-                ((now - start).seconds // 60 + (now - start).days * 1440) \
-                // self.repeat_period
-        elif self.repeat_unit == 'hours':
-            next_time_func = lambda start, iteration_index: start + timedelta(
-                hours=self.repeat_period * iteration_index)
-
-            get_initial_multiplier = lambda start: \
-                ((now - start).seconds // 3600 + (now - start).days * 24) \
-                // self.repeat_period
+        if not_before is None:
+            not_before = date_utils.now(tz=timezone.utc)
+
+        if self.cron_expression:
+            return self._get_next_cron_time(not_before)
+        elif self.repeat_unit in ('minutes', 'hours'):
+            return self._get_next_fixed_interval_time(not_before)
         elif self.repeat_unit == 'days':
-            next_time_func = lambda start, iteration_index: start + timedelta(days=self.repeat_period * iteration_index)
-            get_initial_multiplier = lambda start: (now - start).days // self.repeat_period
+            return self._get_next_local_time(not_before, self._get_days_occurrence, self._count_days_occurrences)
         elif self.repeat_unit == 'months':
-            next_time_func = lambda start, iteration_index: date_utils.add_months(start,
-                                                                                  self.repeat_period * iteration_index)
-            get_initial_multiplier = lambda start: (now - start).days // 28 // self.repeat_period
+            return self._get_next_local_time(not_before, self._get_months_occurrence, self._count_months_occurrences)
         elif self.repeat_unit == 'weeks':
-            start_weekday = self.start_datetime.weekday()
-            offset = 0
-            for weekday in self.weekdays:
-                index = ALLOWED_WEEKDAYS.index(weekday)
-                if index < start_weekday:
-                    offset += 1
-
-            def next_weekday(start: datetime, iteration_index):
-                weeks_multiplier = (iteration_index + offset) // len(self.weekdays)
-                next_weekday_index = (iteration_index + offset) % len(self.weekdays)
-                next_weekday_name = self.weekdays[next_weekday_index]
-                next_weekday = ALLOWED_WEEKDAYS.index(next_weekday_name)
-
-                return start \
-                       + timedelta(weeks=self.repeat_period * weeks_multiplier) \
-                       + timedelta(days=(next_weekday - start.weekday()))
-
-            next_time_func = next_weekday
-
-            get_initial_multiplier = lambda start: (now - start).days // 7 // self.repeat_period * len(
-                self.weekdays) - 1
+            return self._get_next_weeks_time(not_before)
         else:
             raise Exception('Unknown unit: ' + repr(self.repeat_unit))
 
-        now = date_utils.now(tz=timezone.utc)
-        max_iterations = MAX_SCHEDULE_ITERATIONS
-        initial_multiplier = max(0, get_initial_multiplier(self.start_datetime))
-        i = 0
+    def iter_next_times(self, not_before: Optional[datetime] = None) -> Iterator[datetime]:
+        """Iterate over execution times, starting from not_before (now by default), respecting end options"""
+        if not_before is None:
+            not_before = date_utils.now(tz=timezone.utc)
+
+        remaining_executions = None
+        if self.end_option == 'max_executions':
+            remaining_executions = self.end_arg - (self.executions_count or 0)
+
+        if not self.repeatable:
+            if not_before <= self.start_datetime:
+                yield self.start_datetime
+            return
+
+        while (remaining_executions is None) or (remaining_executions > 0):
+            next_time = self.get_next_time(not_before)
+            if (self.end_option == 'end_datetime') and (next_time > self.end_arg):
+                return
+
+            yield next_time
+
+            not_before = next_time + _MIN_STEP
+            if remaining_executions is not None:
+                remaining_executions -= 1
+
+    def get_next_times(self, count: int, not_before: Optional[datetime] = None) -> list[datetime]:
+        """Get up to count next execution times, e.g. for showing a preview of the schedule"""
+        return list(itertools.islice(self.iter_next_times(not_before), count))
+
+    def get_missed_times(self, now: datetime, limit: int) -> list[datetime]:
+        """Get up to limit execution times, which are after last_execution_time, but before now"""
+        if (not self.repeatable) or (self.last_execution_time is None):
+            return []
+
+        missed_times = []
+        for next_time in self.iter_next_times(self.last_execution_time + _MIN_STEP):
+            if (next_time >= now) or (len(missed_times) >= limit):
+                break
+            missed_times.append(next_time)
+
+        return missed_times
+
+    def get_catch_up_count(self, now: datetime) -> int:
+        """Get number of missed executions, which should be run according to the misfire policy"""
+        if self.misfire_policy == MISFIRE_RUN_ONCE:
+            limit = 1
+        elif self.misfire_policy == MISFIRE_RUN_ALL:
+            limit = self.misfire_limit or DEFAULT_MISFIRE_LIMIT
+        else:
+            return 0
+
+        return len(self.get_missed_times(now, limit))
+
+    def _get_next_fixed_interval_time(self, not_before: datetime) -> datetime:
+        # minutes and hours are counted as elapsed time, so DST changes don't affect them
+        if not_before <= self.start_datetime:
+            return self.start_datetime
+
+        unit_delta = timedelta(minutes=1) if self.repeat_unit == 'minutes' else timedelta(hours=1)
+        step = unit_delta * self.repeat_period
+
+        passed_steps = -((self.start_datetime - not_before) // step)  # ceil division
+        return self.start_datetime + step * passed_steps
+
+    def _get_next_local_time(self, not_before: datetime, get_occurrence, count_occurrences) -> datetime:
+        if not_before <= self.start_datetime:
+            return self.start_datetime
+
+        local_start = self._to_local(self.start_datetime)
+        local_not_before = self._to_local(not_before)
+
+        # the estimation can be 1 step behind (e.g. if the time of day is already passed), but never ahead
+        index = max(0, count_occurrences(local_start, local_not_before))
         while True:
-            resolved_time = next_time_func(self.start_datetime, i + initial_multiplier)
-            if resolved_time >= now:
-                return resolved_time
+            occurrence = self._from_local(get_occurrence(local_start, index))
+            if occurrence >= not_before:
+                return occurrence
+            index += 1
+
+    def _get_days_occurrence(self, local_start: datetime, index: int) -> datetime:
+        return local_start + timedelta(days=self.repeat_period * index)
+
+    def _count_days_occurrences(self, local_start: datetime, local_not_before: datetime) -> int:
+        return (local_not_before.date() - local_start.date()).days // self.repeat_period
+
+    def _get_months_occurrence(self, local_start: datetime, index: int) -> datetime:
+        # always counted from start, so that e.g. 31st is restored after shorter months
+        return date_utils.add_months(local_start, self.repeat_period * index)
+
+    def _count_months_occurrences(self, local_start: datetime, local_not_before: datetime) -> int:
+        months = (local_not_before.year - local_start.year) * 12 + (local_not_before.month - local_start.month)
+        return months // self.repeat_period
+
+    def _get_next_weeks_time(self, not_before: datetime) -> datetime:
+        local_start = self._to_local(self.start_datetime)
+        start_weekday = local_start.weekday()
+        first_monday = local_start - timedelta(days=start_weekday)
+        weekday_indices = sorted(ALLOWED_WEEKDAYS.index(weekday) for weekday in self.weekdays)
+
+        local_not_before = self._to_local(max(not_before, self.start_datetime))
+        passed_weeks = (local_not_before.date() - first_monday.date()).days // 7
+        period_index = max(0, passed_weeks // self.repeat_period)
+
+        # the next period always starts after not_before, so at most 2 periods are checked
+        while True:
+            period_monday = first_monday + timedelta(weeks=self.repeat_period * period_index)
+
+            for weekday_index in weekday_indices:
+                if (period_index == 0) and (weekday_index < start_weekday):
+                    continue
+
+                occurrence = self._from_local(period_monday + timedelta(days=weekday_index))
+                if occurrence >= not_before:
+                    return occurrence
+
+            period_index += 1
+
+    def _get_next_cron_time(self, not_before: datetime) -> datetime:
+        cron = compile_cron(self.cron_expression)
+
+        not_before = max(not_before, self.start_datetime)
+        local_not_before = self._to_local(not_before)
+
+        # local times, repeated on DST change, resolve to their first occurrence, which can be before not_before
+        for _ in range(_MAX_CRON_DST_ATTEMPTS):
+            local_time = cron.get_next_time(local_not_before)
+            occurrence = self._from_local(local_time)
+            if occurrence >= not_before:
+                return occurrence
+
+            local_not_before = local_time + timedelta(minutes=1)
+
+        raise Exception('Failed to find next time for cron expression ' + repr(self.cron_expression))
+
+    def _to_local(self, value: datetime) -> datetime:
+        if not self.timezone:
+            if self.start_datetime.tzinfo is None:
+                return value
+            return value.astimezone(self.start_datetime.tzinfo)
+        return value.astimezone(ZoneInfo(self.timezone)).replace(tzinfo=None)
+
+    def _from_local(self, value: datetime) -> datetime:
+        if not self.timezone:
+            return value
 
-            i += 1
-            if i > max_iterations:
-                raise Exception('Endless loop in calc next time')
+        # non-existing local times (DST gap) are shifted forward, ambiguous ones resolve to the first occurrence
+        return value.replace(tzinfo=ZoneInfo(self.timezone), fold=0).astimezone(timezone.utc)
 
     def get_last_execution_time(self) -> Optional[datetime]:
         """Return the actual last execution time for recurring schedules."""
@@ -1,17 +1,23 @@
-import json
+import hashlib
 import logging
 import os
 import threading
-from datetime import timezone, timedelta
+from datetime import timezone, timedelta, datetime
+from typing import Optional
 
 from auth.user import User
 from config.config_service import ConfigService
+from execution.execution_queue import PRIORITY_SCHEDULED
 from execution.execution_service import ExecutionService
 from execution.id_generator import IdGenerator
 from model.constants import SCHEDULE_CLEANUP_INTERVAL_SECONDS
 from scheduling import scheduling_job
-from scheduling.schedule_config import read_schedule_config, InvalidScheduleException
-from scheduling.scheduler import Scheduler
+from scheduling.run_ledger import ScheduleRunLedger, ScheduleRun, DEFAULT_RUNS_PER_SCHEDULE, STATUS_SKIPPED, \
+    STATUS_FAILED_TO_START, STATUS_FINISHED, STATUS_CANCELLED
+from scheduling.schedule_config import read_schedule_config, InvalidScheduleException, OVERLAP_ALLOW, \
+    OVERLAP_SKIP, OVERLAP_QUEUE, OVERLAP_KILL
+from scheduling.schedule_store import ScheduleStore
+from scheduling.scheduler import Scheduler, DEFAULT_MAX_WORKERS
 from scheduling.scheduling_job import SchedulingJob
 from utils import file_utils, date_utils, custom_json
 
@@ -47,28 +53,58 @@ def restore_jobs(schedules_folder: str) -> tuple[dict, list]:
     return job_path_dict, ids
 
 
+def get_dispatch_offset(job_id, jitter_seconds: int) -> timedelta:
+    """
+    Get a delay of job executions within [0, jitter_seconds)
+
+    The delay is derived from the job id, so it's stable across restarts and jobs with the same time
+    are spread evenly over the window
+    """
+    if not jitter_seconds:
+        return timedelta(0)
+
+    digest = hashlib.sha256(str(job_id).encode('utf-8')).digest()
+    fraction = int.from_bytes(digest[:8], 'big') / 2 ** 64
+    return timedelta(seconds=int(fraction * jitter_seconds * 1000) / 1000)
+
+
 class ScheduleService:
 
     def __init__(self,
                  config_service: ConfigService,
                  execution_service: ExecutionService,
                  conf_folder,
-                 onetime_retention_minutes: int = 60):
+                 onetime_retention_minutes: int = 60,
+                 dispatch_workers: int = DEFAULT_MAX_WORKERS,
+                 default_jitter_seconds: int = 0,
+                 run_history_size: int = DEFAULT_RUNS_PER_SCHEDULE):
         self._schedules_folder = os.path.join(conf_folder, 'schedules')
         file_utils.prepare_folder(self._schedules_folder)
 
         self._config_service = config_service
         self._execution_service = execution_service
         self._onetime_retention_minutes = onetime_retention_minutes
+        self._default_jitter_seconds = default_jitter_seconds
         self._schedules_folder_path = self._schedules_folder  # Expose for persistence
 
         (jobs, ids) = restore_jobs(self._schedules_folder)
         self._id_generator = IdGenerator(ids)
 
-        self.scheduler = Scheduler()
+        self._store = ScheduleStore(self._schedules_folder)
+        self._store.load(jobs)
+
+        self._run_ledger = ScheduleRunLedger(self._schedules_folder, run_history_size)
+        self._run_ledger.load(job.id for job in jobs.values())
+        self._run_ledger.start()
+
+        # job id -> ids of executions, which are running or queued
+        self._active_executions = {}
+        self._active_executions_lock = threading.Lock()
+
+        self.scheduler = Scheduler(max_workers=dispatch_workers)
 
         for job_path, job in jobs.items():
-            self.schedule_job(job, job_path)
+            self._restore_job(job, job_path)
 
         # Clean up expired schedules on startup
         self._cleanup_expired_schedules()
@@ -84,19 +120,7 @@ class ScheduleService:
         # Extract verb from schedule config (if provided)
         verb = incoming_schedule_config.get('verb')
 
-        # Add verb to parameter_values before loading config
-        # This ensures the config model processes it correctly
-        if verb:
-            parameter_values_with_verb = parameter_values.copy() if parameter_values else {}
-            # First load to get verb parameter name
-            temp_config = self._config_service.load_config_model(script_name, user, {})
-            if temp_config.verbs_config and temp_config.verbs_config.enabled:
-                verb_param_name = temp_config.verbs_config.parameter_name
-                parameter_values_with_verb[verb_param_name] = verb
-        else:
-            parameter_values_with_verb = parameter_values
-
-        config_model = self._config_service.load_config_model(script_name, user, parameter_values_with_verb)
+        config_model = self._load_config_with_verb(script_name, user, parameter_values, verb)
         self.validate_script_config(config_model)
 
         schedule_config = read_schedule_config(incoming_schedule_config)
@@ -130,6 +154,21 @@ class ScheduleService:
 
         return id
 
+    def _load_config_with_verb(self, script_name, user, parameter_values, verb, run_values_scripts=True):
+        """Loads config model once and sets parameter values, including the verb (if verbs are enabled)"""
+        config_model = self._config_service.load_config_model(
+            script_name, user, run_values_scripts=run_values_scripts)
+        if config_model is None:
+            raise UnavailableScriptException(f'Script {script_name} not found')
+
+        # copy, so that stored values of the job are not modified
+        values = dict(parameter_values) if parameter_values else {}
+        if verb and config_model.verbs_config and config_model.verbs_config.enabled:
+            values[config_model.verbs_config.parameter_name] = verb
+
+        config_model.set_all_param_values(values)
+        return config_model
+
     @staticmethod
     def validate_script_config(config_model):
         if not config_model.schedulable:
@@ -154,45 +193,117 @@ class ScheduleService:
         if schedule.end_option == 'max_executions' and schedule.end_arg <= schedule.executions_count:
             return
 
-        next_datetime = schedule.get_next_time()
+        # jittered executions are planned at (nominal time + offset), so the nominal time is searched
+        # from (now - offset) to keep a run, which is still pending because of its offset
+        offset = self._get_dispatch_offset(job)
+        if offset:
+            next_datetime = schedule.get_next_time(date_utils.now(tz=timezone.utc) - offset)
+        else:
+            next_datetime = schedule.get_next_time()
 
         if schedule.end_option == 'end_datetime':
             if next_datetime > schedule.end_arg:
                 return
-        
+
+        planned_datetime = next_datetime + offset
+
         LOGGER.info(
-            'Scheduling ' + job.get_log_name() + ' at ' + next_datetime.astimezone(tz=None).strftime('%H:%M, %d %B %Y'))
+            'Scheduling ' + job.get_log_name() + ' at '
+            + planned_datetime.astimezone(tz=None).strftime('%H:%M:%S, %d %B %Y'))
+
+        self.scheduler.schedule(planned_datetime, self._execute_job, (job, job_path, 0, planned_datetime))
+
+    def _restore_job(self, job: SchedulingJob, job_path: str) -> None:
+        catch_up_count = 0
+        if job.enabled:
+            offset = self._get_dispatch_offset(job)
+            catch_up_count = job.schedule.get_catch_up_count(date_utils.now(tz=timezone.utc) - offset)
+
+        if not catch_up_count:
+            self.schedule_job(job, job_path)
+            return
 
-        self.scheduler.schedule(next_datetime, self._execute_job, (job, job_path))
+        LOGGER.info(f'Catching up {catch_up_count} missed execution(s) of {job.get_log_name()}')
 
-    def _execute_job(self, job: SchedulingJob, job_path: str) -> None:
+        # catch-up runs go through the scheduler one by one (and then through execution limits),
+        # so a long downtime doesn't start all missed executions at once
+        catch_up_time = date_utils.now(tz=timezone.utc) + self._get_dispatch_offset(job)
+        self.scheduler.schedule(catch_up_time, self._execute_job, (job, job_path, catch_up_count - 1, catch_up_time))
+
+    def _schedule_after_execution(self, job: SchedulingJob, job_path: str, catch_up_remaining: int) -> None:
+        if catch_up_remaining > 0:
+            catch_up_time = date_utils.now(tz=timezone.utc)
+            self.scheduler.schedule(catch_up_time,
+                                    self._execute_job,
+                                    (job, job_path, catch_up_remaining - 1, catch_up_time))
+        else:
+            self.schedule_job(job, job_path)
+
+    def _get_dispatch_offset(self, job: SchedulingJob) -> timedelta:
+        # one-time schedules are executed exactly at the time, which user selected
+        if not job.schedule.repeatable:
+            return timedelta(0)
+
+        jitter_seconds = job.schedule.jitter_seconds
+        if jitter_seconds is None:
+            jitter_seconds = self._default_jitter_seconds
+
+        return get_dispatch_offset(job.id, jitter_seconds)
+
+    def get_planned_time(self, job: SchedulingJob) -> Optional[datetime]:
+        """Get the time, when the next execution of the job is dispatched (including jitter)"""
+        _, job_path = self._store.get(job.id)
+        if job_path is None:
+            return None
+
+        return self.scheduler.get_planned_time(job_path)
+
+    def _execute_job(self,
+                     job: SchedulingJob,
+                     job_path: str,
+                     catch_up_remaining: int = 0,
+                     planned_time: Optional[datetime] = None) -> None:
         LOGGER.info('Executing ' + job.get_log_name())
 
-        if not os.path.exists(job_path):
+        if not self._store.contains(job):
             LOGGER.info(job.get_log_name() + ' was removed, skipping execution')
             return
 
-        script_name = job.script_name
-        parameter_values = job.parameter_values.copy()  # Copy to avoid modifying stored values
+        run = ScheduleRun(job.id, planned_time, date_utils.now(tz=timezone.utc))
+
+        if not self._resolve_overlap(job):
+            run.status = STATUS_SKIPPED
+            self._run_ledger.add(run)
+
+            self._schedule_after_execution(job, job_path, catch_up_remaining)
+            return
+
         user = job.user
         connection_ids = job.connection_ids if hasattr(job, 'connection_ids') else []
-
-        # Inject verb into parameter_values if stored in job
-        if hasattr(job, 'verb') and job.verb:
-            # Load config to get verb parameter name
-            temp_config = self._config_service.load_config_model(script_name, user, {})
-            if temp_config.verbs_config and temp_config.verbs_config.enabled:
-                verb_param_name = temp_config.verbs_config.parameter_name
-                parameter_values[verb_param_name] = job.verb
+        execution_id = None
 
         try:
-            config = self._config_service.load_config_model(script_name, user, parameter_values)
+            # values were checked, when the job was saved, so values scripts are not started for every execution
+            config = self._load_config_with_verb(
+                job.script_name, user, job.parameter_values, getattr(job, 'verb', None), run_values_scripts=False)
             self.validate_script_config(config)
 
+            if job.schedule.overlap_policy == OVERLAP_QUEUE:
+                concurrency_group = 'schedule-' + job.id
+            else:
+                concurrency_group = None
+
             execution_id = self._execution_service.start_script(
-                config, user, schedule_id=job.id, connection_ids=connection_ids)
+                config, user, schedule_id=job.id, connection_ids=connection_ids,
+                priority=PRIORITY_SCHEDULED, concurrency_group=concurrency_group)
             LOGGER.info('Started script #' + str(execution_id) + ' for ' + job.get_log_name())
 
+            # should be registered before auto-cleanup, so the exit code is still available
+            self._track_run(run, execution_id)
+
+            if job.schedule.overlap_policy != OVERLAP_ALLOW:
+                self._track_execution(job.id, execution_id)
+
             if config.scheduling_auto_cleanup:
                 def cleanup():
                     self._execution_service.cleanup_execution(execution_id, user)
@@ -202,7 +313,8 @@ class ScheduleService:
             if job.schedule.repeatable:
                 job.schedule.executions_count += 1
                 job.schedule.last_execution_time = date_utils.now(tz=timezone.utc)
-                self.save_job(job)
+                # only the run state changed, so the job file is not rewritten
+                self._store.save_run_state(job)
             else:
                 # Non-recurring: mark completion time for auto-cleanup tracking
                 job.schedule.completion_time = date_utils.now(tz=timezone.utc)
@@ -211,71 +323,101 @@ class ScheduleService:
         except Exception:
             LOGGER.exception('Failed to execute ' + job.get_log_name())
 
-        self.schedule_job(job, job_path)
+            if execution_id is None:
+                run.status = STATUS_FAILED_TO_START
+                self._run_ledger.add(run)
 
-    def save_job(self, job: SchedulingJob) -> str:
-        user = job.user
-        script_name = job.script_name
+        self._schedule_after_execution(job, job_path, catch_up_remaining)
 
-        filename = file_utils.to_filename('%s_%s_%s.json' % (script_name, user.get_audit_name(), job.id))
-        path = os.path.join(self._schedules_folder, filename)
-        file_utils.write_file(
-            path,
-            json.dumps(job.as_serializable_dict(), indent=2))
+    def _track_run(self, run: ScheduleRun, execution_id):
+        run.execution_id = execution_id
 
-        return path
+        def started():
+            run.start_time = date_utils.now(tz=timezone.utc)
 
-    def get_jobs(self, user: User = None, script_name: str = None) -> list[SchedulingJob]:
-        """Get all scheduled jobs, optionally filtered by script name.
+        def finished():
+            run.finish_time = date_utils.now(tz=timezone.utc)
+            if run.start_time is None:
+                # removed from the execution queue before starting
+                run.status = STATUS_CANCELLED
+            else:
+                run.status = STATUS_FINISHED
+                run.exit_code = self._execution_service.get_exit_code(execution_id)
 
-        Note: User filtering is disabled - all schedules are visible to all users.
-        In a no-auth setup, user-scoping is meaningless.
-        """
-        jobs = []
+            self._run_ledger.add(run)
 
-        for file in os.listdir(self._schedules_folder):
-            if not file.endswith('.json'):
-                continue
+        self._execution_service.add_start_listener(started, execution_id)
+        self._execution_service.add_finish_listener(finished, execution_id)
 
-            try:
-                job_path = os.path.join(self._schedules_folder, file)
-                content = file_utils.read_file(job_path)
-                job_json = custom_json.loads(content)
-                job = scheduling_job.from_dict(job_json)
+    def get_runs(self, job: SchedulingJob, limit: int = None) -> list[ScheduleRun]:
+        """Get recorded runs of the job, the latest first"""
+        return self._run_ledger.get_runs(job.id, limit)
 
-                # Filter by script name if specified
-                if script_name is not None and job.script_name != script_name:
-                    continue
+    def get_run_stats(self, job: SchedulingJob) -> dict:
+        """Get statistics (counts, lag and duration percentiles) of the recorded runs of the job"""
+        return self._run_ledger.get_stats(job.id)
 
-                jobs.append(job)
-            except Exception:
-                LOGGER.exception('Failed to parse schedule file: ' + file)
+    def _resolve_overlap(self, job: SchedulingJob) -> bool:
+        """Apply overlap policy of the job. Returns False, if this execution should be skipped"""
+        with self._active_executions_lock:
+            active_ids = list(self._active_executions.get(job.id, ()))
 
-        return jobs
+        if not active_ids:
+            return True
 
-    def get_job(self, job_id: str, user: User = None) -> tuple:
-        """Get a specific job by ID.
+        overlap_policy = job.schedule.overlap_policy
 
-        Note: User ownership check is disabled - any user can access any schedule.
-        """
-        for file in os.listdir(self._schedules_folder):
-            if not file.endswith('.json'):
-                continue
+        if overlap_policy == OVERLAP_SKIP:
+            LOGGER.info(f'Skipping {job.get_log_name()}, previous execution is still running')
+            return False
 
-            try:
-                job_path = os.path.join(self._schedules_folder, file)
-                content = file_utils.read_file(job_path)
-                job_json = custom_json.loads(content)
+        if overlap_policy == OVERLAP_QUEUE:
+            # only one execution waits for the previous one, otherwise a slow script would grow the queue endlessly
+            if any(self._execution_service.is_queued(execution_id) for execution_id in active_ids):
+                LOGGER.info(f'Skipping {job.get_log_name()}, next execution is already queued')
+                return False
+            return True
 
-                if str(job_json.get('id')) != str(job_id):
-                    continue
+        if overlap_policy == OVERLAP_KILL:
+            for execution_id in active_ids:
+                LOGGER.info(f'Killing previous execution #{execution_id} of {job.get_log_name()}')
+                self._execution_service.kill_script_by_system(execution_id)
 
-                job = scheduling_job.from_dict(job_json)
-                return job, job_path
-            except Exception:
-                LOGGER.exception('Failed to parse schedule file: ' + file)
+        return True
+
+    def _track_execution(self, job_id, execution_id):
+        with self._active_executions_lock:
+            self._active_executions.setdefault(job_id, set()).add(execution_id)
+
+        def finished():
+            with self._active_executions_lock:
+                execution_ids = self._active_executions.get(job_id)
+                if execution_ids is None:
+                    return
 
-        return None, None
+                execution_ids.discard(execution_id)
+                if not execution_ids:
+                    del self._active_executions[job_id]
+
+        self._execution_service.add_finish_listener(finished, execution_id)
+
+    def save_job(self, job: SchedulingJob) -> str:
+        return self._store.save(job)
+
+    def get_jobs(self, user: User = None, script_name: str = None) -> list[SchedulingJob]:
+        """Get all scheduled jobs, optionally filtered by script name.
+
+        Note: User filtering is disabled - all schedules are visible to all users.
+        In a no-auth setup, user-scoping is meaningless.
+        """
+        return self._store.get_jobs(script_name)
+
+    def get_job(self, job_id: str, user: User = None) -> tuple:
+        """Get a specific job by ID.
+
+        Note: User ownership check is disabled - any user can access any schedule.
+        """
+        return self._store.get(job_id)
 
     def delete_job(self, job_id: str, user: User) -> SchedulingJob:
         """Delete a scheduled job by ID.
@@ -295,7 +437,8 @@ class ScheduleService:
         self.scheduler.cancel(job_path)
 
         # Delete the job file
-        os.remove(job_path)
+        self._store.remove(job_id)
+        self._forget_runs(job)
 
         LOGGER.info(f'Deleted schedule {job_id} for script {job.script_name} by user {user.get_audit_name()}')
 
@@ -362,13 +505,9 @@ class ScheduleService:
         job.verb = incoming_schedule_config.get('verb')
         job.connection_ids = incoming_schedule_config.get('connectionIds', [])
 
-        # Save the updated job
+        # Save the updated job (the store removes the old file, if the path changed)
         new_job_path = self.save_job(job)
 
-        # If file path changed (shouldn't happen for update), remove old file
-        if new_job_path != job_path and os.path.exists(job_path):
-            os.remove(job_path)
-
         # Reschedule if enabled
         self.schedule_job(job, new_job_path)
 
@@ -376,9 +515,14 @@ class ScheduleService:
 
         return job
 
+    def _forget_runs(self, job: SchedulingJob) -> None:
+        self._run_ledger.remove_schedule(job.id)
+
     def stop(self) -> None:
         self._cleanup_stop_event.set()
         self.scheduler.stop()
+        self._store.close()
+        self._run_ledger.stop()
 
     def get_retention_minutes(self) -> int:
         """Get the current one-time schedule retention period in minutes."""
@@ -418,26 +562,19 @@ class ScheduleService:
         now = date_utils.now(tz=timezone.utc)
         cleaned_count = 0
 
-        for file in os.listdir(self._schedules_folder):
-            if not file.endswith('.json'):
-                continue
-
+        for job, job_path in self._store.get_job_paths():
             try:
-                job_path = os.path.join(self._schedules_folder, file)
-                content = file_utils.read_file(job_path)
-                job_json = custom_json.loads(content)
-                job = scheduling_job.from_dict(job_json)
-
                 expiry_time = self.get_expiry_time(job)
                 if expiry_time is not None and now >= expiry_time:
                     # Cancel any pending scheduled execution
                     self.scheduler.cancel(job_path)
                     # Delete the job file
-                    os.remove(job_path)
+                    self._store.remove(job.id)
+                    self._forget_runs(job)
                     cleaned_count += 1
                     LOGGER.info(f'Auto-deleted expired one-time schedule {job.id} for script {job.script_name}')
             except Exception:
-                LOGGER.exception(f'Failed to process schedule file during cleanup: {file}')
+                LOGGER.exception(f'Failed to clean up schedule {job.get_log_name()}')
 
         if cleaned_count > 0:
             LOGGER.info(f'Cleaned up {cleaned_count} expired one-time schedule(s)')
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+from scheduling.run_state_journal import RunStateJournal, DEFAULT_FLUSH_INTERVAL_SECONDS
+from scheduling.scheduling_job import SchedulingJob
+from utils import file_utils
+
+LOGGER = logging.getLogger('script_server.scheduling.schedule_store')
+
+
+class ScheduleStore:
+    """
+    In-memory table of scheduling jobs, indexed by id and by script name
+
+    The table is authoritative after loading: all changes are written through to the job files
+    (atomically), but the files are not re-read afterwards. Run state (executions count and last execution time)
+    changes on every execution, so it's written to the run state journal in batches instead of the job files
+    """
+
+    def __init__(self, schedules_folder: str, flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS) -> None:
+        self._schedules_folder = schedules_folder
+        self._lock = threading.RLock()
+        self._run_state_journal = RunStateJournal(schedules_folder, flush_interval_seconds)
+
+        self._jobs = {}  # id -> (job, job_path)
+        self._ids_by_script = {}  # script_name -> {id: None}, dict keeps insertion order
+
+    def load(self, job_path_dict: dict) -> None:
+        with self._lock:
+            self._jobs.clear()
+            self._ids_by_script.clear()
+
+            for job_path, job in job_path_dict.items():
+                self._put(job, job_path)
+
+            run_states = self._run_state_journal.load()
+            for job_id, run_state in run_states.items():
+                job, _ = self._jobs.get(job_id, (None, None))
+                if job is not None:
+                    job.schedule.executions_count = run_state.executions_count
+                    job.schedule.last_execution_time = run_state.last_execution_time
+
+            # states of removed jobs are dropped, so they are not applied to a new job with the same id
+            self._run_state_journal.retain(self._jobs.keys())
+
+        self._run_state_journal.start()
+
+    def get(self, job_id) -> tuple[Optional[SchedulingJob], Optional[str]]:
+        with self._lock:
+            return self._jobs.get(str(job_id), (None, None))
+
+    def contains(self, job: SchedulingJob) -> bool:
+        """Check if this job instance is still stored (i.e. it was not removed or replaced)"""
+        stored_job, _ = self.get(job.id)
+        return stored_job is job
+
+    def get_jobs(self, script_name: str = None) -> list[SchedulingJob]:
+        with self._lock:
+            if script_name is None:
+                ids = self._jobs.keys()
+            else:
+                ids = self._ids_by_script.get(script_name, ())
+
+            return [self._jobs[id][0] for id in ids]
+
+    def get_job_paths(self) -> list[tuple[SchedulingJob, str]]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def save(self, job: SchedulingJob) -> str:
+        filename = file_utils.to_filename('%s_%s_%s.json' % (job.script_name, job.user.get_audit_name(), job.id))
+        path = os.path.join(self._schedules_folder, filename)
+
+        content = json.dumps(job.as_serializable_dict(), indent=2)
+
+        with self._lock:
+            file_utils.write_file_atomic(path, content)
+
+            old_job, old_path = self._jobs.get(job.id, (None, None))
+            if (old_job is not None) and (old_job.script_name != job.script_name):
+                self._remove_from_index(job.id)
+            if (old_path is not None) and (old_path != path) and os.path.exists(old_path):
+                os.remove(old_path)
+
+            self._put(job, path)
+
+            # the file has the latest run state now
+            self._run_state_journal.reset(job.id)
+
+        return path
+
+    def save_run_state(self, job: SchedulingJob) -> None:
+        """Persist executions count and last execution time of the job (with the next journal batch)"""
+        self._run_state_journal.record(
+            job.id, job.schedule.executions_count, job.schedule.last_execution_time)
+
+    def remove(self, job_id) -> tuple[Optional[SchedulingJob], Optional[str]]:
+        with self._lock:
+            job, job_path = self._remove_from_index(job_id)
+
+            if (job_path is not None) and os.path.exists(job_path):
+                os.remove(job_path)
+
+            if job is not None:
+                self._run_state_journal.reset(job.id)
+
+            return job, job_path
+
+    def close(self) -> None:
+        """Write pending run states and stop background writing"""
+        self._run_state_journal.stop()
+
+    def _put(self, job: SchedulingJob, job_path: str) -> None:
+        self._jobs[job.id] = (job, job_path)
+        self._ids_by_script.setdefault(job.script_name, {})[job.id] = None
+
+    def _remove_from_index(self, job_id):
+        job, job_path = self._jobs.pop(str(job_id), (None, None))
+        if job is None:
+            return None, None
+
+        script_ids = self._ids_by_script.get(job.script_name)
+        if script_ids is not None:
+            script_ids.pop(job.id, None)
+            if not script_ids:
+                del self._ids_by_script[job.script_name]
+
+        return job, job_path
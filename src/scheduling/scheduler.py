@@ -1,65 +1,213 @@
+import heapq
+import itertools
 import logging
-import sched
 import threading
 import time
-from datetime import timedelta
+from concurrent.futures.thread import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
 
 from utils import date_utils
 
-_sleep = time.sleep
+_time = time.time
 
 LOGGER = logging.getLogger('script_server.scheduling.scheduler')
 
+DEFAULT_MAX_WORKERS = 8
+
+# cancelled events are removed from the queue lazily, until there are too many of them
+_COMPACTION_MIN_CANCELLED = 100
+
+
+class _ScheduledEvent:
+    __slots__ = ('execute_at', 'callback', 'params', 'key', 'cancelled')
+
+    def __init__(self, execute_at, callback, params, key) -> None:
+        self.execute_at = execute_at
+        self.callback = callback
+        self.params = params
+        self.key = key
+        self.cancelled = False
+
 
 class Scheduler:
-    def __init__(self) -> None:
+    """
+    Executes callbacks at the specified time
+
+    The scheduling thread sleeps until the earliest event is due (it's woken up, when events are added
+    or cancelled) and dispatches due callbacks to a bounded thread pool, so a slow callback doesn't delay other events
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
         self.stopped = False
-        self._events = {}  # Maps job_path to scheduler event
 
-        self.scheduler = sched.scheduler(timefunc=time.time)
-        self._start_scheduler()
+        self._condition = threading.Condition()
+        self._queue = []  # heap of (execute_at, sequence, event)
+        self._sequence = itertools.count()
+        self._events = {}  # Maps job_path to scheduled event
+        self._cancelled_count = 0
 
-    def _start_scheduler(self):
-        def scheduler_loop():
-            while not self.stopped:
-                try:
-                    self.scheduler.run(blocking=False)
-                except Exception as e:
-                    LOGGER.exception('Failed to execute scheduled job: %s', e)
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scheduler-dispatch')
+        # dispatched callbacks, which are running or waiting for a free worker
+        self._active_count = 0
 
-                now = date_utils.now()
-                sleep_delta = timedelta(seconds=1) - timedelta(microseconds=now.microsecond)
-                _sleep(sleep_delta.total_seconds())
+        self._dispatched_count = 0
+        self._failed_count = 0
+        self._total_lag_seconds = 0.0
+        self._max_lag_seconds = 0.0
+        self._last_lag_seconds = None
+        self._last_dispatched_at = None
 
-        self.scheduling_thread = threading.Thread(daemon=True, target=scheduler_loop)
+        self.scheduling_thread = threading.Thread(daemon=True, target=self._scheduler_loop, name='scheduler')
         self.scheduling_thread.start()
 
-    def stop(self):
-        self.stopped = True
+    def _scheduler_loop(self):
+        while True:
+            with self._condition:
+                while not self.stopped:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+
+                    delay = self._queue[0][0] - _time()
+                    if delay <= 0:
+                        break
+
+                    self._condition.wait(delay)
+
+                if self.stopped:
+                    return
+
+                due_events = self._pop_due_events(_time())
+
+            for event in due_events:
+                self._dispatch(event)
+
+    def _pop_due_events(self, now):
+        due_events = []
+
+        while self._queue and (self._queue[0][0] <= now):
+            _, _, event = heapq.heappop(self._queue)
+            if event.cancelled:
+                self._cancelled_count -= 1
+                continue
+
+            if self._events.get(event.key) is event:
+                del self._events[event.key]
+
+            due_events.append(event)
+
+        return due_events
 
-        def stopper():
-            pass
+    def _dispatch(self, event: _ScheduledEvent):
+        lag_seconds = max(0.0, _time() - event.execute_at)
 
-        # just schedule the next execution to exit thread immediately
-        self.scheduler.enter(1, 0, stopper)
+        with self._condition:
+            self._dispatched_count += 1
+            self._active_count += 1
+            self._total_lag_seconds += lag_seconds
+            self._max_lag_seconds = max(self._max_lag_seconds, lag_seconds)
+            self._last_lag_seconds = lag_seconds
+            self._last_dispatched_at = date_utils.now()
+
+        try:
+            self._executor.submit(self._execute, event)
+        except RuntimeError:
+            # executor is shut down
+            with self._condition:
+                self._active_count -= 1
+            LOGGER.warning('Scheduler is stopped, skipping scheduled job')
+
+    def _execute(self, event: _ScheduledEvent):
+        try:
+            event.callback(*event.params)
+        except Exception as e:
+            with self._condition:
+                self._failed_count += 1
+            LOGGER.exception('Failed to execute scheduled job: %s', e)
+        finally:
+            with self._condition:
+                self._active_count -= 1
+
+    def stop(self):
+        with self._condition:
+            self.stopped = True
+            self._condition.notify_all()
 
         self.scheduling_thread.join(1)
+        self._executor.shutdown(wait=False)
 
     def schedule(self, execute_at_datetime, callback, params):
         # params[1] is job_path in the schedule_service usage
         job_path = params[1] if len(params) > 1 else None
-        event = self.scheduler.enterabs(execute_at_datetime.timestamp(), 1, callback, params)
-        if job_path:
-            self._events[job_path] = event
+
+        event = _ScheduledEvent(execute_at_datetime.timestamp(), callback, params, job_path)
+
+        with self._condition:
+            if job_path:
+                self._cancel_event(job_path)
+                self._events[job_path] = event
+
+            heapq.heappush(self._queue, (event.execute_at, next(self._sequence), event))
+
+            # wake up only if the new event is the earliest one
+            if self._queue[0][2] is event:
+                self._condition.notify()
 
     def cancel(self, job_path):
         """Cancel a scheduled job by its job_path"""
-        if job_path in self._events:
-            try:
-                self.scheduler.cancel(self._events[job_path])
-                del self._events[job_path]
+        with self._condition:
+            if self._cancel_event(job_path):
                 LOGGER.info(f'Cancelled scheduled job: {job_path}')
-            except ValueError:
-                # Event already executed or not in queue
-                del self._events[job_path]
+                self._condition.notify()
+            else:
                 LOGGER.debug(f'Job {job_path} was not in scheduler queue (may have already executed)')
+
+    def _cancel_event(self, job_path) -> bool:
+        event = self._events.pop(job_path, None)
+        if event is None:
+            return False
+
+        event.cancelled = True
+        self._cancelled_count += 1
+
+        if (self._cancelled_count >= _COMPACTION_MIN_CANCELLED) and (self._cancelled_count * 2 > len(self._queue)):
+            self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+            heapq.heapify(self._queue)
+            self._cancelled_count = 0
+
+        return True
+
+    def get_planned_time(self, job_path) -> Optional[datetime]:
+        """Get the time, when the job is going to be dispatched (None, if it's not scheduled)"""
+        with self._condition:
+            event = self._events.get(job_path)
+            if event is None:
+                return None
+            return datetime.fromtimestamp(event.execute_at, tz=timezone.utc)
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            if self._dispatched_count:
+                avg_lag_seconds = round(self._total_lag_seconds / self._dispatched_count, 3)
+            else:
+                avg_lag_seconds = None
+
+            return {
+                'pending': len(self._queue) - self._cancelled_count,
+                'active': self._active_count,
+                'max_workers': self._max_workers,
+                'dispatched': self._dispatched_count,
+                'failed': self._failed_count,
+                'avg_lag_seconds': avg_lag_seconds,
+                'max_lag_seconds': round(self._max_lag_seconds, 3),
+                'last_lag_seconds': _round_optional(self._last_lag_seconds),
+                'last_dispatched_at': date_utils.to_iso_string(self._last_dispatched_at)
+            }
+
+
+def _round_optional(value):
+    if value is None:
+        return None
+    return round(value, 3)
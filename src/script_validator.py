@@ -1,21 +1,101 @@
 """
 Script Validation Service
 Validates script configurations by checking if script files exist.
+
+Validation can run in a background thread, which periodically re-validates only the configs,
+whose config file or script file has changed since the previous check.
 """
 import json
 import logging
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional
+
+from utils import date_utils
 
 LOGGER = logging.getLogger('script_server.ScriptValidator')
 
+DEFAULT_VALIDATION_INTERVAL_SECONDS = 30
+
+
+class _ConfigFileState(NamedTuple):
+    config_signature: tuple
+    script_name: str
+    script_file: Optional[str]
+    script_signature: Optional[tuple]
+
 
 class ScriptValidator:
     """Validates script configurations"""
 
     def __init__(self):
         self.validation_cache = {}  # script_name -> validation_result
+        self.version = 0  # changed on every result change, so cached script lists can be invalidated
+        self.last_run = None  # ISO timestamp of the last validation of a config folder
+
+        self._lock = threading.RLock()  # guards results only, files are never read under it
+        self._pass_lock = threading.Lock()  # serializes validation passes, readers don't wait for it
+        self._file_states = {}  # config path -> _ConfigFileState
+
+        self._wake_event = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def _store_result(self, script_name: str, result: Dict) -> None:
+        with self._lock:
+            previous_result = self.validation_cache.get(script_name)
+            self.validation_cache[script_name] = result
+
+            if not _same_result(previous_result, result):
+                self.version += 1
+
+        LOGGER.info(f'Cached validation for "{script_name}": valid={result["valid"]}, cache_size={len(self.validation_cache)}')
+
+    def _remove_result(self, script_name: str) -> None:
+        with self._lock:
+            if self.validation_cache.pop(script_name, None) is not None:
+                self.version += 1
+
+    def start(self, config_folder: str, interval_seconds: float = DEFAULT_VALIDATION_INTERVAL_SECONDS) -> None:
+        """
+        Start background validation of the config folder.
+
+        The first validation is started immediately, afterwards only changed configs and scripts
+        are re-validated every interval_seconds (or when request_validation is called).
+        """
+        if self._thread is not None:
+            raise Exception('Script validation is already started')
+
+        def validation_loop():
+            while not self._stopped:
+                self._wake_event.clear()
+
+                try:
+                    results = self.validate_from_config_folder(config_folder, only_changed=True)
+                    invalid_count = sum(1 for r in results.values() if not r['valid'])
+                    if invalid_count > 0:
+                        LOGGER.warning(f'Found {invalid_count} invalid script(s) of {len(results)}')
+                except Exception:
+                    LOGGER.exception('Failed to validate scripts')
+
+                self._wake_event.wait(timeout=interval_seconds)
+
+        self._thread = threading.Thread(target=validation_loop, daemon=True, name='script-validation')
+        self._thread.start()
+        LOGGER.info(f'Started background script validation (interval={interval_seconds} seconds)')
+
+    def request_validation(self) -> None:
+        """Wake up background validation, without waiting for the interval to pass"""
+        self._wake_event.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake_event.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
 
     def _extract_script_path(self, script_path: str) -> str:
         """
@@ -54,6 +134,21 @@ class ScriptValidator:
         # Default: first part is the script
         return parts[0]
 
+    def _resolve_script_file(self, script_path: str, working_dir: str = None) -> str:
+        # Extract actual script file path from command
+        actual_script_path = self._extract_script_path(script_path)
+
+        # Handle relative paths
+        if not os.path.isabs(actual_script_path):
+            # Try relative to working_dir first
+            if working_dir and os.path.isabs(working_dir):
+                full_path = os.path.join(working_dir, actual_script_path)
+                if os.path.isfile(full_path):
+                    actual_script_path = full_path
+            # If not found, it will be checked as-is
+
+        return actual_script_path
+
     def validate_script(self, script_name: str, script_path: str, working_dir: str = None) -> Dict:
         """
         Validate a single script configuration.
@@ -66,51 +161,38 @@ class ScriptValidator:
         Returns:
             Dict with 'valid' (bool), 'error' (str or None), 'warning' (str or None)
         """
+        result = self._check_script(script_path, working_dir)
+        self._store_result(script_name, result)
+        return result
+
+    def _check_script(self, script_path: str, working_dir: str = None) -> Dict:
         result = {
             'valid': True,
             'error': None,
-            'warning': None
+            'warning': None,
+            'last_validated': date_utils.to_iso_string(date_utils.now())
         }
 
         # Check if script file exists
         if not script_path:
             result['valid'] = False
             result['error'] = 'No script path configured'
-            self.validation_cache[script_name] = result
-            LOGGER.info(f'Cached validation for "{script_name}": valid={result["valid"]}, cache_size={len(self.validation_cache)}')
             return result
 
-        # Extract actual script file path from command
-        actual_script_path = self._extract_script_path(script_path)
-
-        # Handle relative paths
-        if not os.path.isabs(actual_script_path):
-            # Try relative to working_dir first
-            if working_dir and os.path.isabs(working_dir):
-                full_path = os.path.join(working_dir, actual_script_path)
-                if os.path.isfile(full_path):
-                    actual_script_path = full_path
-            # If not found, it will be checked as-is below
+        actual_script_path = self._resolve_script_file(script_path, working_dir)
 
         # Check if file exists
         if not os.path.isfile(actual_script_path):
             result['valid'] = False
             result['error'] = f'Script file not found: {actual_script_path}'
-            self.validation_cache[script_name] = result
-            LOGGER.info(f'Cached validation for "{script_name}": valid={result["valid"]}, cache_size={len(self.validation_cache)}')
             return result
 
         # Check if file is readable
         if not os.access(actual_script_path, os.R_OK):
             result['valid'] = False
             result['error'] = f'Script file not readable: {actual_script_path}'
-            self.validation_cache[script_name] = result
-            LOGGER.info(f'Cached validation for "{script_name}": valid={result["valid"]}, cache_size={len(self.validation_cache)}')
             return result
 
-        # Store in cache (for valid scripts)
-        self.validation_cache[script_name] = result
-        LOGGER.info(f'Cached validation for "{script_name}": valid={result["valid"]}, cache_size={len(self.validation_cache)}')
         return result
 
     def validate_all_scripts(self, script_configs: List) -> Dict[str, Dict]:
@@ -151,18 +233,25 @@ class ScriptValidator:
         result = self.validation_cache.get(script_name, {
             'valid': True,
             'error': None,
-            'warning': None
+            'warning': None,
+            'last_validated': None
         })
         in_cache = script_name in self.validation_cache
         LOGGER.debug(f'get_validation_status("{script_name}"): in_cache={in_cache}, valid={result["valid"]}, cache_size={len(self.validation_cache)}')
         return result
 
-    def validate_from_config_folder(self, config_folder: str) -> Dict[str, Dict]:
+    def get_all_statuses(self) -> Dict[str, Dict]:
+        """Get cached validation statuses of all validated scripts"""
+        with self._lock:
+            return dict(self.validation_cache)
+
+    def validate_from_config_folder(self, config_folder: str, only_changed: bool = False) -> Dict[str, Dict]:
         """
         Validate all scripts by reading config files directly from folder.
 
         Args:
             config_folder: Path to conf/runners directory
+            only_changed: Re-validate only configs, whose config or script file changed since the last validation
 
         Returns:
             Dict mapping script_name -> validation_result
@@ -174,27 +263,90 @@ class ScriptValidator:
             LOGGER.warning(f'Config folder not found: {config_folder}')
             return results
 
-        # Find all .json files
-        for json_file in config_path.glob('*.json'):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    config_json = json.load(f)
+        with self._pass_lock:
+            existing_paths = set()
 
-                script_name = config_json.get('name', json_file.stem)
-                script_path = config_json.get('script_path')
-                working_dir = config_json.get('working_directory')
+            # Find all .json files
+            for json_file in config_path.glob('*.json'):
+                path = str(json_file)
+                existing_paths.add(path)
 
-                result = self.validate_script(script_name, script_path, working_dir)
-                results[script_name] = result
+                try:
+                    result = self._validate_config_file(path, only_changed)
+                    if result is None:
+                        continue
 
-                if not result['valid']:
-                    LOGGER.debug(f"Script validation failed for '{script_name}': {result['error']}")
+                    (script_name, validation_result) = result
+                    results[script_name] = validation_result
+
+                    if not validation_result['valid']:
+                        LOGGER.debug(f"Script validation failed for '{script_name}': {validation_result['error']}")
+
+                except Exception as e:
+                    LOGGER.debug(f"Could not validate {json_file.name}: {e}")
 
-            except Exception as e:
-                LOGGER.debug(f"Could not validate {json_file.name}: {e}")
+            with self._lock:
+                for path in list(self._file_states.keys()):
+                    if path not in existing_paths:
+                        removed_state = self._file_states.pop(path)
+                        self._remove_result(removed_state.script_name)
+
+                self.last_run = date_utils.to_iso_string(date_utils.now())
 
         return results
 
+    def _validate_config_file(self, path: str, only_changed: bool):
+        config_signature = _read_signature(path)
+        if config_signature is None:
+            return None
+
+        state = self._file_states.get(path)
+        if only_changed and (state is not None) and (state.config_signature == config_signature):
+            if (state.script_file is None) or (state.script_signature == _read_signature(state.script_file)):
+                return state.script_name, self.get_validation_status(state.script_name)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            config_json = json.load(f)
+
+        script_name = config_json.get('name', Path(path).stem)
+        script_path = config_json.get('script_path')
+        working_dir = config_json.get('working_directory')
+
+        script_file = self._resolve_script_file(script_path, working_dir) if script_path else None
+        # signature is taken before validation, so changes during validation are noticed on the next run
+        script_signature = _read_signature(script_file) if script_file else None
+
+        result = self._check_script(script_path, working_dir)
+
+        with self._lock:
+            if (state is not None) and (state.script_name != script_name):
+                self._remove_result(state.script_name)
+            self._store_result(script_name, result)
+            self._file_states[path] = _ConfigFileState(config_signature, script_name, script_file, script_signature)
+
+        return script_name, result
+
     def clear_cache(self):
         """Clear validation cache"""
-        self.validation_cache.clear()
+        with self._lock:
+            self.validation_cache.clear()
+            self._file_states.clear()
+            self.version += 1
+
+
+def _read_signature(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    # ctime is included, because permission changes (e.g. losing read access) don't change mtime
+    return stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size
+
+
+def _same_result(result1: Optional[Dict], result2: Optional[Dict]) -> bool:
+    if (result1 is None) or (result2 is None):
+        return result1 is result2
+
+    keys = ('valid', 'error', 'warning')
+    return all(result1.get(key) == result2.get(key) for key in keys)
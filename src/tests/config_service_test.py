@@ -5,6 +5,7 @@ import tempfile
 import unittest
 from collections import OrderedDict
 from shutil import copyfile
+from unittest.mock import patch
 
 from parameterized import parameterized
 from tornado.httputil import HTTPFile
@@ -98,6 +99,73 @@ class ConfigServiceTest(unittest.TestCase):
         configs = self.config_service.list_configs(self.user)
         self.assertEqual([], configs)
 
+    def test_list_configs_when_config_changed(self):
+        path = _create_script_config_file('conf_x', group='g1')
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+        self.config_service.list_configs(self.user)
+
+        _create_script_config_file('conf_x', group='g2')
+        os.utime(path, (1_600_000_100, 1_600_000_100))
+
+        configs = self.config_service.list_configs(self.user)
+        self.assertEqual(['g2'], [c.group for c in configs])
+
+    def test_list_configs_when_config_removed(self):
+        _create_script_config_file('conf_x')
+        path = _create_script_config_file('conf_y')
+        self.config_service.list_configs(self.user)
+
+        os.remove(path)
+
+        configs = self.config_service.list_configs(self.user)
+        self.assertEqual(['conf_x'], [c.name for c in configs])
+
+    def test_configs_version_when_not_changed(self):
+        path = _create_script_config_file('conf_x')
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+
+        self.config_service.list_configs(self.user)
+        version = self.config_service.get_configs_version()
+
+        self.config_service.list_configs(self.user)
+        self.assertEqual(version, self.config_service.get_configs_version())
+
+    def test_configs_version_when_config_added(self):
+        path = _create_script_config_file('conf_x')
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+
+        self.config_service.list_configs(self.user)
+        version = self.config_service.get_configs_version()
+
+        path = _create_script_config_file('conf_y')
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+
+        self.config_service.list_configs(self.user)
+        self.assertNotEqual(version, self.config_service.get_configs_version())
+
+    def test_prewarm(self):
+        _create_script_config_file('conf_x')
+        _create_script_config_file('conf_y', hidden=True)
+        broken_path = os.path.join(test_utils.temp_folder, 'runners', 'broken.json')
+        file_utils.write_file(broken_path, '{ hello')
+
+        timings = self.config_service.prewarm(workers=2)
+
+        self.assertCountEqual(['conf_x.json', 'conf_y.json', 'broken.json'],
+                              [os.path.basename(t.path) for t in timings])
+        self.assertEqual(['broken.json'], [os.path.basename(t.path) for t in timings if t.failed])
+
+    def test_list_configs_after_prewarm(self):
+        path = _create_script_config_file('conf_x')
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+
+        self.config_service.prewarm()
+        version = self.config_service.get_configs_version()
+
+        configs = self.config_service.list_configs(self.user)
+        self.assertEqual(['conf_x'], [c.name for c in configs])
+        self.assertEqual(version, self.config_service.get_configs_version())
+
     def test_load_config(self):
         _create_script_config_file('conf_x')
 
@@ -117,6 +185,35 @@ class ConfigServiceTest(unittest.TestCase):
         config = self.config_service.load_config_model('conf_x', self.user)
         self.assertIsNone(config)
 
+    def test_load_config_twice_uses_known_path(self):
+        _create_script_config_file('conf_x')
+        self.config_service.load_config_model('conf_x', self.user)
+
+        with patch.object(self.config_service, '_list_config_paths') as list_mock:
+            config = self.config_service.load_config_model('conf_x', self.user)
+
+        list_mock.assert_not_called()
+        self.assertEqual('conf_x', config.name)
+
+    def test_load_config_when_known_path_renamed(self):
+        _create_script_config_file('conf_x')
+        self.config_service.load_config_model('conf_x', self.user)
+
+        _create_script_config_file('conf_x', name='conf_y')
+        _create_script_config_file('another_file', name='conf_x', description='moved')
+
+        config = self.config_service.load_config_model('conf_x', self.user)
+        self.assertEqual('moved', config.description)
+
+    def test_load_config_when_known_path_removed(self):
+        path = _create_script_config_file('conf_x')
+        self.config_service.load_config_model('conf_x', self.user)
+
+        os.remove(path)
+
+        config = self.config_service.load_config_model('conf_x', self.user)
+        self.assertIsNone(config)
+
     def test_load_config_with_slash_in_name(self):
         _create_script_config_file('conf_x', name='Name with slash /')
 
@@ -49,6 +49,9 @@ class TestToIsoString(unittest.TestCase):
         iso_string = date_utils.to_iso_string(datetime(2020, 7, 10, 15, 30, 59, 123456, timezone(timedelta(hours=1))))
         self.assertEqual('2020-07-10T14:30:59.123456Z', iso_string)
 
+    def test_none(self):
+        self.assertIsNone(date_utils.to_iso_string(None))
+
 
 class TestIsPast(unittest.TestCase):
     def test_when_past_naive(self):
@@ -0,0 +1,114 @@
+import unittest
+
+from execution.execution_queue import ExecutionQueue, PRIORITY_MANUAL, PRIORITY_SCHEDULED
+
+
+class TestExecutionQueue(unittest.TestCase):
+    def test_start_when_unlimited(self):
+        queue = ExecutionQueue()
+
+        for i in range(100):
+            self.assertTrue(queue.try_start(str(i)))
+
+        self.assertEqual(100, queue.get_stats()['running'])
+
+    def test_queue_when_global_limit(self):
+        queue = ExecutionQueue(max_concurrent=2)
+
+        self.assertTrue(queue.try_start('1'))
+        self.assertTrue(queue.try_start('2'))
+        self.assertFalse(queue.try_start('3'))
+
+        self.assertTrue(queue.is_queued('3'))
+        self.assertEqual(['3'], queue.get_queued_ids())
+
+    def test_finish_starts_next_fifo(self):
+        queue = ExecutionQueue(max_concurrent=1)
+        queue.try_start('1')
+        queue.try_start('2')
+        queue.try_start('3')
+
+        self.assertEqual(['2'], queue.finish('1'))
+        self.assertEqual(['3'], queue.finish('2'))
+        self.assertEqual([], queue.finish('3'))
+
+    def test_finish_starts_higher_priority_first(self):
+        queue = ExecutionQueue(max_concurrent=1)
+        queue.try_start('1')
+        queue.try_start('2', priority=PRIORITY_SCHEDULED)
+        queue.try_start('3', priority=PRIORITY_MANUAL)
+
+        self.assertEqual(['3', '2'], queue.get_queued_ids())
+        self.assertEqual(['3'], queue.finish('1'))
+
+    def test_key_limit(self):
+        queue = ExecutionQueue()
+
+        self.assertTrue(queue.try_start('1', {'script:a': 1}))
+        self.assertFalse(queue.try_start('2', {'script:a': 1}))
+        self.assertTrue(queue.try_start('3', {'script:b': 1}))
+
+    def test_key_limit_when_none(self):
+        queue = ExecutionQueue()
+
+        self.assertTrue(queue.try_start('1', {'script:a': None}))
+        self.assertTrue(queue.try_start('2', {'script:a': None}))
+
+    def test_blocked_key_doesnt_block_other_keys(self):
+        queue = ExecutionQueue(max_concurrent=2)
+        queue.try_start('1', {'script:a': 1})
+        queue.try_start('2', {'script:b': 1})
+        queue.try_start('3', {'script:a': 1})
+        queue.try_start('4', {'script:c': 1})
+
+        self.assertEqual(['4'], queue.finish('2'))
+        self.assertEqual(['3'], queue.get_queued_ids())
+
+    def test_finish_starts_multiple(self):
+        queue = ExecutionQueue(max_concurrent=3)
+        queue.try_start('1', {'script:a': 1})
+        queue.try_start('2', {'script:a': 1})
+        queue.try_start('3', {'script:a': 1})
+        queue.try_start('4')
+
+        self.assertEqual(['2'], queue.finish('1'))
+        self.assertEqual(['3'], queue.finish('2'))
+
+    def test_remove_queued(self):
+        queue = ExecutionQueue(max_concurrent=1)
+        queue.try_start('1')
+        queue.try_start('2')
+        queue.try_start('3')
+
+        self.assertTrue(queue.remove('2'))
+
+        self.assertFalse(queue.is_queued('2'))
+        self.assertEqual(['3'], queue.finish('1'))
+
+    def test_remove_running(self):
+        queue = ExecutionQueue(max_concurrent=1)
+        queue.try_start('1')
+
+        self.assertFalse(queue.remove('1'))
+
+    def test_finish_unknown(self):
+        queue = ExecutionQueue(max_concurrent=1)
+
+        self.assertEqual([], queue.finish('1'))
+
+    def test_stats(self):
+        queue = ExecutionQueue(max_concurrent=2)
+        queue.try_start('1', {'script:a': 2})
+        queue.try_start('2', {'script:a': 2})
+        queue.try_start('3', {'script:a': 2})
+
+        self.assertEqual({'running': 2, 'queued': 1, 'max_concurrent': 2, 'running_by_key': {'script:a': 2}},
+                         queue.get_stats())
+
+    def test_stats_after_finish(self):
+        queue = ExecutionQueue()
+        queue.try_start('1', {'script:a': 2})
+        queue.finish('1')
+
+        self.assertEqual({'running': 0, 'queued': 0, 'max_concurrent': None, 'running_by_key': {}},
+                         queue.get_stats())
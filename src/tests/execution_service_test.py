@@ -7,6 +7,7 @@ from parameterized import parameterized
 from auth.authorization import Authorizer, ANY_USER, EmptyGroupProvider
 from auth.user import User
 from execution import executor
+from execution.execution_queue import PRIORITY_MANUAL, PRIORITY_SCHEDULED
 from execution.execution_service import ExecutionService
 from execution.executor import create_process_wrapper
 from model.model_helper import AccessProhibitedException
@@ -421,6 +422,297 @@ class ExecutionServiceAuthorizationTest(unittest.TestCase):
             self.executor_service.cleanup_execution(self.execution_id, self.owner_user)
 
 
+
+class ExecutionServiceQueueTest(unittest.TestCase):
+    def test_start_when_below_limit(self):
+        execution_service = self.create_execution_service(max_concurrent=2)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        self.assertCountEqual([id1, id2], execution_service.get_running_executions())
+        self.assertFalse(execution_service.is_queued(id1))
+        self.assertFalse(execution_service.is_queued(id2))
+
+    def test_queue_when_global_limit(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        self.assertEqual([id1], execution_service.get_running_executions())
+        self.assertTrue(execution_service.is_queued(id2))
+        self.assertTrue(execution_service.is_running(id2, DEFAULT_USER))
+        self.assertCountEqual([id1, id2], execution_service.get_active_executions(DEFAULT_USER_ID))
+
+    def test_queue_when_script_limit(self):
+        execution_service = self.create_execution_service()
+        id1 = self._start(execution_service, script_limit=1)
+        id2 = self._start(execution_service, script_limit=1)
+        id3 = self._start(execution_service, script_name='another_script', script_limit=1)
+
+        self.assertCountEqual([id1, id3], execution_service.get_running_executions())
+        self.assertTrue(execution_service.is_queued(id2))
+
+    def test_queue_when_concurrency_group(self):
+        execution_service = self.create_execution_service()
+        id1 = self._start(execution_service, concurrency_group='group1')
+        id2 = self._start(execution_service, concurrency_group='group1')
+        id3 = self._start(execution_service, concurrency_group='group2')
+
+        self.assertCountEqual([id1, id3], execution_service.get_running_executions())
+        self.assertTrue(execution_service.is_queued(id2))
+
+    def test_start_queued_after_finish(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        self.get_process(execution_service, id1).stop()
+
+        self.assertFalse(execution_service.is_queued(id2))
+        self.assertEqual([id2], execution_service.get_running_executions())
+
+    def test_start_queued_by_priority(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service, priority=PRIORITY_SCHEDULED)
+        id3 = self._start(execution_service, priority=PRIORITY_MANUAL)
+
+        self.get_process(execution_service, id1).stop()
+
+        self.assertEqual([id3], execution_service.get_running_executions())
+        self.assertTrue(execution_service.is_queued(id2))
+
+    def test_start_listener_when_queued(self):
+        started_ids = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        execution_service.add_start_listener(lambda id, user: started_ids.append(id))
+
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+        self.assertEqual([id1], started_ids)
+
+        self.get_process(execution_service, id1).stop()
+        self.assertEqual([id1, id2], started_ids)
+
+    def test_start_listener_by_id_when_queued(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        execution_service.add_start_listener(lambda: notifications.append('started'), id2)
+        self.assertEqual([], notifications)
+
+        self.get_process(execution_service, id1).stop()
+        self.assertEqual(['started'], notifications)
+
+    def test_start_listener_by_id_when_started(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+
+        execution_service.add_start_listener(lambda: notifications.append('started'), id1)
+
+        self.assertEqual(['started'], notifications)
+
+    def test_finish_listener_by_id_when_queued(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        execution_service.add_finish_listener(lambda: notifications.append('finished'), id2)
+
+        self.get_process(execution_service, id1).stop()
+        self.assertEqual([], notifications)
+
+        self.get_process(execution_service, id2).stop()
+        self.assertEqual(['finished'], notifications)
+
+    def test_start_and_finish_listeners_by_id_when_queued_script_finishes_immediately(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        execution_service.add_start_listener(lambda: notifications.append('started'), id2)
+        execution_service.add_finish_listener(lambda: notifications.append('finished'), id2)
+
+        def create_finished_process(executor, command, working_directory, env_variables):
+            return _FinishedProcessWrapper(executor, command, working_directory, env_variables)
+
+        executor._process_creator = create_finished_process
+        self.get_process(execution_service, id1).stop()
+
+        self.assertEqual(['started', 'finished'], notifications)
+
+    def test_stop_queued(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+        id3 = self._start(execution_service)
+
+        execution_service.add_finish_listener(lambda: notifications.append('finished'), id2)
+
+        execution_service.stop_script(id2, DEFAULT_USER)
+
+        self.assertEqual(['finished'], notifications)
+        self.assertFalse(execution_service.is_queued(id2))
+        self.assertFalse(execution_service.is_active(id2))
+        self.assertEqual([id1], execution_service.get_running_executions())
+
+        self.get_process(execution_service, id1).stop()
+        self.assertEqual([id3], execution_service.get_running_executions())
+
+    def test_kill_queued_by_system(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        execution_service.kill_script_by_system(id2)
+
+        self.assertFalse(execution_service.is_queued(id2))
+        self.assertEqual([id1], execution_service.get_running_executions())
+
+    def test_stop_queued_when_slot_granted(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+        id3 = self._start(execution_service)
+
+        execution_service.add_finish_listener(lambda: notifications.append('finished'), id2)
+
+        queue = execution_service._queue
+        original_finish = queue.finish
+
+        def finish_and_stop(execution_id):
+            next_ids = original_finish(execution_id)
+            if id2 in next_ids:
+                execution_service.stop_script(id2, DEFAULT_USER)
+            return next_ids
+
+        queue.finish = finish_and_stop
+
+        self.get_process(execution_service, id1).stop()
+
+        self.assertEqual(['finished'], notifications)
+        self.assertFalse(execution_service.is_active(id2))
+        self.assertEqual([id3], execution_service.get_running_executions())
+
+    def test_kill_queued_by_system_when_starting(self):
+        notifications = []
+
+        execution_service = self.create_execution_service(max_concurrent=1)
+        id1 = self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        execution_service.add_finish_listener(lambda: notifications.append('finished'), id2)
+
+        queued_executor = execution_service._executors[id2]
+        original_start = queued_executor.start
+
+        def kill_and_start(execution_id, connection_ids=None):
+            execution_service.kill_script_by_system(id2)
+            original_start(execution_id, connection_ids=connection_ids)
+
+        queued_executor.start = kill_and_start
+
+        self.get_process(execution_service, id1).stop()
+
+        self.assertEqual(['finished'], notifications)
+        self.assertTrue(self.get_process(execution_service, id2).is_finished())
+        self.assertEqual([], execution_service.get_running_executions())
+
+    def test_getters_when_queued(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        self.assertIsNone(execution_service.get_exit_code(id2))
+        self.assertIsNone(execution_service.get_process_id(id2))
+        self.assertEqual({}, execution_service.get_user_parameter_values(id2))
+
+    def test_cleanup_fails_when_queued(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        self._start(execution_service)
+        id2 = self._start(execution_service)
+
+        self.assertRaises(Exception, execution_service.cleanup_execution, id2, DEFAULT_USER)
+
+    def test_queue_stats(self):
+        execution_service = self.create_execution_service(max_concurrent=1)
+        self._start(execution_service)
+        self._start(execution_service)
+
+        stats = execution_service.get_queue_stats()
+        self.assertEqual(1, stats['running'])
+        self.assertEqual(1, stats['queued'])
+        self.assertEqual(1, stats['max_concurrent'])
+
+    def _start(self, execution_service, script_name='script_x', script_limit=None,
+               priority=PRIORITY_MANUAL, concurrency_group=None):
+        config = test_utils.create_config_model(
+            script_name,
+            config={'name': script_name,
+                    'script_path': 'ls',
+                    'max_concurrent_executions': script_limit})
+
+        execution_id = execution_service.start_script(
+            config, DEFAULT_USER, priority=priority, concurrency_group=concurrency_group)
+        execution_owners[execution_id] = DEFAULT_USER
+        return execution_id
+
+    def create_execution_service(self, max_concurrent=None):
+        execution_service = ExecutionService(
+            self.authorizer, _IdGeneratorMock(), test_utils.env_variables, max_concurrent=max_concurrent)
+        self.exec_services.append(execution_service)
+        return execution_service
+
+    @staticmethod
+    def get_process(execution_service, execution_id) -> _MockProcessWrapper:
+        return execution_service._executors[execution_id].process_wrapper
+
+    def setUp(self):
+        super().setUp()
+        self.authorizer = Authorizer(ANY_USER, [], [], [], EmptyGroupProvider())
+        self.exec_services = []
+
+        def create_process(executor, command, working_directory, env_variables):
+            return _MockProcessWrapper(executor, command, working_directory, env_variables)
+
+        executor._process_creator = create_process
+
+    def tearDown(self):
+        super().tearDown()
+
+        for service in self.exec_services:
+            for id in list(service._queued_executions.keys()):
+                service.kill_script_by_system(id)
+
+            for id in service.get_running_executions():
+                service.kill_script_by_system(id)
+
+        executor._process_creator = create_process_wrapper
+
+
+class _FinishedProcessWrapper(_MockProcessWrapper):
+    """Process, which exits right after start"""
+
+    def start_execution(self, command, working_directory):
+        self.exit_code = 0
+        self.finished = True
+        self.output_stream.close()
+
+
 def _start(execution_service, user_id=DEFAULT_USER_ID):
     return _start_with_config(execution_service, _create_script_config([]), None, user_id)
 
@@ -1,5 +1,8 @@
+import os
+import stat
 from unittest import TestCase
 
+from tests import test_utils
 from utils import os_utils, file_utils
 
 
@@ -18,3 +21,54 @@ class TestToFilename(TestCase):
 
     def tearDown(self) -> None:
         os_utils.reset_os()
+
+
+class TestWriteFileAtomic(TestCase):
+    def test_write_new_file(self):
+        path = os.path.join(test_utils.temp_folder, 'sub', 'file.json')
+
+        file_utils.write_file_atomic(path, 'hello')
+
+        self.assertEqual('hello', file_utils.read_file(path))
+        self.assertEqual(['file.json'], os.listdir(os.path.dirname(path)))
+
+    def test_replace_existing_file(self):
+        path = os.path.join(test_utils.temp_folder, 'file.json')
+        file_utils.write_file(path, 'old content')
+
+        file_utils.write_file_atomic(path, 'new')
+
+        self.assertEqual('new', file_utils.read_file(path))
+
+    def test_keep_old_content_when_write_fails(self):
+        path = os.path.join(test_utils.temp_folder, 'file.json')
+        file_utils.write_file(path, 'old content')
+
+        self.assertRaises(TypeError, file_utils.write_file_atomic, path, b'bytes', False)
+
+        self.assertEqual('old content', file_utils.read_file(path))
+        self.assertEqual(['file.json'], os.listdir(test_utils.temp_folder))
+
+    def test_new_file_permissions_from_umask(self):
+        path = os.path.join(test_utils.temp_folder, 'file.json')
+
+        file_utils.write_file_atomic(path, 'hello')
+
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(0o666 & ~umask, stat.S_IMODE(os.stat(path).st_mode))
+
+    def test_keep_permissions_of_existing_file(self):
+        path = os.path.join(test_utils.temp_folder, 'file.json')
+        file_utils.write_file(path, 'old content')
+        os.chmod(path, 0o640)
+
+        file_utils.write_file_atomic(path, 'new')
+
+        self.assertEqual(0o640, stat.S_IMODE(os.stat(path).st_mode))
+
+    def setUp(self) -> None:
+        test_utils.setup()
+
+    def tearDown(self) -> None:
+        test_utils.cleanup()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from venv_manager.import_analysis import ImportAnalysisCache, extract_imports
+
+
+class TestImportAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ImportAnalysisCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content, mtime=1_600_000_000):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_extract_imports(self):
+        path = self._write('a.py', 'import os.path\nimport requests.auth as auth\nfrom yaml import load\nfrom . import x\n')
+
+        self.assertEqual({'os', 'requests', 'yaml'}, extract_imports(path))
+
+    def test_extract_imports_when_syntax_error(self):
+        path = self._write('a.py', 'import os\ndef (:\n')
+
+        self.assertEqual(frozenset(), extract_imports(path))
+
+    def test_get_imports(self):
+        path1 = self._write('a.py', 'import os')
+        path2 = self._write('b.py', 'import requests')
+
+        self.assertEqual({path1: {'os'}, path2: {'requests'}}, self.cache.get_imports([path1, path2]))
+
+    def test_cached_when_not_changed(self):
+        path = self._write('a.py', 'import os')
+        self.cache.get_imports([path])
+
+        with patch('venv_manager.import_analysis.extract_imports') as extract_mock:
+            self.assertEqual({path: {'os'}}, self.cache.get_imports([path]))
+            extract_mock.assert_not_called()
+
+    def test_reparsed_when_changed(self):
+        path = self._write('a.py', 'import os')
+        self.cache.get_imports([path])
+
+        self._write('a.py', 'import requests', mtime=1_600_000_100)
+
+        self.assertEqual({path: {'requests'}}, self.cache.get_imports([path]))
+
+    def test_reparsed_when_recently_changed(self):
+        path = os.path.join(self.temp_dir, 'a.py')
+        with open(path, 'w') as f:
+            f.write('import os')
+        self.cache.get_imports([path])
+
+        with open(path, 'w') as f:
+            f.write('import re')
+
+        self.assertEqual({path: {'re'}}, self.cache.get_imports([path]))
+
+    def test_missing_file_skipped(self):
+        path = self._write('a.py', 'import os')
+
+        result = self.cache.get_imports([path, os.path.join(self.temp_dir, 'missing.py')])
+
+        self.assertEqual({path: {'os'}}, result)
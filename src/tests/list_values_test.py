@@ -1,9 +1,13 @@
 import os
+import threading
+import time
 import unittest
+from concurrent.futures.thread import ThreadPoolExecutor
 
 from parameterized import parameterized
 
-from config.script.list_values import DependantScriptValuesProvider, FilesProvider, ScriptValuesProvider
+from config.script.list_values import DependantScriptValuesProvider, FilesProvider, ScriptValuesProvider, \
+    ValuesLoadingCancelledException
 from tests import test_utils
 from tests.test_utils import create_parameter_model, wrap_values
 from utils import file_utils
@@ -41,16 +45,69 @@ class ScriptValuesProviderTest(unittest.TestCase):
                                         process_invoker=test_utils.process_invoker)
         self.assertEqual(['f2'], provider.get_values({}))
 
+    def test_ls_3_files_when_executor(self):
+        test_utils.create_files(['f1', 'f2', 'f3'])
+        provider = ScriptValuesProvider('ls "' + test_utils.temp_folder + '"',
+                                        shell=False,
+                                        process_invoker=test_utils.process_invoker,
+                                        executor=self.executor)
+        provider.wait_loaded()
+
+        self.assertTrue(provider.is_loaded())
+        self.assertEqual(['f1', 'f2', 'f3'], provider.get_values({}))
+
+    def test_empty_values_when_executor_and_not_loaded(self):
+        blocker = threading.Event()
+        self.executor.submit(blocker.wait)
+
+        provider = ScriptValuesProvider('echo 123',
+                                        shell=False,
+                                        process_invoker=test_utils.process_invoker,
+                                        executor=self.executor)
+        try:
+            self.assertFalse(provider.is_loaded())
+            self.assertEqual([], provider.get_values({}))
+        finally:
+            blocker.set()
+
+        provider.wait_loaded()
+        self.assertEqual(['123'], provider.get_values({}))
+
+    def test_loaded_listener_when_executor(self):
+        loaded = threading.Event()
+
+        provider = ScriptValuesProvider('echo 123',
+                                        shell=False,
+                                        process_invoker=test_utils.process_invoker,
+                                        executor=self.executor)
+        provider.add_loaded_listener(loaded.set)
+
+        self.assertTrue(loaded.wait(5))
+        self.assertEqual(['123'], provider.get_values({}))
+
+    def test_empty_values_when_executor_and_script_failed(self):
+        provider = ScriptValuesProvider('ls "' + test_utils.temp_folder + '" | grep 2',
+                                        shell=False,
+                                        process_invoker=test_utils.process_invoker,
+                                        executor=self.executor)
+        provider.wait_loaded()
+
+        self.assertEqual([], provider.get_values({}))
+
     def setUp(self) -> None:
         super().setUp()
 
         test_utils.setup()
 
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
     def tearDown(self) -> None:
         super().tearDown()
 
         test_utils.cleanup()
 
+        self.executor.shutdown()
+
 
 class DependantScriptValuesProviderTest(unittest.TestCase):
 
@@ -184,6 +241,35 @@ class DependantScriptValuesProviderTest(unittest.TestCase):
         value_wrappers = wrap_values(parameters_supplier(), {'param1': test_utils.temp_folder + ' | grep y'})
         self.assertEqual(expected_values, values_provider.get_values(value_wrappers))
 
+    def test_cancel_running_script(self):
+        parameters_supplier = self.create_parameters_supplier('param1')
+        values_provider = DependantScriptValuesProvider(
+            'sleep ${param1}',
+            parameters_supplier,
+            shell=False,
+            process_invoker=test_utils.process_invoker)
+
+        value_wrappers = wrap_values(parameters_supplier(), {'param1': '30'})
+
+        threading.Timer(0.2, values_provider.cancel).start()
+
+        start_time = time.time()
+        self.assertRaises(ValuesLoadingCancelledException, values_provider.get_values, value_wrappers)
+        self.assertLess(time.time() - start_time, 10)
+
+    def test_cancel_when_not_running(self):
+        parameters_supplier = self.create_parameters_supplier('param1')
+        values_provider = DependantScriptValuesProvider(
+            "echo '_${param1}_'",
+            parameters_supplier,
+            shell=False,
+            process_invoker=test_utils.process_invoker)
+
+        values_provider.cancel()
+
+        value_wrappers = wrap_values(parameters_supplier(), {'param1': 'abc'})
+        self.assertEqual(['_abc_'], values_provider.get_values(value_wrappers))
+
     @parameterized.expand([(True,), (False,)])
     def test_script_fails(self, shell):
         parameters_supplier = self.create_parameters_supplier('param1')
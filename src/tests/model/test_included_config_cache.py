@@ -0,0 +1,87 @@
+import json
+import os
+import unittest
+
+from model.included_config_cache import IncludedConfigCache
+from tests import test_utils
+
+
+class IncludedConfigCacheTest(unittest.TestCase):
+    def test_merge_single_file(self):
+        path = self._write_include('inc1.json', {'description': 'abc', 'parameters': [{'name': 'p1'}]})
+
+        merged = self.cache.read_and_merge([path])
+
+        self.assertEqual({'description': 'abc', 'parameters': [{'name': 'p1'}]}, merged)
+
+    def test_merge_multiple_files(self):
+        path1 = self._write_include('inc1.json', {'description': 'abc', 'parameters': [{'name': 'p1'}]})
+        path2 = self._write_include('inc2.json', {'description': 'def',
+                                                  'working_directory': '/tmp',
+                                                  'parameters': [{'name': 'p1', 'type': 'int'}, {'name': 'p2'}]})
+
+        merged = self.cache.read_and_merge([path1, path2])
+
+        self.assertEqual({'description': 'abc',
+                          'working_directory': '/tmp',
+                          'parameters': [{'name': 'p1'}, {'name': 'p2'}]},
+                         merged)
+
+    def test_skip_missing_and_broken_files(self):
+        path1 = self._write_include('inc1.json', {'description': 'abc'})
+        path2 = test_utils.create_file('broken.json', text='{ hello')
+        path3 = self._write_include('list.json', ['abc'])
+
+        merged = self.cache.read_and_merge([os.path.join(test_utils.temp_folder, 'missing.json'), path2, path3, path1])
+
+        self.assertEqual({'description': 'abc'}, merged)
+
+    def test_cached_when_not_changed(self):
+        path = self._write_include('inc1.json', {'description': 'abc'})
+        self.cache.read_and_merge([path])
+
+        # same size and mtime, so the file is not re-read
+        with open(path, 'w') as f:
+            json.dump({'description': 'xyz'}, f)
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+
+        self.assertEqual({'description': 'abc'}, self.cache.read_and_merge([path]))
+
+    def test_reload_when_changed(self):
+        path = self._write_include('inc1.json', {'description': 'abc'})
+        self.cache.read_and_merge([path])
+
+        self._write_include('inc1.json', {'description': 'xyz'}, mtime=1_600_000_100)
+
+        self.assertEqual({'description': 'xyz'}, self.cache.read_and_merge([path]))
+
+    def test_reload_when_recently_changed(self):
+        path = test_utils.create_file('inc1.json', text='{"description": "abc"}')
+        self.cache.read_and_merge([path])
+
+        test_utils.create_file('inc1.json', text='{"description": "xyz"}', overwrite=True)
+
+        self.assertEqual({'description': 'xyz'}, self.cache.read_and_merge([path]))
+
+    def test_result_is_a_copy(self):
+        path = self._write_include('inc1.json', {'parameters': [{'name': 'p1'}]})
+
+        merged = self.cache.read_and_merge([path])
+        merged['parameters'][0]['name'] = 'p2'
+
+        self.assertEqual({'parameters': [{'name': 'p1'}]}, self.cache.read_and_merge([path]))
+
+    def _write_include(self, filename, content, mtime=1_600_000_000):
+        path = test_utils.create_file(filename, text=json.dumps(content), overwrite=True)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def setUp(self) -> None:
+        super().setUp()
+        test_utils.setup()
+
+        self.cache = IncludedConfigCache()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        test_utils.cleanup()
@@ -0,0 +1,66 @@
+import unittest
+
+from model.parameter_dependencies import ParameterDependencies, CyclicDependencyException
+
+
+class TestParameterDependencies(unittest.TestCase):
+    def test_order_when_no_dependencies(self):
+        dependencies = ParameterDependencies({'p1': [], 'p2': [], 'p3': []})
+
+        self.assertEqual(['p1', 'p2', 'p3'], dependencies.get_order())
+
+    def test_order_when_dependant_first(self):
+        dependencies = ParameterDependencies({'p1': ['p2'], 'p2': [], 'p3': []})
+
+        self.assertEqual(['p2', 'p1', 'p3'], dependencies.get_order())
+
+    def test_order_when_chain(self):
+        dependencies = ParameterDependencies({'p1': ['p2'], 'p2': ['p3'], 'p3': []})
+
+        self.assertEqual(['p3', 'p2', 'p1'], dependencies.get_order())
+
+    def test_order_when_multiple_dependencies(self):
+        dependencies = ParameterDependencies({'p1': ['p2', 'p3'], 'p2': ['p3'], 'p3': [], 'p4': ['p3']})
+
+        self.assertEqual(['p3', 'p2', 'p1', 'p4'], dependencies.get_order())
+
+    def test_order_when_unknown_dependency(self):
+        dependencies = ParameterDependencies({'p1': ['p5'], 'p2': []})
+
+        self.assertEqual(['p1', 'p2'], dependencies.get_order())
+
+    def test_dependants_when_chain(self):
+        dependencies = ParameterDependencies({'p1': ['p2'], 'p2': ['p3'], 'p3': [], 'p4': []})
+
+        self.assertEqual(['p2', 'p1'], dependencies.get_dependants('p3'))
+        self.assertEqual(['p1'], dependencies.get_dependants('p2'))
+        self.assertEqual([], dependencies.get_dependants('p1'))
+        self.assertEqual([], dependencies.get_dependants('p4'))
+
+    def test_dependants_when_diamond(self):
+        dependencies = ParameterDependencies({'p1': ['p2', 'p3'], 'p2': ['p4'], 'p3': ['p4'], 'p4': []})
+
+        self.assertEqual(['p2', 'p3', 'p1'], dependencies.get_dependants('p4'))
+
+    def test_dependants_when_unknown_parameter(self):
+        dependencies = ParameterDependencies({'p1': []})
+
+        self.assertEqual([], dependencies.get_dependants('p2'))
+
+    def test_cycle(self):
+        with self.assertRaises(CyclicDependencyException) as context:
+            ParameterDependencies({'p1': ['p2'], 'p2': ['p3'], 'p3': ['p1']})
+
+        self.assertEqual(['p1', 'p2', 'p3', 'p1'], context.exception.cycle)
+
+    def test_cycle_when_self_reference(self):
+        with self.assertRaises(CyclicDependencyException) as context:
+            ParameterDependencies({'p1': [], 'p2': ['p2']})
+
+        self.assertEqual(['p2', 'p2'], context.exception.cycle)
+
+    def test_cycle_when_dependant_on_cycle(self):
+        with self.assertRaises(CyclicDependencyException) as context:
+            ParameterDependencies({'p0': ['p1'], 'p1': ['p2'], 'p2': ['p1']})
+
+        self.assertEqual(['p1', 'p2', 'p1'], context.exception.cycle)
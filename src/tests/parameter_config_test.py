@@ -1,7 +1,9 @@
 import inspect
 import os
+import threading
 import unittest
 from collections import OrderedDict
+from concurrent.futures.thread import ThreadPoolExecutor
 
 from parameterized import parameterized
 
@@ -762,6 +764,35 @@ class TestSingleParameterValidation(unittest.TestCase):
         error = validate_value(parameter, ['X'])
         self.assert_error(error)
 
+    def test_multiselect_when_many_elements(self):
+        allowed_values = ['val' + str(i) for i in range(5000)]
+        parameter = create_parameter_model('param', type=PARAM_TYPE_MULTISELECT, allowed_values=allowed_values)
+
+        error = validate_value(parameter, list(reversed(allowed_values)))
+        self.assertIsNone(error)
+
+    def test_multiselect_when_many_elements_one_not_matching(self):
+        allowed_values = ['val' + str(i) for i in range(5000)]
+        parameter = create_parameter_model('param', type=PARAM_TYPE_MULTISELECT, allowed_values=allowed_values)
+
+        error = validate_value(parameter, allowed_values[:4000] + ['X'] + allowed_values[4000:])
+        self.assertTrue(error.startswith("has value 'X', but should be in "), error)
+
+    def test_multiselect_when_unhashable_element(self):
+        parameter = create_parameter_model(
+            'param', type=PARAM_TYPE_MULTISELECT, allowed_values=['val1', 'val2', 'val3'])
+
+        value = ['val1', {'val2': 'val3'}]
+        error = parameter.validate_value(ScriptValueWrapper(value, value, value))
+        self.assert_error(error)
+
+    def test_list_parameter_when_unhashable_value(self):
+        parameter = create_parameter_model(
+            'param', type='list', allowed_values=['val1', 'val2', 'val3'])
+
+        error = validate_value(parameter, ['val2'])
+        self.assert_error(error)
+
     def test_list_with_script_when_matches(self):
         parameter = create_parameter_model('param', type='list', values_script="echo '123\n' 'abc'")
 
@@ -774,6 +805,50 @@ class TestSingleParameterValidation(unittest.TestCase):
         error = validate_value(parameter, '123')
         self.assertIsNone(error)
 
+    def test_list_with_script_when_values_executor_busy(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        blocker = threading.Event()
+        executor.submit(blocker.wait)
+
+        try:
+            parameter = create_parameter_model_from_config(
+                {'name': 'param', 'type': 'list', 'values': {'script': "echo '123\n' 'abc'"}},
+                values_executor=executor)
+            self.assertEqual([], parameter.values)
+
+            threading.Timer(0.1, blocker.set).start()
+
+            error = validate_value(parameter, '123')
+            self.assertIsNone(error)
+            self.assertEqual(['123', ' abc'], parameter.values)
+        finally:
+            blocker.set()
+            executor.shutdown()
+
+    def test_list_with_script_when_values_scripts_disabled(self):
+        parameter = create_parameter_model_from_config(
+            {'name': 'param', 'type': 'list', 'values': {'script': "echo '123\n' 'abc'"}},
+            run_values_scripts=False)
+
+        self.assertIsNone(parameter.values)
+        self.assertIsNone(validate_value(parameter, 'xyz'))
+
+    def test_multiselect_with_script_when_values_scripts_disabled_and_not_list(self):
+        parameter = create_parameter_model_from_config(
+            {'name': 'param', 'type': 'multiselect', 'values': {'script': "echo '123\n' 'abc'"}},
+            run_values_scripts=False)
+
+        error = validate_value(parameter, 'xyz')
+        self.assert_error(error)
+
+    def test_list_with_constant_values_when_values_scripts_disabled(self):
+        parameter = create_parameter_model_from_config(
+            {'name': 'param', 'type': 'list', 'values': ['val1', 'val2']},
+            run_values_scripts=False)
+
+        error = validate_value(parameter, 'xyz')
+        self.assert_error(error)
+
     @parameterized.expand([
         ('a\d', 'ab', 'some desc', 'some desc'),
         ('a\d', '12', 'desc 2', 'desc 2'),
@@ -801,6 +876,10 @@ class TestSingleParameterValidation(unittest.TestCase):
         error = validate_value(parameter, value)
         self.assertIsNone(error)
 
+    def test_regex_validation_when_invalid_pattern(self):
+        self.assertRaisesRegex(Exception, 'invalid regex pattern',
+                               create_parameter_model, 'param', regex={'pattern': 'a(\\d'})
+
     @parameterized.expand([(False,), (True,), (None,)])
     def test_list_with_dependency_when_matches(self, shell):
         parameters = []
@@ -818,6 +897,24 @@ class TestSingleParameterValidation(unittest.TestCase):
         error = validate_value(parameter, ' _abc_')
         self.assertIsNone(error)
 
+    def test_list_with_dependency_when_values_changed(self):
+        parameters = []
+        values = ObservableDict()
+        dep_param = create_parameter_model('dep_param')
+        parameter = create_parameter_model('param',
+                                           type='list',
+                                           values_script="echo '_${dep_param}_'",
+                                           all_parameters=parameters,
+                                           other_param_values=values)
+        parameters.extend([dep_param, parameter])
+
+        values['dep_param'] = ScriptValueWrapper('abc', 'abc', 'abc')
+        self.assertIsNone(validate_value(parameter, '_abc_'))
+
+        values['dep_param'] = ScriptValueWrapper('def', 'def', 'def')
+        self.assert_error(validate_value(parameter, '_abc_'))
+        self.assertIsNone(validate_value(parameter, '_def_'))
+
     def test_any_ip_when_ip4(self):
         parameter = create_parameter_model('param', type='ip')
         error = validate_value(parameter, '127.0.0.1')
@@ -1078,6 +1175,18 @@ class TestUiValueMapping(unittest.TestCase):
 
         self.assertEqual(['ABC', 'qwerty', 'xyz'], parameter_model.get_ui_values())
 
+    def test_map_to_script_when_mapping(self):
+        parameter_model = create_parameter_model(
+            type=PARAM_TYPE_MULTISELECT,
+            allowed_values=['abc', 'def', 'xyz'],
+            values_ui_mapping={
+                'abc': 'ABC',
+                'def': 'qwerty'
+            }
+        )
+
+        self.assertEqual(['def', 'xyz', 'abc'], parameter_model.map_to_script(['qwerty', 'xyz', 'ABC']))
+
 
 def _create_parameter_model(config, *, username=DEF_USERNAME, audit_name=DEF_AUDIT_NAME, all_parameters=None):
     return create_parameter_model_from_config(config,
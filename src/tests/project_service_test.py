@@ -3,10 +3,15 @@ import tempfile
 import shutil
 import zipfile
 import sys
+import json
+import os
+import subprocess
 from pathlib import Path
 from io import BytesIO
 
+from project_manager.project_metadata_store import ProjectMetadataStore
 from project_manager.project_service import ProjectService
+from utils.background_jobs import JobCancelledException
 
 
 class TestZipSlipProtection(unittest.TestCase):
@@ -242,5 +247,268 @@ class TestGitUrlValidation(unittest.TestCase):
         self.assertTrue('HTTPS' in str(cm.exception) or 'Invalid URL' in str(cm.exception))
 
 
+class TestProjectMetadataCache(unittest.TestCase):
+    """Test caching of project metadata files"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ProjectMetadataStore()
+        self.service = ProjectService(self.temp_dir, metadata_store=self.store)
+        self.service.projects_dir = Path(self.temp_dir) / 'projects'
+
+        self.project_path = self.service.projects_dir / 'my-project'
+        self.project_path.mkdir(parents=True)
+        self.meta_path = self.project_path / '.project-meta.json'
+        self._write_meta({'id': 'my-project', 'name': 'My Project', 'parameters': []})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_meta(self, meta, mtime=1_600_000_000):
+        with open(self.meta_path, 'w') as f:
+            json.dump(meta, f)
+        os.utime(self.meta_path, (mtime, mtime))
+
+    def test_get_project(self):
+        project = self.service.get_project('my-project')
+        self.assertEqual('My Project', project['name'])
+
+    def test_get_project_when_modified_externally(self):
+        self.service.get_project('my-project')
+
+        self._write_meta({'id': 'my-project', 'name': 'Renamed'}, mtime=1_600_000_100)
+
+        self.assertEqual('Renamed', self.service.get_project('my-project')['name'])
+
+    def test_get_project_when_cached(self):
+        self.service.get_project('my-project')
+
+        # same mtime and size, so the cached value is returned
+        self._write_meta({'id': 'my-project', 'name': 'My Projekt', 'parameters': []})
+
+        self.assertEqual('My Project', self.service.get_project('my-project')['name'])
+
+    def test_returned_meta_is_a_copy(self):
+        project = self.service.get_project('my-project')
+        project['name'] = 'Changed'
+        project['parameters'].append({'name': 'p1'})
+
+        project = self.service.get_project('my-project')
+        self.assertEqual('My Project', project['name'])
+        self.assertEqual([], project['parameters'])
+
+    def test_update_project_parameters_write_through(self):
+        self.service.get_project('my-project')
+
+        self.service.update_project_parameters('my-project', [{'name': 'p1', 'type': 'int'}])
+
+        self.assertEqual([{'name': 'p1', 'type': 'int'}], self.service.get_project_parameters('my-project'))
+        with open(self.meta_path, 'r') as f:
+            self.assertEqual([{'name': 'p1', 'type': 'int'}], json.load(f)['parameters'])
+
+    def test_update_project_verbs_shared_between_services(self):
+        another_service = ProjectService(self.temp_dir, metadata_store=self.store)
+        another_service.projects_dir = self.service.projects_dir
+
+        another_service.update_project_verbs('my-project', {'parameter_name': 'verb'}, ['p1'])
+
+        project = self.service.get_project('my-project')
+        self.assertEqual({'parameter_name': 'verb'}, project['verbs'])
+        self.assertEqual(['p1'], project['shared_parameters'])
+
+    def test_list_projects_when_meta_deleted(self):
+        self.service.list_projects()
+
+        os.remove(self.meta_path)
+
+        projects = self.service.list_projects()
+        self.assertEqual([{'id': 'my-project', 'name': 'my-project', 'import_type': 'unknown', 'imported_at': None}],
+                         projects)
+
+
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestEntryPointDetection(unittest.TestCase):
+    """Test entry points detection and project import analysis"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = ProjectService(self.temp_dir, metadata_store=ProjectMetadataStore())
+        self.service.projects_dir = Path(self.temp_dir) / 'projects'
+
+        self.source_path = Path(self.temp_dir) / 'my_tool'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_source(self, relative_path, content):
+        path = self.source_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def test_detect_entry_points(self):
+        self._write_source('src/tool/__main__.py', 'print(1)')
+        self._write_source('src/tool/cli.py', 'import typer\nmy_app = typer.Typer()\n')
+        self._write_source('src/tool/run.py', 'def main():\n    pass\n\nif __name__ == "__main__":\n    main()\n')
+        self._write_source('src/tool/utils.py', 'def helper():\n    pass\n')
+
+        entry_points = self.service.detect_entry_points(self.source_path)
+
+        self.assertEqual(['tool.__main__', 'tool.cli:my_app', 'tool.run:main'], entry_points)
+
+    def test_detect_entry_points_skips_venv_and_hidden_dirs(self):
+        self._write_source('app.py', 'def main():\n    pass\n\nif __name__ == "__main__":\n    main()\n')
+        self._write_source('.venv/lib/site.py', 'def main():\n    pass\n\nif __name__ == "__main__":\n    main()\n')
+        self._write_source('venv/lib/other.py', 'def main():\n    pass\n\nif __name__ == "__main__":\n    main()\n')
+        self._write_source('node_modules/x/script.py', 'if __name__ == "__main__":\n    pass\n')
+
+        self.assertEqual(['app:main'], self.service.detect_entry_points(self.source_path))
+
+    def test_import_from_local_with_job(self):
+        from utils.background_jobs import BackgroundJob
+
+        self._write_source('tool.py', 'def main():\n    pass\n\nif __name__ == "__main__":\n    main()\n')
+        self._write_source('requirements.txt', 'requests>=2.0\n')
+
+        job = BackgroundJob('projects', 'import', 'Import my_tool')
+        meta = self.service.import_from_local(str(self.source_path), job=job)
+
+        self.assertEqual(['tool:main'], meta['entry_points'])
+        self.assertEqual(['requests'], meta['dependencies'])
+        self.assertEqual({'python_files': 1, 'skipped_large_files': 0, 'truncated': False}, meta['scan'])
+        self.assertEqual(meta, self.service.get_project(meta['id']))
+
+        self.assertEqual('saving', job.stage)
+        self.assertIn('Scanning source files for entry points\n', job.output_stream.chunks)
+
+
+class _FakeVenvManager:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.cancel = False
+        self.requirements = []
+        self.released_hashes = []
+        self.used_hashes = None
+
+    def ensure_env(self, requirements, job=None):
+        if self.fail:
+            raise subprocess.CalledProcessError(1, ['pip'])
+        if self.cancel:
+            raise JobCancelledException('job-1')
+        self.requirements.append(requirements)
+        return 'abc123'
+
+    def release_env(self, env_hash):
+        self.released_hashes.append(env_hash)
+
+    def get_python_path(self, env_hash):
+        return Path('/venvs') / env_hash / 'bin' / 'python'
+
+    def remove_unused(self, used_hashes):
+        self.used_hashes = used_hashes
+        return []
+
+
+class TestProjectVenvs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.venv_manager = _FakeVenvManager()
+        self.service = ProjectService(self.temp_dir,
+                                      metadata_store=ProjectMetadataStore(),
+                                      venv_manager=self.venv_manager)
+        self.service.projects_dir = Path(self.temp_dir) / 'projects'
+        self.service.runners_dir = Path(self.temp_dir) / 'runners'
+
+        self.source_path = Path(self.temp_dir) / 'my_tool'
+        self.source_path.mkdir()
+        (self.source_path / 'tool.py').write_text('def main():\n    pass\n\nif __name__ == "__main__":\n    main()\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _import(self, requirements):
+        (self.source_path / 'requirements.txt').write_text(requirements)
+        return self.service.import_from_local(str(self.source_path))
+
+    def _generate_config(self, meta):
+        project_path = self.service.projects_dir / meta['id']
+        meta['wrapper_script'] = str(project_path / 'wrapper.py')
+        self.service._save_meta(project_path, meta)
+
+        config_path = self.service.generate_runner_config(meta['id'], 'My tool')
+        with open(config_path) as f:
+            return json.load(f)
+
+    def test_import_builds_venv(self):
+        meta = self._import('requests>=2.0\n# comment\nclick\n')
+
+        self.assertEqual('abc123', meta['venv'])
+        self.assertEqual([['requests>=2.0', 'click']], self.venv_manager.requirements)
+        self.assertCountEqual(['requests', 'click'], meta['dependencies'])
+        self.assertEqual(['abc123'], self.venv_manager.released_hashes)
+
+    def test_import_without_requirements(self):
+        meta = self._import('')
+
+        self.assertIsNone(meta['venv'])
+        self.assertEqual([], self.venv_manager.requirements)
+
+    def test_import_when_venv_build_fails(self):
+        self.venv_manager.fail = True
+
+        meta = self._import('requests\n')
+
+        self.assertIsNone(meta['venv'])
+
+    def test_import_cancelled_during_analysis(self):
+        self.venv_manager.cancel = True
+
+        self.assertRaises(JobCancelledException, self._import, 'requests\n')
+
+        self.assertEqual([], list(self.service.projects_dir.iterdir()))
+        self.assertEqual([], self.service.list_projects())
+
+    def test_import_after_cancelled_import_reuses_id(self):
+        self.venv_manager.cancel = True
+        self.assertRaises(JobCancelledException, self._import, 'requests\n')
+
+        self.venv_manager.cancel = False
+        meta = self._import('requests\n')
+
+        self.assertEqual('my-tool', meta['id'])
+
+    def test_import_from_zip_cancelled_during_analysis(self):
+        self.venv_manager.cancel = True
+
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr('my_zip/requirements.txt', 'requests\n')
+            zf.writestr('my_zip/tool.py', 'print(1)\n')
+
+        self.assertRaises(JobCancelledException, self.service.import_from_zip, buffer.getvalue(), 'my_zip.zip')
+
+        self.assertEqual([], list(self.service.projects_dir.iterdir()))
+
+    def test_runner_config_uses_project_venv(self):
+        meta = self._import('requests\n')
+
+        config = self._generate_config(meta)
+
+        self.assertTrue(config['script_path'].startswith(str(Path('/venvs/abc123/bin/python')) + ' '))
+
+    def test_runner_config_uses_common_venv_without_project_venv(self):
+        meta = self._import('')
+
+        config = self._generate_config(meta)
+
+        self.assertTrue(config['script_path'].startswith(str(self.service.venv_python) + ' '))
+
+    def test_delete_project_removes_unused_venvs(self):
+        meta1 = self._import('requests\n')
+        self._import('requests\n')
+
+        self.service.delete_project(meta1['id'])
+
+        self.assertEqual({'abc123'}, self.venv_manager.used_hashes)
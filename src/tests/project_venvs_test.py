@@ -0,0 +1,219 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from venv_manager import project_venvs
+from venv_manager.project_venvs import ProjectVenvManager, get_dependencies_hash
+
+
+class TestDependenciesHash(unittest.TestCase):
+    def test_same_for_formatting_and_order(self):
+        self.assertEqual(get_dependencies_hash(['Requests >= 2.0', 'click']),
+                         get_dependencies_hash(['click', 'requests>=2.0', '']))
+
+    def test_normalize_name(self):
+        self.assertEqual(get_dependencies_hash(['python_dateutil']),
+                         get_dependencies_hash(['Python-DateUtil']))
+
+    def test_different_versions(self):
+        self.assertNotEqual(get_dependencies_hash(['requests==2.0']),
+                            get_dependencies_hash(['requests==2.1']))
+
+
+class TestProjectVenvManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ProjectVenvManager(str(self.temp_dir), base_python='base-python')
+
+        self.commands = []
+        self.failing_command = None
+
+        patcher = patch.object(project_venvs, '_run_command', side_effect=self._run_command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run_command(self, command, job):
+        self.commands.append(command)
+
+        if command[-2:] == ['venv', str(self.manager.template_dir)]:
+            self._create_fake_venv(self.manager.template_dir)
+        elif command[1:4] == ['-m', 'pip', 'install']:
+            site_packages = Path(command[0]).parent.parent / 'lib' / 'site-packages'
+            for requirement in command[7:]:
+                (site_packages / requirement).mkdir()
+
+        if self.failing_command and (self.failing_command in command):
+            raise subprocess.CalledProcessError(1, command)
+
+        return ''
+
+    @staticmethod
+    def _create_fake_venv(path):
+        (path / 'bin').mkdir(parents=True)
+        (path / 'bin' / 'python').write_text('python')
+        os.symlink('python', path / 'bin' / 'python3')
+        (path / 'bin' / 'pip').write_text('#!' + str(path / 'bin' / 'python'))
+        (path / 'lib' / 'site-packages' / 'pip').mkdir(parents=True)
+        (path / 'lib' / 'site-packages' / 'pip' / '__init__.py').write_text('')
+        (path / 'pyvenv.cfg').write_text('home = /usr/bin')
+
+    def _pip_commands(self):
+        return [command[3] for command in self.commands if command[1:3] == ['-m', 'pip']]
+
+    def test_build_env(self):
+        env_hash = self.manager.ensure_env(['requests', 'click'])
+
+        env_path = self.manager.get_env_path(env_hash)
+        self.assertEqual(env_path / 'bin' / 'python', self.manager.get_python_path(env_hash))
+        self.assertTrue((env_path / 'bin' / 'python3').is_symlink())
+        self.assertFalse((env_path / 'bin' / 'pip').exists())
+        self.assertTrue((env_path / 'lib' / 'site-packages' / 'requests').exists())
+
+        self.assertEqual(['wheel', 'install'], self._pip_commands())
+        self.assertIn('--no-index', self.commands[-1])
+
+    def test_env_populated_with_hardlinks(self):
+        env_hash = self.manager.ensure_env(['requests'])
+
+        template_file = self.manager.template_dir / 'lib' / 'site-packages' / 'pip' / '__init__.py'
+        env_file = self.manager.get_env_path(env_hash) / 'lib' / 'site-packages' / 'pip' / '__init__.py'
+        self.assertEqual(os.stat(template_file).st_ino, os.stat(env_file).st_ino)
+
+    def test_reuse_env(self):
+        env_hash1 = self.manager.ensure_env(['requests'])
+        self.commands.clear()
+
+        env_hash2 = self.manager.ensure_env(['Requests'])
+
+        self.assertEqual(env_hash1, env_hash2)
+        self.assertEqual([], self.commands)
+
+    def test_template_created_once(self):
+        self.manager.ensure_env(['requests'])
+        self.manager.ensure_env(['click'])
+
+        venv_commands = [command for command in self.commands if 'venv' in command]
+        self.assertEqual(1, len(venv_commands))
+
+    def test_failed_build(self):
+        self.failing_command = 'install'
+
+        env_hash = get_dependencies_hash(['requests'])
+        self.assertRaises(subprocess.CalledProcessError, self.manager.ensure_env, ['requests'])
+
+        self.assertIsNone(self.manager.get_python_path(env_hash))
+        self.assertFalse(self.manager.get_env_path(env_hash).exists())
+
+    def test_rebuild_incomplete_env(self):
+        env_hash = get_dependencies_hash(['requests'])
+        incomplete_path = self.manager.get_env_path(env_hash)
+        incomplete_path.mkdir(parents=True)
+        (incomplete_path / 'garbage').write_text('123')
+
+        self.manager.ensure_env(['requests'])
+
+        self.assertFalse((incomplete_path / 'garbage').exists())
+        self.assertIsNotNone(self.manager.get_python_path(env_hash))
+
+    def test_remove_unused(self):
+        env_hash1 = self.manager.ensure_env(['requests'])
+        env_hash2 = self.manager.ensure_env(['click'])
+        self.manager.release_env(env_hash1)
+        self.manager.release_env(env_hash2)
+
+        removed = self.manager.remove_unused({env_hash1})
+
+        self.assertEqual([env_hash2], removed)
+        self.assertIsNotNone(self.manager.get_python_path(env_hash1))
+        self.assertFalse(self.manager.get_env_path(env_hash2).exists())
+
+    def test_remove_unused_keeps_reserved_env(self):
+        env_hash = self.manager.ensure_env(['requests'])
+
+        removed = self.manager.remove_unused(set())
+
+        self.assertEqual([], removed)
+        self.assertIsNotNone(self.manager.get_python_path(env_hash))
+
+    def test_remove_unused_after_release(self):
+        env_hash = self.manager.ensure_env(['requests'])
+        self.manager.ensure_env(['requests'])
+
+        self.manager.release_env(env_hash)
+        self.assertEqual([], self.manager.remove_unused(set()))
+
+        self.manager.release_env(env_hash)
+        self.assertEqual([env_hash], self.manager.remove_unused(set()))
+
+    def test_remove_unused_when_failed_build(self):
+        self.failing_command = 'install'
+        env_hash = get_dependencies_hash(['requests'])
+        self.assertRaises(subprocess.CalledProcessError, self.manager.ensure_env, ['requests'])
+        self.manager.get_env_path(env_hash).mkdir(parents=True)
+
+        self.assertEqual([env_hash], self.manager.remove_unused(set()))
+
+    def test_remove_unused_skips_env_in_build(self):
+        build_started = threading.Event()
+        finish_build = threading.Event()
+        env_hash = get_dependencies_hash(['requests'])
+
+        def run_command(command, job):
+            if command[1:4] == ['-m', 'pip', 'install']:
+                build_started.set()
+                finish_build.wait(5)
+            return self._run_command(command, job)
+
+        project_venvs._run_command.side_effect = run_command
+
+        thread = threading.Thread(target=self.manager.ensure_env, args=(['requests'],))
+        thread.start()
+        try:
+            self.assertTrue(build_started.wait(5))
+
+            # reservation doesn't matter here: the env lock is taken by the build
+            self.manager._reservations.clear()
+            removed = self.manager.remove_unused(set())
+        finally:
+            finish_build.set()
+            thread.join()
+
+        self.assertEqual([], removed)
+        self.assertIsNotNone(self.manager.get_python_path(env_hash))
+
+    def test_remove_unused_while_template_created(self):
+        self.manager.ensure_env(['requests'])
+        shutil.rmtree(self.manager.template_dir)
+
+        template_started = threading.Event()
+        finish_template = threading.Event()
+
+        def run_command(command, job):
+            if command[1:3] == ['-m', 'venv']:
+                template_started.set()
+                finish_template.wait(5)
+            return self._run_command(command, job)
+
+        project_venvs._run_command.side_effect = run_command
+
+        thread = threading.Thread(target=self.manager.ensure_env, args=(['click'],))
+        thread.start()
+        try:
+            self.assertTrue(template_started.wait(5))
+
+            result = []
+            gc_thread = threading.Thread(target=lambda: result.append(self.manager.remove_unused(set())), daemon=True)
+            gc_thread.start()
+            gc_thread.join(1)
+            self.assertEqual([[]], result)
+        finally:
+            finish_template.set()
+            thread.join()
@@ -0,0 +1,80 @@
+from datetime import datetime
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from scheduling.cron import CronExpression, InvalidCronExpressionException, compile_cron
+
+
+def to_datetime(short_datetime_string):
+    return datetime.strptime(short_datetime_string, '%Y-%m-%d %H:%M')
+
+
+class TestCronNextTime(TestCase):
+    @parameterized.expand([
+        ('* * * * *', '2020-03-15 16:13', '2020-03-15 16:13'),
+        ('*/15 * * * *', '2020-03-15 16:13', '2020-03-15 16:15'),
+        ('*/15 * * * *', '2020-03-15 16:45', '2020-03-15 16:45'),
+        ('*/15 * * * *', '2020-03-15 16:46', '2020-03-15 17:00'),
+        ('5/20 * * * *', '2020-03-15 16:46', '2020-03-15 17:05'),
+        ('0 9 * * *', '2020-03-15 09:01', '2020-03-16 09:00'),
+        ('0 9 * * 1-5', '2020-03-13 09:01', '2020-03-16 09:00'),  # friday -> monday
+        ('0 9 * * mon-fri', '2020-03-14 10:00', '2020-03-16 09:00'),
+        ('30 23 31 * *', '2020-04-01 00:00', '2020-05-31 23:30'),  # April has 30 days
+        ('0 0 29 2 *', '2021-01-01 00:00', '2024-02-29 00:00'),
+        ('59 23 31 12 *', '2020-12-31 23:59', '2020-12-31 23:59'),
+        ('0 0 1 1 *', '2020-12-31 23:59', '2021-01-01 00:00'),
+        ('0 12 * jun,dec *', '2020-07-01 00:00', '2020-12-01 12:00'),
+        ('0 0 * * 0', '2020-03-16 00:00', '2020-03-22 00:00'),
+        ('0 0 * * 7', '2020-03-16 00:00', '2020-03-22 00:00'),  # 7 is sunday too
+        # restricted day of month and day of week: any of them matches
+        ('0 0 13 * fri', '2020-03-01 00:00', '2020-03-06 00:00'),
+        ('0 0 13 * fri', '2020-03-07 00:00', '2020-03-13 00:00'),
+        # day field starting with * is not restricted, so both fields should match: odd-dated mondays
+        ('0 0 */2 * mon', '2020-03-15 00:00', '2020-03-23 00:00'),
+        ('0 0 */2 * 1', '2026-01-01 00:00', '2026-01-05 00:00'),
+        ('0 0 */2 * 1', '2026-01-06 00:00', '2026-01-19 00:00'),
+        # and every second day of week (sun, tue, thu, sat) on odd days
+        ('0 0 1-31/2 * */2', '2020-03-02 00:00', '2020-03-03 00:00'),
+        ('0 0 1-31/2 * */2', '2020-03-04 00:00', '2020-03-05 00:00'),
+        ('0 0 1-31/2 * */2', '2020-03-06 00:00', '2020-03-07 00:00'),
+        ('0 0 1-31/2 * */2', '2020-03-08 00:00', '2020-03-15 00:00'),
+        ('0 8-18/4 * * *', '2020-03-15 17:00', '2020-03-16 08:00'),
+        ('0,30 10,22 * * *', '2020-03-15 10:31', '2020-03-15 22:00'),
+        ('@hourly', '2020-03-15 16:13', '2020-03-15 17:00'),
+        ('@daily', '2020-03-15 16:13', '2020-03-16 00:00'),
+        ('@weekly', '2020-03-15 16:13', '2020-03-22 00:00'),
+        ('@monthly', '2020-03-15 16:13', '2020-04-01 00:00'),
+        ('@yearly', '2020-03-15 16:13', '2021-01-01 00:00'),
+    ])
+    def test_next_time(self, expression, not_before, expected):
+        cron = CronExpression(expression)
+
+        self.assertEqual(to_datetime(expected), cron.get_next_time(to_datetime(not_before)))
+
+    def test_round_up_seconds(self):
+        cron = CronExpression('* * * * *')
+
+        self.assertEqual(to_datetime('2020-03-15 16:14'), cron.get_next_time(datetime(2020, 3, 15, 16, 13, 0, 1)))
+
+    @parameterized.expand([
+        ('',),
+        ('* * * *',),
+        ('* * * * * *',),
+        ('60 * * * *',),
+        ('* 24 * * *',),
+        ('* * 0 * *',),
+        ('* * * 13 *',),
+        ('* * * * 8',),
+        ('*/0 * * * *',),
+        ('10-5 * * * *',),
+        ('a * * * *',),
+        ('* * * abc *',),
+        ('0 0 30 2 *',),
+        ('0 0 31 4,6 *',),
+    ])
+    def test_invalid_expression(self, expression):
+        self.assertRaises(InvalidCronExpressionException, CronExpression, expression)
+
+    def test_compiled_expression_is_shared(self):
+        self.assertIs(compile_cron('0 9 * * 1-5'), compile_cron('0 9 * * 1-5'))
@@ -0,0 +1,97 @@
+import os
+import time
+import unittest
+
+from scheduling.jsonl_journal import JsonLinesJournal
+from tests import test_utils
+from utils import file_utils
+
+
+class TestJsonLinesJournal(unittest.TestCase):
+    def test_read_when_no_file(self):
+        self.assertEqual([], self.journal.read(dict))
+        self.assertEqual(0, self.journal.records_count)
+
+    def test_append_and_read(self):
+        self.journal.append([{'id': '1'}, {'id': '2', 'value': 5}])
+        self.journal.append([{'id': '3'}])
+
+        self.assertEqual(['{"id":"1"}', '{"id":"2","value":5}', '{"id":"3"}'], self.read_lines())
+        self.assertEqual(3, self.journal.records_count)
+        self.assertEqual([{'id': '1'}, {'id': '2', 'value': 5}, {'id': '3'}], self.reload().read(dict))
+
+    def test_append_nothing(self):
+        self.journal.append([])
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_read_skips_broken_records(self):
+        file_utils.write_file(self.path, '{"id":"1"}\n{"value":2}\n\n{"id":"3","va')
+
+        journal = self.reload()
+        records = journal.read(lambda record: record['id'])
+
+        self.assertEqual(['1'], records)
+        self.assertEqual(1, journal.records_count)
+
+    def test_append_after_partially_written_line(self):
+        file_utils.write_file(self.path, '{"id":"1"}\n{"id":"2","va')
+
+        journal = self.reload()
+        journal.read(dict)
+        journal.append([{'id': '3'}])
+
+        self.assertEqual([{'id': '1'}, {'id': '3'}], self.reload().read(dict))
+
+    def test_compact(self):
+        self.journal.append([{'id': '1'}, {'id': '2'}, {'id': '3'}])
+
+        self.journal.compact([{'id': '3'}])
+
+        self.assertEqual(['{"id":"3"}'], self.read_lines())
+        self.assertEqual(1, self.journal.records_count)
+
+    def test_needs_compaction(self):
+        self.journal.append([{'id': str(i)} for i in range(1000)])
+
+        self.assertTrue(self.journal.needs_compaction(499))
+        self.assertFalse(self.journal.needs_compaction(500))
+
+    def test_needs_compaction_when_few_records(self):
+        self.journal.append([{'id': str(i)} for i in range(999)])
+
+        self.assertFalse(self.journal.needs_compaction(1))
+
+    def test_background_flush(self):
+        flushed = []
+
+        journal = JsonLinesJournal(self.path, flush_interval_seconds=0.01)
+        journal.start(lambda: flushed.append(True), 'test-journal')
+        try:
+            for _ in range(100):
+                if flushed:
+                    break
+                time.sleep(0.01)
+        finally:
+            journal.stop()
+
+        self.assertTrue(flushed)
+
+    def reload(self):
+        return JsonLinesJournal(self.path, flush_interval_seconds=5)
+
+    def read_lines(self):
+        return file_utils.read_file(self.path).splitlines()
+
+    def setUp(self) -> None:
+        super().setUp()
+        test_utils.setup()
+
+        self.path = os.path.join(test_utils.temp_folder, 'test.journal')
+        self.journal = self.reload()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self.journal.stop()
+
+        test_utils.cleanup()
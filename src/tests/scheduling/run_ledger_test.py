@@ -0,0 +1,281 @@
+import os
+import unittest
+from datetime import timedelta
+
+from scheduling.run_ledger import ScheduleRunLedger, ScheduleRun, LEDGER_FILENAME, STATUS_FINISHED, STATUS_SKIPPED, \
+    STATUS_FAILED_TO_START, STATUS_CANCELLED
+from tests import test_utils
+from utils import date_utils, file_utils
+
+planned_time = date_utils.parse_iso_datetime('2020-07-24T12:30:00.000000Z')
+
+
+def create_run(schedule_id='1',
+               status=STATUS_FINISHED,
+               dispatch_lag=0.5,
+               start_lag=1.0,
+               duration=10.0,
+               exit_code=0,
+               execution_id='100'):
+    start_time = planned_time + timedelta(seconds=start_lag) if start_lag is not None else None
+    finish_time = start_time + timedelta(seconds=duration) if (start_time is not None) else None
+
+    return ScheduleRun(schedule_id,
+                       planned_time,
+                       planned_time + timedelta(seconds=dispatch_lag),
+                       status=status,
+                       execution_id=execution_id,
+                       start_time=start_time,
+                       finish_time=finish_time,
+                       exit_code=exit_code)
+
+
+class TestScheduleRun(unittest.TestCase):
+    def test_timings(self):
+        run = create_run(dispatch_lag=0.25, start_lag=2, duration=30)
+
+        self.assertEqual(0.25, run.dispatch_lag_seconds)
+        self.assertEqual(2, run.start_lag_seconds)
+        self.assertEqual(30, run.duration_seconds)
+
+    def test_timings_when_not_started(self):
+        run = create_run(status=STATUS_SKIPPED, start_lag=None, exit_code=None)
+
+        self.assertIsNone(run.start_lag_seconds)
+        self.assertIsNone(run.duration_seconds)
+
+    def test_failed(self):
+        self.assertFalse(create_run(exit_code=0).failed)
+        self.assertTrue(create_run(exit_code=1).failed)
+        self.assertTrue(create_run(status=STATUS_FAILED_TO_START, start_lag=None, exit_code=None).failed)
+        self.assertFalse(create_run(status=STATUS_SKIPPED, start_lag=None, exit_code=None).failed)
+
+    def test_as_serializable_dict(self):
+        run = create_run(dispatch_lag=0.5, start_lag=1, duration=10, exit_code=3)
+
+        self.assertEqual({
+            'execution_id': '100',
+            'status': 'finished',
+            'planned_time': '2020-07-24T12:30:00.000000Z',
+            'dispatch_time': '2020-07-24T12:30:00.500000Z',
+            'start_time': '2020-07-24T12:30:01.000000Z',
+            'finish_time': '2020-07-24T12:30:11.000000Z',
+            'exit_code': 3,
+            'dispatch_lag_seconds': 0.5,
+            'start_lag_seconds': 1.0,
+            'duration_seconds': 10.0
+        }, run.as_serializable_dict())
+
+
+class TestScheduleRunLedger(unittest.TestCase):
+    def test_get_runs_latest_first(self):
+        self.ledger.add(create_run(execution_id='1'))
+        self.ledger.add(create_run(execution_id='2'))
+        self.ledger.add(create_run(schedule_id='2', execution_id='3'))
+
+        self.assertEqual(['2', '1'], [run.execution_id for run in self.ledger.get_runs('1')])
+
+    def test_get_runs_with_limit(self):
+        for i in range(5):
+            self.ledger.add(create_run(execution_id=str(i)))
+
+        self.assertEqual(['4', '3'], [run.execution_id for run in self.ledger.get_runs('1', limit=2)])
+
+    def test_get_runs_when_unknown(self):
+        self.assertEqual([], self.ledger.get_runs('1'))
+
+    def test_retention(self):
+        ledger = ScheduleRunLedger(test_utils.temp_folder, runs_per_schedule=3)
+        for i in range(5):
+            ledger.add(create_run(execution_id=str(i)))
+
+        self.assertEqual(['4', '3', '2'], [run.execution_id for run in ledger.get_runs('1')])
+
+    def test_flush_and_load(self):
+        self.ledger.add(create_run(execution_id='1', exit_code=5))
+        self.ledger.add(create_run(status=STATUS_SKIPPED, start_lag=None, exit_code=None, execution_id=None))
+        self.ledger.flush()
+
+        runs = self.reload(['1']).get_runs('1')
+
+        self.assertEqual([STATUS_SKIPPED, STATUS_FINISHED], [run.status for run in runs])
+        self.assertEqual(create_run(execution_id='1', exit_code=5).as_serializable_dict(),
+                         runs[1].as_serializable_dict())
+        self.assertIsNone(runs[0].start_time)
+
+    def test_not_written_before_flush(self):
+        self.ledger.add(create_run())
+
+        self.assertFalse(os.path.exists(self.ledger_path))
+
+    def test_load_drops_unknown_schedules(self):
+        self.ledger.add(create_run(schedule_id='1'))
+        self.ledger.add(create_run(schedule_id='2'))
+        self.ledger.flush()
+
+        ledger = self.reload(['2'])
+
+        self.assertEqual([], ledger.get_runs('1'))
+        self.assertEqual(1, len(ledger.get_runs('2')))
+        self.assertEqual(1, len(self.read_lines()))
+
+    def test_load_applies_retention(self):
+        for i in range(5):
+            self.ledger.add(create_run(execution_id=str(i)))
+        self.ledger.flush()
+
+        ledger = ScheduleRunLedger(test_utils.temp_folder, runs_per_schedule=2)
+        ledger.load(['1'])
+
+        self.assertEqual(['4', '3'], [run.execution_id for run in ledger.get_runs('1')])
+        self.assertEqual(2, len(self.read_lines()))
+
+    def test_load_when_broken_line(self):
+        self.ledger.add(create_run())
+        self.ledger.flush()
+        with open(self.ledger_path, 'a') as file:
+            file.write('{"id":"1","sta')
+
+        self.assertEqual(1, len(self.reload(['1']).get_runs('1')))
+
+    def test_add_after_broken_line(self):
+        self.ledger.add(create_run(execution_id='1'))
+        self.ledger.flush()
+        with open(self.ledger_path, 'a') as file:
+            file.write('{"id":"1","sta')
+
+        ledger = self.reload(['1'])
+        ledger.add(create_run(execution_id='2'))
+        ledger.flush()
+
+        self.assertEqual(['2', '1'], [run.execution_id for run in self.reload(['1']).get_runs('1')])
+
+    def test_remove_schedule(self):
+        self.ledger.add(create_run(schedule_id='1'))
+        self.ledger.add(create_run(schedule_id='2'))
+        self.ledger.flush()
+
+        self.ledger.remove_schedule('1')
+        self.ledger.flush()
+
+        self.assertEqual([], self.ledger.get_runs('1'))
+        self.assertEqual([], self.reload(['1', '2']).get_runs('1'))
+
+    def test_remove_schedule_does_not_rewrite_ledger(self):
+        self.ledger.add(create_run(schedule_id='1'))
+        self.ledger.add(create_run(schedule_id='2'))
+        self.ledger.flush()
+        lines = self.read_lines()
+
+        self.ledger.remove_schedule('1')
+        self.assertEqual(lines, self.read_lines())
+
+        self.ledger.flush()
+        self.assertEqual(lines, self.read_lines()[:2])
+        self.assertEqual(3, len(self.read_lines()))
+
+    def test_load_compacts_removed_schedule(self):
+        self.ledger.add(create_run(schedule_id='1'))
+        self.ledger.add(create_run(schedule_id='2'))
+        self.ledger.remove_schedule('1')
+        self.ledger.flush()
+
+        ledger = self.reload(['1', '2'])
+
+        self.assertEqual([], ledger.get_runs('1'))
+        self.assertEqual(1, len(self.read_lines()))
+
+    def test_add_after_remove_schedule(self):
+        self.ledger.add(create_run(schedule_id='1', execution_id='1'))
+        self.ledger.remove_schedule('1')
+        self.ledger.add(create_run(schedule_id='1', execution_id='2'))
+        self.ledger.flush()
+
+        self.assertEqual(['2'], [run.execution_id for run in self.ledger.get_runs('1')])
+        self.assertEqual(['2'], [run.execution_id for run in self.reload(['1']).get_runs('1')])
+
+    def test_compaction_drops_removed_schedules(self):
+        ledger = ScheduleRunLedger(test_utils.temp_folder, runs_per_schedule=1000)
+        for i in range(600):
+            ledger.add(create_run(schedule_id='1', execution_id=str(i)))
+            ledger.add(create_run(schedule_id='2', execution_id=str(i)))
+        ledger.flush()
+
+        ledger.remove_schedule('1')
+        ledger.flush()
+
+        self.assertEqual(600, len(self.read_lines()))
+        self.assertEqual([], self.reload(['1', '2']).get_runs('1'))
+
+    def test_remove_schedule_when_pending(self):
+        self.ledger.add(create_run(schedule_id='1'))
+        self.ledger.add(create_run(schedule_id='2'))
+
+        self.ledger.remove_schedule('1')
+        self.ledger.flush()
+
+        ledger = self.reload(['1', '2'])
+        self.assertEqual([], ledger.get_runs('1'))
+        self.assertEqual(1, len(ledger.get_runs('2')))
+
+    def test_compaction_when_many_records(self):
+        ledger = ScheduleRunLedger(test_utils.temp_folder, runs_per_schedule=10)
+        for i in range(1500):
+            ledger.add(create_run(execution_id=str(i)))
+            ledger.flush()
+
+        self.assertLess(len(self.read_lines()), 1000)
+        self.assertEqual(['1499', '1498'], [run.execution_id for run in self.reload(['1']).get_runs('1', 2)])
+
+    def test_stop_flushes_pending(self):
+        self.ledger.start()
+        self.ledger.add(create_run())
+
+        self.ledger.stop()
+
+        self.assertEqual(1, len(self.reload(['1']).get_runs('1')))
+
+    def test_stats(self):
+        for i in range(1, 21):
+            self.ledger.add(create_run(dispatch_lag=i / 10, start_lag=i, duration=i * 10, exit_code=i % 10))
+        self.ledger.add(create_run(status=STATUS_SKIPPED, dispatch_lag=0.1, start_lag=None, exit_code=None))
+        self.ledger.add(create_run(status=STATUS_FAILED_TO_START, dispatch_lag=0.1, start_lag=None, exit_code=None))
+        self.ledger.add(create_run(status=STATUS_CANCELLED, dispatch_lag=0.1, start_lag=None, exit_code=None))
+
+        stats = self.ledger.get_stats('1')
+
+        self.assertEqual(23, stats['runs'])
+        self.assertEqual(20, stats['finished'])
+        self.assertEqual(19, stats['failed'])
+        self.assertEqual(1, stats['skipped'])
+        self.assertEqual(1, stats['cancelled'])
+        self.assertEqual({'p50': 10.0, 'p95': 19.0, 'max': 20.0}, stats['start_lag_seconds'])
+        self.assertEqual({'p50': 100.0, 'p95': 190.0, 'max': 200.0}, stats['duration_seconds'])
+        self.assertEqual({'p50': 0.9, 'p95': 1.9, 'max': 2.0}, stats['dispatch_lag_seconds'])
+
+    def test_stats_when_no_runs(self):
+        stats = self.ledger.get_stats('1')
+
+        self.assertEqual(0, stats['runs'])
+        self.assertEqual({'p50': None, 'p95': None, 'max': None}, stats['duration_seconds'])
+
+    def reload(self, schedule_ids):
+        ledger = ScheduleRunLedger(test_utils.temp_folder)
+        ledger.load(schedule_ids)
+        return ledger
+
+    def read_lines(self):
+        return file_utils.read_file(self.ledger_path).splitlines()
+
+    def setUp(self) -> None:
+        super().setUp()
+        test_utils.setup()
+
+        self.ledger = ScheduleRunLedger(test_utils.temp_folder)
+        self.ledger_path = os.path.join(test_utils.temp_folder, LEDGER_FILENAME)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self.ledger.stop()
+
+        test_utils.cleanup()
@@ -0,0 +1,167 @@
+import os
+import time
+import unittest
+
+from scheduling.run_state_journal import RunStateJournal, RunState, JOURNAL_FILENAME
+from tests import test_utils
+from utils import date_utils, file_utils
+
+time_1 = date_utils.parse_iso_datetime('2020-07-24T12:30:59.000000Z')
+time_2 = date_utils.parse_iso_datetime('2020-07-25T12:30:59.000000Z')
+
+
+class TestRunStateJournal(unittest.TestCase):
+    def test_load_when_no_file(self):
+        self.assertEqual({}, self.journal.load())
+
+    def test_record_and_flush(self):
+        self.journal.record('1', 5, time_1)
+        self.journal.flush()
+
+        self.assertEqual({'1': RunState(5, time_1)}, self.reload())
+
+    def test_record_without_flush(self):
+        self.journal.record('1', 5, time_1)
+
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_record_without_last_execution_time(self):
+        self.journal.record('1', 0, None)
+        self.journal.flush()
+
+        self.assertEqual({'1': RunState(0, None)}, self.reload())
+
+    def test_batch_keeps_latest_state(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.record('1', 2, time_2)
+        self.journal.record('2', 7, time_1)
+        self.journal.flush()
+
+        self.assertEqual(2, len(self.read_lines()))
+        self.assertEqual({'1': RunState(2, time_2), '2': RunState(7, time_1)}, self.reload())
+
+    def test_multiple_batches(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.flush()
+        self.journal.record('1', 2, time_2)
+        self.journal.flush()
+
+        self.assertEqual(2, len(self.read_lines()))
+        self.assertEqual({'1': RunState(2, time_2)}, self.reload())
+
+    def test_reset_when_pending(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.reset('1')
+        self.journal.flush()
+
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_reset_when_written(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.flush()
+
+        self.journal.reset('1')
+
+        self.assertEqual({}, self.reload())
+
+    def test_record_after_reset(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.flush()
+        self.journal.reset('1')
+
+        self.journal.record('1', 2, time_2)
+        self.journal.flush()
+
+        self.assertEqual({'1': RunState(2, time_2)}, self.reload())
+
+    def test_load_when_broken_line(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.flush()
+        with open(self.journal_path, 'a') as file:
+            file.write('{"id":"2","executions_cou')
+
+        self.assertEqual({'1': RunState(1, time_1)}, self.reload())
+
+    def test_record_after_broken_line(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.flush()
+        with open(self.journal_path, 'a') as file:
+            file.write('{"id":"2","executions_cou')
+
+        journal = RunStateJournal(test_utils.temp_folder)
+        journal.load()
+        journal.record('3', 3, time_2)
+        journal.flush()
+
+        self.assertEqual({'1': RunState(1, time_1), '3': RunState(3, time_2)}, self.reload())
+
+    def test_retain(self):
+        self.journal.record('1', 1, time_1)
+        self.journal.record('2', 2, time_2)
+        self.journal.flush()
+
+        self.journal.retain(['2'])
+
+        self.assertEqual(1, len(self.read_lines()))
+        self.assertEqual({'2': RunState(2, time_2)}, self.reload())
+
+    def test_retain_compacts_obsolete_records(self):
+        for i in range(5):
+            self.journal.record('1', i, time_1)
+            self.journal.flush()
+
+        self.journal.load()
+        self.journal.retain(['1'])
+
+        self.assertEqual(1, len(self.read_lines()))
+        self.assertEqual({'1': RunState(4, time_1)}, self.reload())
+
+    def test_compaction_when_many_records(self):
+        for i in range(1500):
+            self.journal.record('1', i, time_1)
+            self.journal.flush()
+
+        self.assertLess(len(self.read_lines()), 1000)
+        self.assertEqual({'1': RunState(1499, time_1)}, self.reload())
+
+    def test_background_flush(self):
+        journal = RunStateJournal(test_utils.temp_folder, flush_interval_seconds=0.01)
+        journal.start()
+        try:
+            journal.record('1', 3, time_1)
+
+            for _ in range(100):
+                if os.path.exists(self.journal_path):
+                    break
+                time.sleep(0.01)
+        finally:
+            journal.stop()
+
+        self.assertEqual({'1': RunState(3, time_1)}, self.reload())
+
+    def test_stop_flushes_pending(self):
+        self.journal.start()
+        self.journal.record('1', 3, time_1)
+
+        self.journal.stop()
+
+        self.assertEqual({'1': RunState(3, time_1)}, self.reload())
+
+    def reload(self):
+        return RunStateJournal(test_utils.temp_folder).load()
+
+    def read_lines(self):
+        return file_utils.read_file(self.journal_path).splitlines()
+
+    def setUp(self) -> None:
+        super().setUp()
+        test_utils.setup()
+
+        self.journal = RunStateJournal(test_utils.temp_folder)
+        self.journal_path = os.path.join(test_utils.temp_folder, JOURNAL_FILENAME)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self.journal.stop()
+
+        test_utils.cleanup()
@@ -2,7 +2,7 @@ from unittest import TestCase
 
 from parameterized import parameterized
 
-from scheduling.schedule_config import ScheduleConfig
+from scheduling.schedule_config import ScheduleConfig, InvalidScheduleException, read_schedule_config
 from utils import date_utils
 
 
@@ -58,6 +58,9 @@ class TestGetNextTime(TestCase):
         ('2020-08-18 11:30', '2020-03-15 16:13', 5, 'months', '2021-01-15 16:13'),
         ('2021-01-18 11:30', '2020-03-15 16:13', 5, 'months', '2021-06-15 16:13'),
         ('2020-03-16 11:30', '2020-03-15 16:13', 13, 'months', '2021-04-15 16:13'),
+        # month lengths are not approximated
+        ('2022-04-27 20:57', '2020-04-29 04:50', 2, 'months', '2022-04-29 04:50'),
+        ('2022-06-29 08:31', '2020-07-16 04:55', 1, 'months', '2022-07-16 04:55'),
         ('2020-03-19 11:30', '2020-03-15 16:13', 1, 'weeks', '2020-03-20 16:13', ['monday', 'friday']),
         ('2020-03-15 11:30', '2020-03-15 16:13', 1, 'weeks', '2020-03-16 16:13', ['monday', 'friday']),
         ('2020-03-16 11:30', '2020-03-15 16:13', 1, 'weeks', '2020-03-16 16:13', ['monday', 'friday']),
@@ -128,3 +131,394 @@ class TestGetNextTime(TestCase):
         super().tearDown()
 
         date_utils._mocked_now = None
+
+
+class TestGetNextTimeInTimezone(TestCase):
+    @parameterized.expand([
+        # 09:00 in Berlin: CET (+1) before 2020-03-29, CEST (+2) after
+        ('2020-03-27 10:00', '2020-03-20 08:00', 1, 'days', '2020-03-28 08:00', None),
+        ('2020-03-28 10:00', '2020-03-20 08:00', 1, 'days', '2020-03-29 07:00', None),
+        ('2020-03-30 08:00', '2020-03-20 08:00', 1, 'days', '2020-03-31 07:00', None),
+        ('2020-03-30 08:00', '2020-03-20 08:00', 1, 'weeks', '2020-04-03 07:00', ['friday']),
+        ('2020-10-20 08:00', '2020-03-20 08:00', 1, 'months', '2020-11-20 08:00', None),
+        ('2020-05-01 00:00', '2020-03-20 08:00', 1, 'months', '2020-05-20 07:00', None),
+        # elapsed time units are not affected by DST
+        ('2020-03-29 10:00', '2020-03-20 08:00', 24, 'hours', '2020-03-30 08:00', None),
+    ])
+    def test_berlin_dst(self, now_dt, start, period, unit, expected, weekdays):
+        date_utils._mocked_now = to_datetime(now_dt)
+
+        config = self._create_config(start, period, unit, 'Europe/Berlin', weekdays)
+
+        self.assertEqual(to_datetime(expected), config.get_next_time())
+
+    def test_non_existing_local_time(self):
+        # 02:30 doesn't exist in New York on 2020-03-08, it's shifted to 03:30 EDT
+        date_utils._mocked_now = to_datetime('2020-03-08 05:00')
+
+        config = self._create_config('2020-03-07 07:30', 1, 'days', 'America/New_York')
+
+        self.assertEqual(to_datetime('2020-03-08 07:30'), config.get_next_time())
+        self.assertEqual(to_datetime('2020-03-09 06:30'), config.get_next_time(to_datetime('2020-03-08 07:31')))
+
+    def test_ambiguous_local_time(self):
+        # 01:30 happens twice in New York on 2020-11-01, the first one (EDT) is used
+        date_utils._mocked_now = to_datetime('2020-11-01 00:00')
+
+        config = self._create_config('2020-10-31 05:30', 1, 'days', 'America/New_York')
+
+        self.assertEqual(to_datetime('2020-11-01 05:30'), config.get_next_time())
+
+    @staticmethod
+    def _create_config(start, period, unit, timezone, weekdays=None):
+        config = ScheduleConfig(True, to_datetime(start))
+        config.repeat_period = period
+        config.repeat_unit = unit
+        config.weekdays = weekdays
+        config.timezone = timezone
+        return config
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        date_utils._mocked_now = None
+
+
+class TestGetNextTimes(TestCase):
+    def test_repeatable(self):
+        config = self._create_config('2020-03-15 16:13', 2, 'days')
+
+        next_times = config.get_next_times(3, to_datetime('2020-03-18 12:00'))
+
+        self.assertEqual([to_datetime('2020-03-19 16:13'),
+                          to_datetime('2020-03-21 16:13'),
+                          to_datetime('2020-03-23 16:13')],
+                         next_times)
+
+    def test_weekdays(self):
+        config = self._create_config('2020-03-15 16:13', 1, 'weeks', weekdays=['monday', 'friday'])
+
+        next_times = config.get_next_times(4, to_datetime('2020-03-15 12:00'))
+
+        self.assertEqual([to_datetime('2020-03-16 16:13'),
+                          to_datetime('2020-03-20 16:13'),
+                          to_datetime('2020-03-23 16:13'),
+                          to_datetime('2020-03-27 16:13')],
+                         next_times)
+
+    def test_when_end_datetime(self):
+        config = self._create_config('2020-03-15 16:13', 1, 'days')
+        config.end_option = 'end_datetime'
+        config.end_arg = to_datetime('2020-03-17 16:13')
+
+        next_times = config.get_next_times(5, to_datetime('2020-03-15 12:00'))
+
+        self.assertEqual([to_datetime('2020-03-15 16:13'),
+                          to_datetime('2020-03-16 16:13'),
+                          to_datetime('2020-03-17 16:13')],
+                         next_times)
+
+    def test_when_max_executions(self):
+        config = self._create_config('2020-03-15 16:13', 1, 'hours')
+        config.end_option = 'max_executions'
+        config.end_arg = 5
+        config.executions_count = 3
+
+        next_times = config.get_next_times(5, to_datetime('2020-03-16 12:00'))
+
+        self.assertEqual([to_datetime('2020-03-16 12:13'), to_datetime('2020-03-16 13:13')], next_times)
+
+    def test_one_time(self):
+        config = ScheduleConfig(False, to_datetime('2020-03-15 16:13'))
+
+        self.assertEqual([to_datetime('2020-03-15 16:13')], config.get_next_times(5, to_datetime('2020-03-15 12:00')))
+        self.assertEqual([], config.get_next_times(5, to_datetime('2020-03-15 17:00')))
+
+    def test_iterate_far_in_future(self):
+        config = self._create_config('2020-03-15 16:13', 1, 'minutes')
+
+        next_times = config.get_next_times(2, to_datetime('2120-03-15 16:13'))
+
+        self.assertEqual([to_datetime('2120-03-15 16:13'), to_datetime('2120-03-15 16:14')], next_times)
+
+    @staticmethod
+    def _create_config(start, period, unit, weekdays=None):
+        config = ScheduleConfig(True, to_datetime(start))
+        config.repeat_period = period
+        config.repeat_unit = unit
+        config.weekdays = weekdays
+        config.executions_count = 0
+        return config
+
+
+class TestMissedTimes(TestCase):
+    def test_missed_times(self):
+        config = self._create_config(last_execution='2020-03-15 16:13')
+
+        missed_times = config.get_missed_times(to_datetime('2020-03-15 19:30'), 10)
+
+        self.assertEqual([to_datetime('2020-03-15 17:13'),
+                          to_datetime('2020-03-15 18:13'),
+                          to_datetime('2020-03-15 19:13')],
+                         missed_times)
+
+    def test_missed_times_when_limit(self):
+        config = self._create_config(last_execution='2020-03-15 16:13')
+
+        missed_times = config.get_missed_times(to_datetime('2020-03-16 19:30'), 2)
+
+        self.assertEqual([to_datetime('2020-03-15 17:13'), to_datetime('2020-03-15 18:13')], missed_times)
+
+    def test_missed_times_when_nothing_missed(self):
+        config = self._create_config(last_execution='2020-03-15 16:13')
+
+        self.assertEqual([], config.get_missed_times(to_datetime('2020-03-15 17:00'), 10))
+
+    def test_missed_times_when_never_executed(self):
+        config = self._create_config(last_execution=None)
+
+        self.assertEqual([], config.get_missed_times(to_datetime('2020-03-16 17:00'), 10))
+
+    def test_missed_times_when_max_executions(self):
+        config = self._create_config(last_execution='2020-03-15 16:13')
+        config.executions_count = 3
+        config.end_option = 'max_executions'
+        config.end_arg = 4
+
+        missed_times = config.get_missed_times(to_datetime('2020-03-15 19:30'), 10)
+
+        self.assertEqual([to_datetime('2020-03-15 17:13')], missed_times)
+
+    def test_missed_times_when_one_time(self):
+        config = ScheduleConfig(False, to_datetime('2020-03-15 16:13'))
+
+        self.assertEqual([], config.get_missed_times(to_datetime('2020-03-16 17:00'), 10))
+
+    @parameterized.expand([
+        ('skip', None, 0),
+        ('run_once', None, 1),
+        ('run_all', 2, 2),
+        ('run_all', 10, 3),
+        ('run_all', None, 3),
+    ])
+    def test_catch_up_count(self, misfire_policy, misfire_limit, expected_count):
+        config = self._create_config(last_execution='2020-03-15 16:13')
+        config.misfire_policy = misfire_policy
+        config.misfire_limit = misfire_limit
+
+        self.assertEqual(expected_count, config.get_catch_up_count(to_datetime('2020-03-15 19:30')))
+
+    @staticmethod
+    def _create_config(last_execution):
+        config = ScheduleConfig(True, to_datetime('2020-03-15 12:13'))
+        config.repeat_period = 1
+        config.repeat_unit = 'hours'
+        config.executions_count = 5
+        if last_execution:
+            config.last_execution_time = to_datetime(last_execution)
+        return config
+
+
+class TestReadScheduleConfig(TestCase):
+    def test_timezone(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'timezone': 'Europe/Berlin'})
+
+        self.assertEqual('Europe/Berlin', config.timezone)
+        self.assertEqual('Europe/Berlin', config.as_serializable_dict()['timezone'])
+
+    def test_without_timezone(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days'})
+
+        self.assertIsNone(config.timezone)
+        self.assertNotIn('timezone', config.as_serializable_dict())
+
+    def test_unknown_timezone(self):
+        self.assertRaisesRegex(InvalidScheduleException, 'Unknown timezone', read_schedule_config, {
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'timezone': 'Mars/Olympus'})
+
+    def test_overlap_policy(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'overlap_policy': 'Skip'})
+
+        self.assertEqual('skip', config.overlap_policy)
+        self.assertEqual('skip', config.as_serializable_dict()['overlap_policy'])
+
+    def test_without_overlap_policy(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days'})
+
+        self.assertEqual('allow', config.overlap_policy)
+        self.assertNotIn('overlap_policy', config.as_serializable_dict())
+
+    def test_jitter_seconds(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'jitter_seconds': '300'})
+
+        self.assertEqual(300, config.jitter_seconds)
+        self.assertEqual(300, config.as_serializable_dict()['jitter_seconds'])
+
+    def test_without_jitter_seconds(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days'})
+
+        self.assertIsNone(config.jitter_seconds)
+        self.assertNotIn('jitter_seconds', config.as_serializable_dict())
+
+    def test_negative_jitter_seconds(self):
+        self.assertRaisesRegex(InvalidScheduleException, 'jitter_seconds', read_schedule_config, {
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'jitter_seconds': -1})
+
+    def test_misfire_policy(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'misfire_policy': 'run_once'})
+
+        self.assertEqual('run_once', config.misfire_policy)
+        self.assertIsNone(config.misfire_limit)
+        self.assertEqual('run_once', config.as_serializable_dict()['misfire_policy'])
+
+    def test_misfire_policy_run_all(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'misfire_policy': 'run_all',
+            'misfire_limit': 3})
+
+        self.assertEqual('run_all', config.misfire_policy)
+        self.assertEqual(3, config.misfire_limit)
+        self.assertEqual(3, config.as_serializable_dict()['misfire_limit'])
+
+    def test_misfire_policy_run_all_default_limit(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'misfire_policy': 'run_all'})
+
+        self.assertEqual(10, config.misfire_limit)
+
+    def test_without_misfire_policy(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days'})
+
+        self.assertEqual('skip', config.misfire_policy)
+        self.assertNotIn('misfire_policy', config.as_serializable_dict())
+
+    def test_unknown_misfire_policy(self):
+        self.assertRaisesRegex(InvalidScheduleException, 'misfire_policy', read_schedule_config, {
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'misfire_policy': 'run_twice'})
+
+    def test_zero_misfire_limit(self):
+        self.assertRaisesRegex(InvalidScheduleException, 'misfire_limit', read_schedule_config, {
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'misfire_policy': 'run_all',
+            'misfire_limit': 0})
+
+    def test_unknown_overlap_policy(self):
+        self.assertRaisesRegex(InvalidScheduleException, 'overlap_policy', read_schedule_config, {
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'repeat_unit': 'days',
+            'overlap_policy': 'restart'})
+
+
+class TestCronSchedule(TestCase):
+    def test_next_time(self):
+        date_utils._mocked_now = to_datetime('2020-03-13 09:01')
+
+        config = self._create_config('2020-03-01 00:00', '0 9 * * 1-5')
+
+        self.assertEqual(to_datetime('2020-03-16 09:00'), config.get_next_time())
+
+    def test_not_before_start(self):
+        date_utils._mocked_now = to_datetime('2020-03-01 00:00')
+
+        config = self._create_config('2020-03-10 12:00', '0 * * * *')
+
+        self.assertEqual(to_datetime('2020-03-10 12:00'), config.get_next_time())
+
+    def test_timezone(self):
+        # 09:00 in Berlin: CET (+1) before 2020-03-29, CEST (+2) after
+        config = self._create_config('2020-03-01 00:00', '0 9 * * *', 'Europe/Berlin')
+
+        next_times = config.get_next_times(3, to_datetime('2020-03-27 12:00'))
+
+        self.assertEqual([to_datetime('2020-03-28 08:00'),
+                          to_datetime('2020-03-29 07:00'),
+                          to_datetime('2020-03-30 07:00')],
+                         next_times)
+
+    def test_repeated_local_hour(self):
+        # 01:00-01:59 happens twice in New York on 2020-11-01, each local time is executed once
+        config = self._create_config('2020-10-01 00:00', '*/30 * * * *', 'America/New_York')
+
+        next_times = config.get_next_times(4, to_datetime('2020-11-01 04:45'))
+
+        self.assertEqual([to_datetime('2020-11-01 05:00'),
+                          to_datetime('2020-11-01 05:30'),
+                          to_datetime('2020-11-01 07:00'),
+                          to_datetime('2020-11-01 07:30')],
+                         next_times)
+
+    def test_read_config(self):
+        config = read_schedule_config({
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'cron_expression': ' 0  9 * * 1-5 ',
+            'timezone': 'Europe/Berlin'})
+
+        self.assertEqual('0 9 * * 1-5', config.cron_expression)
+        self.assertIsNone(config.repeat_unit)
+        self.assertEqual('0 9 * * 1-5', config.as_serializable_dict()['cron_expression'])
+
+    def test_read_config_when_invalid(self):
+        self.assertRaisesRegex(InvalidScheduleException, 'should have 5 fields', read_schedule_config, {
+            'repeatable': True,
+            'start_datetime': '2020-03-15T16:13:00.000000Z',
+            'cron_expression': '0 9 * *'})
+
+    @staticmethod
+    def _create_config(start, cron_expression, timezone=None):
+        config = ScheduleConfig(True, to_datetime(start))
+        config.cron_expression = cron_expression
+        config.timezone = timezone
+        config.executions_count = 0
+        return config
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        date_utils._mocked_now = None
@@ -8,9 +8,12 @@ from unittest.mock import patch, ANY, MagicMock
 
 from auth.user import User
 from config.config_service import ConfigService
-from scheduling import scheduler
-from scheduling.schedule_config import ScheduleConfig, InvalidScheduleException
-from scheduling.schedule_service import ScheduleService, InvalidUserException, UnavailableScriptException
+from scheduling.run_ledger import STATUS_FINISHED, STATUS_CANCELLED, STATUS_FAILED_TO_START, STATUS_SKIPPED
+from scheduling.schedule_config import ScheduleConfig, InvalidScheduleException, OVERLAP_ALLOW, OVERLAP_SKIP, \
+    OVERLAP_QUEUE, OVERLAP_KILL
+from scheduling.schedule_service import ScheduleService, InvalidUserException, UnavailableScriptException, \
+    get_dispatch_offset
+from scheduling.scheduler import Scheduler
 from scheduling.scheduling_job import SchedulingJob
 from tests import test_utils
 from tests.test_utils import AnyUserAuthorizer
@@ -22,7 +25,7 @@ mocked_now_epoch = mocked_now.timestamp()
 
 class ScheduleServiceTestCase(TestCase):
     def assert_schedule_calls(self, expected_job_path_time_tuples):
-        self.assertEqual(len(expected_job_path_time_tuples), len(self.scheduler_mock.enterabs.call_args_list))
+        self.assertEqual(len(expected_job_path_time_tuples), len(self.schedule_mock.call_args_list))
 
         for i, expected_tuple in enumerate(expected_job_path_time_tuples):
             expected_job = expected_tuple[0]
@@ -30,13 +33,13 @@ class ScheduleServiceTestCase(TestCase):
             expected_time = date_utils.sec_to_datetime(expected_tuple[2])
 
             # the first item of call_args is actual arguments, passed to the method
-            args = self.scheduler_mock.enterabs.call_args_list[i][0]
+            args = self.schedule_mock.call_args_list[i][0]
 
-            # we schedule job as enterabs(expected_time, priority, self._execute_job, (job, job_path))
-            schedule_method_args_tuple = args[3]
+            # we schedule job as schedule(expected_datetime, self._execute_job, (job, job_path, ...))
+            schedule_method_args_tuple = args[2]
             actual_job_arg = schedule_method_args_tuple[0]
             actual_job_path_arg = schedule_method_args_tuple[1]
-            actual_time = date_utils.sec_to_datetime(args[0])
+            actual_time = date_utils.sec_to_datetime(args[0].timestamp())
 
             self.assertEqual(expected_job_path, actual_job_path_arg)
             self.assertEqual(expected_time, actual_time)
@@ -53,12 +56,8 @@ class ScheduleServiceTestCase(TestCase):
         super().setUp()
         test_utils.setup()
 
-        self.patcher = patch('sched.scheduler')
-        self.scheduler_mock = MagicMock()
-        self.patcher.start().return_value = self.scheduler_mock
-
-        scheduler._sleep = MagicMock()
-        scheduler._sleep.side_effect = lambda x: time.sleep(0.001)
+        self.patcher = patch.object(Scheduler, 'schedule')
+        self.schedule_mock = self.patcher.start()
 
         self.config_service = ConfigService(
             AnyUserAuthorizer(),
@@ -101,8 +100,6 @@ class ScheduleServiceTestCase(TestCase):
 
         self.schedule_service.stop()
 
-        scheduler._sleep = time.sleep
-
         self.patcher.stop()
 
 
@@ -186,6 +183,18 @@ class TestScheduleServiceCreateJob(ScheduleServiceTestCase):
 
         self.assert_schedule_calls([(job_prototype, get_job_path(job_prototype), mocked_now_epoch + 1468703)])
 
+    def test_create_job_when_cron(self):
+        job_prototype = create_job(id='1', repeatable=True)
+        job_prototype.schedule.repeat_unit = None
+        job_prototype.schedule.repeat_period = None
+        job_prototype.schedule.weekdays = None
+        job_prototype.schedule.cron_expression = '0 */6 * * *'
+
+        self.call_create_job(job_prototype)
+
+        # mocked now is 12:30:59, the next run is at 18:00
+        self.assert_schedule_calls([(job_prototype, get_job_path(job_prototype), mocked_now_epoch + 19741)])
+
     def test_create_job_when_ui_values_mapping(self):
         job_prototype = create_job(
             id='1',
@@ -280,26 +289,186 @@ class TestScheduleServiceInit(ScheduleServiceTestCase):
         ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
         self.assert_schedule_calls([(job, job_path, mocked_now_epoch + 1468800)])
 
-    def test_scheduler_runner(self):
-        original_runs_count = self.scheduler_mock.run.call_count
-        time.sleep(0.1)
-        step1_runs_count = self.scheduler_mock.run.call_count
 
-        self.assertGreater(step1_runs_count, original_runs_count)
+class TestScheduleServiceJitter(ScheduleServiceTestCase):
+    def test_dispatch_offset_is_deterministic(self):
+        self.assertEqual(get_dispatch_offset('15', 600), get_dispatch_offset('15', 600))
 
-        time.sleep(0.1)
-        step2_runs_count = self.scheduler_mock.run.call_count
-        self.assertGreater(step2_runs_count, step1_runs_count)
+    def test_dispatch_offset_within_window(self):
+        for job_id in range(1000):
+            offset = get_dispatch_offset(job_id, 60)
+            self.assertGreaterEqual(offset, timedelta(0))
+            self.assertLess(offset, timedelta(seconds=60))
+
+    def test_dispatch_offset_spreads_jobs(self):
+        offsets = [get_dispatch_offset(job_id, 60).total_seconds() for job_id in range(1000)]
+
+        # every 10 seconds bucket gets roughly 1/6 of the jobs
+        for bucket_start in range(0, 60, 10):
+            bucket_size = len([o for o in offsets if bucket_start <= o < bucket_start + 10])
+            self.assertGreater(bucket_size, 100)
+
+    def test_dispatch_offset_without_jitter(self):
+        self.assertEqual(timedelta(0), get_dispatch_offset('15', 0))
+
+    def test_schedule_with_job_jitter(self):
+        job = self._create_job(jitter_seconds=600)
+
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service.schedule_job(job, job_path)
+
+        expected_offset = get_dispatch_offset(job.id, 600)
+        self.assertEqual(mocked_now + timedelta(minutes=30) + expected_offset, self._get_scheduled_time())
+
+    def test_schedule_with_default_jitter(self):
+        schedule_service = ScheduleService(
+            self.config_service, self.execution_service, test_utils.temp_folder, default_jitter_seconds=600)
+        job = self._create_job()
+
+        job_path = schedule_service.save_job(job)
+        schedule_service.schedule_job(job, job_path)
+
+        expected_offset = get_dispatch_offset(job.id, 600)
+        self.assertEqual(mocked_now + timedelta(minutes=30) + expected_offset, self._get_scheduled_time())
+
+    def test_schedule_when_job_disables_default_jitter(self):
+        schedule_service = ScheduleService(
+            self.config_service, self.execution_service, test_utils.temp_folder, default_jitter_seconds=600)
+        job = self._create_job(jitter_seconds=0)
+
+        job_path = schedule_service.save_job(job)
+        schedule_service.schedule_job(job, job_path)
+
+        self.assertEqual(mocked_now + timedelta(minutes=30), self._get_scheduled_time())
+
+    def test_schedule_when_nominal_time_passed_but_offset_not(self):
+        job = self._create_job(jitter_seconds=3600)
+        expected_offset = get_dispatch_offset(job.id, 3600)
+        # the nominal time (now - 30 minutes + 1 hour steps) passed, but the jittered one didn't
+        job.schedule.start_datetime = mocked_now - expected_offset + timedelta(seconds=1)
+
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service.schedule_job(job, job_path)
+
+        self.assertEqual(mocked_now + timedelta(seconds=1), self._get_scheduled_time())
+
+    def test_schedule_one_time_without_jitter(self):
+        job = create_job(id=1, repeatable=False, start_datetime=mocked_now + timedelta(minutes=5))
+        job.schedule.jitter_seconds = 600
+
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service.schedule_job(job, job_path)
+
+        self.assertEqual(mocked_now + timedelta(minutes=5), self._get_scheduled_time())
+
+    def test_get_planned_time(self):
+        job = self._create_job()
+        job_path = self.schedule_service.save_job(job)
+
+        with patch.object(Scheduler, 'get_planned_time', return_value=mocked_now) as get_planned_time_mock:
+            self.assertEqual(mocked_now, self.schedule_service.get_planned_time(job))
+            get_planned_time_mock.assert_called_once_with(job_path)
+
+    def test_get_planned_time_when_unknown_job(self):
+        self.assertIsNone(self.schedule_service.get_planned_time(self._create_job()))
+
+    @staticmethod
+    def _create_job(jitter_seconds=None):
+        job = create_job(id=12,
+                         repeatable=True,
+                         start_datetime=mocked_now + timedelta(minutes=30),
+                         repeat_unit='hours',
+                         repeat_period=1)
+        job.schedule.jitter_seconds = jitter_seconds
+        return job
+
+    def _get_scheduled_time(self):
+        return self.schedule_mock.call_args[0][0]
 
-    def test_scheduler_runner_when_stopped(self):
-        self.schedule_service.stop()
-        time.sleep(0.1)
-        original_runs_count = self.scheduler_mock.run.call_count
 
-        time.sleep(0.1)
+class TestScheduleServiceMisfire(ScheduleServiceTestCase):
+    def test_restore_when_skip(self):
+        job = self._create_job('skip')
+        job_path = save_job(job)
+
+        ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+
+        self.assert_schedule_calls([(job, job_path, mocked_now_epoch + 3541)])
+
+    def test_restore_when_run_once(self):
+        job = self._create_job('run_once')
+        save_job(job)
+
+        ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+
+        self.assertEqual(1, len(self.schedule_mock.call_args_list))
+        self.assertEqual(mocked_now, self._get_scheduled_time())
+        self.assertEqual(0, self._get_scheduled_params()[2])
+
+    def test_restore_when_run_all(self):
+        job = self._create_job('run_all', misfire_limit=10)
+        save_job(job)
+
+        ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+
+        # 3 missed executions: 10:30, 11:30, 12:30
+        self.assertEqual(mocked_now, self._get_scheduled_time())
+        self.assertEqual(2, self._get_scheduled_params()[2])
+
+    def test_restore_when_run_all_limited(self):
+        job = self._create_job('run_all', misfire_limit=2)
+        save_job(job)
 
-        final_runs_count = self.scheduler_mock.run.call_count
-        self.assertEqual(final_runs_count, original_runs_count)
+        ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+
+        self.assertEqual(1, self._get_scheduled_params()[2])
+
+    def test_restore_when_disabled(self):
+        job = self._create_job('run_all', misfire_limit=10)
+        job.enabled = False
+        save_job(job)
+
+        ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+
+        self.assert_schedule_calls([])
+
+    def test_execute_catch_up_schedules_next_catch_up(self):
+        job = self._create_job('run_all', misfire_limit=10)
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service._execute_job(job, job_path, 2)
+
+        self.assertEqual(1, self.execution_service.start_script.call_count)
+        self.assertEqual(mocked_now, self._get_scheduled_time())
+        self.assertEqual(1, self._get_scheduled_params()[2])
+
+    def test_execute_last_catch_up_schedules_regular_execution(self):
+        job = self._create_job('run_all', misfire_limit=10)
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service._execute_job(job, job_path, 0)
+
+        self.assertEqual(1, self.execution_service.start_script.call_count)
+        self.assert_schedule_calls([(job, job_path, mocked_now_epoch + 3541)])
+
+    @staticmethod
+    def _create_job(misfire_policy, misfire_limit=None):
+        job = create_job(id=1,
+                         repeatable=True,
+                         start_datetime=mocked_now - timedelta(days=1, seconds=59),
+                         repeat_unit='hours',
+                         repeat_period=1,
+                         executions_count=5)
+        job.schedule.last_execution_time = date_utils.parse_iso_datetime('2020-07-24T09:30:00.000000Z')
+        job.schedule.misfire_policy = misfire_policy
+        job.schedule.misfire_limit = misfire_limit
+        return job
+
+    def _get_scheduled_time(self):
+        return self.schedule_mock.call_args[0][0]
+
+    def _get_scheduled_params(self):
+        return self.schedule_mock.call_args[0][2]
 
 
 class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
@@ -310,13 +479,13 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
             start_datetime=mocked_now - timedelta(seconds=1),
             parameter_values={'p1': 'mpd', 'param_2': ['hello', '3']})
 
-        job_path = save_job(job)
+        job_path = self.schedule_service.save_job(job)
 
         self.schedule_service._execute_job(job, job_path)
 
         self.verify_start_script_call({'p1': 'bingo!', 'param_2': ['hello', '3']}, job.user)
 
-        self.execution_service.add_finish_listener.assert_not_called()
+        self.assert_no_cleanup()
         self.assert_schedule_calls([])
 
     def test_execute_repeatable_job(self):
@@ -325,12 +494,12 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
                          start_datetime=mocked_now - timedelta(seconds=1),
                          repeat_unit='days',
                          repeat_period=1)
-        job_path = save_job(job)
+        job_path = self.schedule_service.save_job(job)
 
         self.schedule_service._execute_job(job, job_path)
 
         self.verify_start_script_call(job.parameter_values, job.user)
-        self.execution_service.add_finish_listener.assert_not_called()
+        self.assert_no_cleanup()
         self.assert_schedule_calls([(job, job_path, mocked_now_epoch + 86399)])
 
     def test_execute_when_fails(self):
@@ -339,7 +508,7 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
                          start_datetime=mocked_now - timedelta(seconds=1),
                          repeat_unit='days',
                          repeat_period=1)
-        job_path = save_job(job)
+        job_path = self.schedule_service.save_job(job)
 
         self.execution_service.start_script.side_effect = Exception('Test exception')
         self.schedule_service._execute_job(job, job_path)
@@ -353,7 +522,7 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
                          start_datetime=mocked_now - timedelta(seconds=1),
                          repeat_unit='days',
                          repeat_period=1)
-        job_path = save_job(job)
+        job_path = self.schedule_service.save_job(job)
 
         self.schedule_service._execute_job(job, job_path)
 
@@ -367,7 +536,7 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
                          start_datetime=mocked_now - timedelta(seconds=1),
                          repeat_unit='days',
                          repeat_period=1)
-        job_path = save_job(job)
+        job_path = self.schedule_service.save_job(job)
 
         self.mock_schedule_model_with_secure_param()
 
@@ -383,8 +552,8 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
                          start_datetime=mocked_now - timedelta(seconds=1),
                          repeat_unit='days',
                          repeat_period=1)
-        job_path = save_job(job)
-        os.remove(job_path)
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service.delete_job(job.id, job.user)
 
         self.schedule_service._execute_job(job, job_path)
 
@@ -397,7 +566,7 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
                          script_name='script_with_cleanup',
                          repeatable=False,
                          start_datetime=mocked_now - timedelta(seconds=1))
-        job_path = save_job(job)
+        job_path = self.schedule_service.save_job(job)
 
         finish_callback = None
 
@@ -419,6 +588,69 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
 
         self.execution_service.cleanup_execution.assert_called_once_with(ANY, job.user)
 
+    def test_execute_when_values_script(self):
+        marker_path = os.path.join(test_utils.temp_folder, 'values_script_called')
+        self.create_config('values_script_config', parameters=[
+            {'name': 'p1', 'type': 'list', 'values': {'script': 'touch ' + marker_path + ' && echo a', 'shell': True}},
+        ])
+        job = create_job(id=1,
+                         script_name='values_script_config',
+                         repeatable=False,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         parameter_values={'p1': 'b'})
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service._execute_job(job, job_path)
+
+        self.verify_start_script_call({'p1': 'b'}, job.user)
+        self.assertFalse(os.path.exists(marker_path))
+
+    def test_execute_when_verb(self):
+        test_utils.write_script_config(
+            {
+                'name': 'verb_script',
+                'script_path': 'echo 1',
+                'parameters': [{'name': 'p1'}],
+                'verbs': {'parameter_name': 'command', 'options': [{'name': 'start'}, {'name': 'stop'}]},
+                'scheduling': {'enabled': True}
+            },
+            'verb_script')
+        job = create_job(id=1,
+                         script_name='verb_script',
+                         repeatable=False,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         parameter_values={'p1': 'abc'})
+        job.verb = 'stop'
+        job_path = self.schedule_service.save_job(job)
+
+        with patch.object(self.config_service, 'load_config_model',
+                          wraps=self.config_service.load_config_model) as load_mock:
+            self.schedule_service._execute_job(job, job_path)
+
+        load_mock.assert_called_once()
+        self.verify_start_script_call({'p1': 'abc', 'command': 'stop'}, job.user)
+        self.assertEqual({'p1': 'abc'}, job.parameter_values)
+
+    def test_execute_when_script_removed(self):
+        job = create_job(id=1,
+                         script_name='missing_script',
+                         repeatable=True,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         repeat_unit='days',
+                         repeat_period=1)
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service._execute_job(job, job_path)
+
+        self.execution_service.start_script.assert_not_called()
+        self.assert_schedule_calls([(job, job_path, mocked_now_epoch + 86399)])
+
+    def assert_no_cleanup(self):
+        for call in self.execution_service.add_finish_listener.call_args_list:
+            call[0][0]()
+
+        self.execution_service.cleanup_execution.assert_not_called()
+
     def verify_start_script_call(self, expected_values, expected_user):
         start_args = self.execution_service.start_script.call_args[0]
         self.assertEqual(expected_user, start_args[1])
@@ -426,6 +658,390 @@ class TestScheduleServiceExecuteJob(ScheduleServiceTestCase):
         self.assertEqual(expected_values, actual_values)
 
 
+class TestScheduleServiceOverlap(ScheduleServiceTestCase):
+    def test_allow_starts_concurrently(self):
+        job, job_path = self._create_job(OVERLAP_ALLOW)
+
+        self.schedule_service._execute_job(job, job_path)
+        self.schedule_service._execute_job(job, job_path)
+
+        self.assertEqual(2, self.execution_service.start_script.call_count)
+        self.assertEqual(None, self.execution_service.start_script.call_args[1]['concurrency_group'])
+
+    def test_skip_when_running(self):
+        job, job_path = self._create_job(OVERLAP_SKIP)
+
+        self.schedule_service._execute_job(job, job_path)
+        self.schedule_service._execute_job(job, job_path)
+
+        self.assertEqual(1, self.execution_service.start_script.call_count)
+        self.assertEqual(1, job.schedule.executions_count)
+        self.assertEqual(2, len(self.schedule_mock.call_args_list))
+
+    def test_skip_when_previous_finished(self):
+        job, job_path = self._create_job(OVERLAP_SKIP)
+
+        self.schedule_service._execute_job(job, job_path)
+        self._finish_executions()
+        self.schedule_service._execute_job(job, job_path)
+
+        self.assertEqual(2, self.execution_service.start_script.call_count)
+
+    def test_queue_when_running(self):
+        job, job_path = self._create_job(OVERLAP_QUEUE)
+
+        self.schedule_service._execute_job(job, job_path)
+        self.schedule_service._execute_job(job, job_path)
+
+        self.assertEqual(2, self.execution_service.start_script.call_count)
+        self.assertEqual('schedule-1', self.execution_service.start_script.call_args[1]['concurrency_group'])
+
+    def test_queue_when_already_queued(self):
+        job, job_path = self._create_job(OVERLAP_QUEUE)
+
+        self.schedule_service._execute_job(job, job_path)
+        self.schedule_service._execute_job(job, job_path)
+
+        self.execution_service.is_queued.return_value = True
+        self.schedule_service._execute_job(job, job_path)
+
+        self.assertEqual(2, self.execution_service.start_script.call_count)
+
+    def test_kill_when_running(self):
+        job, job_path = self._create_job(OVERLAP_KILL)
+
+        self.schedule_service._execute_job(job, job_path)
+        first_execution_id = self.started_ids[0]
+        self.schedule_service._execute_job(job, job_path)
+
+        self.execution_service.kill_script_by_system.assert_called_once_with(first_execution_id)
+        self.assertEqual(2, self.execution_service.start_script.call_count)
+
+    def test_kill_when_previous_finished(self):
+        job, job_path = self._create_job(OVERLAP_KILL)
+
+        self.schedule_service._execute_job(job, job_path)
+        self._finish_executions()
+        self.schedule_service._execute_job(job, job_path)
+
+        self.execution_service.kill_script_by_system.assert_not_called()
+
+    def _create_job(self, overlap_policy):
+        job = create_job(id=1,
+                         repeatable=True,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         repeat_unit='days',
+                         repeat_period=1)
+        job.schedule.overlap_policy = overlap_policy
+        job_path = self.schedule_service.save_job(job)
+        return job, job_path
+
+    def _finish_executions(self):
+        for callback in list(self.finish_listeners):
+            callback()
+        self.finish_listeners.clear()
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.started_ids = []
+        self.finish_listeners = []
+
+        def start_script(config, user, **kwargs):
+            execution_id = time.time_ns()
+            self.started_ids.append(execution_id)
+            return execution_id
+
+        self.execution_service.start_script.side_effect = start_script
+        self.execution_service.add_finish_listener.side_effect = \
+            lambda callback, execution_id: self.finish_listeners.append(callback)
+        self.execution_service.is_queued.return_value = False
+
+
+class TestScheduleServiceRuns(ScheduleServiceTestCase):
+    def test_record_finished_run(self):
+        job, job_path = self._schedule_job()
+
+        date_utils._mocked_now = mocked_now + timedelta(seconds=7)
+        self._execute_scheduled_job()
+
+        date_utils._mocked_now = mocked_now + timedelta(seconds=17)
+        self._finish_executions()
+
+        runs = self.schedule_service.get_runs(job)
+        self.assertEqual(1, len(runs))
+        self.assertEqual(STATUS_FINISHED, runs[0].status)
+        self.assertEqual(3, runs[0].exit_code)
+        self.assertEqual(self.started_ids[0], runs[0].execution_id)
+        self.assertEqual(2, runs[0].dispatch_lag_seconds)
+        self.assertEqual(2, runs[0].start_lag_seconds)
+        self.assertEqual(10, runs[0].duration_seconds)
+
+    def test_record_planned_time(self):
+        job, job_path = self._schedule_job()
+
+        self._execute_scheduled_job()
+        self._finish_executions()
+
+        self.assertEqual(mocked_now + timedelta(seconds=5), self.schedule_service.get_runs(job)[0].planned_time)
+
+    def test_record_run_when_queued(self):
+        job, job_path = self._schedule_job()
+        self.start_immediately = False
+
+        date_utils._mocked_now = mocked_now + timedelta(seconds=5)
+        self._execute_scheduled_job()
+
+        date_utils._mocked_now = mocked_now + timedelta(seconds=20)
+        self._start_executions()
+
+        date_utils._mocked_now = mocked_now + timedelta(seconds=30)
+        self._finish_executions()
+
+        run = self.schedule_service.get_runs(job)[0]
+        self.assertEqual(0, run.dispatch_lag_seconds)
+        self.assertEqual(15, run.start_lag_seconds)
+        self.assertEqual(10, run.duration_seconds)
+
+    def test_record_run_when_cancelled_in_queue(self):
+        job, job_path = self._schedule_job()
+        self.start_immediately = False
+
+        self._execute_scheduled_job()
+        self._finish_executions()
+
+        run = self.schedule_service.get_runs(job)[0]
+        self.assertEqual(STATUS_CANCELLED, run.status)
+        self.assertIsNone(run.exit_code)
+
+    def test_no_run_before_finish(self):
+        job, job_path = self._schedule_job()
+
+        self._execute_scheduled_job()
+
+        self.assertEqual([], self.schedule_service.get_runs(job))
+
+    def test_record_failed_to_start(self):
+        self.execution_service.start_script.side_effect = Exception('Test exception')
+        job, job_path = self._schedule_job()
+
+        self._execute_scheduled_job()
+
+        runs = self.schedule_service.get_runs(job)
+        self.assertEqual([STATUS_FAILED_TO_START], [run.status for run in runs])
+        self.assertEqual(1, self.schedule_service.get_run_stats(job)['failed'])
+
+    def test_record_skipped(self):
+        job, job_path = self._schedule_job(overlap_policy=OVERLAP_SKIP)
+        self._execute_scheduled_job()
+        self._execute_scheduled_job()
+
+        runs = self.schedule_service.get_runs(job)
+        self.assertEqual([STATUS_SKIPPED], [run.status for run in runs])
+
+    def test_stats(self):
+        job, job_path = self._schedule_job()
+        for duration in [10, 20, 30]:
+            self._execute_scheduled_job()
+            date_utils._mocked_now += timedelta(seconds=duration)
+            self._finish_executions()
+
+        stats = self.schedule_service.get_run_stats(job)
+
+        self.assertEqual(3, stats['runs'])
+        self.assertEqual(3, stats['failed'])
+        self.assertEqual({'p50': 20.0, 'p95': 30.0, 'max': 30.0}, stats['duration_seconds'])
+
+    def test_runs_restored_after_stop(self):
+        job, job_path = self._schedule_job()
+        self._execute_scheduled_job()
+        self._finish_executions()
+
+        self.schedule_service.stop()
+
+        restored_service = ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+        restored_job = restored_service.get_job(job.id)[0]
+        runs = restored_service.get_runs(restored_job)
+        restored_service.stop()
+
+        self.assertEqual([STATUS_FINISHED], [run.status for run in runs])
+
+    def test_delete_job_removes_runs(self):
+        job, job_path = self._schedule_job()
+        self._execute_scheduled_job()
+        self._finish_executions()
+
+        self.schedule_service.delete_job(job.id, job.user)
+
+        self.assertEqual([], self.schedule_service.get_runs(job))
+
+    def _execute_scheduled_job(self):
+        # the same call, which scheduler does, when the job is due
+        _, callback, params = self.schedule_mock.call_args[0]
+        callback(*params)
+
+    def _schedule_job(self, overlap_policy=OVERLAP_ALLOW):
+        job = create_job(id=1,
+                         repeatable=False,
+                         start_datetime=mocked_now + timedelta(seconds=5))
+        job.schedule.overlap_policy = overlap_policy
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service.schedule_job(job, job_path)
+        return job, job_path
+
+    def _start_executions(self):
+        for callback in list(self.start_listeners):
+            callback()
+        self.start_listeners.clear()
+
+    def _finish_executions(self):
+        for callback in list(self.finish_listeners):
+            callback()
+        self.finish_listeners.clear()
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.started_ids = []
+        self.start_listeners = []
+        self.finish_listeners = []
+        self.start_immediately = True
+
+        def start_script(config, user, **kwargs):
+            execution_id = str(time.time_ns())
+            self.started_ids.append(execution_id)
+            return execution_id
+
+        def add_start_listener(callback, execution_id):
+            if self.start_immediately:
+                callback()
+            else:
+                self.start_listeners.append(callback)
+
+        self.execution_service.start_script.side_effect = start_script
+        self.execution_service.add_start_listener.side_effect = add_start_listener
+        self.execution_service.add_finish_listener.side_effect = \
+            lambda callback, execution_id: self.finish_listeners.append(callback)
+        self.execution_service.get_exit_code.return_value = 3
+        self.execution_service.is_queued.return_value = False
+
+
+class TestScheduleServiceJobStore(ScheduleServiceTestCase):
+    def test_get_restored_job(self):
+        job = create_job(id=3)
+        job_path = save_job(job)
+
+        schedule_service = ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+        actual_job, actual_path = schedule_service.get_job('3')
+
+        self.assertEqual(job_path, actual_path)
+        self.assertEqual(job.as_serializable_dict(), actual_job.as_serializable_dict())
+
+    def test_get_unknown_job(self):
+        self.assertEqual((None, None), self.schedule_service.get_job('123'))
+
+    def test_get_jobs_by_script(self):
+        self.create_config('my_script_B')
+
+        job1 = create_job(id=1, script_name='my_script_A')
+        job2 = create_job(id=2, script_name='my_script_B')
+        job3 = create_job(id=3, script_name='my_script_A')
+        for job in [job1, job2, job3]:
+            self.schedule_service.save_job(job)
+
+        self.assertEqual(['1', '3'], [job.id for job in self.schedule_service.get_jobs(script_name='my_script_A')])
+        self.assertEqual(['2'], [job.id for job in self.schedule_service.get_jobs(script_name='my_script_B')])
+        self.assertEqual([], self.schedule_service.get_jobs(script_name='my_script_C'))
+        self.assertEqual(['1', '2', '3'], [job.id for job in self.schedule_service.get_jobs()])
+
+    def test_toggle_job_writes_file(self):
+        job = create_job(id=1)
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service.toggle_job_enabled('1', False, job.user)
+
+        self.assertFalse(self.schedule_service.get_job('1')[0].enabled)
+        self.assertFalse(json.loads(file_utils.read_file(job_path))['enabled'])
+
+    def test_delete_job(self):
+        job = create_job(id=1)
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service.delete_job('1', job.user)
+
+        self.assertEqual((None, None), self.schedule_service.get_job('1'))
+        self.assertEqual([], self.schedule_service.get_jobs(script_name='my_script_A'))
+        self.assertFalse(os.path.exists(job_path))
+
+    def test_save_job_leaves_no_temp_files(self):
+        job = create_job(id=1)
+        self.schedule_service.save_job(job)
+        self.schedule_service.save_job(job)
+
+        schedules_dir = os.path.join(test_utils.temp_folder, 'schedules')
+        test_utils.assert_dir_files([get_job_filename(job)], schedules_dir, self)
+
+    def test_cleanup_expired_schedules(self):
+        job = create_job(id=1, repeatable=False, start_datetime=mocked_now - timedelta(hours=2))
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service._cleanup_expired_schedules()
+
+        self.assertEqual((None, None), self.schedule_service.get_job('1'))
+        self.assertFalse(os.path.exists(job_path))
+
+    def test_execution_doesnt_rewrite_job_file(self):
+        job = create_job(id=1,
+                         repeatable=True,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         repeat_unit='days',
+                         repeat_period=1)
+        job_path = self.schedule_service.save_job(job)
+
+        self.schedule_service._execute_job(job, job_path)
+
+        self.assertEqual(0, json.loads(file_utils.read_file(job_path))['schedule']['executions_count'])
+        self.assertEqual(1, self.schedule_service.get_job('1')[0].schedule.executions_count)
+
+    def test_restore_run_state_after_stop(self):
+        job = create_job(id=1,
+                         repeatable=True,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         repeat_unit='days',
+                         repeat_period=1)
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service._execute_job(job, job_path)
+        self.schedule_service._execute_job(job, job_path)
+
+        self.schedule_service.stop()
+
+        restored_service = ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+        restored_job = restored_service.get_job('1')[0]
+        restored_service.stop()
+
+        self.assertEqual(2, restored_job.schedule.executions_count)
+        self.assertEqual(mocked_now, restored_job.schedule.last_execution_time)
+
+    def test_saved_job_overrides_run_state(self):
+        job = create_job(id=1,
+                         repeatable=True,
+                         start_datetime=mocked_now - timedelta(seconds=1),
+                         repeat_unit='days',
+                         repeat_period=1)
+        job_path = self.schedule_service.save_job(job)
+        self.schedule_service._execute_job(job, job_path)
+        self.schedule_service.stop()
+
+        job.schedule.executions_count = 10
+        self.schedule_service.save_job(job)
+
+        restored_service = ScheduleService(self.config_service, self.execution_service, test_utils.temp_folder)
+        restored_job = restored_service.get_job('1')[0]
+        restored_service.stop()
+
+        self.assertEqual(10, restored_job.schedule.executions_count)
+
+
 def create_job(id=None,
                user_id='UserX',
                script_name='my_script_A',
@@ -0,0 +1,152 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import TestCase
+
+from scheduling.scheduler import Scheduler
+from utils import date_utils
+
+
+def _in_seconds(seconds):
+    return date_utils.now() + timedelta(seconds=seconds)
+
+
+class TestScheduler(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.scheduler = Scheduler(max_workers=2)
+        self.executed = []
+        self.executed_event = threading.Event()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.scheduler.stop()
+
+    def _callback(self, name, job_path=None):
+        self.executed.append(name)
+        self.executed_event.set()
+
+    def _wait_executed(self, count, timeout=2):
+        deadline = time.time() + timeout
+        while (len(self.executed) < count) and (time.time() < deadline):
+            time.sleep(0.005)
+
+    def test_execute_due_job(self):
+        self.scheduler.schedule(_in_seconds(0.05), self._callback, ('job1', 'path1'))
+
+        self.assertTrue(self.executed_event.wait(2))
+        self.assertEqual(['job1'], self.executed)
+
+    def test_execute_in_time_order(self):
+        self.scheduler.schedule(_in_seconds(0.2), self._callback, ('job2', 'path2'))
+        self.scheduler.schedule(_in_seconds(0.1), self._callback, ('job1', 'path1'))
+
+        self._wait_executed(2)
+
+        self.assertEqual(['job1', 'job2'], self.executed)
+
+    def test_wake_up_for_earlier_job(self):
+        self.scheduler.schedule(_in_seconds(60), self._callback, ('late', 'path1'))
+        time.sleep(0.05)
+
+        self.scheduler.schedule(_in_seconds(0.05), self._callback, ('early', 'path2'))
+
+        self.assertTrue(self.executed_event.wait(1))
+        self.assertEqual(['early'], self.executed)
+
+    def test_cancel(self):
+        self.scheduler.schedule(_in_seconds(0.1), self._callback, ('job1', 'path1'))
+        self.scheduler.schedule(_in_seconds(0.15), self._callback, ('job2', 'path2'))
+
+        self.scheduler.cancel('path1')
+
+        self._wait_executed(1)
+        time.sleep(0.1)
+        self.assertEqual(['job2'], self.executed)
+
+    def test_get_planned_time(self):
+        execute_at = _in_seconds(60)
+        self.scheduler.schedule(execute_at, self._callback, ('job1', 'path1'))
+
+        self.assertEqual(execute_at.timestamp(), self.scheduler.get_planned_time('path1').timestamp())
+
+    def test_get_planned_time_when_not_scheduled(self):
+        self.assertIsNone(self.scheduler.get_planned_time('path1'))
+
+    def test_get_planned_time_when_cancelled(self):
+        self.scheduler.schedule(_in_seconds(60), self._callback, ('job1', 'path1'))
+        self.scheduler.cancel('path1')
+
+        self.assertIsNone(self.scheduler.get_planned_time('path1'))
+
+    def test_reschedule_same_path_replaces_event(self):
+        self.scheduler.schedule(_in_seconds(0.05), self._callback, ('old', 'path1'))
+        self.scheduler.schedule(_in_seconds(0.1), self._callback, ('new', 'path1'))
+
+        self._wait_executed(1)
+        time.sleep(0.1)
+        self.assertEqual(['new'], self.executed)
+
+    def test_slow_job_does_not_delay_others(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        self.scheduler.schedule(_in_seconds(0.02), lambda name, path: release.wait(5), ('slow', 'path1'))
+        self.scheduler.schedule(_in_seconds(0.05), self._callback, ('fast', 'path2'))
+
+        self.assertTrue(self.executed_event.wait(1))
+        self.assertEqual(['fast'], self.executed)
+
+    def test_failed_callback(self):
+        def fail(name, path):
+            raise Exception('Test exception')
+
+        self.scheduler.schedule(_in_seconds(0.02), fail, ('failing', 'path1'))
+        self.scheduler.schedule(_in_seconds(0.05), self._callback, ('job2', 'path2'))
+
+        self._wait_executed(1)
+        self.assertEqual(['job2'], self.executed)
+        self.assertEqual(1, self.scheduler.get_stats()['failed'])
+
+    def test_do_not_execute_when_stopped(self):
+        self.scheduler.schedule(_in_seconds(0.1), self._callback, ('job1', 'path1'))
+
+        self.scheduler.stop()
+
+        time.sleep(0.2)
+        self.assertEqual([], self.executed)
+        self.assertFalse(self.scheduler.scheduling_thread.is_alive())
+
+    def test_stats(self):
+        self.scheduler.schedule(_in_seconds(0.02), self._callback, ('job1', 'path1'))
+        self.scheduler.schedule(_in_seconds(60), self._callback, ('job2', 'path2'))
+        self._wait_executed(1)
+
+        stats = self.scheduler.get_stats()
+
+        self.assertEqual(1, stats['pending'])
+        self.assertEqual(1, stats['dispatched'])
+        self.assertEqual(2, stats['max_workers'])
+        self.assertGreaterEqual(stats['max_lag_seconds'], 0)
+        self.assertIsNotNone(stats['last_dispatched_at'])
+
+    def test_compact_cancelled_events(self):
+        for i in range(300):
+            self.scheduler.schedule(_in_seconds(60), self._callback, ('job' + str(i), 'path' + str(i)))
+        for i in range(250):
+            self.scheduler.cancel('path' + str(i))
+
+        self.assertLess(len(self.scheduler._queue), 300)
+        self.assertEqual(50, self.scheduler.get_stats()['pending'])
+
+    def test_execute_many_jobs_due_at_same_time(self):
+        due_time = _in_seconds(0.1)
+        for i in range(50):
+            self.scheduler.schedule(due_time, self._callback, ('job' + str(i), 'path' + str(i)))
+
+        self._wait_executed(50)
+
+        self.assertEqual(50, len(self.executed))
+        self.assertLess(self.scheduler.get_stats()['max_lag_seconds'], 1)
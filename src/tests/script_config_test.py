@@ -1,14 +1,19 @@
 import os
+import threading
+import time
 import unittest
 from collections import OrderedDict
+from pathlib import Path
 
 from parameterized import parameterized
 
 from config.constants import PARAM_TYPE_SERVER_FILE, PARAM_TYPE_MULTISELECT
 from config.exceptions import InvalidConfigException
 from model.script_config import InvalidValueException, TemplateProperty, ParameterNotFoundException, \
-    get_sorted_config
+    get_sorted_config, ConfigModel
 from model.value_wrapper import ScriptValueWrapper
+from project_manager.project_metadata_store import ProjectMetadataStore
+from project_manager.project_service import ProjectService
 from react.properties import ObservableDict, ObservableList
 from tests import test_utils
 from tests.test_utils import create_script_param_config, create_parameter_model, create_files, wrap_values
@@ -120,6 +125,20 @@ class ConfigModelInitTest(unittest.TestCase):
         self.assertRaisesRegex(InvalidConfigException, 'Invalid output format', _create_config_model, name, config={
             'output_format': 'abc'})
 
+    def test_max_concurrent_executions(self):
+        config_model = _create_config_model('conf_y', config={'max_concurrent_executions': 2})
+
+        self.assertEqual(2, config_model.max_concurrent_executions)
+
+    def test_max_concurrent_executions_default(self):
+        config_model = _create_config_model('conf_y')
+
+        self.assertIsNone(config_model.max_concurrent_executions)
+
+    def test_max_concurrent_executions_when_zero(self):
+        self.assertRaisesRegex(InvalidConfigException, 'max_concurrent_executions', _create_config_model, 'conf_y',
+                               config={'max_concurrent_executions': 0})
+
 
 class ConfigModelValuesTest(unittest.TestCase):
 
@@ -196,10 +215,87 @@ class ConfigModelValuesTest(unittest.TestCase):
             create_script_param_config('p1', type='list', values_script='echo "X${p2}X"'),
             create_script_param_config('p2', type='list', values_script='echo "X${p1}X"')]
 
+        self.assertRaisesRegex(InvalidConfigException,
+                               'Cyclic dependency between parameters: p1 -> p2 -> p1',
+                               _create_config_model, 'main_conf', parameters=parameters)
+
+    def test_set_all_values_when_default_dependants_cycle(self):
+        parameters = [
+            create_script_param_config('p1', type='list', values_script='echo "X${p2}X"'),
+            create_script_param_config('p2', default={'script': 'echo ${p1}'})]
+
+        self.assertRaisesRegex(InvalidConfigException,
+                               'Cyclic dependency between parameters: p1 -> p2 -> p1',
+                               _create_config_model, 'main_conf', parameters=parameters)
+
+    def test_set_all_values_when_dependants_chain(self):
+        parameters = [
+            create_script_param_config('p3', type='list', values_script='echo "Z${p2}Z"'),
+            create_script_param_config('p2', type='list', values_script='echo "Y${p1}Y"'),
+            create_script_param_config('p1')]
+
+        config_model = _create_config_model('main_conf', parameters=parameters)
+
+        values = {'p3': 'ZYabcYZ', 'p2': 'YabcY', 'p1': 'abc'}
+        config_model.set_all_param_values(values)
+
+        expected_values = wrap_values(config_model.parameters, values)
+        self.assertEqual(expected_values, config_model.parameter_values)
+
+    def test_get_dependant_parameters(self):
+        parameters = [
+            create_script_param_config('p3', type='list', values_script='echo "Z${p2}Z"'),
+            create_script_param_config('p2', type='list', values_script='echo "Y${p1}Y"'),
+            create_script_param_config('p1'),
+            create_script_param_config('p4', type='list', values_script='echo "X${p1}X"'),
+            create_script_param_config('p5')]
+
         config_model = _create_config_model('main_conf', parameters=parameters)
 
-        values = {'p1': 'XabcX', 'p2': 'abc'}
-        self.assertRaisesRegex(Exception, 'Could not resolve order', config_model.set_all_param_values, values)
+        dependants = config_model.get_dependant_parameters('p1')
+        self.assertEqual(['p2', 'p3', 'p4'], [p.name for p in dependants])
+        self.assertEqual([], config_model.get_dependant_parameters('p5'))
+
+    def test_reload_cancelled_values_when_same_value_set(self):
+        parameters = [
+            create_script_param_config('p1'),
+            create_script_param_config('p2', type='list', values_script='sleep 0.3; echo "${p1}_x"',
+                                       values_script_shell=True)]
+
+        config_model = _create_config_model('main_conf', parameters=parameters)
+        config_model.set_param_value('p1', 'a')
+        p2 = config_model.find_parameter('p2')
+        self.assertEqual(['a_x'], p2.values)
+
+        thread = threading.Thread(target=config_model.set_param_value, args=('p1', 'b'))
+        thread.start()
+        deadline = time.time() + 5
+        while (p2._values_provider._running_process is None) and (time.time() < deadline):
+            time.sleep(0.01)
+
+        config_model.cancel_dependant_values_loading('p1')
+        thread.join()
+        self.assertEqual(['a_x'], p2.values)
+
+        # the same value doesn't notify observers, so cancelled values have to be reloaded explicitly
+        config_model.set_param_value('p1', 'b')
+        config_model.reload_cancelled_values()
+
+        self.assertEqual(['b_x'], p2.values)
+
+    def test_reload_cancelled_values_when_not_cancelled(self):
+        parameters = [
+            create_script_param_config('p1'),
+            create_script_param_config('p2', type='list', values_script='echo "${p1}_x"')]
+
+        config_model = _create_config_model('main_conf', parameters=parameters)
+        config_model.set_param_value('p1', 'a')
+        p2 = config_model.find_parameter('p2')
+        p2.values = ['outdated']
+
+        config_model.reload_cancelled_values()
+
+        self.assertEqual(['outdated'], p2.values)
 
     def test_set_all_values_with_normalization(self):
         allowed_values = ['abc', 'def', 'xyz']
@@ -1188,6 +1284,56 @@ class PreloadScriptTest(unittest.TestCase):
         test_utils.cleanup()
 
 
+class ProjectConfigModelTest(unittest.TestCase):
+    def test_load_parameters_from_project(self):
+        self.project_service.update_project_parameters('my-project', [
+            {'name': 'p1', 'type': 'int'},
+            {'name': 'p2'}])
+
+        config_model = self._create_project_config_model({'included_parameters': ['p2']})
+
+        self.assertEqual(['p2'], [p.name for p in config_model.parameters])
+
+    def test_load_parameters_after_project_update(self):
+        self._create_project_config_model({'included_parameters': ['p1']})
+
+        self.project_service.update_project_parameters('my-project', [{'name': 'p1', 'type': 'int'}])
+        config_model = self._create_project_config_model({'included_parameters': ['p1']})
+
+        self.assertEqual('int', config_model.find_parameter('p1').type)
+
+    def test_load_when_project_missing(self):
+        self.assertRaisesRegex(Exception, 'Project another-project not found',
+                               self._create_project_config_model, {}, project_id='another-project')
+
+    def _create_project_config_model(self, instance_config, project_id='my-project'):
+        config = {'name': 'my_instance',
+                  'script_path': 'echo 123',
+                  'project_id': project_id,
+                  'instance_config': instance_config}
+
+        return ConfigModel(config,
+                           test_utils.create_file('my_instance.json', text='{}', overwrite=True),
+                           DEF_USERNAME,
+                           DEF_AUDIT_NAME,
+                           True,
+                           test_utils.temp_folder,
+                           test_utils.process_invoker,
+                           project_service=self.project_service)
+
+    def setUp(self) -> None:
+        test_utils.setup()
+
+        self.project_service = ProjectService(test_utils.temp_folder, metadata_store=ProjectMetadataStore())
+        self.project_service.projects_dir = Path(test_utils.temp_folder, 'projects')
+        os.makedirs(self.project_service.projects_dir / 'my-project')
+        self.project_service._save_meta(self.project_service.projects_dir / 'my-project',
+                                        {'id': 'my-project', 'name': 'My Project', 'parameters': []})
+
+    def tearDown(self) -> None:
+        test_utils.cleanup()
+
+
 def _create_config_model(name, *,
                          config=None,
                          username=DEF_USERNAME,
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+import unittest
+
+from script_validator import ScriptValidator
+from tests import test_utils
+
+
+class ScriptValidatorFolderTest(unittest.TestCase):
+    def test_validate_valid_script(self):
+        script_path = self._create_script('my.sh')
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path})
+
+        results = self.validator.validate_from_config_folder(self.runners_folder)
+
+        self.assertTrue(results['s1']['valid'])
+        self.assertIsNotNone(results['s1']['last_validated'])
+
+    def test_validate_missing_script(self):
+        self._write_config('conf1', {'name': 's1', 'script_path': '/some/missing/script.sh'})
+
+        results = self.validator.validate_from_config_folder(self.runners_folder)
+
+        self.assertFalse(results['s1']['valid'])
+        self.assertEqual('Script file not found: /some/missing/script.sh', results['s1']['error'])
+
+    def test_only_changed_when_nothing_changed(self):
+        script_path = self._create_script('my.sh')
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path})
+
+        first_result = self.validator.validate_from_config_folder(self.runners_folder)['s1']
+        version = self.validator.version
+
+        second_result = self.validator.validate_from_config_folder(self.runners_folder, only_changed=True)['s1']
+
+        self.assertIs(first_result, second_result)
+        self.assertEqual(version, self.validator.version)
+
+    def test_only_changed_when_script_removed(self):
+        script_path = self._create_script('my.sh')
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path})
+        self.validator.validate_from_config_folder(self.runners_folder)
+        version = self.validator.version
+
+        os.remove(script_path)
+
+        results = self.validator.validate_from_config_folder(self.runners_folder, only_changed=True)
+        self.assertFalse(results['s1']['valid'])
+        self.assertNotEqual(version, self.validator.version)
+
+    def test_only_changed_when_config_changed(self):
+        script_path = self._create_script('my.sh')
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path}, mtime=1_600_000_000)
+        self.validator.validate_from_config_folder(self.runners_folder)
+
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path + '_2'}, mtime=1_600_000_100)
+
+        results = self.validator.validate_from_config_folder(self.runners_folder, only_changed=True)
+        self.assertFalse(results['s1']['valid'])
+
+    def test_only_changed_when_script_renamed(self):
+        script_path = self._create_script('my.sh')
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path}, mtime=1_600_000_000)
+        self.validator.validate_from_config_folder(self.runners_folder)
+
+        self._write_config('conf1', {'name': 's2', 'script_path': script_path}, mtime=1_600_000_100)
+
+        self.validator.validate_from_config_folder(self.runners_folder, only_changed=True)
+        self.assertEqual(['s2'], list(self.validator.get_all_statuses().keys()))
+
+    def test_config_removed(self):
+        script_path = self._create_script('my.sh')
+        config_path = self._write_config('conf1', {'name': 's1', 'script_path': script_path})
+        self._write_config('conf2', {'name': 's2', 'script_path': script_path})
+        self.validator.validate_from_config_folder(self.runners_folder)
+
+        os.remove(config_path)
+
+        self.validator.validate_from_config_folder(self.runners_folder, only_changed=True)
+        self.assertEqual(['s2'], list(self.validator.get_all_statuses().keys()))
+
+    def test_background_validation(self):
+        self._write_config('conf1', {'name': 's1', 'script_path': '/some/missing/script.sh'})
+
+        self.validator.start(self.runners_folder, interval_seconds=60)
+        self._wait_for(lambda: 's1' in self.validator.get_all_statuses())
+
+        script_path = self._create_script('my.sh')
+        self._write_config('conf1', {'name': 's1', 'script_path': script_path}, mtime=1_600_000_100)
+        self.validator.request_validation()
+
+        self._wait_for(lambda: self.validator.get_validation_status('s1')['valid'])
+
+    def test_statuses_available_during_validation(self):
+        self._write_config('conf1', {'name': 's1', 'script_path': '/some/missing/script.sh'})
+        self.validator.validate_from_config_folder(self.runners_folder)
+        self._write_config('conf1', {'name': 's1', 'script_path': '/other/script.sh'}, mtime=1_600_000_100)
+
+        check_started = threading.Event()
+        release_check = threading.Event()
+        original_check = self.validator._check_script
+
+        def blocking_check(*args, **kwargs):
+            check_started.set()
+            release_check.wait(5)
+            return original_check(*args, **kwargs)
+
+        self.validator._check_script = blocking_check
+
+        thread = threading.Thread(
+            target=self.validator.validate_from_config_folder, args=(self.runners_folder, True))
+        thread.start()
+        try:
+            self.assertTrue(check_started.wait(5))
+
+            statuses = self._run_with_timeout(self.validator.get_all_statuses)
+            self.assertEqual('Script file not found: /some/missing/script.sh', statuses['s1']['error'])
+        finally:
+            release_check.set()
+            thread.join()
+
+        self.assertEqual('Script file not found: /other/script.sh', self.validator.get_all_statuses()['s1']['error'])
+
+    def _run_with_timeout(self, function):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(function()), daemon=True)
+        thread.start()
+        thread.join(1)
+
+        if not result:
+            self.fail('Call was blocked')
+        return result[0]
+
+    def _wait_for(self, condition):
+        deadline = time.time() + 5
+        while not condition():
+            if time.time() > deadline:
+                self.fail('Condition was not satisfied in time')
+            time.sleep(0.01)
+
+    def _create_script(self, name):
+        return os.path.abspath(test_utils.create_file(name, text='echo 123'))
+
+    def _write_config(self, filename, config, mtime=1_600_000_000):
+        path = os.path.join(self.runners_folder, filename + '.json')
+        with open(path, 'w') as f:
+            json.dump(config, f)
+
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def setUp(self) -> None:
+        super().setUp()
+        test_utils.setup()
+
+        self.runners_folder = os.path.join(test_utils.temp_folder, 'runners')
+        os.makedirs(self.runners_folder)
+
+        self.validator = ScriptValidator()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.validator.stop()
+        test_utils.cleanup()
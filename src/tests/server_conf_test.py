@@ -14,7 +14,7 @@ from communications.alerts_service import AlertsService
 from features.executions_callback_feature import ExecutionsCallbackFeature
 from model import server_conf
 from model.model_helper import InvalidValueException
-from model.server_conf import _prepare_allowed_users
+from model.server_conf import _prepare_allowed_users, InvalidServerConfigException
 from tests import test_utils
 from utils import file_utils, custom_json
 
@@ -353,6 +353,64 @@ class TestSecurityConfig(unittest.TestCase):
 
         self.assertEqual(xsrf_protection, config.xsrf_protection)
 
+    def test_prewarm_configs_default(self):
+        config = _from_json({})
+
+        self.assertFalse(config.prewarm_configs)
+        self.assertIsNone(config.prewarm_workers)
+
+    def test_prewarm_configs(self):
+        config = _from_json({'startup': {'prewarm_configs': True, 'prewarm_workers': 4}})
+
+        self.assertTrue(config.prewarm_configs)
+        self.assertEqual(4, config.prewarm_workers)
+
+    def test_schedule_dispatch_workers_default(self):
+        config = _from_json({})
+
+        self.assertEqual(8, config.schedule_dispatch_workers)
+
+    def test_schedule_dispatch_workers(self):
+        config = _from_json({'scheduling': {'dispatch_workers': 20}})
+
+        self.assertEqual(20, config.schedule_dispatch_workers)
+
+    def test_schedule_jitter_seconds_default(self):
+        config = _from_json({})
+
+        self.assertEqual(0, config.schedule_jitter_seconds)
+
+    def test_schedule_jitter_seconds(self):
+        config = _from_json({'scheduling': {'jitter_seconds': 300}})
+
+        self.assertEqual(300, config.schedule_jitter_seconds)
+
+    def test_schedule_run_history_size_default(self):
+        config = _from_json({})
+
+        self.assertEqual(100, config.schedule_run_history_size)
+
+    def test_schedule_run_history_size(self):
+        config = _from_json({'scheduling': {'run_history_size': 500}})
+
+        self.assertEqual(500, config.schedule_run_history_size)
+
+    def test_schedule_run_history_size_when_zero(self):
+        self.assertRaises(InvalidServerConfigException, _from_json, {'scheduling': {'run_history_size': 0}})
+
+    def test_max_concurrent_executions_default(self):
+        config = _from_json({})
+
+        self.assertIsNone(config.max_concurrent_executions)
+
+    def test_max_concurrent_executions(self):
+        config = _from_json({'execution': {'max_concurrent': 16}})
+
+        self.assertEqual(16, config.max_concurrent_executions)
+
+    def test_max_concurrent_executions_when_zero(self):
+        self.assertRaises(InvalidServerConfigException, _from_json, {'execution': {'max_concurrent': 0}})
+
     def test_xsrf_protection_when_unsupported(self):
         self.assertRaises(InvalidValueException, _from_json, {'security': {
             'xsrf_protection': 'something'
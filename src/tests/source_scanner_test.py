@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from project_manager.source_scanner import scan_python_files
+
+
+class TestSourceScanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, relative_path, content):
+        path = self.temp_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def test_scan_files(self):
+        path1 = self._write('a.py', 'print(1)')
+        path2 = self._write('pkg/b.py', 'print(2)')
+        self._write('pkg/readme.md', 'hello')
+
+        result = scan_python_files(self.temp_dir)
+
+        self.assertEqual([path1, path2], result.paths)
+        self.assertEqual({path1: 'print(1)', path2: 'print(2)'}, result.contents)
+        self.assertFalse(result.truncated)
+
+    def test_skip_dependency_and_hidden_dirs(self):
+        path = self._write('a.py', 'print(1)')
+        self._write('.git/hooks/b.py', 'print(2)')
+        self._write('.venv/lib/c.py', 'print(3)')
+        self._write('venv/lib/d.py', 'print(4)')
+        self._write('pkg/__pycache__/e.py', 'print(5)')
+        self._write('node_modules/f.py', 'print(6)')
+
+        result = scan_python_files(self.temp_dir)
+
+        self.assertEqual([path], result.paths)
+
+    def test_large_files_not_read(self):
+        small_path = self._write('a.py', 'print(1)')
+        large_path = self._write('b.py', 'x = 1\n' * 100)
+
+        result = scan_python_files(self.temp_dir, max_file_size=50)
+
+        self.assertEqual([small_path, large_path], result.paths)
+        self.assertEqual({small_path: 'print(1)'}, result.contents)
+        self.assertEqual(1, result.skipped_large_files)
+
+    def test_max_files(self):
+        for i in range(5):
+            self._write(f'file_{i}.py', 'print(1)')
+
+        result = scan_python_files(self.temp_dir, max_files=3)
+
+        self.assertEqual(3, len(result.paths))
+        self.assertTrue(result.truncated)
+        self.assertEqual({'python_files': 3, 'skipped_large_files': 0, 'truncated': True}, result.to_stats())
+
+    def test_empty_folder(self):
+        result = scan_python_files(self.temp_dir)
+
+        self.assertEqual([], result.paths)
+        self.assertEqual({}, result.contents)
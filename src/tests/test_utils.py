@@ -359,7 +359,9 @@ def create_parameter_model_from_config(config,
                                        username='user1',
                                        audit_name='127.0.0.1',
                                        working_dir=None,
-                                       all_parameters=None):
+                                       all_parameters=None,
+                                       values_executor=None,
+                                       run_values_scripts=True):
     if all_parameters is None:
         all_parameters = []
 
@@ -372,7 +374,9 @@ def create_parameter_model_from_config(config,
         audit_name,
         lambda: ObservableList(all_parameters),
         working_dir=working_dir,
-        process_invoker=process_invoker)
+        process_invoker=process_invoker,
+        values_executor=values_executor,
+        run_values_scripts=run_values_scripts)
 
 
 def create_audit_names(ip=None, auth_username=None, proxy_username=None, hostname=None):
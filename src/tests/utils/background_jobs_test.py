@@ -0,0 +1,158 @@
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from react.observable import read_until_closed
+from utils.background_jobs import BackgroundJobService, STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED, \
+    STATUS_QUEUED, STATUS_RUNNING
+
+WAIT_TIMEOUT = 10
+
+
+class TestBackgroundJobService(unittest.TestCase):
+    def setUp(self):
+        self.service = BackgroundJobService()
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_job_succeeded(self):
+        job = self.service.submit('venv1', 'install', 'Install abc', lambda job: {'success': True})
+
+        job.finished_future.result(WAIT_TIMEOUT)
+
+        self.assertEqual(STATUS_SUCCEEDED, job.status)
+        self.assertEqual({'success': True}, job.result)
+        self.assertIsNotNone(job.started_at)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_job_failed(self):
+        def action(job):
+            raise RuntimeError('Failed to install package: some error')
+
+        job = self.service.submit('venv1', 'install', 'Install abc', action)
+
+        job.finished_future.result(WAIT_TIMEOUT)
+
+        self.assertEqual(STATUS_FAILED, job.status)
+        self.assertEqual('Failed to install package: some error', job.error)
+
+    def test_process_output_streamed(self):
+        command = [sys.executable, '-c', 'print("line 1"); print("line 2")']
+        job = self.service.submit('venv1', 'install', 'Install abc', lambda job: {'output': job.run_process(command)})
+
+        output = read_until_closed(job.output_stream, timeout=WAIT_TIMEOUT)
+
+        self.assertEqual(['line 1\n', 'line 2\n'], output)
+        job.finished_future.result(WAIT_TIMEOUT)
+        self.assertEqual({'output': 'line 1\nline 2\n'}, job.result)
+
+    def test_process_failed(self):
+        command = [sys.executable, '-c', 'import sys; print("bad package"); sys.exit(3)']
+
+        def action(job):
+            try:
+                job.run_process(command)
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError('Failed: ' + e.stderr)
+
+        job = self.service.submit('venv1', 'install', 'Install abc', action)
+        job.finished_future.result(WAIT_TIMEOUT)
+
+        self.assertEqual(STATUS_FAILED, job.status)
+        self.assertEqual('Failed: bad package\n', job.error)
+
+    def test_jobs_of_same_venv_serialized(self):
+        release_event = threading.Event()
+        job1 = self.service.submit('venv1', 'install', 'Install abc', lambda job: release_event.wait(WAIT_TIMEOUT))
+        job2 = self.service.submit('venv1', 'install', 'Install def', lambda job: {})
+
+        self._wait_for_status(job1, STATUS_RUNNING)
+        self.assertEqual(STATUS_QUEUED, job2.status)
+
+        release_event.set()
+        job2.finished_future.result(WAIT_TIMEOUT)
+        self.assertEqual(STATUS_SUCCEEDED, job2.status)
+
+    def test_jobs_of_different_venvs_in_parallel(self):
+        release_event = threading.Event()
+        job1 = self.service.submit('venv1', 'install', 'Install abc', lambda job: release_event.wait(WAIT_TIMEOUT))
+        job2 = self.service.submit('venv2', 'install', 'Install def', lambda job: {})
+
+        try:
+            job2.finished_future.result(WAIT_TIMEOUT)
+            self.assertEqual(STATUS_SUCCEEDED, job2.status)
+            self.assertFalse(job1.finished)
+        finally:
+            release_event.set()
+
+    def test_cancel_queued_job(self):
+        release_event = threading.Event()
+        self.service.submit('venv1', 'install', 'Install abc', lambda job: release_event.wait(WAIT_TIMEOUT))
+        executed = []
+        job2 = self.service.submit('venv1', 'install', 'Install def', lambda job: executed.append(job))
+
+        self.assertTrue(self.service.cancel(job2.id))
+        self.assertEqual(STATUS_CANCELLED, job2.status)
+
+        release_event.set()
+        self.service.submit('venv1', 'install', 'Install xyz', lambda job: {}).finished_future.result(WAIT_TIMEOUT)
+        self.assertEqual([], executed)
+
+    def test_cancel_running_process(self):
+        command = [sys.executable, '-c', 'import time; print("started", flush=True); time.sleep(30)']
+        job = self.service.submit('venv1', 'install', 'Install abc', lambda job: job.run_process(command))
+
+        started = threading.Event()
+
+        class Listener:
+            def on_next(self, chunk):
+                started.set()
+
+            def on_close(self):
+                pass
+
+        job.output_stream.subscribe(Listener())
+        self.assertTrue(started.wait(WAIT_TIMEOUT))
+
+        self.assertTrue(self.service.cancel(job.id))
+
+        job.finished_future.result(WAIT_TIMEOUT)
+        self.assertEqual(STATUS_CANCELLED, job.status)
+
+    def test_cancel_finished_job(self):
+        job = self.service.submit('venv1', 'install', 'Install abc', lambda job: {})
+        job.finished_future.result(WAIT_TIMEOUT)
+
+        self.assertFalse(self.service.cancel(job.id))
+        self.assertEqual(STATUS_SUCCEEDED, job.status)
+
+    def test_cancel_unknown_job(self):
+        self.assertRaises(KeyError, self.service.cancel, 'some_id')
+
+    def test_old_finished_jobs_removed(self):
+        service = BackgroundJobService(max_finished_jobs=2)
+
+        try:
+            jobs = []
+            for i in range(4):
+                job = service.submit('venv1', 'install', 'Install ' + str(i), lambda job: {})
+                job.finished_future.result(WAIT_TIMEOUT)
+                jobs.append(job)
+
+            last_job = service.submit('venv1', 'install', 'Install last', lambda job: {})
+            last_job.finished_future.result(WAIT_TIMEOUT)
+
+            self.assertEqual([jobs[2].id, jobs[3].id, last_job.id], [job.id for job in service.list_jobs()])
+        finally:
+            service.shutdown()
+
+    def _wait_for_status(self, job, status):
+        for _ in range(WAIT_TIMEOUT * 100):
+            if job.status == status:
+                return
+            time.sleep(0.01)
+
+        self.fail('Job status is ' + job.status + ', expected ' + status)
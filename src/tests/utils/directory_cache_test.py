@@ -0,0 +1,104 @@
+import os
+import time
+import unittest
+
+from tests import test_utils
+from utils.directory_cache import DirectoryListingCache, DirectoryEntry
+
+
+class TestDirectoryListingCache(unittest.TestCase):
+    def test_list_entries(self):
+        test_utils.create_files(['b.txt', 'A.txt', 'c.txt'])
+        test_utils.create_dir('dir1')
+
+        entries = self.cache.list_entries(test_utils.temp_folder)
+
+        self.assertEqual((DirectoryEntry('A.txt', False, True),
+                          DirectoryEntry('b.txt', False, True),
+                          DirectoryEntry('c.txt', False, True),
+                          DirectoryEntry('dir1', True, False)),
+                         entries)
+
+    def test_cached_when_not_modified(self):
+        test_utils.create_files(['a.txt', 'b.txt'])
+        self._set_old_mtime(test_utils.temp_folder)
+
+        self.cache.list_entries(test_utils.temp_folder)
+
+        test_utils.create_file('c.txt')
+        self._set_old_mtime(test_utils.temp_folder)
+
+        entries = self.cache.list_entries(test_utils.temp_folder)
+        self.assertEqual(['a.txt', 'b.txt'], [e.name for e in entries])
+
+    def test_reloaded_when_modified(self):
+        test_utils.create_files(['a.txt', 'b.txt'])
+        self._set_old_mtime(test_utils.temp_folder)
+
+        self.cache.list_entries(test_utils.temp_folder)
+
+        test_utils.create_file('c.txt')
+        self._set_old_mtime(test_utils.temp_folder, 500)
+
+        entries = self.cache.list_entries(test_utils.temp_folder)
+        self.assertEqual(['a.txt', 'b.txt', 'c.txt'], [e.name for e in entries])
+
+    def test_not_cached_when_recently_modified(self):
+        test_utils.create_files(['a.txt', 'b.txt'])
+
+        self.cache.list_entries(test_utils.temp_folder)
+
+        test_utils.create_file('c.txt')
+
+        entries = self.cache.list_entries(test_utils.temp_folder)
+        self.assertEqual(['a.txt', 'b.txt', 'c.txt'], [e.name for e in entries])
+
+    def test_invalidate(self):
+        test_utils.create_files(['a.txt', 'b.txt'])
+        self._set_old_mtime(test_utils.temp_folder)
+
+        self.cache.list_entries(test_utils.temp_folder)
+
+        test_utils.create_file('c.txt')
+        self._set_old_mtime(test_utils.temp_folder)
+        self.cache.invalidate(test_utils.temp_folder)
+
+        entries = self.cache.list_entries(test_utils.temp_folder)
+        self.assertEqual(['a.txt', 'b.txt', 'c.txt'], [e.name for e in entries])
+
+    def test_least_recently_used_evicted(self):
+        cache = DirectoryListingCache(max_directories=2)
+
+        dirs = []
+        for name in ['dir1', 'dir2', 'dir3']:
+            dir = test_utils.create_dir(name)
+            test_utils.create_file(os.path.join(name, 'a.txt'))
+            self._set_old_mtime(dir)
+            dirs.append(dir)
+
+        for dir in dirs:
+            cache.list_entries(dir)
+
+        for dir in dirs:
+            test_utils.create_file(os.path.join(os.path.basename(dir), 'b.txt'))
+            self._set_old_mtime(dir)
+
+        self.assertEqual(['a.txt', 'b.txt'], [e.name for e in cache.list_entries(dirs[0])])
+        self.assertEqual(['a.txt'], [e.name for e in cache.list_entries(dirs[2])])
+
+    def test_dir_not_exists(self):
+        dir = os.path.join(test_utils.temp_folder, 'missing')
+        self.assertRaises(FileNotFoundError, self.cache.list_entries, dir)
+
+    @staticmethod
+    def _set_old_mtime(path, age_seconds=1000):
+        old_time = int(time.time()) // 1000 * 1000 - age_seconds
+        os.utime(path, (old_time, old_time))
+
+    def setUp(self):
+        test_utils.setup()
+
+        self.cache = DirectoryListingCache()
+
+    def tearDown(self):
+        test_utils.cleanup()
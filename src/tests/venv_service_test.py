@@ -1,7 +1,11 @@
+import json
+import os
+import sys
 import unittest
 import tempfile
 import shutil
 from pathlib import Path
+from unittest.mock import patch
 
 from venv_manager.venv_service import VenvService
 
@@ -225,5 +229,92 @@ class TestUninstallPackageValidation(unittest.TestCase):
         self.assertIn('cannot contain spaces', str(cm.exception))
 
 
+class TestInstalledPackages(unittest.TestCase):
+    """Test reading installed packages from the venv site-packages"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = VenvService(self.temp_dir)
+
+        Path(self.service.pip_path).parent.mkdir(parents=True)
+        Path(self.service.pip_path).touch()
+
+        if sys.platform == 'win32':
+            self.site_packages = Path(self.service.venv_path) / 'Lib' / 'site-packages'
+        else:
+            self.site_packages = Path(self.service.venv_path) / 'lib' / 'python3.11' / 'site-packages'
+        self.site_packages.mkdir(parents=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _add_distribution(self, name, version, editable=False, mtime=1_600_000_000):
+        dist_info = self.site_packages / f'{name}-{version}.dist-info'
+        dist_info.mkdir()
+        (dist_info / 'METADATA').write_text(f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n')
+        if editable:
+            (dist_info / 'direct_url.json').write_text(
+                json.dumps({'url': 'file:///src/' + name, 'dir_info': {'editable': True}}))
+
+        os.utime(self.site_packages, (mtime, mtime))
+
+    def _write_script(self, name, content):
+        scripts_dir = Path(self.temp_dir) / 'samples' / 'scripts'
+        scripts_dir.mkdir(parents=True, exist_ok=True)
+        (scripts_dir / name).write_text(content)
+
+    def test_list_packages(self):
+        self._add_distribution('requests', '2.31.0')
+        self._add_distribution('Jinja2', '3.1.2')
+
+        self.assertEqual([{'name': 'Jinja2', 'version': '3.1.2'}, {'name': 'requests', 'version': '2.31.0'}],
+                         self.service.list_packages())
+
+    def test_list_packages_when_no_venv(self):
+        shutil.rmtree(self.service.venv_path)
+
+        self.assertEqual([], self.service.list_packages())
+
+    def test_list_packages_reloaded_when_site_packages_changed(self):
+        self._add_distribution('requests', '2.31.0')
+        self.service.list_packages()
+
+        self._add_distribution('urllib3', '2.0.0', mtime=1_600_000_100)
+
+        self.assertEqual(['requests', 'urllib3'], [p['name'] for p in self.service.list_packages()])
+
+    def test_list_packages_cached(self):
+        self._add_distribution('requests', '2.31.0')
+        self.service.list_packages()
+
+        with patch('venv_manager.venv_service._read_installed_distributions') as read_mock:
+            self.assertEqual(['requests'], [p['name'] for p in self.service.list_packages()])
+            read_mock.assert_not_called()
+
+    def test_list_packages_after_invalidate(self):
+        self._add_distribution('requests', '2.31.0')
+        self.service.list_packages()
+
+        self._add_distribution('urllib3', '2.0.0')
+        self.service.invalidate_installed_packages()
+
+        self.assertEqual(['requests', 'urllib3'], [p['name'] for p in self.service.list_packages()])
+
+    def test_requirements_with_dependencies(self):
+        self._add_distribution('requests', '2.31.0')
+        self._add_distribution('pip', '23.0')
+        self._add_distribution('my-lib', '0.1', editable=True)
+        self._write_script('fetch.py', 'import os\nimport requests\nfrom yaml import safe_load\n')
+
+        result = self.service.get_requirements_with_dependencies()
+
+        self.assertEqual([
+            {'name': 'my-lib', 'version': 'editable', 'is_stdlib': False, 'used_by': []},
+            {'name': 'requests', 'version': '2.31.0', 'is_stdlib': False, 'used_by': ['fetch']}],
+            result['requirements'])
+        self.assertEqual([{'name': 'yaml', 'needed_by': ['fetch']}], result['missing_packages'])
+        self.assertEqual({'fetch': ['os', 'requests', 'yaml']}, result['script_dependencies'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import time
+import unittest
+
+from tornado.ioloop import IOLoop
+
+from web.ioloop_monitor import IOLoopMonitor
+
+
+class IOLoopMonitorTest(unittest.TestCase):
+    def test_record_normal_tick(self):
+        self.monitor.record_tick(0.01)
+
+        stats = self.monitor.get_stats()
+        self.assertEqual(1, stats['ticks'])
+        self.assertEqual(0, stats['blocked_count'])
+        self.assertEqual(0, stats['total_blocked_seconds'])
+        self.assertIsNone(stats['last_blocked_at'])
+
+    def test_record_blocked_ticks(self):
+        self.monitor.record_tick(0.5)
+        self.monitor.record_tick(0.01)
+        self.monitor.record_tick(2)
+
+        stats = self.monitor.get_stats()
+        self.assertEqual(3, stats['ticks'])
+        self.assertEqual(2, stats['blocked_count'])
+        self.assertEqual(2.5, stats['total_blocked_seconds'])
+        self.assertEqual(2, stats['max_blocked_seconds'])
+        self.assertIsNotNone(stats['last_blocked_at'])
+
+    def test_measure_blocked_loop(self):
+        io_loop = IOLoop()
+        monitor = IOLoopMonitor(interval_seconds=0.01, blocking_threshold_seconds=0.1)
+
+        try:
+            io_loop.add_callback(monitor.start)
+            io_loop.call_later(0.05, lambda: time.sleep(0.3))
+            io_loop.call_later(0.5, io_loop.stop)
+            io_loop.start()
+
+            monitor.stop()
+        finally:
+            io_loop.close()
+
+        stats = monitor.get_stats()
+        self.assertGreaterEqual(stats['blocked_count'], 1)
+        self.assertGreaterEqual(stats['max_blocked_seconds'], 0.2)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.monitor = IOLoopMonitor(blocking_threshold_seconds=0.1, warning_threshold_seconds=1)
@@ -1,5 +1,6 @@
 import json
 import os
+from unittest.mock import patch
 from urllib.parse import quote
 
 import tornado.concurrent
@@ -73,64 +74,89 @@ class ScriptConfigSocketTest(testing.AsyncTestCase):
         message2 = yield self.socket.read_message()
         self._assert_message_type(message2, 'preloadScript')
 
-        self.socket.write_message(json.dumps({
-            'event': 'parameterValue',
-            'data': {'parameter': 'file 1',
-                     'value': 'x',
-                     'clientStateVersion': 2}}))
-
-        self.socket.write_message(json.dumps({
-            'event': 'parameterValue',
-            'data': {'parameter': 'text 1',
-                     'value': 'included',
-                     'clientStateVersion': 3}}))
-
-        self.socket.write_message(json.dumps({
-            'event': 'parameterValue',
-            'data': {'parameter': 'file 1',
-                     'value': 'z',
-                     'clientStateVersion': 4}}))
-
-        self.socket.write_message(json.dumps({
-            'event': 'parameterValue',
-            'data': {'parameter': 'file 1',
-                     'value': 'z',
-                     'clientStateVersion': 5}}))
-
-        self.socket.write_message(json.dumps({
-            'event': 'parameterValue',
-            'data': {'parameter': 'text 1',
-                     'value': 'inc',
-                     'clientStateVersion': 6}}))
-
-        self.socket.write_message(json.dumps({
-            'event': 'reloadModelValues',
-            'data': {'clientModelId': 'abcd',
-                     'parameterValues': {'list 1': 'Value a', 'file 1': 'y', 'list 2': 'y1.txt'},
-                     'clientStateVersion': 7}}))
-
+        self._send_parameter_value('file 1', 'x', 2)
         self._assert_parameter_change((yield self.socket.read_message()),
                                       _list2(['x1.txt', 'x2.txt', 'x3.txt']), 2)
         self._assert_version_beat((yield self.socket.read_message()), 2)
 
+        self._send_parameter_value('text 1', 'included', 3)
         self._assert_parameter_added((yield self.socket.read_message()), _included_text2(), 3)
         self._assert_version_beat((yield self.socket.read_message()), 3)
 
+        self._send_parameter_value('file 1', 'z', 4)
         self._assert_parameter_change((yield self.socket.read_message()),
                                       _list2(['z1.txt', 'z2.txt', 'z3.txt']), 4)
         self._assert_version_beat((yield self.socket.read_message()), 4)
 
+        self._send_parameter_value('file 1', 'z', 5)
         self._assert_version_beat((yield self.socket.read_message()), 5)
 
+        self._send_parameter_value('text 1', 'inc', 6)
         self._assert_parameter_removed((yield self.socket.read_message()), _included_text2()['name'], 6)
         self._assert_version_beat((yield self.socket.read_message()), 6)
 
+        self.socket.write_message(json.dumps({
+            'event': 'reloadModelValues',
+            'data': {'clientModelId': 'abcd',
+                     'parameterValues': {'list 1': 'Value a', 'file 1': 'y', 'list 2': 'y1.txt'},
+                     'clientStateVersion': 7}}))
+
         response3 = yield self.socket.read_message()
         self.assert_model(response3, 'reloadedConfig',
                           list2_values=['y1.txt', 'y2.txt', 'y3.txt'],
                           external_model_id='abcd',
                           client_version=7)
 
+    @testing.gen_test
+    def test_client_version_when_values_coalesced(self):
+        self.socket = yield self._connect('Test script 1')
+
+        message1 = yield self.socket.read_message()
+        self._assert_message_type(message1, 'initialConfig')
+
+        message2 = yield self.socket.read_message()
+        self._assert_message_type(message2, 'preloadScript')
+
+        with patch('web.script_config_socket.PARAMETER_VALUES_DEBOUNCE_SECONDS', 0.5):
+            self._send_parameter_value('file 1', 'x', 2)
+            self._send_parameter_value('text 1', 'included', 3)
+            self._send_parameter_value('file 1', 'y', 4)
+            self._send_parameter_value('file 1', 'z', 5)
+
+        self._assert_parameter_change((yield self.socket.read_message()),
+                                      _list2(['z1.txt', 'z2.txt', 'z3.txt']), 5)
+        self._assert_parameter_added((yield self.socket.read_message()), _included_text2(), 5)
+        self._assert_version_beat((yield self.socket.read_message()), 5)
+
+    @testing.gen_test
+    def test_pending_values_dropped_when_reload_model(self):
+        self.socket = yield self._connect('Test script 1')
+
+        message1 = yield self.socket.read_message()
+        self._assert_message_type(message1, 'initialConfig')
+
+        message2 = yield self.socket.read_message()
+        self._assert_message_type(message2, 'preloadScript')
+
+        with patch('web.script_config_socket.PARAMETER_VALUES_DEBOUNCE_SECONDS', 2):
+            self._send_parameter_value('file 1', 'x', 2)
+            self.socket.write_message(json.dumps({
+                'event': 'reloadModelValues',
+                'data': {'clientModelId': 'abcd',
+                         'parameterValues': {'list 1': 'Value a', 'file 1': 'y', 'list 2': 'y1.txt'},
+                         'clientStateVersion': 3}}))
+
+            response = yield self.socket.read_message()
+            self.assert_model(response, 'reloadedConfig',
+                              list2_values=['y1.txt', 'y2.txt', 'y3.txt'],
+                              external_model_id='abcd',
+                              client_version=3)
+
+        self._assert_message_type((yield self.socket.read_message()), 'preloadScript')
+
+        self._send_parameter_value('list 1', 'B', 4)
+        self._assert_version_beat((yield self.socket.read_message()), 4)
+
     @testing.gen_test
     def test_preload_script(self):
         self.socket = yield self._connect('Test script 1')
@@ -210,6 +236,13 @@ class ScriptConfigSocketTest(testing.AsyncTestCase):
             {'data': {'clientStateVersion': client_version}, 'event': 'clientStateVersionAccepted'},
             event)
 
+    def _send_parameter_value(self, parameter, value, client_version):
+        self.socket.write_message(json.dumps({
+            'event': 'parameterValue',
+            'data': {'parameter': parameter,
+                     'value': value,
+                     'clientStateVersion': client_version}}))
+
     def _assert_message_type(self, message, expected_type):
         event = json.loads(message)
 
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import threading
@@ -9,8 +10,10 @@ from unittest.mock import patch, MagicMock
 import requests
 from parameterized import parameterized
 from requests.auth import HTTPBasicAuth
+from tornado.httpclient import HTTPRequest
 from tornado.ioloop import IOLoop
 from tornado.web import create_signed_value
+from tornado.websocket import websocket_connect
 
 from auth.authorization import Authorizer, ANY_USER, EmptyGroupProvider
 from config.config_service import ConfigService
@@ -97,6 +100,275 @@ class ServerTest(TestCase):
              'validation': {'valid': True, 'error': None, 'warning': None}}],
             response['scripts'])
 
+    def test_get_scripts_when_not_modified(self):
+        self.start_server(12345, '127.0.0.1')
+
+        test_utils.write_script_config({'name': 's1'}, 's1', self.runners_folder)
+
+        response = self._user_session.get('http://127.0.0.1:12345/scripts')
+        etag = response.headers['Etag']
+
+        not_modified_response = self._user_session.get('http://127.0.0.1:12345/scripts',
+                                                       headers={'If-None-Match': etag})
+        self.assertEqual(304, not_modified_response.status_code)
+
+        test_utils.write_script_config({'name': 's2'}, 's2', self.runners_folder)
+
+        modified_response = self._user_session.get('http://127.0.0.1:12345/scripts',
+                                                   headers={'If-None-Match': etag})
+        self.assertEqual(200, modified_response.status_code)
+        self.assertNotEqual(etag, modified_response.headers['Etag'])
+        self.assertCountEqual(['s1', 's2'], [s['name'] for s in modified_response.json()['scripts']])
+
+    def test_get_scripts_does_not_block_other_requests(self):
+        self.start_server(12345, '127.0.0.1')
+
+        test_utils.write_script_config({'name': 's1'}, 's1', self.runners_folder)
+
+        config_service = server._http_server.request_callback.config_service
+        original_list_configs = config_service.list_configs
+        release_event = threading.Event()
+
+        def slow_list_configs(*args, **kwargs):
+            release_event.wait(timeout=10)
+            return original_list_configs(*args, **kwargs)
+
+        config_service.list_configs = slow_list_configs
+
+        scripts_responses = []
+        scripts_thread = threading.Thread(
+            target=lambda: scripts_responses.append(self._user_session.get('http://127.0.0.1:12345/scripts')))
+        scripts_thread.start()
+
+        try:
+            self.check_server_running()
+        finally:
+            release_event.set()
+            scripts_thread.join(timeout=10)
+
+        self.assertEqual(200, scripts_responses[0].status_code)
+        self.assertEqual(['s1'], [s['name'] for s in scripts_responses[0].json()['scripts']])
+
+    def test_get_ioloop_metrics(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self.request('GET', 'http://127.0.0.1:12345/admin/metrics/ioloop', self._admin_session)
+
+        self.assertEqual(0, response['blocked_count'])
+        self.assertIsNotNone(response['started_at'])
+
+    def test_get_ioloop_metrics_when_not_admin(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self._user_session.get('http://127.0.0.1:12345/admin/metrics/ioloop')
+
+        self.assertEqual(403, response.status_code)
+
+    def test_get_scheduler_metrics(self):
+        self.start_server(12345, '127.0.0.1')
+
+        schedule_service = server._http_server.request_callback.schedule_service
+        schedule_service.scheduler.get_stats.return_value = {'pending': 3, 'dispatched': 10}
+
+        response = self.request('GET', 'http://127.0.0.1:12345/admin/metrics/scheduler', self._admin_session)
+
+        self.assertEqual({'pending': 3, 'dispatched': 10}, response)
+
+    def test_get_execution_queue_metrics(self):
+        self.start_server(12345, '127.0.0.1')
+
+        execution_service = server._http_server.request_callback.execution_service
+        execution_service.get_queue_stats.return_value = {'running': 2, 'queued': 5}
+
+        response = self.request('GET', 'http://127.0.0.1:12345/admin/metrics/executions', self._admin_session)
+
+        self.assertEqual({'running': 2, 'queued': 5}, response)
+
+    def test_get_schedule_runs(self):
+        self.start_server(12345, '127.0.0.1')
+
+        schedule_service = server._http_server.request_callback.schedule_service
+        job = MagicMock(id='7', script_name='my_script')
+        run = MagicMock()
+        run.as_serializable_dict.return_value = {'status': 'finished', 'exit_code': 0}
+        schedule_service.get_job.return_value = (job, 'path')
+        schedule_service.get_runs.return_value = [run]
+        schedule_service.get_run_stats.return_value = {'runs': 1, 'failed': 0}
+
+        response = self.request('GET', 'http://127.0.0.1:12345/schedules/7/runs?limit=5', self._user_session)
+
+        self.assertEqual({'id': '7',
+                          'script_name': 'my_script',
+                          'stats': {'runs': 1, 'failed': 0},
+                          'runs': [{'status': 'finished', 'exit_code': 0}]},
+                         response)
+        schedule_service.get_runs.assert_called_once_with(job, 5)
+
+    def test_get_schedule_runs_when_not_found(self):
+        self.start_server(12345, '127.0.0.1')
+
+        schedule_service = server._http_server.request_callback.schedule_service
+        schedule_service.get_job.return_value = (None, None)
+
+        response = self._user_session.get('http://127.0.0.1:12345/schedules/7/runs')
+
+        self.assertEqual(404, response.status_code)
+
+    def test_get_schedule_runs_when_invalid_limit(self):
+        self.start_server(12345, '127.0.0.1')
+
+        schedule_service = server._http_server.request_callback.schedule_service
+        schedule_service.get_job.return_value = (MagicMock(id='7'), 'path')
+
+        response = self._user_session.get('http://127.0.0.1:12345/schedules/7/runs?limit=abc')
+
+        self.assertEqual(400, response.status_code)
+
+    def test_get_execution_status_when_queued(self):
+        self.start_server(12345, '127.0.0.1')
+
+        execution_service = server._http_server.request_callback.execution_service
+        execution_service.is_running.return_value = True
+        execution_service.is_queued.return_value = True
+
+        response = self._user_session.get('http://127.0.0.1:12345/executions/status/3')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('queued', response.text)
+
+    def test_install_venv_package(self):
+        self.start_server(12345, '127.0.0.1')
+
+        venv_service = server._http_server.request_callback.venv_service
+        venv_service.install_package = MagicMock(
+            return_value={'success': True, 'package': 'abc', 'version': '1.0', 'output': 'Installed'})
+
+        response = self._post_venv_install({'package': 'abc', 'version': '1.0'})
+
+        self.assertEqual(200, response.status_code)
+        body = response.json()
+        self.assertEqual({'success': True, 'package': 'abc', 'version': '1.0', 'output': 'Installed'},
+                         {k: v for k, v in body.items() if k != 'job_id'})
+
+        job = self.request('get', 'http://127.0.0.1:12345/admin/venv/jobs/' + body['job_id'], self._admin_session)
+        self.assertEqual('succeeded', job['status'])
+        self.assertEqual('Install abc==1.0', job['description'])
+
+    def test_install_venv_package_without_wait(self):
+        self.start_server(12345, '127.0.0.1')
+
+        venv_service = server._http_server.request_callback.venv_service
+        venv_service.install_package = MagicMock(return_value={'success': True})
+
+        response = self._post_venv_install({'package': 'abc'}, '?wait=false')
+
+        self.assertEqual(202, response.status_code)
+        job_id = response.json()['id']
+
+        jobs = self.request('get', 'http://127.0.0.1:12345/admin/venv/jobs', self._admin_session)['jobs']
+        self.assertEqual([job_id], [job['id'] for job in jobs])
+
+    def test_install_venv_package_when_invalid_name(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self._post_venv_install({'package': '--index-url=https://evil.com'})
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual([], self.request('get', 'http://127.0.0.1:12345/admin/venv/jobs', self._admin_session)['jobs'])
+
+    def test_import_project_when_invalid_type(self):
+        self.start_server(12345, '127.0.0.1')
+
+        xsrf_token = self.get_xsrf_token(self._admin_session)
+        response = self._admin_session.post(
+            'http://127.0.0.1:12345/admin/projects/import',
+            data=json.dumps({'type': 'svn', 'url': 'https://example.com/repo'}),
+            headers={'X-XSRFToken': xsrf_token})
+
+        self.assertEqual(400, response.status_code)
+
+    def test_get_project_import_when_unknown_job(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self._admin_session.get('http://127.0.0.1:12345/admin/project-imports/abc')
+
+        self.assertEqual(404, response.status_code)
+
+    @parameterized.expand([('venv/jobs',), ('project-imports',)])
+    def test_stream_job_when_unknown_job(self, jobs_path):
+        self.start_server(12345, '127.0.0.1')
+
+        async def read_close_code():
+            request = HTTPRequest(
+                'ws://127.0.0.1:12345/admin/' + jobs_path + '/abc/stream',
+                headers={'Cookie': 'username=' + self._admin_session.cookies['username']})
+            connection = await websocket_connect(request)
+            message = await connection.read_message()
+            return message, connection.close_code
+
+        # client runs in a separate thread, because asyncio.run resets the event loop of the current thread
+        result = []
+        client_thread = threading.Thread(target=lambda: result.append(asyncio.run(read_close_code())))
+        client_thread.start()
+        client_thread.join(10)
+
+        self.assertEqual([(None, 404)], result)
+
+    def test_preview_schedule(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self._post_schedule_preview({
+            'schedule_config': {
+                'repeatable': True,
+                'startDatetime': '2120-03-15T16:13:00.000Z',
+                'repeatUnit': 'days',
+                'repeatPeriod': 2},
+            'count': 3})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['2120-03-15T16:13:00+00:00', '2120-03-17T16:13:00+00:00', '2120-03-19T16:13:00+00:00'],
+                         response.json()['next_executions'])
+
+    def test_preview_schedule_when_invalid(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self._post_schedule_preview({
+            'schedule_config': {
+                'repeatable': True,
+                'startDatetime': '2120-03-15T16:13:00.000Z',
+                'repeatUnit': 'years'}})
+
+        self.assertEqual(422, response.status_code)
+
+    def test_preview_schedule_when_negative_count(self):
+        self.start_server(12345, '127.0.0.1')
+
+        response = self._post_schedule_preview({
+            'schedule_config': {
+                'repeatable': True,
+                'startDatetime': '2120-03-15T16:13:00.000Z',
+                'repeatUnit': 'days',
+                'repeatPeriod': 2},
+            'count': -1})
+
+        self.assertEqual(422, response.status_code)
+
+    def _post_schedule_preview(self, body):
+        xsrf_token = self.get_xsrf_token(self._user_session)
+
+        return self._user_session.post(
+            'http://127.0.0.1:12345/schedules/preview',
+            data=json.dumps(body),
+            headers={'X-XSRFToken': xsrf_token})
+
+    def _post_venv_install(self, body, query=''):
+        xsrf_token = self.get_xsrf_token(self._admin_session)
+
+        return self._admin_session.post(
+            'http://127.0.0.1:12345/admin/venv/packages/install' + query,
+            data=json.dumps(body),
+            headers={'X-XSRFToken': xsrf_token})
+
     @parameterized.expand([
         ('X-Forwarded-Proto',),
         ('X-Scheme',)])
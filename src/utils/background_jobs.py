@@ -0,0 +1,332 @@
+"""
+Long-running operations (package installs, project imports, etc.), executed in background threads.
+
+Jobs with the same queue key are executed one by one, jobs with different keys run in parallel.
+Job output (e.g. of the running commands) is published to a replay observable, so it can be streamed to clients.
+"""
+
+import logging
+import subprocess
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from react.observable import ReplayObservable
+from utils import date_utils
+
+LOGGER = logging.getLogger('script_server.background_jobs')
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+DEFAULT_MAX_FINISHED_JOBS = 50
+
+# time for a process to exit after termination, before it's killed
+PROCESS_TERMINATE_TIMEOUT_SECONDS = 5
+
+
+class JobCancelledException(Exception):
+    def __init__(self, job_id: str):
+        super().__init__(f'Job {job_id} was cancelled')
+
+
+class BackgroundJob:
+    """Single operation, executed in background"""
+
+    def __init__(self, queue_key: str, operation: str, description: str):
+        self.id = uuid.uuid4().hex
+        self.queue_key = queue_key
+        self.operation = operation
+        self.description = description
+
+        self.status = STATUS_QUEUED
+        self.stage = None
+        self.result = None
+        self.error = None
+
+        self.created_at = date_utils.now()
+        self.started_at = None
+        self.finished_at = None
+
+        self.output_stream = ReplayObservable()
+
+        self._lock = threading.Lock()
+        self._process = None
+        self._cancel_requested = False
+        self._finished_future = Future()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested
+
+    @property
+    def finished_future(self) -> Future:
+        """Future, which is resolved (with the job itself), when the job is finished"""
+        return self._finished_future
+
+    def write_output(self, text: str) -> None:
+        self.output_stream.push(text)
+
+    def set_stage(self, stage: str, message: Optional[str] = None) -> None:
+        """Report progress of the job. Message (if any) is written to the job output"""
+        self.stage = stage
+
+        if message:
+            self.write_output(message + '\n')
+
+    def get_output(self) -> str:
+        return ''.join(self.output_stream.chunks)
+
+    def run_process(self, command: List[str]) -> str:
+        """
+        Run command, streaming its output (stdout and stderr) to the job output.
+
+        Returns:
+            Output of the command
+
+        Raises:
+            JobCancelledException: If the job was cancelled
+            subprocess.CalledProcessError: If the command failed
+        """
+        with self._lock:
+            if self._cancel_requested:
+                raise JobCancelledException(self.id)
+
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1)
+            self._process = process
+
+        output_lines = []
+        try:
+            for line in process.stdout:
+                output_lines.append(line)
+                self.write_output(line)
+
+            process.wait()
+        finally:
+            process.stdout.close()
+
+            with self._lock:
+                self._process = None
+
+        output = ''.join(output_lines)
+
+        if self._cancel_requested:
+            raise JobCancelledException(self.id)
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, output=output, stderr=output)
+
+        return output
+
+    def to_dict(self, include_output=False) -> Dict:
+        result = {
+            'id': self.id,
+            'operation': self.operation,
+            'description': self.description,
+            'status': self.status,
+            'stage': self.stage,
+            'error': self.error,
+            'result': self.result,
+            'created_at': date_utils.to_iso_string(self.created_at),
+            'started_at': date_utils.to_iso_string(self.started_at),
+            'finished_at': date_utils.to_iso_string(self.finished_at),
+        }
+
+        if include_output:
+            result['output'] = self.get_output()
+
+        return result
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self.status != STATUS_QUEUED:
+                return False
+
+            self.status = STATUS_RUNNING
+            self.started_at = date_utils.now()
+            return True
+
+    def _cancel(self) -> bool:
+        with self._lock:
+            if self.finished:
+                return False
+
+            self._cancel_requested = True
+
+            if self.status == STATUS_QUEUED:
+                self._finish_locked(STATUS_CANCELLED)
+                return True
+
+            process = self._process
+
+        if process is not None:
+            _terminate_process(process)
+
+        return True
+
+    def _finish(self, status: str, result=None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._finish_locked(status, result, error)
+
+    def _finish_locked(self, status: str, result=None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = date_utils.now()
+
+        self.output_stream.close()
+        self._finished_future.set_result(self)
+
+
+class BackgroundJobService:
+    """Runs jobs in background threads, one job at a time per queue key"""
+
+    def __init__(self, max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS, thread_name_prefix: str = 'background-job'):
+        self._max_finished_jobs = max_finished_jobs
+        self._thread_name_prefix = thread_name_prefix
+
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job id -> BackgroundJob
+        self._executors = {}  # queue key -> single thread executor
+
+    def submit(self, queue_key: str, operation: str, description: str,
+               action: Callable[[BackgroundJob], Dict]) -> BackgroundJob:
+        """
+        Queue a job.
+
+        Args:
+            queue_key: Jobs with the same key never run in parallel (e.g. a venv path)
+            operation: Short operation name (install, uninstall, sync, import)
+            description: Human-readable description of the job
+            action: Function, which performs the operation and returns its result
+
+        Returns:
+            The queued job
+        """
+        job = BackgroundJob(queue_key, operation, description)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            self._cleanup_finished_jobs()
+
+            executor = self._executors.get(queue_key)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self._thread_name_prefix)
+                self._executors[queue_key] = executor
+
+        LOGGER.info(f'Queued job {job.id}: {description}')
+        executor.submit(self._run_job, job, action)
+
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BackgroundJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[BackgroundJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True, if the job was cancelled, False if it's already finished
+
+        Raises:
+            KeyError: If the job doesn't exist
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            raise KeyError(job_id)
+
+        cancelled = job._cancel()
+        if cancelled:
+            LOGGER.info(f'Cancelled job {job.id}: {job.description}')
+        return cancelled
+
+    def shutdown(self) -> None:
+        for job in self.list_jobs():
+            job._cancel()
+
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _run_job(job: BackgroundJob, action: Callable[[BackgroundJob], Dict]) -> None:
+        if not job._start():
+            return
+
+        try:
+            result = action(job)
+        except JobCancelledException:
+            job._finish(STATUS_CANCELLED)
+            return
+        except Exception as e:
+            if job.cancel_requested:
+                job._finish(STATUS_CANCELLED)
+                return
+
+            LOGGER.warning(f'Job {job.id} failed: {job.description}', exc_info=True)
+            job._finish(STATUS_FAILED, error=str(e))
+            return
+
+        if job.cancel_requested:
+            job._finish(STATUS_CANCELLED)
+        else:
+            LOGGER.info(f'Job {job.id} finished: {job.description}')
+            job._finish(STATUS_SUCCEEDED, result=result)
+
+    def _cleanup_finished_jobs(self) -> None:
+        finished_jobs = [job for job in self._jobs.values() if job.finished]
+        for job in finished_jobs[:max(0, len(finished_jobs) - self._max_finished_jobs)]:
+            del self._jobs[job.id]
+            job.output_stream.dispose()
+
+
+def _terminate_process(process: subprocess.Popen) -> None:
+    try:
+        process.terminate()
+    except OSError as e:
+        LOGGER.warning(f'Failed to terminate process {process.pid}: {e}')
+        return
+
+    # don't block the caller (e.g. a request handler), while waiting for the process to exit
+    kill_timer = threading.Timer(PROCESS_TERMINATE_TIMEOUT_SECONDS, _kill_if_running, [process])
+    kill_timer.daemon = True
+    kill_timer.start()
+
+
+def _kill_if_running(process: subprocess.Popen) -> None:
+    if process.poll() is not None:
+        return
+
+    LOGGER.warning(f'Process {process.pid} did not stop after termination, killing it')
+    try:
+        process.kill()
+    except OSError as e:
+        LOGGER.warning(f'Failed to kill process {process.pid}: {e}')
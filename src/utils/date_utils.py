@@ -2,6 +2,7 @@ import calendar
 import sys
 import time
 from datetime import datetime, timezone
+from typing import Optional
 
 MS_IN_SEC = 1000
 MS_IN_MIN = 60 * MS_IN_SEC
@@ -50,7 +51,10 @@ def parse_iso_datetime(date_str):
     return datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc)
 
 
-def to_iso_string(datetime_value: datetime):
+def to_iso_string(datetime_value: Optional[datetime]):
+    if datetime_value is None:
+        return None
+
     if datetime_value.tzinfo is not None:
         datetime_value = datetime_value.astimezone(timezone.utc)
 
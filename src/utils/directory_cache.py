@@ -0,0 +1,91 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+LOGGER = logging.getLogger('script_server.directory_cache')
+
+DirectoryEntry = namedtuple('DirectoryEntry', ['name', 'is_dir', 'is_file'])
+
+DEFAULT_MAX_DIRECTORIES = 256
+
+# Directory mtime has limited precision (e.g. 1 second on some NFS mounts), so a listing of a recently
+# modified directory can miss a change within the same tick. Such listings are not cached
+_RACY_MTIME_SECONDS = 2
+
+
+class DirectoryListingCache:
+    """
+    Caches directory listings, which are invalidated, when directory modification time changes
+
+    Entries are read with os.scandir, so file types are taken from the directory entries, without stat calls
+    (where the OS supports it)
+    """
+
+    def __init__(self, max_directories=DEFAULT_MAX_DIRECTORIES) -> None:
+        self._max_directories = max_directories
+        self._lock = threading.Lock()
+        self._listings = OrderedDict()
+
+    def list_entries(self, dir):
+        """Returns DirectoryEntry tuples, sorted by name (case-insensitive)"""
+        key = os.path.abspath(dir)
+        mtime = os.stat(key).st_mtime_ns
+
+        with self._lock:
+            cached = self._listings.get(key)
+            if (cached is not None) and (cached[0] == mtime):
+                self._listings.move_to_end(key)
+                return cached[1]
+
+        entries = _scan_directory(key)
+
+        if (time.time_ns() - mtime) < (_RACY_MTIME_SECONDS * 1_000_000_000):
+            return entries
+
+        with self._lock:
+            self._listings[key] = (mtime, entries)
+            self._listings.move_to_end(key)
+
+            while len(self._listings) > self._max_directories:
+                self._listings.popitem(last=False)
+
+        return entries
+
+    def invalidate(self, dir=None):
+        with self._lock:
+            if dir is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(os.path.abspath(dir), None)
+
+
+def _scan_directory(dir):
+    entries = []
+
+    with os.scandir(dir) as iterator:
+        for entry in iterator:
+            try:
+                is_dir = entry.is_dir()
+                is_file = (not is_dir) and entry.is_file()
+            except OSError as e:
+                LOGGER.warning('Failed to read type of ' + entry.path + ': ' + str(e))
+                is_dir = False
+                is_file = False
+
+            entries.append(DirectoryEntry(entry.name, is_dir, is_file))
+
+    entries.sort(key=lambda e: e.name.casefold())
+    return tuple(entries)
+
+
+_shared_cache = DirectoryListingCache()
+
+
+def list_entries(dir):
+    return _shared_cache.list_entries(dir)
+
+
+def invalidate(dir=None):
+    _shared_cache.invalidate(dir)
@@ -6,6 +6,7 @@ import pathlib
 import re
 import stat
 import sys
+import tempfile
 import time
 from fnmatch import fnmatch
 
@@ -100,6 +101,54 @@ def write_file(filename, content, byte_content=False):
         file.write(content)
 
 
+def write_file_atomic(filename, content, byte_content=False):
+    """Write the file via a temporary file, so readers (and restarts after a crash) never see partial content"""
+    path = normalize_path(filename)
+
+    folder = os.path.dirname(path)
+    prepare_folder(folder)
+
+    mode = "w"
+    if byte_content:
+        mode += "b"
+
+    if os.path.exists(path):
+        file_mode = stat.S_IMODE(os.stat(path).st_mode)
+    else:
+        file_mode = 0o666 & ~_get_umask()
+
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+
+        # mkstemp creates files readable only by the owner
+        os.chmod(temp_path, file_mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+_umask = None
+
+
+def _get_umask():
+    # umask can be read only by setting it, so it's read once, to avoid races with threads creating files
+    global _umask
+
+    if _umask is None:
+        _umask = os.umask(0o022)
+        os.umask(_umask)
+
+    return _umask
+
+
 def prepare_folder(folder_path):
     path = normalize_path(folder_path)
 
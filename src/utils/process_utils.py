@@ -17,7 +17,8 @@ class ProcessInvoker:
         super().__init__()
         self._env_vars = env_vars
 
-    def invoke(self, command, work_dir='.', *, environment_variables: dict = None, check_stderr=True, shell=False):
+    def invoke(self, command, work_dir='.', *, environment_variables: dict = None, check_stderr=True, shell=False,
+               on_started=None):
         if isinstance(command, str) and not shell:
             command = split_command(command, working_directory=work_dir)
 
@@ -31,6 +32,9 @@ class ProcessInvoker:
                              universal_newlines=True,
                              shell=shell)
 
+        if on_started is not None:
+            on_started(p)
+
         (output, error) = p.communicate()
 
         result_code = p.returncode
@@ -0,0 +1,113 @@
+"""
+Analysis of imports in Python scripts.
+
+Imports of each file are cached by (path, mtime, size), so unchanged scripts are not parsed again.
+"""
+
+import ast
+import logging
+import os
+import threading
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Dict, FrozenSet, List
+
+LOGGER = logging.getLogger('script_server.import_analysis')
+
+DEFAULT_WORKERS = 4
+
+# files, modified within this period, are always re-parsed, because mtime precision can be too low to notice changes
+_RACY_MTIME_NANOSECONDS = 2 * 1_000_000_000
+
+
+def extract_imports(filepath: str) -> FrozenSet[str]:
+    """Extract top-level import names from a Python file"""
+    imports = set()
+
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=filepath)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    # Get root module (e.g., 'requests' from 'requests.auth')
+                    root = alias.name.split('.')[0]
+                    imports.add(root)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module:
+                    # Get root module
+                    root = node.module.split('.')[0]
+                    imports.add(root)
+    except (OSError, SyntaxError, ValueError) as e:
+        LOGGER.debug(f'Failed to parse imports from {filepath}: {e}')
+
+    return frozenset(imports)
+
+
+class ImportAnalysisCache:
+    """Thread-safe cache of imports per file"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self._workers = workers
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size), imports)
+        self._entries = {}
+
+    def get_imports(self, paths: List[str]) -> Dict[str, FrozenSet[str]]:
+        """
+        Get imports of the files. Only new and modified files are parsed (in parallel).
+
+        Args:
+            paths: Paths of python files
+
+        Returns:
+            Dictionary of path -> imported top-level modules
+        """
+        result = {}
+        changed = []
+
+        with self._lock:
+            # entries of removed files are dropped
+            for stale_path in set(self._entries.keys()).difference(paths):
+                del self._entries[stale_path]
+
+            cached_entries = dict(self._entries)
+
+        for path in paths:
+            signature = _get_signature(path)
+            if signature is None:
+                continue
+
+            cached = cached_entries.get(path)
+            if (cached is not None) and (cached[0] == signature):
+                result[path] = cached[1]
+            else:
+                changed.append((path, signature))
+
+        if changed:
+            with ThreadPoolExecutor(max_workers=min(self._workers, len(changed)),
+                                    thread_name_prefix='import-analysis') as executor:
+                parsed = executor.map(extract_imports, [path for path, _ in changed])
+
+                for (path, signature), imports in zip(changed, parsed):
+                    result[path] = imports
+
+                    if (time.time_ns() - signature[0]) >= _RACY_MTIME_NANOSECONDS:
+                        with self._lock:
+                            self._entries[path] = (signature, imports)
+
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _get_signature(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
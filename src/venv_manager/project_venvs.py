@@ -0,0 +1,298 @@
+"""
+Virtual environments of imported projects.
+
+Environments are keyed by a hash of the dependency set (requirement specifiers + python version), so projects
+with the same dependencies share a single environment and new instances of a project reuse it without
+installing anything. Packages are installed from a local wheel cache, which is shared by all environments.
+
+New environments are populated from a template venv with hardlinks (or copies, if hardlinks are not supported),
+so pip doesn't need to be bootstrapped for every environment.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from utils.background_jobs import BackgroundJob
+
+LOGGER = logging.getLogger('script_server.project_venvs')
+
+VENVS_DIR_NAME = '.project-venvs'
+
+# a marker, which is created only after an environment is fully built
+_COMPLETE_MARKER = '.complete'
+
+_IS_WINDOWS = os.name == 'nt'
+_BIN_DIR_NAME = 'Scripts' if _IS_WINDOWS else 'bin'
+_PYTHON_NAME = 'python.exe' if _IS_WINDOWS else 'python'
+
+
+def normalize_requirement(requirement: str) -> str:
+    """Normalize requirement specifier, so that formatting differences don't produce different environments"""
+    requirement = requirement.split(' #', 1)[0].strip()
+
+    match = re.match(r'^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$', requirement)
+    if not match:
+        return requirement
+
+    name = re.sub(r'[-_.]+', '-', match.group(1)).lower()
+    specifier = re.sub(r'\s+', '', match.group(2))
+    return name + specifier
+
+
+def get_dependencies_hash(requirements: List[str]) -> str:
+    """Get identifier of an environment for the requirements"""
+    normalized = sorted({normalize_requirement(r) for r in requirements if r.strip()})
+
+    python_version = f'{sys.version_info.major}.{sys.version_info.minor}'
+    content = '\n'.join([f'python=={python_version}'] + normalized)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+class ProjectVenvManager:
+    """Builds and reuses virtual environments of imported projects"""
+
+    def __init__(self, project_root: str, base_python: str = sys.executable):
+        """
+        Args:
+            project_root: Path to script-server root directory
+            base_python: Python interpreter, which is used for creating environments
+        """
+        self.venvs_dir = Path(project_root) / VENVS_DIR_NAME
+        self.wheels_dir = self.venvs_dir / 'wheels'
+        self.template_dir = self.venvs_dir / 'template'
+        self.envs_dir = self.venvs_dir / 'envs'
+        self._base_python = base_python
+
+        self._lock = threading.Lock()
+        self._template_lock = threading.Lock()
+        self._env_locks = {}
+        self._reservations = {}  # env hash -> number of imports, which use the env, but haven't saved it yet
+
+    def get_env_path(self, env_hash: str) -> Path:
+        return self.envs_dir / env_hash
+
+    def get_python_path(self, env_hash: str) -> Optional[Path]:
+        """Get interpreter of the environment or None, if the environment is not built (completely)"""
+        env_path = self.get_env_path(env_hash)
+        if not (env_path / _COMPLETE_MARKER).exists():
+            return None
+        return _get_python(env_path)
+
+    def ensure_env(self, requirements: List[str], job: Optional[BackgroundJob] = None) -> str:
+        """
+        Get an environment with the requirements installed. Existing environments are reused.
+
+        The environment stays reserved (it's not removed by remove_unused), until release_env is called,
+        so the caller can save its hash first. If building fails, the reservation is released here.
+
+        Args:
+            requirements: Requirement specifiers (e.g. 'requests>=2.0')
+            job: Background job for reporting progress and streaming pip output
+
+        Returns:
+            Hash of the environment
+
+        Raises:
+            subprocess.CalledProcessError: If the environment could not be built
+        """
+        env_hash = get_dependencies_hash(requirements)
+
+        self._reserve(env_hash)
+        try:
+            self._ensure_env(env_hash, requirements, job)
+        except BaseException:
+            self.release_env(env_hash)
+            raise
+
+        return env_hash
+
+    def release_env(self, env_hash: str) -> None:
+        """Release the reservation of ensure_env, after the environment hash is saved (or discarded)"""
+        with self._lock:
+            count = self._reservations.get(env_hash, 0) - 1
+            if count > 0:
+                self._reservations[env_hash] = count
+            else:
+                self._reservations.pop(env_hash, None)
+
+    def _ensure_env(self, env_hash: str, requirements: List[str], job: Optional[BackgroundJob]) -> None:
+        with self._get_env_lock(env_hash):
+            env_path = self.get_env_path(env_hash)
+            if (env_path / _COMPLETE_MARKER).exists():
+                LOGGER.info(f'Reusing project venv {env_hash}')
+                if job is not None:
+                    job.set_stage('building_venv', f'Reusing existing environment {env_hash}')
+                return
+
+            if job is not None:
+                job.set_stage('building_venv', f'Building environment {env_hash}')
+
+            # leftovers of an interrupted build
+            if env_path.exists():
+                shutil.rmtree(env_path)
+
+            try:
+                self._build_env(env_path, requirements, job)
+            except BaseException:
+                shutil.rmtree(env_path, ignore_errors=True)
+                raise
+
+            LOGGER.info(f'Built project venv {env_hash} with {len(requirements)} requirement(s)')
+
+    def remove_unused(self, used_hashes) -> List[str]:
+        """
+        Remove environments, which are not in used_hashes. The wheel cache is kept
+
+        Environments, which are reserved by unfinished imports or are being built, are skipped (without waiting),
+        they are removed by one of the next calls, if they become unused
+        """
+        if not self.envs_dir.exists():
+            return []
+
+        removed = []
+        for env_path in self.envs_dir.iterdir():
+            env_hash = env_path.name
+            if (env_hash in used_hashes) or not env_path.is_dir():
+                continue
+
+            env_lock = self._try_lock_unreserved_env(env_hash)
+            if env_lock is None:
+                LOGGER.info(f'Skipped removal of project venv {env_hash}, it is in use')
+                continue
+
+            try:
+                shutil.rmtree(env_path, ignore_errors=True)
+            finally:
+                env_lock.release()
+
+            removed.append(env_hash)
+            LOGGER.info(f'Removed unused project venv {env_hash}')
+
+        return removed
+
+    def _reserve(self, env_hash: str) -> None:
+        with self._lock:
+            self._reservations[env_hash] = self._reservations.get(env_hash, 0) + 1
+
+    def _try_lock_unreserved_env(self, env_hash: str) -> Optional[threading.Lock]:
+        # ensure_env reserves an env before taking its lock, so if it's reserved after this check,
+        # the build waits for the removal and then builds the env again
+        with self._lock:
+            if env_hash in self._reservations:
+                return None
+
+            env_lock = self._env_locks.setdefault(env_hash, threading.Lock())
+            if not env_lock.acquire(blocking=False):
+                return None
+
+            return env_lock
+
+    def _build_env(self, env_path: Path, requirements: List[str], job: Optional[BackgroundJob]) -> None:
+        with self._template_lock:
+            self._ensure_template(job)
+
+        env_path.parent.mkdir(parents=True, exist_ok=True)
+        _populate_from_template(self.template_dir, env_path)
+
+        requirements = sorted({r.strip() for r in requirements if r.strip()})
+        if requirements:
+            python = str(_get_python(env_path))
+            self.wheels_dir.mkdir(parents=True, exist_ok=True)
+
+            # only missing wheels are downloaded/built, the rest is taken from the cache
+            _run_command([python, '-m', 'pip', 'wheel',
+                          '--wheel-dir', str(self.wheels_dir),
+                          '--find-links', str(self.wheels_dir),
+                          '--prefer-binary']
+                         + requirements,
+                         job)
+            _run_command([python, '-m', 'pip', 'install',
+                          '--no-index',
+                          '--find-links', str(self.wheels_dir)]
+                         + requirements,
+                         job)
+
+        (env_path / _COMPLETE_MARKER).touch()
+
+    def _ensure_template(self, job: Optional[BackgroundJob]) -> None:
+        if (self.template_dir / _COMPLETE_MARKER).exists():
+            return
+
+        if self.template_dir.exists():
+            shutil.rmtree(self.template_dir)
+
+        LOGGER.info(f'Creating template venv at {self.template_dir}')
+        self.template_dir.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            _run_command([self._base_python, '-m', 'venv', str(self.template_dir)], job)
+        except BaseException:
+            shutil.rmtree(self.template_dir, ignore_errors=True)
+            raise
+
+        (self.template_dir / _COMPLETE_MARKER).touch()
+
+    def _get_env_lock(self, env_hash: str) -> threading.Lock:
+        with self._lock:
+            if env_hash not in self._env_locks:
+                self._env_locks[env_hash] = threading.Lock()
+            return self._env_locks[env_hash]
+
+
+def _get_python(env_path: Path) -> Path:
+    return env_path / _BIN_DIR_NAME / _PYTHON_NAME
+
+
+def _populate_from_template(template_dir: Path, env_path: Path) -> None:
+    # Scripts in bin (pip, activate, etc.) contain absolute paths of the template, so only interpreters are taken.
+    # pip is still available via "python -m pip"
+    env_path.mkdir()
+    (env_path / _BIN_DIR_NAME).mkdir()
+
+    for child in template_dir.iterdir():
+        if child.name in (_BIN_DIR_NAME, _COMPLETE_MARKER):
+            continue
+        _link_tree(child, env_path / child.name)
+
+    for child in (template_dir / _BIN_DIR_NAME).iterdir():
+        if child.name.lower().startswith('python'):
+            _link_tree(child, env_path / _BIN_DIR_NAME / child.name)
+
+
+def _link_tree(source: Path, target: Path) -> None:
+    """Copy a file or a folder using hardlinks where possible. Symlinks are copied as symlinks"""
+    if source.is_symlink():
+        os.symlink(os.readlink(source), target)
+        return
+
+    if source.is_file():
+        _link_file(source, target)
+        return
+
+    target.mkdir()
+    for child in source.iterdir():
+        _link_tree(child, target / child.name)
+
+
+def _link_file(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        # e.g. different file systems or hardlinks are not supported
+        shutil.copy2(source, target)
+
+
+def _run_command(command: List[str], job: Optional[BackgroundJob]) -> str:
+    if job is not None:
+        return job.run_process(command)
+
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return result.stdout
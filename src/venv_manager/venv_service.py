@@ -3,15 +3,20 @@ Venv Package Management Service.
 Manages Python packages in the project's venv directory.
 """
 
-import ast
+import glob
 import json
 import logging
 import os
 import re
 import subprocess
 import sys
+import threading
+from importlib import metadata
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.background_jobs import BackgroundJob
+from venv_manager.import_analysis import ImportAnalysisCache
 
 LOGGER = logging.getLogger('script_server.VenvService')
 
@@ -21,6 +26,9 @@ PACKAGE_NAME_PATTERN = re.compile(r'^[a-zA-Z0-9._-]+$')
 # Version pattern (basic semver + extras)
 VERSION_PATTERN = re.compile(r'^[a-zA-Z0-9._+\-]+$')
 
+# packages, which are not listed by pip freeze
+FREEZE_EXCLUDED_PACKAGES = {'pip', 'setuptools', 'wheel', 'distribute'}
+
 
 class VenvService:
     """Manages packages in the project venv"""
@@ -31,6 +39,12 @@ class VenvService:
         self.pip_path = self._get_pip_path()
         self.python_path = self._get_python_path()
 
+        self._import_cache = ImportAnalysisCache()
+
+        self._installed_packages_lock = threading.Lock()
+        # (site-packages signature, packages)
+        self._installed_packages_cache = None
+
     def _get_pip_path(self) -> str:
         """Get path to pip in venv"""
         if sys.platform == 'win32':
@@ -47,25 +61,44 @@ class VenvService:
         """Check if venv exists"""
         return os.path.exists(self.pip_path)
 
-    def create_venv(self) -> bool:
+    def create_venv(self, job: Optional[BackgroundJob] = None) -> bool:
         """Create venv if it doesn't exist"""
         if self.venv_exists():
             return True
 
         try:
             LOGGER.info(f'Creating venv at {self.venv_path}')
-            subprocess.run(
-                [sys.executable, '-m', 'venv', self.venv_path],
-                check=True,
-                capture_output=True
-            )
+            if job is not None:
+                job.write_output(f'Creating venv at {self.venv_path}\n')
+            self._run_command([sys.executable, '-m', 'venv', self.venv_path], job)
             LOGGER.info(f'Successfully created venv at {self.venv_path}')
+            self.invalidate_installed_packages()
             return True
         except subprocess.CalledProcessError as e:
-            error_msg = e.stderr.decode() if e.stderr else str(e)
+            error_msg = e.stderr if e.stderr else str(e)
             LOGGER.error(f'Failed to create venv: {error_msg}')
             raise RuntimeError(f'Failed to create venv: {error_msg}')
 
+    @staticmethod
+    def _run_command(command: List[str], job: Optional[BackgroundJob] = None) -> str:
+        """
+        Run command and return its stdout. If job is specified, output is streamed to the job
+        and the command can be cancelled.
+
+        Raises:
+            subprocess.CalledProcessError: If the command failed
+        """
+        if job is not None:
+            return job.run_process(command)
+
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout
+
     def get_status(self) -> Dict:
         """Get venv status including Python version"""
         if not self.venv_exists():
@@ -140,6 +173,47 @@ class VenvService:
         if not self.venv_exists():
             return []
 
+        return [{'name': package['name'], 'version': package['version']}
+                for package in self._get_installed_packages()]
+
+    def invalidate_installed_packages(self) -> None:
+        """Drop cached list of installed packages (it's also re-read, when site-packages folder changes)"""
+        with self._installed_packages_lock:
+            self._installed_packages_cache = None
+
+    def _find_site_packages_dirs(self) -> List[str]:
+        if sys.platform == 'win32':
+            candidates = [os.path.join(self.venv_path, 'Lib', 'site-packages')]
+        else:
+            candidates = sorted(glob.glob(os.path.join(self.venv_path, 'lib', 'python*', 'site-packages')))
+
+        return [path for path in candidates if os.path.isdir(path)]
+
+    def _get_installed_packages(self) -> List[Dict]:
+        """
+        Get installed packages (name, version, editable) from distributions metadata in the venv site-packages.
+        Falls back to pip, if site-packages folder cannot be found
+        """
+        site_packages_dirs = self._find_site_packages_dirs()
+        if not site_packages_dirs:
+            return [dict(package, editable=False) for package in self._list_packages_with_pip()]
+
+        # installing or removing a package adds/removes its metadata folder, which changes the folder mtime
+        signature = tuple((path, os.stat(path).st_mtime_ns) for path in site_packages_dirs)
+
+        with self._installed_packages_lock:
+            cached = self._installed_packages_cache
+            if (cached is not None) and (cached[0] == signature):
+                return cached[1]
+
+        packages = _read_installed_distributions(site_packages_dirs)
+
+        with self._installed_packages_lock:
+            self._installed_packages_cache = (signature, packages)
+
+        return packages
+
+    def _list_packages_with_pip(self) -> List[Dict]:
         try:
             result = subprocess.run(
                 [self.pip_path, 'list', '--format=json'],
@@ -156,8 +230,16 @@ class VenvService:
             LOGGER.error(f'Failed to parse package list: {e}')
             raise RuntimeError(f'Failed to parse package list: {e}')
 
-    def install_package(self, package: str, version: Optional[str] = None) -> Dict:
-        """Install a package. Auto-creates venv if needed."""
+    def validate_install_request(self, package: str, version: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """
+        Validate package name and version of an install request.
+
+        Returns:
+            Tuple of normalized (package, version)
+
+        Raises:
+            ValueError: If package name or version are invalid
+        """
         if not package or not package.strip():
             raise ValueError('Package name is required')
 
@@ -169,34 +251,45 @@ class VenvService:
             version = version.strip()
             self._validate_version(version)
 
+        return package, version
+
+    def install_package(self, package: str, version: Optional[str] = None, job: Optional[BackgroundJob] = None) -> Dict:
+        """Install a package. Auto-creates venv if needed."""
+        package, version = self.validate_install_request(package, version)
+
         # Auto-create venv if needed
         if not self.venv_exists():
-            self.create_venv()
+            self.create_venv(job)
 
         package_spec = f'{package}=={version}' if version else package
 
         try:
             LOGGER.info(f'Installing package: {package_spec}')
-            result = subprocess.run(
-                [self.pip_path, 'install', package_spec],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            output = self._run_command([self.pip_path, 'install', package_spec], job)
+            self.invalidate_installed_packages()
             LOGGER.info(f'Successfully installed package: {package_spec}')
             return {
                 'success': True,
                 'package': package,
                 'version': version,
-                'output': result.stdout
+                'output': output
             }
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr if e.stderr else str(e)
             LOGGER.error(f'Failed to install {package_spec}: {error_msg}')
             raise RuntimeError(f'Failed to install package: {error_msg}')
 
-    def uninstall_package(self, package: str) -> Dict:
-        """Uninstall a package"""
+    def validate_uninstall_request(self, package: str) -> str:
+        """
+        Validate package name of an uninstall request.
+
+        Returns:
+            Normalized package name
+
+        Raises:
+            ValueError: If package name is invalid
+            RuntimeError: If venv does not exist
+        """
         if not package or not package.strip():
             raise ValueError('Package name is required')
 
@@ -208,19 +301,21 @@ class VenvService:
         if not self.venv_exists():
             raise RuntimeError('Venv does not exist')
 
+        return package
+
+    def uninstall_package(self, package: str, job: Optional[BackgroundJob] = None) -> Dict:
+        """Uninstall a package"""
+        package = self.validate_uninstall_request(package)
+
         try:
             LOGGER.info(f'Uninstalling package: {package}')
-            result = subprocess.run(
-                [self.pip_path, 'uninstall', '-y', package],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            output = self._run_command([self.pip_path, 'uninstall', '-y', package], job)
+            self.invalidate_installed_packages()
             LOGGER.info(f'Successfully uninstalled package: {package}')
             return {
                 'success': True,
                 'package': package,
-                'output': result.stdout
+                'output': output
             }
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr if e.stderr else str(e)
@@ -266,29 +361,31 @@ class VenvService:
             LOGGER.error(f'Failed to write requirements.txt: {e}')
             raise RuntimeError(f'Failed to write requirements.txt: {str(e)}')
 
-    def sync_requirements(self) -> Dict:
+    def validate_sync_request(self) -> None:
+        """
+        Raises:
+            RuntimeError: If requirements.txt doesn't exist
+        """
+        if not os.path.exists(self._get_requirements_file_path()):
+            raise RuntimeError('requirements.txt not found')
+
+    def sync_requirements(self, job: Optional[BackgroundJob] = None) -> Dict:
         """Install all packages from requirements.txt"""
+        self.validate_sync_request()
         requirements_path = self._get_requirements_file_path()
 
-        if not os.path.exists(requirements_path):
-            raise RuntimeError('requirements.txt not found')
-
         # Auto-create venv if needed
         if not self.venv_exists():
-            self.create_venv()
+            self.create_venv(job)
 
         try:
             LOGGER.info(f'Installing packages from requirements.txt')
-            result = subprocess.run(
-                [self.pip_path, 'install', '-r', requirements_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            output = self._run_command([self.pip_path, 'install', '-r', requirements_path], job)
+            self.invalidate_installed_packages()
             LOGGER.info(f'Successfully installed packages from requirements.txt')
             return {
                 'success': True,
-                'output': result.stdout
+                'output': output
             }
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr if e.stderr else str(e)
@@ -376,30 +473,6 @@ class VenvService:
             'zipapp', 'zipfile', 'zipimport', 'zlib'
         }
 
-    def _extract_imports_from_file(self, filepath: str) -> Set[str]:
-        """Extract top-level import names from a Python file"""
-        imports = set()
-
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                tree = ast.parse(f.read(), filename=filepath)
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        # Get root module (e.g., 'requests' from 'requests.auth')
-                        root = alias.name.split('.')[0]
-                        imports.add(root)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        # Get root module
-                        root = node.module.split('.')[0]
-                        imports.add(root)
-        except (OSError, SyntaxError) as e:
-            LOGGER.debug(f'Failed to parse imports from {filepath}: {e}')
-
-        return imports
-
     def _get_script_dependencies(self) -> Dict[str, Set[str]]:
         """
         Scan all scripts and return mapping of script_name -> set of imported packages
@@ -411,13 +484,16 @@ class VenvService:
         if not os.path.exists(scripts_dir):
             return script_dependencies
 
-        # Find all .py files
-        for py_file in Path(scripts_dir).rglob('*.py'):
-            script_name = py_file.stem
-            imports = self._extract_imports_from_file(str(py_file))
+        # Find all .py files, only new and modified files are parsed
+        py_files = [str(py_file) for py_file in Path(scripts_dir).rglob('*.py')]
+        file_imports = self._import_cache.get_imports(py_files)
+
+        for py_file in py_files:
+            script_name = Path(py_file).stem
+            imports = file_imports.get(py_file)
 
             if imports:
-                script_dependencies[script_name] = imports
+                script_dependencies[script_name] = set(imports)
 
         return script_dependencies
 
@@ -450,97 +526,116 @@ class VenvService:
                     package_usage[pkg] = []
                 package_usage[pkg].append(script_name)
 
-        # Get installed packages using pip freeze (name==version format)
-        try:
-            result = subprocess.run(
-                [self.pip_path, 'freeze'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+        # Get installed packages (the same, as pip freeze lists)
+        installed_packages = set()
+        requirements = []
 
-            # Build set of installed package names (normalized)
-            installed_packages = set()
-            requirements = []
-
-            for line in result.stdout.strip().split('\n'):
-                if not line or line.startswith('#') or line.startswith('-'):
-                    continue
-
-                # Parse name==version or name @ url
-                if '==' in line:
-                    name, version = line.split('==', 1)
-                elif ' @ ' in line:
-                    # Handle editable installs like "package @ file://..."
-                    name = line.split(' @ ')[0]
-                    version = 'editable'
-                else:
-                    # Handle other formats
-                    name = line
-                    version = 'unknown'
-
-                name = name.strip()
-
-                # Add to installed set with various normalizations
-                installed_packages.add(name.lower())
-                installed_packages.add(name.replace('-', '_').lower())
-                installed_packages.add(name.replace('_', '-').lower())
-
-                # Normalize package name (pip uses dashes, imports use underscores)
-                # Example: google-api-python-client imports as googleapiclient
-                import_name = name.replace('-', '_').lower()
-
-                # Check if it's stdlib
-                is_stdlib = name.lower() in stdlib or import_name in stdlib
-
-                # Get scripts that use this package
-                used_by = package_usage.get(name, [])
-                if not used_by:
-                    # Try with underscores
-                    used_by = package_usage.get(import_name, [])
-                if not used_by:
-                    # Try common variations (e.g., google-api-python-client -> google)
-                    for pkg_name in package_usage.keys():
-                        if pkg_name.startswith(name.split('-')[0].lower()):
-                            used_by.extend(package_usage[pkg_name])
-
-                requirements.append({
-                    'name': name,
-                    'version': version,
-                    'is_stdlib': is_stdlib,
-                    'used_by': sorted(list(set(used_by)))
+        for package in self._get_installed_packages():
+            name = package['name']
+            if name.lower() in FREEZE_EXCLUDED_PACKAGES:
+                continue
+
+            version = 'editable' if package['editable'] else package['version']
+
+            # Add to installed set with various normalizations
+            installed_packages.add(name.lower())
+            installed_packages.add(name.replace('-', '_').lower())
+            installed_packages.add(name.replace('_', '-').lower())
+
+            # Normalize package name (pip uses dashes, imports use underscores)
+            # Example: google-api-python-client imports as googleapiclient
+            import_name = name.replace('-', '_').lower()
+
+            # Check if it's stdlib
+            is_stdlib = name.lower() in stdlib or import_name in stdlib
+
+            # Get scripts that use this package
+            used_by = package_usage.get(name, [])
+            if not used_by:
+                # Try with underscores
+                used_by = package_usage.get(import_name, [])
+            if not used_by:
+                # Try common variations (e.g., google-api-python-client -> google)
+                for pkg_name in package_usage.keys():
+                    if pkg_name.startswith(name.split('-')[0].lower()):
+                        used_by.extend(package_usage[pkg_name])
+
+            requirements.append({
+                'name': name,
+                'version': version,
+                'is_stdlib': is_stdlib,
+                'used_by': sorted(list(set(used_by)))
+            })
+
+        # Find missing packages (imported but not installed)
+        missing_packages = []
+        all_imports = set()
+        for imports in script_deps.values():
+            all_imports.update(imports)
+
+        for import_name in all_imports:
+            # Skip stdlib modules
+            if import_name in stdlib:
+                continue
+
+            # Check if installed (try various normalizations)
+            normalized = import_name.lower()
+            if normalized not in installed_packages:
+                # Find which scripts need this package
+                needed_by = [script for script, imports in script_deps.items()
+                             if import_name in imports]
+
+                missing_packages.append({
+                    'name': import_name,
+                    'needed_by': sorted(needed_by)
                 })
 
-            # Find missing packages (imported but not installed)
-            missing_packages = []
-            all_imports = set()
-            for imports in script_deps.values():
-                all_imports.update(imports)
-
-            for import_name in all_imports:
-                # Skip stdlib modules
-                if import_name in stdlib:
-                    continue
-
-                # Check if installed (try various normalizations)
-                normalized = import_name.lower()
-                if normalized not in installed_packages:
-                    # Find which scripts need this package
-                    needed_by = [script for script, imports in script_deps.items()
-                                if import_name in imports]
-
-                    missing_packages.append({
-                        'name': import_name,
-                        'needed_by': sorted(needed_by)
-                    })
+        return {
+            'requirements': requirements,
+            'missing_packages': sorted(missing_packages, key=lambda x: x['name']),
+            'script_dependencies': {k: sorted(list(v)) for k, v in script_deps.items()}
+        }
 
-            return {
-                'requirements': requirements,
-                'missing_packages': sorted(missing_packages, key=lambda x: x['name']),
-                'script_dependencies': {k: sorted(list(v)) for k, v in script_deps.items()}
-            }
 
-        except subprocess.CalledProcessError as e:
-            error_msg = e.stderr if e.stderr else str(e)
-            LOGGER.error(f'Failed to get requirements: {error_msg}')
-            raise RuntimeError(f'Failed to get requirements: {error_msg}')
+def _read_installed_distributions(site_packages_dirs: List[str]) -> List[Dict]:
+    """Read name and version of the distributions, installed to the site-packages folders"""
+    packages = {}
+
+    # metadata folders are listed explicitly, because importlib.metadata.distributions caches folder listings
+    for site_packages_dir in site_packages_dirs:
+        for entry in sorted(os.listdir(site_packages_dir)):
+            if not entry.endswith(('.dist-info', '.egg-info')):
+                continue
+
+            metadata_path = Path(site_packages_dir) / entry
+            if metadata_path.is_dir():
+                _add_distribution(packages, metadata.PathDistribution(metadata_path))
+
+    return sorted(packages.values(), key=lambda package: package['name'].lower())
+
+
+def _add_distribution(packages: Dict[str, Dict], distribution) -> None:
+    name = distribution.metadata['Name']
+    if not name:
+        return
+
+    normalized_name = re.sub(r'[-_.]+', '-', name).lower()
+    if normalized_name in packages:
+        # the first found distribution is the one, which python imports
+        return
+
+    packages[normalized_name] = {
+        'name': name,
+        'version': distribution.version,
+        'editable': _is_editable(distribution)
+    }
+
+
+def _is_editable(distribution) -> bool:
+    try:
+        direct_url = distribution.read_text('direct_url.json')
+        if not direct_url:
+            return False
+        return bool(json.loads(direct_url).get('dir_info', {}).get('editable'))
+    except (OSError, ValueError, AttributeError):
+        return False
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+
+import tornado.ioloop
+
+from utils import date_utils
+
+LOGGER = logging.getLogger('script_server.ioloop_monitor')
+
+DEFAULT_INTERVAL_SECONDS = 0.1
+
+# ticks, delayed less than this, are considered as normal scheduling jitter
+DEFAULT_BLOCKING_THRESHOLD_SECONDS = 0.05
+
+DEFAULT_WARNING_THRESHOLD_SECONDS = 1
+
+
+class IOLoopMonitor:
+    """
+    Measures, how long IOLoop was blocked
+
+    A periodic callback is scheduled on the loop and its delay (compared to the expected time) is treated
+    as a time, when the loop couldn't process any other events
+    """
+
+    def __init__(self,
+                 interval_seconds=DEFAULT_INTERVAL_SECONDS,
+                 blocking_threshold_seconds=DEFAULT_BLOCKING_THRESHOLD_SECONDS,
+                 warning_threshold_seconds=DEFAULT_WARNING_THRESHOLD_SECONDS) -> None:
+        self._interval_seconds = interval_seconds
+        self._blocking_threshold_seconds = blocking_threshold_seconds
+        self._warning_threshold_seconds = warning_threshold_seconds
+
+        self._lock = threading.Lock()
+        self._callback = None
+        self._last_tick = None
+
+        self._started_at = None
+        self._ticks = 0
+        self._blocked_count = 0
+        self._total_blocked_seconds = 0.0
+        self._max_blocked_seconds = 0.0
+        self._last_blocked_at = None
+
+    def start(self):
+        if self._callback is not None:
+            return
+
+        self._started_at = date_utils.now()
+        self._last_tick = time.monotonic()
+
+        self._callback = tornado.ioloop.PeriodicCallback(self._tick, self._interval_seconds * 1000)
+        self._callback.start()
+
+    def stop(self):
+        if self._callback is None:
+            return
+
+        self._callback.stop()
+        self._callback = None
+
+    def _tick(self):
+        now = time.monotonic()
+        delay = now - self._last_tick - self._interval_seconds
+        self._last_tick = now
+
+        self.record_tick(delay)
+
+    def record_tick(self, delay_seconds):
+        with self._lock:
+            self._ticks += 1
+
+            if delay_seconds < self._blocking_threshold_seconds:
+                return
+
+            self._blocked_count += 1
+            self._total_blocked_seconds += delay_seconds
+            self._max_blocked_seconds = max(self._max_blocked_seconds, delay_seconds)
+            self._last_blocked_at = date_utils.now()
+
+        if delay_seconds >= self._warning_threshold_seconds:
+            LOGGER.warning('IOLoop was blocked for %.3f seconds', delay_seconds)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'started_at': date_utils.to_iso_string(self._started_at),
+                'interval_seconds': self._interval_seconds,
+                'blocking_threshold_seconds': self._blocking_threshold_seconds,
+                'ticks': self._ticks,
+                'blocked_count': self._blocked_count,
+                'total_blocked_seconds': round(self._total_blocked_seconds, 3),
+                'max_blocked_seconds': round(self._max_blocked_seconds, 3),
+                'last_blocked_at': date_utils.to_iso_string(self._last_blocked_at)
+            }
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import functools
 import json
 import logging.config
+import threading
 import uuid
+from collections import OrderedDict
 from concurrent.futures.thread import ThreadPoolExecutor
 
 import tornado.concurrent
@@ -27,6 +28,9 @@ LOGGER = logging.getLogger('web.script_config_socket')
 
 active_config_models = {}
 
+# parameter values, which were received during this period, are applied together (older values are dropped)
+PARAMETER_VALUES_DEBOUNCE_SECONDS = 0.1
+
 
 class ScriptConfigSocket(tornado.websocket.WebSocketHandler):
     user: User
@@ -48,6 +52,10 @@ class ScriptConfigSocket(tornado.websocket.WebSocketHandler):
         self._parameter_events_queue = []
         self._latest_client_state_version = None
 
+        self._pending_values_lock = threading.Lock()
+        self._pending_parameter_values = OrderedDict()
+        self._pending_values_timeout = None
+
     @check_authorization
     @inject_user
     @gen.coroutine
@@ -71,24 +79,22 @@ class ScriptConfigSocket(tornado.websocket.WebSocketHandler):
 
             if type == 'parameterValue':
                 param = data.get('parameter')
-                set_parameter_func = functools.partial(
-                    self._set_parameter_value,
-                    param,
-                    data.get('value'),
-                    data.get('clientStateVersion'))
 
-                def handle_future_exception(result):
-                    if result.exception():
-                        LOGGER.exception(f'Failed to set parameter {param} value', exc_info=result.exception())
+                with self._pending_values_lock:
+                    # the latest value replaces a pending one, but keeps its position
+                    self._pending_parameter_values[param] = (data.get('value'), data.get('clientStateVersion'))
 
-                future = self._start_task(set_parameter_func)
-                future.add_done_callback(handle_future_exception)
+                if self.config_model is not None:
+                    self.config_model.cancel_dependant_values_loading(param)
 
+                self._schedule_pending_values()
                 return
             elif type == 'reloadModelValues':
                 parameter_values = data.get('parameterValues')
                 external_id = data.get('clientModelId')
 
+                self._cancel_pending_values()
+
                 yield self._prepare_and_send_model(parameter_values=parameter_values,
                                                    external_id=external_id,
                                                    event_type='reloadedConfig',
@@ -118,12 +124,59 @@ class ScriptConfigSocket(tornado.websocket.WebSocketHandler):
 
         return future
 
-    def _set_parameter_value(self, parameter, value, client_state_version):
-        self._latest_client_state_version = client_state_version
-        self.config_model.set_param_value(parameter, value)
+    def _schedule_pending_values(self):
+        if self._pending_values_timeout is not None:
+            self.ioloop.remove_timeout(self._pending_values_timeout)
+
+        self._pending_values_timeout = self.ioloop.call_later(
+            PARAMETER_VALUES_DEBOUNCE_SECONDS,
+            self._flush_pending_values)
+
+    def _cancel_pending_values(self):
+        if self._pending_values_timeout is not None:
+            self.ioloop.remove_timeout(self._pending_values_timeout)
+            self._pending_values_timeout = None
+
+        with self._pending_values_lock:
+            self._pending_parameter_values.clear()
+
+    def _flush_pending_values(self):
+        self._pending_values_timeout = None
+
+        def handle_future_exception(result):
+            if result.exception():
+                LOGGER.exception('Failed to set parameter values', exc_info=result.exception())
+
+        future = self._start_task(self._set_pending_parameter_values)
+        future.add_done_callback(handle_future_exception)
+
+    def _set_pending_parameter_values(self):
+        # values are taken only when the task starts, so that values, received in the meantime, are coalesced too
+        with self._pending_values_lock:
+            pending_values = self._pending_parameter_values
+            self._pending_parameter_values = OrderedDict()
+
+        if not pending_values:
+            return
+
+        client_state_versions = [version for (_, version) in pending_values.values() if version is not None]
+        if client_state_versions:
+            self._latest_client_state_version = max(client_state_versions)
+
+        for parameter, (value, _) in pending_values.items():
+            try:
+                self.config_model.set_param_value(parameter, value)
+            except Exception:
+                LOGGER.exception(f'Failed to set parameter {parameter} value')
+
+        # loading was cancelled on receiving the values, but equal values don't trigger reloading
+        self.config_model.reload_cancelled_values()
+
         self._send_parameter_event('clientStateVersionAccepted', {})
 
     def on_close(self):
+        self._cancel_pending_values()
+
         if self.config_id in active_config_models:
             del active_config_models[self.config_id]
 
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+DEFAULT_MAX_ENTRIES = 1000
+
+ScriptsSummary = namedtuple('ScriptsSummary', ['body', 'etag'])
+
+
+class ScriptsSummaryCache:
+    """
+    Keeps serialized /scripts responses per user and mode
+
+    An entry is rebuilt only, when its version (e.g. configs and validation versions) changes
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, version, build_scripts) -> ScriptsSummary:
+        with self._lock:
+            cached = self._entries.get(key)
+            if (cached is not None) and (cached[0] == version):
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        body = json.dumps({'scripts': build_scripts()})
+        summary = ScriptsSummary(body, '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"')
+
+        with self._lock:
+            self._entries[key] = (version, summary)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -7,6 +7,7 @@ import signal
 import ssl
 import time
 import urllib.parse
+from concurrent.futures.thread import ThreadPoolExecutor
 
 import tornado.concurrent
 import tornado.escape
@@ -39,14 +40,18 @@ from model.constants import (
     WEBSOCKET_NORMAL_CLOSE_CODE,
     MAX_LOG_LINES
 )
+from scheduling.schedule_config import read_schedule_config
 from scheduling.schedule_service import ScheduleService, UnavailableScriptException, InvalidScheduleException, AccessDeniedException, JobNotFoundException
 from utils import file_utils
 from utils import tornado_utils, os_utils, env_utils, custom_json
 from utils.audit_utils import get_audit_name_from_request
+from utils.background_jobs import BackgroundJobService, STATUS_CANCELLED, STATUS_FAILED
 from utils.exceptions.missing_arg_exception import MissingArgumentException
 from utils.exceptions.not_found_exception import NotFoundException
 from utils.tornado_utils import respond_error, redirect_relative, get_form_file
+from web.ioloop_monitor import IOLoopMonitor
 from web.script_config_socket import ScriptConfigSocket, active_config_models
+from web.scripts_summary_cache import ScriptsSummaryCache
 from web.streaming_form_reader import StreamingFormReader
 from web.web_auth_utils import check_authorization, check_authorization_sync
 from web.web_utils import wrap_to_server_event, identify_user, inject_user, get_user
@@ -54,6 +59,13 @@ from web.xheader_app_wrapper import autoapply_xheaders
 
 BYTES_IN_MB = 1024 * 1024
 
+# bounded, so slow file systems cannot exhaust threads of the server
+IO_EXECUTOR_MAX_WORKERS = 8
+
+MAX_SCHEDULE_PREVIEW_COUNT = 100
+
+PROJECT_IMPORT_QUEUE = 'project-import'
+
 LOGGER = logging.getLogger('web_server')
 
 
@@ -122,6 +134,10 @@ class BaseRequestHandler(tornado.web.RequestHandler):
 
         respond_error(self, status_code, self._reason)
 
+    async def run_blocking(self, func, *args):
+        """Runs blocking function (e.g. disk access) in the IO pool, so IOLoop can serve other requests"""
+        return await tornado.ioloop.IOLoop.current().run_in_executor(self.application.io_executor, func, *args)
+
 
 class BaseStaticHandler(tornado.web.StaticFileHandler):
     def set_default_headers(self):
@@ -139,41 +155,66 @@ class GetServerConf(BaseRequestHandler):
 class GetScripts(BaseRequestHandler):
     @check_authorization
     @inject_user
-    def get(self, user):
+    async def get(self, user):
         mode = self.get_query_argument('mode', default=None)
 
-        configs = self.application.config_service.list_configs(user, mode)
+        summary = await self.run_blocking(self._get_summary, user, mode)
 
-        scripts = []
-        for conf in configs:
-            script_dict = {
-                'name': conf.name,
-                'group': conf.group,
-                'parsing_failed': conf.parsing_failed,
-                'description': conf.description
-            }
+        self.set_header('Etag', summary.etag)
+        if self.check_etag_header():
+            self.set_status(304)
+            return
 
-            # Add project_id if this script was created from a project
-            if conf.project_id:
-                script_dict['project_id'] = conf.project_id
-
-            # Add verbs configuration if present
-            if hasattr(conf, 'verbs_config') and conf.verbs_config and conf.verbs_config.enabled:
-                script_dict['verbs'] = conf.verbs_config.to_dict()
-                script_dict['sharedParameters'] = getattr(conf, 'shared_parameters', [])
-
-            # Add validation status
-            if hasattr(self.application, 'script_validator'):
-                validation = self.application.script_validator.get_validation_status(conf.name)
-                script_dict['validation'] = {
-                    'valid': validation.get('valid', True),
-                    'error': validation.get('error'),
-                    'warning': validation.get('warning')
-                }
+        self.write(summary.body)
+
+    def compute_etag(self):
+        # etag is set explicitly in get
+        return None
 
-            scripts.append(script_dict)
+    def _get_summary(self, user, mode):
+        config_service = self.application.config_service
+        configs = config_service.list_configs(user, mode)
 
-        self.write(json.dumps({'scripts': scripts}))
+        script_validator = getattr(self.application, 'script_validator', None)
+
+        # visible scripts are included, because access rights of the user can change independently of configs
+        version = (config_service.get_configs_version(),
+                   script_validator.version if script_validator else None,
+                   tuple(conf.name for conf in configs))
+
+        return self.application.scripts_summary_cache.get(
+            (user.user_id, mode),
+            version,
+            lambda: [self._to_script_summary(conf, script_validator) for conf in configs])
+
+    @staticmethod
+    def _to_script_summary(conf, script_validator):
+        script_dict = {
+            'name': conf.name,
+            'group': conf.group,
+            'parsing_failed': conf.parsing_failed,
+            'description': conf.description
+        }
+
+        # Add project_id if this script was created from a project
+        if conf.project_id:
+            script_dict['project_id'] = conf.project_id
+
+        # Add verbs configuration if present
+        if hasattr(conf, 'verbs_config') and conf.verbs_config and conf.verbs_config.enabled:
+            script_dict['verbs'] = conf.verbs_config.to_dict()
+            script_dict['sharedParameters'] = getattr(conf, 'shared_parameters', [])
+
+        # Add validation status
+        if script_validator is not None:
+            validation = script_validator.get_validation_status(conf.name)
+            script_dict['validation'] = {
+                'valid': validation.get('valid', True),
+                'error': validation.get('error'),
+                'warning': validation.get('warning')
+            }
+
+        return script_dict
 
 
 class AdminUpdateScriptEndpoint(BaseRequestHandler):
@@ -218,9 +259,9 @@ class AdminUpdateScriptEndpoint(BaseRequestHandler):
 class AdminScriptEndpoint(BaseRequestHandler):
     @requires_admin_rights
     @inject_user
-    def get(self, user, script_name):
+    async def get(self, user, script_name):
         try:
-            config = self.application.config_service.load_config(script_name, user)
+            config = await self.run_blocking(self.application.config_service.load_config, script_name, user)
         except ConfigNotAllowedException:
             LOGGER.warning('Admin access to the script "' + script_name + '" is denied for ' + user.get_audit_name())
             respond_error(self, 403, 'Access to the script is denied')
@@ -236,49 +277,20 @@ class AdminScriptEndpoint(BaseRequestHandler):
 
     @requires_admin_rights
     @inject_user
-    def put(self, user, script_name):
+    async def put(self, user, script_name):
         """Update script configuration (settings)."""
         try:
             config_service = self.application.config_service
 
             # Load existing config
-            config_path = config_service.find_config(script_name)
+            config_path = await self.run_blocking(config_service.find_config, script_name)
             if not config_path:
                 raise tornado.web.HTTPError(404, reason=f'Script "{script_name}" not found')
 
-            # Read existing config
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
             # Parse request body
             body = json.loads(self.request.body.decode('utf-8'))
 
-            # Update defaults (if provided)
-            if 'defaultVerb' in body:
-                config['defaultVerb'] = body['defaultVerb']
-            if 'defaultConnections' in body:
-                config['defaultConnections'] = body['defaultConnections']
-            if 'defaultParameters' in body:
-                config['defaultParameters'] = body['defaultParameters']
-
-            # Update access control (if provided)
-            if 'allowed_users' in body:
-                config['allowed_users'] = body['allowed_users']
-            if 'admin_users' in body:
-                config['admin_users'] = body['admin_users']
-
-            # Update scheduling settings (if provided)
-            if 'scheduling_enabled' in body or 'scheduling_auto_cleanup' in body:
-                if 'scheduling' not in config:
-                    config['scheduling'] = {}
-                if 'scheduling_enabled' in body:
-                    config['scheduling']['enabled'] = body['scheduling_enabled']
-                if 'scheduling_auto_cleanup' in body:
-                    config['scheduling']['auto_cleanup'] = body['scheduling_auto_cleanup']
-
-            # Write updated config
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            await self.run_blocking(self._update_config_file, config_path, body)
 
             LOGGER.info(f"Updated configuration for script '{script_name}'")
             self.write(json.dumps({'success': True}))
@@ -291,11 +303,44 @@ class AdminScriptEndpoint(BaseRequestHandler):
             LOGGER.error(f'Failed to update script {script_name}: {e}', exc_info=True)
             raise tornado.web.HTTPError(500, reason=str(e))
 
+    @staticmethod
+    def _update_config_file(config_path, body):
+        # Read existing config
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        # Update defaults (if provided)
+        if 'defaultVerb' in body:
+            config['defaultVerb'] = body['defaultVerb']
+        if 'defaultConnections' in body:
+            config['defaultConnections'] = body['defaultConnections']
+        if 'defaultParameters' in body:
+            config['defaultParameters'] = body['defaultParameters']
+
+        # Update access control (if provided)
+        if 'allowed_users' in body:
+            config['allowed_users'] = body['allowed_users']
+        if 'admin_users' in body:
+            config['admin_users'] = body['admin_users']
+
+        # Update scheduling settings (if provided)
+        if 'scheduling_enabled' in body or 'scheduling_auto_cleanup' in body:
+            if 'scheduling' not in config:
+                config['scheduling'] = {}
+            if 'scheduling_enabled' in body:
+                config['scheduling']['enabled'] = body['scheduling_enabled']
+            if 'scheduling_auto_cleanup' in body:
+                config['scheduling']['auto_cleanup'] = body['scheduling_auto_cleanup']
+
+        # Write updated config
+        with open(config_path, 'w') as f:
+            json.dump(config, f, indent=2)
+
     @requires_admin_rights
     @inject_user
-    def delete(self, user, script_name):
+    async def delete(self, user, script_name):
         try:
-            self.application.config_service.delete_config(user, script_name)
+            await self.run_blocking(self.application.config_service.delete_config, user, script_name)
         except ConfigNotAllowedException:
             LOGGER.warning(
                 f'Admin access to the script "{script_name}" is denied for {user.get_audit_name()}'
@@ -313,9 +358,10 @@ class AdminScriptEndpoint(BaseRequestHandler):
 class AdminGetScriptCodeEndpoint(BaseRequestHandler):
     @requires_admin_rights
     @inject_user
-    def get(self, user, script_name):
+    async def get(self, user, script_name):
         try:
-            loaded_script = self.application.config_service.load_script_code(script_name, user)
+            loaded_script = await self.run_blocking(
+                self.application.config_service.load_script_code, script_name, user)
         except ConfigNotAllowedException:
             LOGGER.warning('Admin access to the script "' + script_name + '" is denied for ' + user.get_audit_name())
             respond_error(self, 403, 'Access to the script is denied')
@@ -352,6 +398,7 @@ class ScriptStreamSocket(tornado.websocket.WebSocketHandler):
         super().__init__(application, request, **kwargs)
 
         self.executor = None
+        self.attached = False
 
     @check_authorization
     @inject_user
@@ -366,9 +413,29 @@ class ScriptStreamSocket(tornado.websocket.WebSocketHandler):
 
         self.ioloop = tornado.ioloop.IOLoop.current()
 
-        self.write_message(wrap_to_server_event('input', 'your input >>'))
-
         user_id = identify_user(self)
+        web_socket = self
+
+        if execution_service.is_queued(execution_id):
+            self.write_message(wrap_to_server_event('output', 'Waiting in the execution queue...\n'))
+
+            def cancelled():
+                # the execution was removed from the queue without starting
+                if not web_socket.attached:
+                    web_socket.ioloop.add_callback(web_socket.close, code=WEBSOCKET_NORMAL_CLOSE_CODE)
+
+            execution_service.add_finish_listener(cancelled, execution_id)
+
+        # for queued executions, the output is attached only when the script is started
+        execution_service.add_start_listener(
+            lambda: self._attach_to_execution(execution_id, user_id),
+            execution_id)
+
+    def _attach_to_execution(self, execution_id, user_id):
+        execution_service = self.application.execution_service
+        self.attached = True
+
+        self.safe_write(wrap_to_server_event('input', 'your input >>'))
 
         output_stream = execution_service.get_raw_output_stream(execution_id, user_id)
         pipe_output_to_http(output_stream, self.safe_write)
@@ -585,8 +652,10 @@ class GetExecutionStatus(BaseRequestHandler):
     @check_authorization
     @inject_user
     def get(self, user, execution_id):
-        running = self.application.execution_service.is_running(execution_id, user)
-        self.write(external_model.running_flag_to_status(running))
+        execution_service = self.application.execution_service
+        running = execution_service.is_running(execution_id, user)
+        queued = running and execution_service.is_queued(execution_id)
+        self.write(external_model.running_flag_to_status(running, queued))
 
 
 class AuthorizedStaticFileHandler(BaseStaticHandler):
@@ -668,8 +737,33 @@ class ScriptParameterListFiles(BaseRequestHandler):
             return
 
         path = self.get_query_arguments('path')
+        prefix = self.get_query_argument('prefix', default=None)
+        try:
+            offset = int(self.get_query_argument('offset', default='0'))
+            limit_arg = self.get_query_argument('limit', default=None)
+            limit = int(limit_arg) if limit_arg is not None else None
+        except ValueError:
+            respond_error(self, 400, 'offset and limit should be integers')
+            return
+
+        if (offset < 0) or ((limit is not None) and (limit < 0)):
+            respond_error(self, 400, 'offset and limit should not be negative')
+            return
+
         try:
             files = config_model.list_files_for_param(parameter_name, path)
+
+            if prefix:
+                folded_prefix = prefix.casefold()
+                files = [f for f in files if f['name'].casefold().startswith(folded_prefix)]
+
+            # total count allows the client to request next pages
+            self.set_header('X-Total-Count', str(len(files)))
+            if limit is not None:
+                files = files[offset:offset + limit]
+            elif offset:
+                files = files[offset:]
+
             self.write(json.dumps(files))
 
         except ParameterNotFoundException as e:
@@ -908,6 +1002,10 @@ class GetSchedules(BaseRequestHandler):
             next_time = job.schedule.get_next_time()
             if next_time:
                 schedule_data['next_execution'] = next_time.isoformat()
+            # the time, when the execution is actually dispatched (including jitter)
+            planned_time = schedule_service.get_planned_time(job)
+            if planned_time:
+                schedule_data['planned_execution'] = planned_time.isoformat()
             # Add last execution time for recurring schedules
             if job.schedule.repeatable and job.schedule.executions_count > 0:
                 last_time = job.schedule.get_last_execution_time()
@@ -923,6 +1021,27 @@ class GetSchedules(BaseRequestHandler):
         self.write(json.dumps({'schedules': schedules}))
 
 
+class SchedulePreviewHandler(BaseRequestHandler):
+    @check_authorization
+    def post(self):
+        """Get next execution times of a schedule config (without saving it)."""
+        body = json.loads(self.request.body.decode('utf-8'))
+        schedule_config = body.get('schedule_config', {})
+
+        try:
+            count = min(int(body.get('count', 5)), MAX_SCHEDULE_PREVIEW_COUNT)
+            if count < 0:
+                raise ValueError('count should be >= 0')
+            parsed_config = read_schedule_config(external_model.parse_external_schedule(schedule_config))
+        except (InvalidScheduleException, ValueError, TypeError) as e:
+            raise tornado.web.HTTPError(422, reason=str(e))
+        except InvalidValueException as e:
+            raise tornado.web.HTTPError(422, reason=e.get_user_message())
+
+        next_times = parsed_config.get_next_times(count)
+        self.write(json.dumps({'next_executions': [next_time.isoformat() for next_time in next_times]}))
+
+
 class ScheduleHandler(BaseRequestHandler):
     @check_authorization
     @inject_user
@@ -959,6 +1078,9 @@ class ScheduleHandler(BaseRequestHandler):
                 next_time = schedule.get_next_time()
                 if next_time:
                     response['next_execution'] = next_time.isoformat()
+                planned_time = self.application.schedule_service.get_planned_time(job)
+                if planned_time:
+                    response['planned_execution'] = planned_time.isoformat()
 
             self.write(json.dumps(response))
         except JobNotFoundException as e:
@@ -991,6 +1113,9 @@ class ToggleScheduleEnabled(BaseRequestHandler):
                 next_time = schedule_config.get_next_time()
                 if next_time:
                     response['next_execution'] = next_time.isoformat()
+                planned_time = self.application.schedule_service.get_planned_time(job)
+                if planned_time:
+                    response['planned_execution'] = planned_time.isoformat()
 
             self.write(json.dumps(response))
         except JobNotFoundException as e:
@@ -999,6 +1124,36 @@ class ToggleScheduleEnabled(BaseRequestHandler):
             raise tornado.web.HTTPError(403, reason=str(e))
 
 
+class GetScheduleRuns(BaseRequestHandler):
+    @check_authorization
+    @inject_user
+    def get(self, user, schedule_id):
+        """Get recorded runs of a schedule (the latest first) with lag and duration statistics."""
+        schedule_service = self.application.schedule_service
+
+        job, _ = schedule_service.get_job(schedule_id, user)
+        if job is None:
+            raise tornado.web.HTTPError(404, reason=f'Schedule {schedule_id} not found')
+
+        limit = self.get_query_argument('limit', None)
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise tornado.web.HTTPError(400, reason='limit should be an integer')
+            if limit < 0:
+                raise tornado.web.HTTPError(400, reason='limit should be >= 0')
+
+        runs = schedule_service.get_runs(job, limit)
+
+        self.write(json.dumps({
+            'id': job.id,
+            'script_name': job.script_name,
+            'stats': schedule_service.get_run_stats(job),
+            'runs': [run.as_serializable_dict() for run in runs]
+        }))
+
+
 class ScheduleSettingsHandler(BaseRequestHandler):
     @check_authorization
     def get(self):
@@ -1202,22 +1357,50 @@ class GetVenvStatusHandler(BaseRequestHandler):
 
 class GetVenvPackagesHandler(BaseRequestHandler):
     @requires_admin_rights
-    def get(self):
+    async def get(self):
         venv_service = self.application.venv_service
         if venv_service is None:
             raise tornado.web.HTTPError(503, 'Venv service not available')
 
         try:
-            packages = venv_service.list_packages()
-            status = venv_service.get_status()
+            packages = await self.run_blocking(venv_service.list_packages)
+            status = await self.run_blocking(venv_service.get_status)
             self.write(json.dumps({'packages': packages, 'status': status}))
         except RuntimeError as e:
             raise tornado.web.HTTPError(500, reason=str(e))
 
 
-class InstallVenvPackageHandler(BaseRequestHandler):
+class BackgroundJobRequestHandler(BaseRequestHandler):
+    async def respond_with_job(self, job):
+        """
+        Responds with the job result, when the job is finished.
+        With wait=false argument, responds immediately with the job info (status 202)
+        """
+        if self.get_argument('wait', 'true').lower() == 'false':
+            self.set_status(202)
+            self.write(json.dumps(job.to_dict()))
+            return
+
+        # waiting doesn't block IOLoop, the job runs in its own thread
+        await asyncio.wrap_future(job.finished_future)
+
+        if job.status == STATUS_CANCELLED:
+            raise tornado.web.HTTPError(409, reason='Job was cancelled')
+        if job.status == STATUS_FAILED:
+            raise tornado.web.HTTPError(500, reason=job.error)
+
+        self.write(json.dumps(dict(job.result, job_id=job.id)))
+
+
+class VenvJobRequestHandler(BackgroundJobRequestHandler):
+    def submit_venv_job(self, operation, description, action):
+        venv_service = self.application.venv_service
+        return self.application.venv_job_service.submit(venv_service.venv_path, operation, description, action)
+
+
+class InstallVenvPackageHandler(VenvJobRequestHandler):
     @requires_admin_rights
-    def post(self):
+    async def post(self):
         venv_service = self.application.venv_service
         if venv_service is None:
             raise tornado.web.HTTPError(503, 'Venv service not available')
@@ -1230,31 +1413,143 @@ class InstallVenvPackageHandler(BaseRequestHandler):
             if not package:
                 raise tornado.web.HTTPError(400, reason='Package name is required')
 
-            result = venv_service.install_package(package, version)
-            self.write(json.dumps(result))
+            package, version = venv_service.validate_install_request(package, version)
         except ValueError as e:
             raise tornado.web.HTTPError(400, reason=str(e))
-        except RuntimeError as e:
-            raise tornado.web.HTTPError(500, reason=str(e))
+
+        package_spec = f'{package}=={version}' if version else package
+        job = self.submit_venv_job(
+            'install',
+            f'Install {package_spec}',
+            lambda job: venv_service.install_package(package, version, job=job))
+
+        await self.respond_with_job(job)
 
 
-class UninstallVenvPackageHandler(BaseRequestHandler):
+class UninstallVenvPackageHandler(VenvJobRequestHandler):
     @requires_admin_rights
-    def delete(self, package_name):
+    async def delete(self, package_name):
         venv_service = self.application.venv_service
         if venv_service is None:
             raise tornado.web.HTTPError(503, 'Venv service not available')
 
         try:
-            result = venv_service.uninstall_package(package_name)
-            self.write(json.dumps(result))
+            package = venv_service.validate_uninstall_request(package_name)
         except ValueError as e:
             raise tornado.web.HTTPError(400, reason=str(e))
         except RuntimeError as e:
             raise tornado.web.HTTPError(500, reason=str(e))
 
+        job = self.submit_venv_job(
+            'uninstall',
+            f'Uninstall {package}',
+            lambda job: venv_service.uninstall_package(package, job=job))
+
+        await self.respond_with_job(job)
+
+
+class GetVenvJobsHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self):
+        jobs = self.application.venv_job_service.list_jobs()
+        self.write(json.dumps({'jobs': [job.to_dict() for job in jobs]}))
+
+
+class VenvJobHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self, job_id):
+        job = self.application.venv_job_service.get_job(job_id)
+        if job is None:
+            raise tornado.web.HTTPError(404, reason=f'Job {job_id} not found')
+
+        self.write(json.dumps(job.to_dict(include_output=True)))
+
+
+class CancelVenvJobHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def post(self, job_id):
+        try:
+            cancelled = self.application.venv_job_service.cancel(job_id)
+        except KeyError:
+            raise tornado.web.HTTPError(404, reason=f'Job {job_id} not found')
+
+        self.write(json.dumps({'cancelled': cancelled}))
+
+
+class BackgroundJobStreamSocket(tornado.websocket.WebSocketHandler):
+    """Streams output of a job. When the job is finished, sends 'finished' event and closes the socket"""
+
+    def __init__(self, application, request, **kwargs):
+        super().__init__(application, request, **kwargs)
+
+        self.job = None
+        self.output_listener = None
+
+    def initialize(self, job_service_name):
+        self.job_service_name = job_service_name
+
+    def open(self, job_id):
+        if not has_admin_rights(self):
+            self.close(code=403, reason='Access denied')
+            return
+
+        job_service = getattr(self.application, self.job_service_name)
+        self.job = job_service.get_job(job_id)
+        if self.job is None:
+            self.close(code=404, reason=f'Job {job_id} not found')
+            return
+
+        io_loop = tornado.ioloop.IOLoop.current()
+        web_socket = self
+        job = self.job
+
+        class JobOutputListener:
+            def on_next(self, output):
+                io_loop.add_callback(web_socket.safe_write, wrap_to_server_event('output', output))
+
+            def on_close(self):
+                io_loop.add_callback(web_socket.finish_stream)
+
+        self.output_listener = JobOutputListener()
+        job.output_stream.subscribe(self.output_listener)
+
+    def finish_stream(self):
+        self.safe_write(wrap_to_server_event('finished', self.job.to_dict()))
+
+        if self.ws_connection is not None:
+            self.close(code=WEBSOCKET_NORMAL_CLOSE_CODE)
+
+    def safe_write(self, message):
+        if self.ws_connection is not None:
+            self.write_message(message)
+
+    def on_close(self):
+        if (self.job is not None) and (self.output_listener is not None):
+            self.job.output_stream.unsubscribe(self.output_listener)
+
 
 # Server Logs Handler
+class GetIOLoopMetricsHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self):
+        """Get statistics of IOLoop blocking (time, when the server couldn't handle any requests)."""
+        self.write(json.dumps(self.application.ioloop_monitor.get_stats()))
+
+
+class GetSchedulerMetricsHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self):
+        """Get statistics of scheduled jobs dispatching (pending jobs, dispatch lag)."""
+        self.write(json.dumps(self.application.schedule_service.scheduler.get_stats()))
+
+
+class GetExecutionQueueMetricsHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self):
+        """Get statistics of execution concurrency limits (running and queued executions)."""
+        self.write(json.dumps(self.application.execution_service.get_queue_stats()))
+
+
 class GetServerLogsHandler(BaseRequestHandler):
     @requires_admin_rights
     def get(self):
@@ -1333,6 +1628,22 @@ class GetServerLogsHandler(BaseRequestHandler):
 
 
 class ValidateScriptsHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self):
+        """Get the latest validation status of all scripts"""
+        if not hasattr(self.application, 'script_validator'):
+            raise tornado.web.HTTPError(503, reason='Script validator not available')
+
+        script_validator = self.application.script_validator
+        results = script_validator.get_all_statuses()
+
+        self.write(json.dumps({
+            'last_run': script_validator.last_run,
+            'validated': len(results),
+            'invalid_count': sum(1 for r in results.values() if not r['valid']),
+            'results': results
+        }))
+
     @requires_admin_rights
     def post(self):
         """Re-validate all scripts on-demand"""
@@ -1366,14 +1677,14 @@ class ValidateScriptsHandler(BaseRequestHandler):
 # Requirements.txt Management Handlers
 class GetRequirementsHandler(BaseRequestHandler):
     @requires_admin_rights
-    def get(self):
+    async def get(self):
         """Get auto-populated requirements from venv with script dependencies and missing packages"""
         venv_service = self.application.venv_service
         if venv_service is None:
             raise tornado.web.HTTPError(503, 'Venv service not available')
 
         try:
-            data = venv_service.get_requirements_with_dependencies()
+            data = await self.run_blocking(venv_service.get_requirements_with_dependencies)
             self.write(json.dumps(data))
         except Exception as e:
             raise tornado.web.HTTPError(500, reason=str(e))
@@ -1399,20 +1710,26 @@ class UpdateRequirementsHandler(BaseRequestHandler):
             raise tornado.web.HTTPError(500, reason=str(e))
 
 
-class SyncRequirementsHandler(BaseRequestHandler):
+class SyncRequirementsHandler(VenvJobRequestHandler):
     @requires_admin_rights
-    def post(self):
+    async def post(self):
         """Install all packages from requirements.txt"""
         venv_service = self.application.venv_service
         if venv_service is None:
             raise tornado.web.HTTPError(503, 'Venv service not available')
 
         try:
-            result = venv_service.sync_requirements()
-            self.write(json.dumps(result))
+            venv_service.validate_sync_request()
         except Exception as e:
             raise tornado.web.HTTPError(500, reason=str(e))
 
+        job = self.submit_venv_job(
+            'sync',
+            'Install packages from requirements.txt',
+            lambda job: venv_service.sync_requirements(job=job))
+
+        await self.respond_with_job(job)
+
 
 class GetRequirementsStatusHandler(BaseRequestHandler):
     @requires_admin_rights
@@ -1496,42 +1813,70 @@ class ListProjectsHandler(BaseRequestHandler):
         self.write(json.dumps({'projects': projects}))
 
 
-class ImportProjectHandler(BaseRequestHandler):
+class ImportProjectHandler(BackgroundJobRequestHandler):
     @requires_admin_rights
-    def post(self):
+    async def post(self):
         project_service = self.application.project_service
         if project_service is None:
             raise tornado.web.HTTPError(503, 'Project service not available')
 
         try:
             body = json.loads(self.request.body.decode('utf-8'))
-            import_type = body.get('type')
-
-            if import_type == 'git':
-                url = body.get('url')
-                branch = body.get('branch')
-                if not url:
-                    raise tornado.web.HTTPError(400, reason='Git URL is required')
-                result = project_service.import_from_git(url, branch)
-            elif import_type == 'zip':
-                import base64
-                file_data = body.get('file')
-                filename = body.get('filename', 'project.zip')
-                if not file_data:
-                    raise tornado.web.HTTPError(400, reason='ZIP file data is required')
-                file_bytes = base64.b64decode(file_data)
-                result = project_service.import_from_zip(file_bytes, filename)
-            elif import_type == 'local':
-                local_path = body.get('path')
-                if not local_path:
-                    raise tornado.web.HTTPError(400, reason='Local path is required')
-                result = project_service.import_from_local(local_path)
-            else:
-                raise tornado.web.HTTPError(400, reason='Invalid import type. Use "git", "zip", or "local"')
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, reason=str(e))
+
+        import_type = body.get('type')
+
+        if import_type == 'git':
+            url = body.get('url')
+            branch = body.get('branch')
+            if not url:
+                raise tornado.web.HTTPError(400, reason='Git URL is required')
+            description = f'Import {url}'
+            action = lambda job: project_service.import_from_git(url, branch, job=job)
+        elif import_type == 'zip':
+            import base64
+            file_data = body.get('file')
+            filename = body.get('filename', 'project.zip')
+            if not file_data:
+                raise tornado.web.HTTPError(400, reason='ZIP file data is required')
+            file_bytes = base64.b64decode(file_data)
+            description = f'Import {filename}'
+            action = lambda job: project_service.import_from_zip(file_bytes, filename, job=job)
+        elif import_type == 'local':
+            local_path = body.get('path')
+            if not local_path:
+                raise tornado.web.HTTPError(400, reason='Local path is required')
+            description = f'Import {local_path}'
+            action = lambda job: project_service.import_from_local(local_path, job=job)
+        else:
+            raise tornado.web.HTTPError(400, reason='Invalid import type. Use "git", "zip", or "local"')
+
+        # imports are executed one by one, so unique project ids and names are not raced
+        job = self.application.project_import_job_service.submit(PROJECT_IMPORT_QUEUE, 'import', description, action)
+
+        await self.respond_with_job(job)
 
-            self.write(json.dumps(result))
-        except Exception as e:
-            raise tornado.web.HTTPError(500, reason=str(e))
+
+class ProjectImportJobHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def get(self, job_id):
+        job = self.application.project_import_job_service.get_job(job_id)
+        if job is None:
+            raise tornado.web.HTTPError(404, reason=f'Job {job_id} not found')
+
+        self.write(json.dumps(job.to_dict(include_output=True)))
+
+
+class CancelProjectImportJobHandler(BaseRequestHandler):
+    @requires_admin_rights
+    def post(self, job_id):
+        try:
+            cancelled = self.application.project_import_job_service.cancel(job_id)
+        except KeyError:
+            raise tornado.web.HTTPError(404, reason=f'Job {job_id} not found')
+
+        self.write(json.dumps({'cancelled': cancelled}))
 
 
 class GetProjectHandler(BaseRequestHandler):
@@ -1549,13 +1894,14 @@ class GetProjectHandler(BaseRequestHandler):
 
 class DeleteProjectHandler(BaseRequestHandler):
     @requires_admin_rights
-    def delete(self, project_id):
+    async def delete(self, project_id):
         project_service = self.application.project_service
         if project_service is None:
             raise tornado.web.HTTPError(503, 'Project service not available')
 
         try:
-            deleted = project_service.delete_project(project_id)
+            # deletion removes files and unused venvs, so it's not done on the IOLoop
+            deleted = await self.run_blocking(project_service.delete_project, project_id)
             if not deleted:
                 raise tornado.web.HTTPError(404, reason='Project not found')
             self.write(json.dumps({'success': True}))
@@ -2068,6 +2414,7 @@ def init(server_config: ServerConfig,
          conf_folder,
          *,
          auth_initializer=None,
+         project_service=None,
          start_server=True):
     ssl_context = None
     if server_config.is_ssl():
@@ -2102,8 +2449,10 @@ def init(server_config: ServerConfig,
                 (r'/history/execution_log/(.*)', DeleteHistoryEntryHandler),
                 (r'/schedule', AddSchedule),
                 (r'/schedules', GetSchedules),
+                (r'/schedules/preview', SchedulePreviewHandler),
                 (r'/schedules/([^/]+)', ScheduleHandler),
                 (r'/schedules/([^/]+)/enabled', ToggleScheduleEnabled),
+                (r'/schedules/([^/]+)/runs', GetScheduleRuns),
                 (r'/schedules/settings', ScheduleSettingsHandler),
                 (r'/auth/info', AuthInfoHandler),
                 (r'/result_files/(.*)',
@@ -2128,6 +2477,11 @@ def init(server_config: ServerConfig,
                 (r'/admin/venv/packages', GetVenvPackagesHandler),
                 (r'/admin/venv/packages/install', InstallVenvPackageHandler),
                 (r'/admin/venv/packages/([^/]+)', UninstallVenvPackageHandler),
+                (r'/admin/venv/jobs', GetVenvJobsHandler),
+                (r'/admin/venv/jobs/([^/]+)', VenvJobHandler),
+                (r'/admin/venv/jobs/([^/]+)/cancel', CancelVenvJobHandler),
+                (r'/admin/venv/jobs/([^/]+)/stream', BackgroundJobStreamSocket,
+                 {'job_service_name': 'venv_job_service'}),
                 # Requirements.txt management endpoints
                 (r'/admin/venv/requirements', GetRequirementsHandler),
                 (r'/admin/venv/requirements/update', UpdateRequirementsHandler),
@@ -2137,9 +2491,16 @@ def init(server_config: ServerConfig,
                 (r'/admin/filesystem/browse', FilesystemBrowseHandler),
                 # Server logs endpoint
                 (r'/admin/logs/server', GetServerLogsHandler),
+                (r'/admin/metrics/ioloop', GetIOLoopMetricsHandler),
+                (r'/admin/metrics/scheduler', GetSchedulerMetricsHandler),
+                (r'/admin/metrics/executions', GetExecutionQueueMetricsHandler),
                 # Project management endpoints
                 (r'/admin/projects', ListProjectsHandler),
                 (r'/admin/projects/import', ImportProjectHandler),
+                (r'/admin/project-imports/([^/]+)', ProjectImportJobHandler),
+                (r'/admin/project-imports/([^/]+)/cancel', CancelProjectImportJobHandler),
+                (r'/admin/project-imports/([^/]+)/stream', BackgroundJobStreamSocket,
+                 {'job_service_name': 'project_import_job_service'}),
                 (r'/admin/projects/([^/]+)', GetProjectHandler),
                 (r'/admin/projects/([^/]+)/delete', DeleteProjectHandler),
                 (r'/admin/projects/([^/]+)/dependencies', GetProjectDependenciesHandler),
@@ -2191,6 +2552,8 @@ def init(server_config: ServerConfig,
     application.schedule_service = schedule_service
     application.execution_logging_service = execution_logging_service
     application.config_service = config_service
+    application.scripts_summary_cache = ScriptsSummaryCache()
+    application.io_executor = ThreadPoolExecutor(max_workers=IO_EXECUTOR_MAX_WORKERS, thread_name_prefix='web-io')
     application.alerts_service = alerts_service
     application.identification = identification
     application.max_request_size_mb = server_config.max_request_size_mb
@@ -2207,11 +2570,15 @@ def init(server_config: ServerConfig,
     # __file__ is src/web/server.py, so go up 3 levels to get project root
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     application.venv_service = VenvService(project_root)
+    application.venv_job_service = BackgroundJobService(thread_name_prefix='venv-job')
 
-    # Initialize project manager service
-    from project_manager.project_service import ProjectService
-    # project_root is already calculated above
-    application.project_service = ProjectService(project_root)
+    # Initialize project manager service (shared with config service, if provided)
+    if project_service is None:
+        from project_manager.project_service import ProjectService
+        # project_root is already calculated above
+        project_service = ProjectService(project_root)
+    application.project_service = project_service
+    application.project_import_job_service = BackgroundJobService(thread_name_prefix='project-import')
 
     # Initialize connection management (encryption + connection service)
     from connections.encryption import init_encryption
@@ -2222,26 +2589,18 @@ def init(server_config: ServerConfig,
     init_connection_service(connections_dir)
     LOGGER.info('Connection management initialized')
 
-    # Initialize script validator and validate all scripts on startup
+    # Initialize script validator, scripts are validated in background, so startup doesn't wait for it
     from script_validator import ScriptValidator
     application.script_validator = ScriptValidator()
-    LOGGER.info('Validating scripts on startup...')
-    try:
-        # Validate from config folder
-        config_folder = os.path.join(conf_folder, 'runners')
-        validation_results = application.script_validator.validate_from_config_folder(config_folder)
-        invalid_count = sum(1 for r in validation_results.values() if not r['valid'])
-        if invalid_count > 0:
-            LOGGER.warning(f'Found {invalid_count} invalid script(s) during startup validation')
-        else:
-            LOGGER.info(f'All {len(validation_results)} scripts validated successfully')
-    except Exception as e:
-        LOGGER.warning(f'Could not validate scripts on startup: {e}')
+    application.script_validator.start(os.path.join(conf_folder, 'runners'))
 
     if os_utils.is_win() and env_utils.is_min_version('3.8'):
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     io_loop = tornado.ioloop.IOLoop.current()
 
+    application.ioloop_monitor = IOLoopMonitor()
+    application.ioloop_monitor.start()
+
     global _http_server
     _http_server = httpserver.HTTPServer(
         application,
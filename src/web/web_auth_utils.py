@@ -1,3 +1,4 @@
+import inspect
 import logging
 from urllib.parse import urlencode
 
@@ -38,7 +39,7 @@ def check_authorization(func, ):
 
         login_resource = is_allowed_during_login(request_path, login_url, self)
         if login_resource:
-            return func(self, *args, **kwargs)
+            return await _call_handler(func, self, *args, **kwargs)
 
         try:
             authenticated = await auth.is_authenticated(self)
@@ -71,7 +72,7 @@ def check_authorization(func, ):
                     raise tornado.web.HTTPError(code, message)
 
         if authenticated and access_allowed:
-            return func(self, *args, **kwargs)
+            return await _call_handler(func, self, *args, **kwargs)
 
         # User is not authenticated
         message = 'Not authenticated'
@@ -100,6 +101,15 @@ def check_authorization(func, ):
     return wrapper
 
 
+async def _call_handler(func, self, *args, **kwargs):
+    result = func(self, *args, **kwargs)
+
+    # native coroutines (async def handlers) are not started, until they are awaited
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
 def is_allowed_during_login(request_path, login_url, request_handler):
     if request_handler.request.method != 'GET':
         return False